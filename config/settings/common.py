@@ -122,6 +122,8 @@ SECRET_KEY = env('DJANGO_SECRET_KEY', default='c4)!ho4t^lsy0ozrnlqamjso@^n-ookiq
 # MIDDLEWARE CONFIGURATION
 # ------------------------------------------------------------------------------
 MIDDLEWARE_FIRST = (
+    'shared.metrics.MetricsMiddleware',
+    'shared.db.ReadReplicaMiddleware',
     # 'django.middleware.cache.UpdateCacheMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -199,6 +201,13 @@ CACHES = {
     "select2": {
         "BACKEND": "django.core.cache.backends.db.DatabaseCache",
         'LOCATION': 'select2_cache_table'
+    },
+    # Shared tier of the API response cache, see shared.cache
+    "api": {
+        "BACKEND": env("API_CACHE_BACKEND", default="django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": env("API_CACHE_LOCATION", default="/tmp/tsc-api-cache"),
+        "TIMEOUT": env("API_CACHE_SECONDS", default=86400),
+        "OPTIONS": {"MAX_ENTRIES": env("API_CACHE_MAX_ENTRIES", default=5000)},
     }
 }
 
@@ -261,6 +270,29 @@ MANAGERS = ADMINS
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#databases
 DATABASES = {'default': database.config()}
 DATABASES['default']['ATOMIC_REQUESTS'] = True
+DATABASES['default']['CONN_MAX_AGE'] = env('CONN_MAX_AGE', default=60)
+
+# Read database for safe reads of list, detail, tile and export views, see shared.db.
+# Without READ_DATABASE_URL, a second connection to the primary.
+READ_DATABASE_ALIAS = 'read'
+DATABASES[READ_DATABASE_ALIAS] = (
+    database.config(name='READ_DATABASE_URL') if env('READ_DATABASE_URL', default=None)
+    else dict(DATABASES['default']))
+DATABASES[READ_DATABASE_ALIAS]['ATOMIC_REQUESTS'] = False
+DATABASES[READ_DATABASE_ALIAS]['CONN_MAX_AGE'] = env('READ_CONN_MAX_AGE', default=60)
+DATABASES[READ_DATABASE_ALIAS]['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['shared.db.ReadReplicaRouter']
+
+# A second, autocommit connection to the primary for JobRuns, see shared.jobs.
+# Runs of jobs which fail inside a transaction are kept when it rolls back.
+JOBS_DATABASE_ALIAS = 'jobs'
+DATABASES[JOBS_DATABASE_ALIAS] = dict(DATABASES['default'])
+DATABASES[JOBS_DATABASE_ALIAS]['ATOMIC_REQUESTS'] = False
+DATABASES[JOBS_DATABASE_ALIAS]['TEST'] = {'MIRROR': 'default'}
+
+# Seconds to read from the primary after a user's own write, and the cookie to remember it
+READ_REPLICA_PIN_SECONDS = env('READ_REPLICA_PIN_SECONDS', default=15)
+READ_REPLICA_PIN_COOKIE = 'read_primary_until'
 
 
 # GENERAL CONFIGURATION
@@ -645,6 +677,16 @@ GRAPHENE = {
     'SCHEMA': 'api.schema'
 }
 
+# GraphQL API: default and maximum page size of connections, estimated length of unpaginated
+# lists, maximum depth and complexity of a query, and number of parsed queries kept per process,
+# see shared.gql
+GRAPHQL_PAGE_SIZE = env("GRAPHQL_PAGE_SIZE", default=100)
+GRAPHQL_MAX_PAGE_SIZE = env("GRAPHQL_MAX_PAGE_SIZE", default=1000)
+GRAPHQL_LIST_SIZE = env("GRAPHQL_LIST_SIZE", default=10)
+GRAPHQL_MAX_DEPTH = env("GRAPHQL_MAX_DEPTH", default=10)
+GRAPHQL_MAX_COMPLEXITY = env("GRAPHQL_MAX_COMPLEXITY", default=20000)
+GRAPHQL_DOCUMENT_CACHE_SIZE = env("GRAPHQL_DOCUMENT_CACHE_SIZE", default=256)
+
 
 # Guardian permissions, django-polymorphic integration
 GUARDIAN_GET_CONTENT_TYPE = 'polymorphic.contrib.guardian.get_polymorphic_base_content_type'
@@ -680,6 +722,84 @@ DATA_ROOT = os.path.join(MEDIA_ROOT, 'data')
 if not os.path.exists(DATA_ROOT):
     os.mkdir(DATA_ROOT)
 
+# Seconds between checks whether the in-process Area index is outdated
+AREA_INDEX_CHECK_SECONDS = env("AREA_INDEX_CHECK_SECONDS", default=30)
+
+# Deferred rendering of Encounter popups: seconds to wait before rendering,
+# Encounters per batch, and worker processes
+ENCOUNTER_RENDER_DELAY = env("ENCOUNTER_RENDER_DELAY", default=5)
+ENCOUNTER_RENDER_BATCH_SIZE = env("ENCOUNTER_RENDER_BATCH_SIZE", default=200)
+ENCOUNTER_RENDER_PROCESSES = env("ENCOUNTER_RENDER_PROCESSES", default=1)
+
+# ODK Aggregate API credentials
+ODKA_URL = env("ODKA_URL", default="")
+ODKA_UN = env("ODKA_UN", default="")
+ODKA_PW = env("ODKA_PW", default="")
+
+# ODK media downloads: concurrent workers, attempts per file, read timeout (s),
+# delay (s) before failed downloads are retried, and number of retries before they are dropped
+MEDIA_FETCH_WORKERS = env("MEDIA_FETCH_WORKERS", default=8)
+MEDIA_FETCH_ATTEMPTS = env("MEDIA_FETCH_ATTEMPTS", default=3)
+MEDIA_FETCH_TIMEOUT = env("MEDIA_FETCH_TIMEOUT", default=60)
+MEDIA_FETCH_RETRY_DELAY = env("MEDIA_FETCH_RETRY_DELAY", default=3600)
+MEDIA_FETCH_MAX_RETRIES = env("MEDIA_FETCH_MAX_RETRIES", default=5)
+
+# Nesting season analytics: first month of a nesting season (local time),
+# and seconds to cache season summaries
+NESTING_SEASON_START_MONTH = env("NESTING_SEASON_START_MONTH", default=7)
+SEASON_ANALYTICS_CACHE_SECONDS = env("SEASON_ANALYTICS_CACHE_SECONDS", default=900)
+
+# Duplicate Encounter detection: maximum distance (m) and time difference (min),
+# and minimum score of likely duplicates
+DUPLICATE_DISTANCE_M = env("DUPLICATE_DISTANCE_M", default=10)
+DUPLICATE_MINUTES = env("DUPLICATE_MINUTES", default=30)
+DUPLICATE_MIN_SCORE = env("DUPLICATE_MIN_SCORE", default=0.7)
+
+# Occurrence duplicate clusters: maximum distance (m) between duplicate TAE or CAE
+OCCURRENCE_DUPLICATE_DISTANCE_M = env("OCCURRENCE_DUPLICATE_DISTANCE_M", default=50)
+
+# API response cache: on/off, size of the per-process LRU (responses),
+# and the models whose versions invalidate cached responses, see shared.cache
+API_CACHE_ENABLED = env("API_CACHE_ENABLED", default=True)
+API_CACHE_LRU_SIZE = env("API_CACHE_LRU_SIZE", default=256)
+API_CACHE_MODELS = [
+    "taxonomy.Taxon",
+    "taxonomy.Community",
+    "taxonomy.Crossreference",
+    "conservation.TaxonConservationListing",
+    "conservation.CommunityConservationListing",
+    "occurrence.AreaEncounter",
+]
+
+# Taxon search: results per autocomplete request, and size of the per-process LRU (searches),
+# see taxonomy.search
+TAXON_SEARCH_LIMIT = env("TAXON_SEARCH_LIMIT", default=20)
+TAXON_SEARCH_LRU_SIZE = env("TAXON_SEARCH_LRU_SIZE", default=1024)
+
+# Taxon name resolution: maximum names and NameIDs per request, see taxonomy.resolver
+TAXON_RESOLVE_MAX_NAMES = env("TAXON_RESOLVE_MAX_NAMES", default=100000)
+
+# Apps whose models maintain change watermarks for conditional API requests, see shared.watermarks
+CHANGE_WATERMARK_APPS = ["taxonomy", "conservation", "occurrence"]
+
+# Change feed: changed and deleted keys per entity and request,
+# and seconds to hold back recent changes of possibly still open transactions, see shared.changefeed
+CHANGE_FEED_PAGE_SIZE = env("CHANGE_FEED_PAGE_SIZE", default=1000)
+CHANGE_FEED_LAG_SECONDS = env("CHANGE_FEED_LAG_SECONDS", default=60)
+
+# Request metrics per view and method, see shared.metrics: on/off,
+# the directory of the per-worker counter files (shared memory if available),
+# seconds between writes of the counters, latency histogram buckets (seconds),
+# the bearer token for Prometheus scrapers of /metrics,
+# and the slow request log: threshold (seconds, 0: off) and number of SQL statements logged
+METRICS_ENABLED = env("METRICS_ENABLED", default=True)
+METRICS_DIR = env("METRICS_DIR", default="/dev/shm/tsc-metrics" if os.path.isdir("/dev/shm") else "/tmp/tsc-metrics")
+METRICS_FLUSH_SECONDS = env("METRICS_FLUSH_SECONDS", default=5)
+METRICS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_TOKEN = env("METRICS_TOKEN", default=None)
+METRICS_SLOW_REQUEST_SECONDS = env("METRICS_SLOW_REQUEST_SECONDS", default=0)
+METRICS_SLOW_SQL_TOP = env("METRICS_SLOW_SQL_TOP", default=5)
+
 # LOGGING CONFIGURATION
 # ------------------------------------------------------------------------------
 # See: https://docs.djangoproject.com/en/dev/ref/settings/#logging
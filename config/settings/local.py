@@ -39,6 +39,9 @@ CACHES = {
     },
     "select2": {
         "BACKEND": "django.core.cache.backends.dummy.DummyCache",
+    },
+    "api": {
+        "BACKEND": "django.core.cache.backends.dummy.DummyCache",
     }
 }
 
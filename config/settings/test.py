@@ -61,6 +61,15 @@ EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
 }
 SELECT2_CACHE_BACKEND = "default"
 
+# Test databases are rolled back without saving or deleting, which would leave
+# stale API responses cached. Tests of the API cache enable it explicitly.
+API_CACHE_ENABLED = False
+
+# Test cases run in a transaction on "default", which a second connection
+# would not see. Route all reads and JobRuns to "default".
+READ_DATABASE_ALIAS = 'default'
+JOBS_DATABASE_ALIAS = 'default'
+
 # TESTING
 # ------------------------------------------------------------------------------
 TEST_RUNNER = 'django.test.runner.DiscoverRunner'
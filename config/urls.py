@@ -15,9 +15,10 @@ from adminactions import actions
 from djgeojson.views import GeoJSONLayerView, TiledGeoJSONLayerView
 from rest_framework.authtoken import views as drf_authviews
 from rest_framework.documentation import include_docs_urls
-from graphene_django.views import GraphQLView
 
 from occurrence.models import CommunityAreaEncounter
+from shared.gql import GraphQLView
+from shared.metrics import metrics_view
 from wastd.router import router
 from wastd.observations import models as wastd_models
 from wastd.observations import views as wastd_views
@@ -31,6 +32,7 @@ urlpatterns = [
     path('', TemplateView.as_view(template_name='pages/index.html'), name='home'),
     # path('map/', cache_page(60 * 60)(wastd_views.HomeView.as_view()), name='map'),
     path('healthcheck/', TemplateView.as_view(template_name='pages/healthcheck.html'), name='healthcheck'),
+    path('metrics', metrics_view, name='metrics'),
 
     path(settings.ADMIN_URL, admin.site.urls),
     path('grappelli/', include('grappelli.urls')),
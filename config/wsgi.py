@@ -19,7 +19,7 @@ import os
 import confy
 from dj_static import Cling, MediaCling  # noqa
 # from whitenoise import WhiteNoise
-from django.core.wsgi import get_wsgi_application  # noqa
+from shared.db import get_wsgi_application  # noqa
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.production")
 
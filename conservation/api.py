@@ -4,7 +4,7 @@ from rest_framework.response import Response
 from rest_framework.viewsets import ModelViewSet
 from rest_framework_filters import FilterSet
 
-from shared.api import BatchUpsertViewSet, MyGeoJsonPagination
+from shared.api import BatchUpsertViewSet, CachedResponseMixin, ConditionalGetMixin, MyGeoJsonPagination
 from shared.utils import force_as_list
 from conservation.models import (
     CommunityConservationListing,
@@ -106,7 +106,7 @@ class ConservationListFilter(FilterSet):
         }
 
 
-class ConservationListViewSet(ModelViewSet):
+class ConservationListViewSet(ConditionalGetMixin, ModelViewSet):
     model = ConservationList
     queryset = ConservationList.objects.all()
     serializer_class = ConservationListSerializer
@@ -184,7 +184,7 @@ class DocumentFilter(FilterSet):
 
 class DocumentViewSet(BatchUpsertViewSet):
     model = Document
-    queryset = Document.objects.all()
+    queryset = Document.objects.all().prefetch_related("taxa", "communities", "team")
     serializer_class = DocumentSerializer
     filterset_class = DocumentFilter
     uid_fields = ("source", "source_id")
@@ -221,14 +221,15 @@ class TaxonConservationListingFilter(FilterSet):
         }
 
 
-class TaxonConservationListingViewSet(BatchUpsertViewSet):
+class TaxonConservationListingViewSet(CachedResponseMixin, BatchUpsertViewSet):
     """View set for TaxonConservationListing."""
 
-    queryset = TaxonConservationListing.objects.all().select_related("taxon")
+    queryset = TaxonConservationListing.objects.all().select_related("taxon").prefetch_related("category", "criteria")
     serializer_class = TaxonConservationListingSerializer
     filterset_class = TaxonConservationListingFilter
     uid_fields = ("source", "source_id")
     model = TaxonConservationListing
+    cache_models = (TaxonConservationListing, Taxon)
 
     def resolve_fks(self, data):
         """Resolve FKs from PK to object."""
@@ -354,11 +355,13 @@ class CommunityConservationListingFilter(FilterSet):
         }
 
 
-class CommunityConservationListingViewSet(BatchUpsertViewSet):
+class CommunityConservationListingViewSet(CachedResponseMixin, BatchUpsertViewSet):
     """View set for CommunityConservationListing.
     """
     model = CommunityConservationListing
-    queryset = CommunityConservationListing.objects.all().select_related("community")
+    cache_models = (CommunityConservationListing, Community)
+    queryset = CommunityConservationListing.objects.all().select_related(
+        "community").prefetch_related("category", "criteria")
     serializer_class = CommunityConservationListingSerializer
     filterset_class = CommunityConservationListingFilter
     uid_fields = ("source", "source_id")
@@ -17,6 +17,7 @@ from django_fsm_log.decorators import fsm_log_by
 
 from wastd.users.models import User
 from shared.models import (
+    LastModifiedMixin,
     RenderMixin,
     UrlsMixin,
     CodeLabelDescriptionMixin,
@@ -826,7 +827,7 @@ class ActiveNationalConservationListingManager(models.Manager):
         )
 
 
-class ConservationListing(RenderMixin, UrlsMixin, models.Model):
+class ConservationListing(RenderMixin, UrlsMixin, LastModifiedMixin, models.Model):
     """The allocation of one or more ConservationCategories and Criteria.
 
     Approval state is tracked as django-fsm field.
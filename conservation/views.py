@@ -59,7 +59,8 @@ class ConservationThreatListView(
             "taxa",
             "communities",
             "document",
-            "category"
+            "category",
+            "encountered_by",
         )
         return cons_filters.ConservationThreatFilter(
             self.request.GET,
@@ -133,8 +134,19 @@ class DocumentListView(
         queryset = cons_models.Document.objects.all().prefetch_related(
             "taxa",
             "communities",
+            "attachments",
             "conservationaction_set",
+            "conservationaction_set__taxa",
+            "conservationaction_set__communities",
+            "conservationaction_set__document",
+            "conservationaction_set__category",
+            "conservationaction_set__conservationactivity_set",
             "conservationthreat_set",
+            "conservationthreat_set__taxa",
+            "conservationthreat_set__communities",
+            "conservationthreat_set__document",
+            "conservationthreat_set__category",
+            "conservationthreat_set__encountered_by",
         )
         return cons_filters.DocumentFilter(
             self.request.GET,
@@ -18,6 +18,7 @@ from reversion.admin import VersionAdmin
 from shared.admin import (
     CodeLabelDescriptionAdmin,
     CustomStateLogInline,
+    QA_TRANSITION_ACTIONS,
     S2ATTRS,
     FORMFIELD_OVERRIDES
 )
@@ -43,6 +44,7 @@ class FileAttachmentAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.FileAttachmentForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
 
 class FileAttachmentInline(admin.TabularInline):
@@ -109,6 +111,7 @@ class HabitatCompositionAdmin(FSMTransitionMixin, VersionAdmin):
 
     form = occ_forms.HabitatCompositionForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
 
     def get_queryset(self, request):
@@ -158,6 +161,7 @@ class AreaAssessmentAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.AreaAssessmentForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
     def get_queryset(self, request):
         return super(
@@ -206,6 +210,7 @@ class HabitatConditionAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.HabitatConditionForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
     def get_queryset(self, request):
         return super(
@@ -242,6 +247,7 @@ class FireHistoryAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.FireHistoryForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
     def get_queryset(self, request):
         return super(
@@ -349,6 +355,7 @@ class PlantCountAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.PlantCountForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
     fieldsets = (
         (_('Plant count survey'), {
@@ -432,6 +439,7 @@ class VegetationClassificationAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.VegetationClassificationForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
     def get_queryset(self, request):
         return super(
@@ -463,6 +471,7 @@ class AssociatedSpeciesAdmin(FSMTransitionMixin, VersionAdmin):
     list_display = ["encounter", "taxon", ]
     form = occ_forms.AssociatedSpeciesForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
     autocomplete_fields = ['taxon', ]
 
     def get_queryset(self, request):
@@ -610,6 +619,7 @@ class AnimalObservationAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.AnimalObservationForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
     # autocomplete_fields = ['taxon', ]
 
     def secondary_signs_list(self, obj):
@@ -670,6 +680,7 @@ class PhysicalSampleAdmin(FSMTransitionMixin, VersionAdmin):
     ]
     form = occ_forms.PhysicalSampleForm
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
     # autocomplete_fields = ['taxon', ]
 
 
@@ -707,6 +718,7 @@ class AreaEncounterAdmin(FSMTransitionMixin, ImportExportModelAdmin, VersionAdmi
     form = s2form(occ_models.AreaEncounter, attrs=S2ATTRS)
     formfield_overrides = FORMFIELD_OVERRIDES
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
     autocomplete_fields = ['encountered_by', ]
     fieldsets = (
         (_('Details'), {
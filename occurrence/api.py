@@ -1,4 +1,5 @@
 import logging
+from contextlib import contextmanager
 
 from django.apps import apps
 from rest_framework.decorators import action
@@ -6,13 +7,13 @@ from rest_framework.response import Response
 from rest_framework.serializers import ValidationError
 from rest_framework.status import HTTP_201_CREATED
 from rest_framework.viewsets import ModelViewSet
-from rest_framework_filters import FilterSet
+from rest_framework_filters import BooleanFilter, FilterSet
 
-from shared.api import BatchUpsertViewSet, MyGeoJsonPagination
+from shared.api import BatchUpsertViewSet, BulkTransitionMixin, CachedResponseMixin, MyGeoJsonPagination
 from wastd.users.models import User
 
 from taxonomy.models import Community, Taxon
-from occurrence import serializers
+from occurrence import clustering, serializers
 from occurrence.models import (
     AreaEncounter,
     TaxonAreaEncounter,
@@ -71,7 +72,7 @@ class OccurrenceAreaEncounterFilter(FilterSet):
         }
 
 
-class OccurrenceAreaPolyViewSet(BatchUpsertViewSet):
+class OccurrenceAreaPolyViewSet(BulkTransitionMixin, CachedResponseMixin, BatchUpsertViewSet):
     """Occurrence Area viewset.
     """
     model = AreaEncounter
@@ -90,6 +91,10 @@ class OccurrenceAreaPointViewSet(OccurrenceAreaPolyViewSet):
 class OccurrenceTaxonAreaEncounterFilter(FilterSet):
     """Occurrence TaxonAreaEncounter filter.
     """
+    collapse_duplicates = BooleanFilter(
+        method="filter_collapse_duplicates",
+        label="Return one encounter per duplicate cluster")
+
     class Meta:
         model = TaxonAreaEncounter
         fields = {
@@ -103,14 +108,32 @@ class OccurrenceTaxonAreaEncounterFilter(FilterSet):
             "source": ["exact", "in"],
             "source_id": ["exact", "in"],
             "encounter_type": ["exact", "in"],
+            "duplicate_cluster": ["exact", "in"],
         }
 
+    def filter_collapse_duplicates(self, queryset, name, value):
+        """Collapse duplicate clusters to their representative encounter."""
+        return clustering.collapse(queryset) if value else queryset
+
+
+class DuplicateClustersMixin(object):
+    """Refresh the duplicate clusters of encounters updated in bulk, see occurrence.clustering."""
+
+    @contextmanager
+    def bulk_updating(self, pks):
+        """Recluster the records after the update, e.g. when their points moved."""
+        with super().bulk_updating(pks):
+            yield
+        clustering.refresh_clusters(self.model, pks)
 
-class OccurrenceTaxonAreaEncounterPolyViewSet(BatchUpsertViewSet):
+
+class OccurrenceTaxonAreaEncounterPolyViewSet(
+        DuplicateClustersMixin, BulkTransitionMixin, CachedResponseMixin, BatchUpsertViewSet):
     """TaxonEncounter polygon view set.
     """
     model = TaxonAreaEncounter
     queryset = TaxonAreaEncounter.objects.all().prefetch_related("taxon")
+    cache_models = (AreaEncounter, Taxon)
     serializer_class = serializers.OccurrenceTaxonAreaEncounterPolySerializer
     filter_class = OccurrenceTaxonAreaEncounterFilter
     pagination_class = MyGeoJsonPagination
@@ -147,6 +170,10 @@ class OccurrenceTaxonAreaEncounterPointViewSet(OccurrenceTaxonAreaEncounterPolyV
 class OccurrenceCommunityAreaEncounterFilter(FilterSet):
     """Occurrence CommunityAreaEncounter filter.
     """
+    collapse_duplicates = BooleanFilter(
+        method="filter_collapse_duplicates",
+        label="Return one encounter per duplicate cluster")
+
     class Meta:
         model = CommunityAreaEncounter
         fields = {
@@ -159,14 +186,21 @@ class OccurrenceCommunityAreaEncounterFilter(FilterSet):
             "northern_extent": ["exact", "gt", "lt"],
             "source": ["exact", "in"],
             "source_id": ["exact", "in"],
+            "duplicate_cluster": ["exact", "in"],
         }
 
+    def filter_collapse_duplicates(self, queryset, name, value):
+        """Collapse duplicate clusters to their representative encounter."""
+        return clustering.collapse(queryset) if value else queryset
+
 
-class OccurrenceCommunityAreaEncounterPolyViewSet(BatchUpsertViewSet):
+class OccurrenceCommunityAreaEncounterPolyViewSet(
+        DuplicateClustersMixin, BulkTransitionMixin, CachedResponseMixin, BatchUpsertViewSet):
     """Occurrence CommunityAreaEncounter view set.
     """
     model = CommunityAreaEncounter
     queryset = CommunityAreaEncounter.objects.all().prefetch_related("community")
+    cache_models = (AreaEncounter, Community)
     serializer_class = serializers.OccurrenceCommunityAreaEncounterPolySerializer
     filter_class = OccurrenceCommunityAreaEncounterFilter
     pagination_class = MyGeoJsonPagination
@@ -388,7 +422,7 @@ class PermitTypeViewSet(BatchUpsertViewSet):
     model = PermitType
 
 
-class ObservationGroupViewSet(ModelViewSet):
+class ObservationGroupViewSet(BulkTransitionMixin, ModelViewSet):
     """ObservationGroup models.
 
     Filter the Observations to a specific type with the parameter `obstype`:
@@ -413,9 +447,9 @@ class ObservationGroupViewSet(ModelViewSet):
         """Filter queryset to the model specified by request parameter "obstype"."""
         model_name = self.request.query_params.get('obstype', None)
         if model_name is not None:
-            return apps.get_model("occurrence", model_name).objects.all()
+            return apps.get_model("occurrence", model_name).objects.all().prefetch_related("encounter")
         else:
-            return ObservationGroup.objects.all()
+            return ObservationGroup.objects.all().prefetch_related("encounter")
 
     @action(detail=False, methods=['post'])
     def bulk_create(self, request):
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""Clustering of near-duplicate occurrences.
+
+TaxonAreaEncounters of the same Taxon and CommunityAreaEncounters of the same
+Community are duplicates if their points lie within
+``settings.OCCURRENCE_DUPLICATE_DISTANCE_M`` metres of each other, directly or
+through other duplicates.
+
+Neighbours are found with ``ST_DWithin`` on the points cast to geography,
+which measures in metres and uses the geography index on
+``occurrence_areaencounter.point`` (see migration 0051).
+Each cluster is identified by its lowest AreaEncounter ID, which is stored
+as ``AreaEncounter.duplicate_cluster`` on all members. The member whose ID
+equals its cluster represents the cluster, see ``collapse``.
+
+Clusters are rebuilt with ``./manage.py cluster_occurrences`` and refreshed
+around each saved or deleted TAE and CAE (see the receivers in ``occurrence.models``).
+"""
+import logging
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from shared import cache as api_cache
+from shared import watermarks
+from wastd.observations.identity import UnionFind
+
+logger = logging.getLogger(__name__)
+
+
+def subject_field(model):
+    """Return the column of the subject which duplicates share, e.g. "taxon_id"."""
+    from occurrence.models import TaxonAreaEncounter
+
+    return "taxon_id" if issubclass(model, TaxonAreaEncounter) else "community_id"
+
+
+def neighbour_pairs(model, distance_m, ids=None):
+    """Return pairs of AreaEncounter IDs of the same subject within distance_m metres.
+
+    Arguments:
+    model TaxonAreaEncounter or CommunityAreaEncounter
+    distance_m The maximum distance in metres
+    ids A list of AreaEncounter IDs, default: None (all)
+
+    Returns:
+    A list of (id, id). Without ids, each pair is listed once as (lower, higher).
+    With ids, all pairs with a first ID in ids are listed.
+    """
+    from occurrence.models import AreaEncounter
+
+    sql = (
+        "SELECT a.areaencounter_ptr_id, b.areaencounter_ptr_id "
+        "FROM {child} a "
+        "JOIN {parent} pa ON pa.id = a.areaencounter_ptr_id "
+        "JOIN {child} b ON b.{subject} = a.{subject} AND b.areaencounter_ptr_id {op} a.areaencounter_ptr_id "
+        "JOIN {parent} pb ON pb.id = b.areaencounter_ptr_id "
+        "WHERE pa.point IS NOT NULL AND pb.point IS NOT NULL "
+        "AND ST_DWithin(pa.point::geography, pb.point::geography, %s)"
+    ).format(
+        child=model._meta.db_table,
+        parent=AreaEncounter._meta.db_table,
+        subject=subject_field(model),
+        op=">" if ids is None else "<>")
+    params = [distance_m]
+    if ids is not None:
+        sql += " AND a.areaencounter_ptr_id = ANY(%s)"
+        params.append(list(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def clusters(ids, pairs):
+    """Return a dict of AreaEncounter ID: cluster ID, the lowest ID of its cluster.
+
+    Arguments:
+    ids All AreaEncounter IDs to cluster
+    pairs Pairs of duplicate AreaEncounter IDs
+    """
+    uf = UnionFind()
+    for pk in ids:
+        uf.find(pk)
+    for a, b in pairs:
+        uf.union(a, b)
+    return {pk: min(members) for members in uf.groups().values() for pk in members}
+
+
+def save_clusters(cluster_ids, batch_size=1000):
+    """Store changed cluster IDs, return the number of updated AreaEncounters.
+
+    Arguments:
+    cluster_ids A dict of AreaEncounter ID: cluster ID or None
+    """
+    from occurrence.models import AreaEncounter
+
+    current = dict(AreaEncounter.objects.non_polymorphic().filter(
+        pk__in=list(cluster_ids)).values_list("pk", "duplicate_cluster"))
+    now = timezone.now()
+    changed = [
+        AreaEncounter(pk=pk, duplicate_cluster=cluster, last_modified=now)
+        for pk, cluster in cluster_ids.items()
+        if pk in current and current[pk] != cluster
+    ]
+    AreaEncounter.objects.bulk_update(changed, ["duplicate_cluster", "last_modified"], batch_size=batch_size)
+    if changed:
+        api_cache.bump(AreaEncounter)
+        watermarks.touch(AreaEncounter)
+    return len(changed)
+
+
+def cluster_all(model, distance_m=None):
+    """Rebuild the duplicate clusters of all TAE or CAE.
+
+    Arguments:
+    model TaxonAreaEncounter or CommunityAreaEncounter
+    distance_m The maximum distance in metres, default: settings.OCCURRENCE_DUPLICATE_DISTANCE_M
+
+    Returns:
+    A tuple of the number of clustered encounters, and of clusters with duplicates.
+    """
+    distance_m = distance_m or settings.OCCURRENCE_DUPLICATE_DISTANCE_M
+    ids = list(model.objects.non_polymorphic().exclude(point=None).values_list("pk", flat=True))
+    cluster_ids = clusters(ids, neighbour_pairs(model, distance_m))
+    # Encounters without a point are not clustered
+    cluster_ids.update((pk, None) for pk in model.objects.non_polymorphic().filter(
+        point=None).exclude(duplicate_cluster=None).values_list("pk", flat=True))
+    updated = save_clusters(cluster_ids)
+    duplicated = len({c for pk, c in cluster_ids.items() if c is not None and c != pk})
+    logger.info("[occurrence.clustering.cluster_all] {0}: {1} encounters, {2} clusters with duplicates, "
+                "{3} updated.".format(model._meta.verbose_name_plural, len(ids), duplicated, updated))
+    return len(ids), duplicated
+
+
+def refresh_clusters(model, ids, distance_m=None):
+    """Recluster the given encounters, their neighbours, and the members of their clusters.
+
+    Clusters are connected components, so reclustering the members of all touched
+    clusters together with any new neighbours of the given encounters is enough
+    to merge, split and re-identify them.
+
+    Arguments:
+    model TaxonAreaEncounter or CommunityAreaEncounter
+    ids A list of AreaEncounter IDs, e.g. of a saved encounter, or the
+        remaining members of a deleted encounter's cluster
+    distance_m The maximum distance in metres, default: settings.OCCURRENCE_DUPLICATE_DISTANCE_M
+
+    Returns:
+    The number of updated AreaEncounters.
+    """
+    distance_m = distance_m or settings.OCCURRENCE_DUPLICATE_DISTANCE_M
+    ids = set(ids)
+    if not ids:
+        return 0
+    qs = model.objects.non_polymorphic()
+    ids |= {b for a, b in neighbour_pairs(model, distance_m, ids)}
+    touched = set(qs.filter(pk__in=ids).exclude(duplicate_cluster=None).values_list(
+        "duplicate_cluster", flat=True))
+    ids |= set(qs.filter(duplicate_cluster__in=touched).values_list("pk", flat=True))
+
+    located = set(qs.filter(pk__in=ids).exclude(point=None).values_list("pk", flat=True))
+    pairs = [(a, b) for a, b in neighbour_pairs(model, distance_m, located) if b in located]
+    cluster_ids = clusters(located, pairs)
+    cluster_ids.update((pk, None) for pk in ids - located)
+    return save_clusters(cluster_ids)
+
+
+def collapse(queryset):
+    """Return only one encounter per duplicate cluster, and all unclustered encounters."""
+    return queryset.filter(Q(duplicate_cluster=None) | Q(duplicate_cluster=F("pk")))
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+"""Rebuild the duplicate clusters of TaxonAreaEncounters and CommunityAreaEncounters."""
+from django.core.management.base import BaseCommand
+
+from occurrence import clustering
+from occurrence.models import CommunityAreaEncounter, TaxonAreaEncounter
+
+
+class Command(BaseCommand):
+    """Rebuild the duplicate clusters of all TAE and CAE."""
+
+    help = "Group TAE and CAE of the same subject within a distance into duplicate clusters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--distance", type=float, default=None,
+            help="Maximum distance in metres, default: settings.OCCURRENCE_DUPLICATE_DISTANCE_M")
+
+    def handle(self, *args, **options):
+        for model in (TaxonAreaEncounter, CommunityAreaEncounter):
+            encounters, duplicated = clustering.cluster_all(model, distance_m=options["distance"])
+            self.stdout.write(self.style.SUCCESS("{0}: {1} encounters, {2} clusters with duplicates.".format(
+                model._meta.verbose_name_plural, encounters, duplicated)))
@@ -0,0 +1,23 @@
+# Generated by Django 3.1 on 2020-08-28 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('occurrence', '0050_auto_20200730_1248'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='areaencounter',
+            name='duplicate_cluster',
+            field=models.PositiveIntegerField(blank=True, db_index=True, editable=False, help_text='The lowest ID of all encounters with the same subject near this encounter, see occurrence.clustering.', null=True, verbose_name='Duplicate cluster'),
+        ),
+        migrations.RunSQL(
+            sql='CREATE INDEX occurrence_areaencounter_point_geog_idx '
+                'ON occurrence_areaencounter USING GIST ((point::geography));',
+            reverse_sql='DROP INDEX IF EXISTS occurrence_areaencounter_point_geog_idx;',
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.1 on 2020-08-30 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('occurrence', '0051_areaencounter_duplicate_cluster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='areaencounter',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time of the last change to this record.', verbose_name='Last modified'),
+        ),
+        migrations.AddField(
+            model_name='observationgroup',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='The time of the last change to this record.', verbose_name='Last modified'),
+        ),
+    ]
@@ -13,7 +13,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.gis.db import models as geo_models
 from django.urls import reverse
 from django.db import models
-from django.db.models.signals import post_save, pre_delete, pre_save  # noqa
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save  # noqa
 from django.dispatch import receiver
 
 from django.template import loader
@@ -24,8 +24,10 @@ from django.utils.translation import ugettext_lazy as _
 
 from polymorphic.models import PolymorphicModel
 
+from occurrence import clustering
 from shared.models import (
     CodeLabelDescriptionMixin,
+    LastModifiedMixin,
     RenderMixin,
     LegacySourceMixin,
     ObservationAuditMixin,
@@ -49,6 +51,7 @@ class AreaEncounter(PolymorphicModel,
                     LegacySourceMixin,
                     ObservationAuditMixin,
                     QualityControlMixin,
+                    LastModifiedMixin,
                     geo_models.Model):
     """An Encounter with an Area.
 
@@ -231,6 +234,14 @@ class AreaEncounter(PolymorphicModel,
         help_text=_("The exact extent of the area occupied by the encountered "
                     "subject as polygon in WGS84, if available."))
 
+    duplicate_cluster = models.PositiveIntegerField(
+        verbose_name=_("Duplicate cluster"),
+        editable=False,
+        db_index=True,
+        blank=True, null=True,
+        help_text=_("The lowest ID of all encounters with the same subject "
+                    "near this encounter, see occurrence.clustering."),)
+
     # -------------------------------------------------------------------------
     # Cached fields
     as_html = models.TextField(
@@ -461,11 +472,31 @@ def area_caches(sender, instance, *args, **kwargs):
         logger.info("[area_caches] New Area, re-save to populate caches.")
 
 
+@receiver(post_save, sender=TaxonAreaEncounter)
+@receiver(post_save, sender=CommunityAreaEncounter)
+def area_duplicate_clusters(sender, instance, *args, **kwargs):
+    """AreaEncounter: Refresh the duplicate clusters around the saved encounter."""
+    if kwargs.get("raw"):
+        return
+    clustering.refresh_clusters(sender, [instance.pk])
+
+
+@receiver(post_delete, sender=TaxonAreaEncounter)
+@receiver(post_delete, sender=CommunityAreaEncounter)
+def area_duplicate_clusters_delete(sender, instance, *args, **kwargs):
+    """AreaEncounter: Split the duplicate cluster of the deleted encounter."""
+    if instance.duplicate_cluster is None:
+        return
+    clustering.refresh_clusters(sender, sender.objects.non_polymorphic().filter(
+        duplicate_cluster=instance.duplicate_cluster).exclude(pk=instance.pk).values_list("pk", flat=True))
+
+
 # Observation models ---------------------------------------------------------#
 class ObservationGroup(
         QualityControlMixin,
         RenderMixin,
         UrlsMixin,
+        LastModifiedMixin,
         PolymorphicModel,
         models.Model):
     """The Observation base class for area encounter observations.
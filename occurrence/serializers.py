@@ -103,7 +103,8 @@ class OccurrenceTaxonAreaEncounterPolySerializer(GeoFeatureModelSerializer):
             "geolocation_capture_method",
             "accuracy",
             "northern_extent",
-            "point"
+            "point",
+            "duplicate_cluster",
         )
         id_field = "id"
         geo_field = "geom"
@@ -136,7 +137,7 @@ class OccurrenceCommunityAreaEncounterPolySerializer(GeoFeatureModelSerializer):
         fields = (
             "community", "id", "code", "label", "name", "description", "as_html", "source", "source_id",
             "status", "encountered_on", "encountered_by", "area_type", "accuracy", "northern_extent",
-            "point",
+            "point", "duplicate_cluster",
         )
         id_field = "id"
         geo_field = "geom"
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Occurrence duplicate clustering tests."""
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from model_mommy import mommy
+
+from occurrence import clustering
+from occurrence.models import EncounterType, TaxonAreaEncounter
+from taxonomy.models import Taxon
+
+
+class ClustersTests(SimpleTestCase):
+    """Tests for grouping duplicate pairs into clusters."""
+
+    def test_clusters(self):
+        self.assertEqual(
+            clustering.clusters([4, 5, 7, 9], [(5, 9), (9, 7)]),
+            {4: 4, 5: 5, 7: 5, 9: 5})
+
+
+@override_settings(OCCURRENCE_DUPLICATE_DISTANCE_M=50)
+class ClusteringTests(TestCase):
+    """Tests for duplicate clusters of TaxonAreaEncounters."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser(
+            username="superuser", email="super@gmail.com", password="test")
+        self.taxon = mommy.make(Taxon, name_id=1000, name="name0")
+        self.other_taxon = mommy.make(Taxon, name_id=1001, name="name1")
+
+    def make(self, lon, lat, taxon=None):
+        return TaxonAreaEncounter.objects.create(
+            taxon=taxon or self.taxon,
+            source_id=uuid.uuid1(),
+            encountered_on=timezone.now(),
+            encountered_by=self.user,
+            point=Point(lon, lat, srid=4326))
+
+    def cluster(self, tae):
+        tae.refresh_from_db()
+        return tae.duplicate_cluster
+
+    def test_refresh_on_save(self):
+        first = self.make(115, -32)
+        second = self.make(115.0002, -32)  # ca 19 m east
+        far = self.make(115.01, -32)
+        other = self.make(115, -32, taxon=self.other_taxon)
+
+        self.assertEqual(self.cluster(first), first.pk)
+        self.assertEqual(self.cluster(second), first.pk)
+        self.assertEqual(self.cluster(far), far.pk)
+        self.assertEqual(self.cluster(other), other.pk)
+
+        # Moving the first encounter away splits the cluster
+        first.point = Point(115.02, -32, srid=4326)
+        first.save()
+        self.assertEqual(self.cluster(first), first.pk)
+        self.assertEqual(self.cluster(second), second.pk)
+
+        # Deleting the link between two encounters splits their cluster
+        link = self.make(115.0006, -32)
+        third = self.make(115.001, -32)
+        self.assertEqual(self.cluster(third), second.pk)
+        link.delete()
+        self.assertEqual(self.cluster(second), second.pk)
+        self.assertEqual(self.cluster(third), third.pk)
+
+    def test_cluster_all(self):
+        first = self.make(115, -32)
+        second = self.make(115.0002, -32)
+        TaxonAreaEncounter.objects.update(duplicate_cluster=None)
+
+        self.assertEqual(clustering.cluster_all(TaxonAreaEncounter), (2, 1))
+        self.assertEqual(self.cluster(first), first.pk)
+        self.assertEqual(self.cluster(second), first.pk)
+        self.assertEqual(
+            list(clustering.collapse(TaxonAreaEncounter.objects.all()).values_list("pk", flat=True)),
+            [first.pk])
+
+    def test_refresh_on_batch_update(self):
+        first = self.make(115, -32)
+        second = self.make(115.0002, -32)
+        self.assertEqual(self.cluster(second), first.pk)
+        self.client.force_login(self.user)
+        url = reverse("api:occurrence_taxonarea_points-list")
+        enc_type = EncounterType.objects.create(code="enctype", label="Encounter type")
+
+        # A batch of existing records is updated in bulk, bypassing post_save
+        response = self.client.post(url, [
+            {
+                "source": first.source,
+                "source_id": first.source_id,
+                "taxon": self.taxon.name_id,
+                "encountered_by": self.user.pk,
+                "encounter_type": enc_type.pk,
+                "point": "SRID=4326;POINT (115.02 -32)",
+            },
+        ], content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.cluster(first), first.pk)
+        self.assertEqual(self.cluster(second), second.pk)
+
+    def test_api_collapse_duplicates(self):
+        first = self.make(115, -32)
+        self.make(115.0002, -32)
+        self.client.force_login(self.user)
+        url = reverse("api:occurrence_taxonarea_points-list")
+
+        response = self.client.get(url, {"duplicate_cluster": first.pk})
+        self.assertEqual(len(response.json()["features"]), 2)
+        response = self.client.get(url, {"collapse_duplicates": "true"})
+        self.assertEqual([f["id"] for f in response.json()["features"]], [first.pk])
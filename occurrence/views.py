@@ -49,15 +49,16 @@ class TaxonAreaEncounterListView(
         context['show_subject'] = True
         context['list_filter'] = occ_filters.TaxonAreaEncounterFilter(
             self.request.GET,
-            queryset=self.get_queryset()
+            queryset=self.object_list
         )
-        context["count"] = self.get_queryset().count()
+        context["count"] = context["paginator"].count
         return context
 
     def get_queryset(self):
         """Queryset with custom filter."""
         queryset = occ_models.TaxonAreaEncounter.objects.all().prefetch_related(
             "taxon",
+            "encountered_by",
             # "conservationactivity_set",
         )
         return occ_filters.TaxonAreaEncounterFilter(
@@ -85,15 +86,16 @@ class CommunityAreaEncounterListView(
         context['show_subject'] = True
         context['list_filter'] = occ_filters.CommunityAreaEncounterFilter(
             self.request.GET,
-            queryset=self.get_queryset()
+            queryset=self.object_list
         )
-        context["count"] = self.get_queryset().count()
+        context["count"] = context["paginator"].count
         return context
 
     def get_queryset(self):
         """Queryset with custom filter."""
         queryset = occ_models.CommunityAreaEncounter.objects.all().prefetch_related(
             "community",
+            "encountered_by",
             # "conservationactivity_set",
         )
         return occ_filters.CommunityAreaEncounterFilter(
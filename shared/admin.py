@@ -2,13 +2,18 @@
 """Shared admin."""
 from __future__ import unicode_literals
 
+from django.contrib import admin
 from django.contrib.gis.db import models as geo_models
+from django.utils.html import format_html, format_html_join
 from django.utils.translation import ugettext_lazy as _
 
 from django_fsm_log.admin import StateLogInline
 from leaflet.forms.widgets import LeafletWidget
 from reversion.admin import VersionAdmin
 
+from shared import transitions
+from shared.models import JobRun
+
 
 # Fix collapsing widget width
 # https://github.com/applegrew/django-select2/issues/252
@@ -32,6 +37,22 @@ FORMFIELD_OVERRIDES = {
 }
 
 
+def bulk_transition_action(name):
+    """Return an admin action running the QA transition name on all selected records."""
+    def action(modeladmin, request, queryset):
+        result = transitions.bulk_transition(queryset, name, by=request.user)
+        modeladmin.message_user(
+            request, "{0}: {1} records changed, {2} skipped.".format(
+                transitions.verbose_name(name), result["transitioned"], result["skipped"]))
+    action.__name__ = "bulk_{0}".format(name)
+    action.short_description = "QA: {0}".format(transitions.verbose_name(name))
+    return action
+
+
+# Admin actions for QualityControlMixin models, see shared.transitions
+QA_TRANSITION_ACTIONS = [bulk_transition_action(name) for name in transitions.TRANSITIONS]
+
+
 class CustomStateLogInline(StateLogInline):
     """Custom StateLogInline."""
 
@@ -55,3 +76,32 @@ class CodeLabelDescriptionAdmin(VersionAdmin):
             'fields': ("label", "description", "code")}
          ),
     )
+
+
+@admin.register(JobRun)
+class JobRunAdmin(admin.ModelAdmin):
+    """History of long-running jobs with their stages, see shared.jobs."""
+
+    date_hierarchy = 'started_on'
+    list_display = ('name', 'status', 'started_on', 'seconds', 'db_seconds', 'queries',
+                    'rows', 'rows_per_second', 'peak_rss_mb')
+    list_filter = ('name', 'status')
+    search_fields = ('name', 'error')
+    readonly_fields = ('name', 'status', 'started_on', 'finished_on', 'seconds', 'db_seconds', 'queries',
+                       'rows', 'rows_per_second', 'peak_rss_mb', 'error', 'stage_table')
+    exclude = ('stages', )
+
+    def has_add_permission(self, request):
+        """Job runs are recorded by the jobs only."""
+        return False
+
+    def stage_table(self, obj):
+        """Show the metrics of each stage as table."""
+        columns = ('name', 'seconds', 'db_seconds', 'queries', 'rows', 'rows_per_second', 'peak_rss_mb')
+        return format_html(
+            '<table><thead><tr>{0}</tr></thead><tbody>{1}</tbody></table>',
+            format_html_join('', '<th>{0}</th>', ((c.replace('_', ' '), ) for c in columns)),
+            format_html_join('', '<tr>{0}</tr>', (
+                (format_html_join('', '<td>{0}</td>', ((stage.get(c, ''), ) for c in columns)), )
+                for stage in obj.stages if stage)))
+    stage_table.short_description = 'Stages'
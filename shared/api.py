@@ -2,14 +2,24 @@
 """Shared API utilities."""
 import logging
 from collections import OrderedDict
+from contextlib import contextmanager
 
+from django.conf import settings
 from django.db import transaction
-
-from rest_framework import pagination, status, viewsets  # , serializers, routers
+from django.http import HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+
+from rest_framework import exceptions, pagination, status, viewsets  # , serializers, routers
+from rest_framework.decorators import action
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.serializers import ValidationError
 from rest_framework.response import Response as RestResponse
 from rest_framework_csv.renderers import CSVRenderer
 from rest_framework.settings import api_settings
 
+from shared import cache as api_cache
+from shared import changefeed, db, transitions, watermarks
 from shared.models import QualityControlMixin
 
 logger = logging.getLogger(__name__)
@@ -83,7 +93,152 @@ class FastLimitOffsetPagination(pagination.LimitOffsetPagination):
     page_size = 10
 
 
-class BatchUpsertViewSet(viewsets.ModelViewSet):
+class CachedResponseMixin(object):
+    """Serve GET list and detail responses from the API response cache, see shared.cache.
+
+    Set ``cache_models`` to all models the responses depend on,
+    default: the viewset's model.
+    Writes through the viewset invalidate the responses of its model,
+    as batch upserts update records without saving them.
+    Output of ``uncached_renderers``, which depends on the user, e.g. the
+    username and CSRF token in the browsable API, is never cached.
+    """
+
+    cache_models = None
+    cache_key = None
+    uncached_renderers = (BrowsableAPIRenderer, )
+
+    def get_cache_models(self):
+        """Return the models the responses depend on."""
+        return self.cache_models or (self.model or self.queryset.model, )
+
+    def cached(self, handler, request, *args, **kwargs):
+        """Return the cached response, or run handler and mark its response for caching."""
+        if not settings.API_CACHE_ENABLED or isinstance(request.accepted_renderer, self.uncached_renderers):
+            return handler(request, *args, **kwargs)
+        models = self.get_cache_models()
+        key = api_cache.response_key(request, models)
+        response = api_cache.get_response(key)
+        if response is None:
+            # A lagging read replica may return data older than the version
+            if not db.reading() or api_cache.settled(models):
+                self.cache_key = key
+            response = handler(request, *args, **kwargs)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        """GET a list, from cache if possible."""
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        """GET one object, from cache if possible."""
+        return self.cached(super().retrieve, request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Cache successful responses marked for caching, invalidate after writes."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.cache_key and response.status_code == status.HTTP_200_OK:
+            response.render()
+            api_cache.set_response(self.cache_key, response)
+        elif request.method not in SAFE_METHODS and response.status_code < 400:
+            api_cache.bump(self.model or self.queryset.model)
+        return response
+
+
+class NotModified(exceptions.APIException):
+    """The requested data have not changed since the client's copy."""
+
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin(object):
+    """Answer conditional GET requests from change watermarks, see shared.watermarks.
+
+    GET list and detail responses carry an ETag and Last-Modified derived from
+    the watermarks of ``watermark_models`` (default: ``cache_models``, or the
+    viewset's model). Requests with a matching If-None-Match or a current
+    If-Modified-Since get a 304 Not Modified before any data are queried.
+    Viewsets depending on untracked models are not conditional.
+    """
+
+    watermark_models = None
+    etag = None
+    last_modified = None
+
+    def get_watermark_models(self):
+        """Return the models the responses depend on."""
+        return (self.watermark_models or getattr(self, "cache_models", None) or
+                (self.model or self.queryset.model, ))
+
+    def initial(self, request, *args, **kwargs):
+        """Raise NotModified if the client's copy is current."""
+        super().initial(request, *args, **kwargs)
+        if request.method not in ("GET", "HEAD") or self.action not in ("list", "retrieve"):
+            return
+        models = self.get_watermark_models()
+        if not all(watermarks.is_tracked(model) for model in models):
+            return
+        self.etag, self.last_modified = watermarks.validators(
+            models, request.get_host(), request.get_full_path(), request.accepted_renderer.format)
+        if self.is_not_modified(request):
+            raise NotModified()
+
+    def is_not_modified(self, request):
+        """Return whether If-None-Match, or else If-Modified-Since, match the current data."""
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            etags = [etag.replace("W/", "", 1) for etag in parse_etags(if_none_match)]
+            return "*" in etags or self.etag.replace("W/", "", 1) in etags
+        if_modified_since = parse_http_date_safe(request.META.get("HTTP_IF_MODIFIED_SINCE") or "")
+        return bool(if_modified_since and self.last_modified and
+                    int(self.last_modified.timestamp()) <= if_modified_since)
+
+    def handle_exception(self, exc):
+        """Return an empty 304 Not Modified response."""
+        if isinstance(exc, NotModified):
+            return HttpResponseNotModified()
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Add ETag and Last-Modified, move the watermark after writes."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+        model = self.model or self.queryset.model
+        if self.etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response["ETag"] = self.etag
+            if self.last_modified:
+                response["Last-Modified"] = http_date(self.last_modified.timestamp())
+        elif (request.method not in SAFE_METHODS and response.status_code < 400 and
+                watermarks.is_tracked(model)):
+            watermarks.touch(model)
+        return response
+
+
+class BulkTransitionMixin(object):
+    """Run a QA transition on many records at once, see shared.transitions.
+
+    POST ``{"transition": "curate", "ids": [1, 2, 3]}`` to ``<model>/transition/``
+    to run the transition on the given records. Without ``ids``, the transition
+    runs on all records matching the filters given as query parameters.
+    The response holds the numbers of transitioned and skipped records.
+    """
+
+    @action(detail=False, methods=["post"])
+    def transition(self, request):
+        name = request.data.get("transition")
+        if name not in transitions.TRANSITIONS:
+            raise ValidationError({"transition": "Choose one of {0}.".format(", ".join(transitions.TRANSITIONS))})
+        ids = request.data.get("ids")
+        queryset = self.filter_queryset(self.get_queryset())
+        if ids is not None:
+            if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+                raise ValidationError({"ids": "Expected a list of IDs."})
+            queryset = queryset.filter(pk__in=ids)
+        elif not request.query_params:
+            raise ValidationError({"ids": "Give the IDs or query parameters filtering the records to transition."})
+        return RestResponse(transitions.bulk_transition(queryset, name, by=request.user))
+
+
+class BatchUpsertViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """A BatchUpsert ViewSet.
 
     Override split_data for nested serializers, e.g. TaxonAreaEncounters.taxon.
@@ -140,6 +295,15 @@ class BatchUpsertViewSet(viewsets.ModelViewSet):
         else:
             return qs.values("pk", "source", "source_id")
 
+    @contextmanager
+    def bulk_updating(self, pks):
+        """Wrap the update of the records with the given pks by ``QuerySet.update()``.
+
+        Updates send no signals. Override to maintain data derived from the records,
+        e.g. from their values before and after the update.
+        """
+        yield
+
     def create_one(self, data):
         """POST: Create or update exactly one model instance.
 
@@ -178,7 +342,8 @@ class BatchUpsertViewSet(viewsets.ModelViewSet):
             # Continue on happy trail: update if new or existing but unchanged
             # TODO wastd.observations.Observation models
             # have Encounter(source, source_id) but update own fields
-            self.model.objects.filter(**unique_data).update(**update_data)
+            with self.bulk_updating([obj.pk]):
+                self.model.objects.filter(**unique_data).update(**changefeed.stamped(self.model, update_data))
 
         obj.refresh_from_db()
         obj.save()  # to update cached fields
@@ -269,9 +434,17 @@ class BatchUpsertViewSet(viewsets.ModelViewSet):
                     # updated = self.model.objects.bulk_update(
                     #     [self.model(**x) for x in records_to_update], records_to_update[0].keys())
                     # updated = [self.create_one(x) for x in records_to_update]
-                    for data in records_to_update:
-                        unique_data, update_data = self.split_data(data)
-                        self.model.objects.filter(**unique_data).update(**update_data)
+                    existing_pks = {
+                        tuple(rec[uid_field] for uid_field in self.uid_fields): rec["pk"]
+                        for rec in existing_records}
+                    update_pks = [
+                        existing_pks.get(tuple(rec[uid_field] for uid_field in self.uid_fields))
+                        for rec in records_to_update]
+                    with self.bulk_updating([pk for pk in update_pks if pk is not None]):
+                        for data in records_to_update:
+                            unique_data, update_data = self.split_data(data)
+                            self.model.objects.filter(**unique_data).update(
+                                **changefeed.stamped(self.model, update_data))
 
                         # to update cached fields
                         # self.model.objects.filter(**unique_data).refresh_from_db()
@@ -358,3 +531,32 @@ class AreaEncounterObsBatchUpsertViewSet(BatchUpsertViewSet):
     """A viewset to upsert Observations linked to an AreaEncounter."""
 
     pass
+
+
+class ChangeFeedViewSet(viewsets.ViewSet):
+    """Changed and deleted records since a token, see shared.changefeed.
+
+    Entities: taxon, community, taxon-conservationlisting, community-conservationlisting,
+    occurrence (all AreaEncounters) and occurrence-observation (all ObservationGroups).
+    Changed records are listed by primary key in the order of their change,
+    deleted records by their former primary key.
+
+    Pass the returned ``next`` as ``since`` to continue. While ``more`` is true,
+    further changes are waiting.
+
+    # Examples
+    * [/api/1/changes/](/api/1/changes/) All records from the beginning
+    * [/api/1/changes/?since=2020-08-01T00:00:00](/api/1/changes/?since=2020-08-01T00:00:00)
+      Changes since a local time
+    * [/api/1/changes/?since=<next>&limit=100](/api/1/changes/?limit=100)
+      Continue with up to 100 keys per entity (at most CHANGE_FEED_PAGE_SIZE, default 1000)
+    """
+
+    def list(self, request):
+        limit = request.query_params.get("limit")
+        try:
+            return RestResponse(changefeed.changes(
+                token=request.query_params.get("since"),
+                limit=min(int(limit), settings.CHANGE_FEED_PAGE_SIZE) if limit and limit.isdigit() else None))
+        except ValueError as e:
+            raise ValidationError({"since": str(e)})
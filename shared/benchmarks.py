@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""Repeatable benchmarks of the ingest, query, export and map-serving hot paths.
+
+Run against a generated dataset (see ``shared.synthetic``)::
+
+    ./manage.py generate_dataset --scale 0.1
+    ./manage.py benchmark --output results.json
+
+Each benchmark returns a dict of metrics, or, if it measures several
+endpoints, a dict of endpoint: metrics. The metrics are
+
+* ``seconds``, ``p50`` and ``p95`` (seconds): lower is better,
+* ``rows_per_second`` and other ``*_per_second``: higher is better,
+* anything else, e.g. ``rows``: context, never compared.
+
+Benchmarks which write run inside a transaction which is rolled back,
+so the dataset is the same for every run. API list latency is measured
+with the API response cache turned off, i.e. for requests missing the cache.
+
+``compare`` flags metrics which got worse than a baseline by more than a threshold.
+"""
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "benchmark_baseline.json")
+BENCHMARKS = OrderedDict()
+LOWER_IS_BETTER = ("seconds", "p50", "p95")
+HIGHER_IS_BETTER = "_per_second"
+
+PAGE_SIZE = 100
+# Map tiles (z, x, y) over Ningaloo, the Dampier Archipelago, Broome and Thevenard Island
+TILES = ((6, 52, 36), (8, 208, 144), (8, 210, 142), (10, 843, 571), (10, 859, 563), (10, 839, 574))
+
+
+class Rollback(Exception):
+    """Raised to roll back a benchmark run."""
+
+
+class Skip(Exception):
+    """Raised by a benchmark which cannot run, e.g. for lack of data."""
+
+
+def benchmark(name):
+    """Register a benchmark function taking the Runner."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def percentile(values, p):
+    """Return the p-th percentile (0 to 100) of values, by linear interpolation."""
+    values = sorted(values)
+    rank = (len(values) - 1) * p / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+
+def rolled_back(func, *args, **kwargs):
+    """Run func inside a transaction which is rolled back, return its duration and result."""
+    result = dict()
+    try:
+        with transaction.atomic():
+            start = time.perf_counter()
+            result["value"] = func(*args, **kwargs)
+            result["seconds"] = time.perf_counter() - start
+            raise Rollback()
+    except Rollback:
+        pass
+    return result["seconds"], result["value"]
+
+
+def throughput(seconds, rows):
+    """Return the metrics of a run over rows."""
+    return dict(seconds=seconds, rows=rows, rows_per_second=rows / max(seconds, 1e-9))
+
+
+class Runner(object):
+    """Run benchmarks with an authenticated API client as a superuser.
+
+    Arguments:
+    repeat The number of requests per latency measurement
+    rows The number of records per batch upsert
+    odka_path A directory of downloaded ODK Aggregate submissions, see
+        ``wastd.observations.importers.odka.save_all_odka``, or None to skip
+    """
+
+    def __init__(self, repeat=20, rows=1000, odka_path=None):
+        """Log in a client as the benchmark user."""
+        from django.contrib.auth import get_user_model
+        from rest_framework.test import APIClient
+
+        self.repeat = repeat
+        self.rows = rows
+        self.odka_path = odka_path
+        # Committed, so that requests reading from the read database see the user
+        self.user, created = get_user_model().objects.get_or_create(
+            username="benchmark", defaults=dict(name="Benchmark", is_staff=True, is_superuser=True))
+        hosts = [host for host in settings.ALLOWED_HOSTS if host != "*"]
+        self.client = APIClient(HTTP_HOST=hosts[0].lstrip(".") if hosts else "localhost")
+        self.client.force_login(self.user)
+
+    def latency(self, url):
+        """Request url repeatedly, return p50 and p95 in seconds."""
+        durations = []
+        with override_settings(API_CACHE_ENABLED=False):
+            for i in range(self.repeat):
+                start = time.perf_counter()
+                response = self.client.get(url)
+                durations.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    raise Skip("GET {0} returned {1}.".format(url, response.status_code))
+        return dict(p50=percentile(durations, 50), p95=percentile(durations, 95))
+
+    def run(self, names=None):
+        """Run the benchmarks by name, default: all, return their metrics by name.
+
+        Skipped benchmarks are logged and left out.
+        """
+        results = OrderedDict()
+        for name, func in BENCHMARKS.items():
+            if names and name not in names:
+                continue
+            try:
+                metrics = func(self)
+            except Skip as e:
+                logger.warning("[shared.benchmarks.Runner] Skipping {0}: {1}".format(name, e))
+                continue
+            if all(isinstance(value, dict) for value in metrics.values()):
+                results.update(metrics)
+            else:
+                results[name] = metrics
+            logger.info("[shared.benchmarks.Runner] {0} done.".format(name))
+        return results
+
+
+def list_latency(runner, basename, model):
+    """Return the latency of the first and a deep page of a list endpoint."""
+    count = model.objects.count()
+    if not count:
+        raise Skip("No {0}.".format(model._meta.verbose_name_plural))
+    url = reverse("api:{0}-list".format(basename)) + "?format=json&limit={0}&offset={1}"
+    deep = max(0, count - count // 10 - PAGE_SIZE)
+    return OrderedDict((
+        ("{0}_first_page".format(basename), runner.latency(url.format(PAGE_SIZE, 0))),
+        ("{0}_deep_page".format(basename), dict(runner.latency(url.format(PAGE_SIZE, deep)), offset=deep)),
+    ))
+
+
+@benchmark("batch_upsert")
+def batch_upsert(runner):
+    """POST a batch of new TaxonAreaEncounters, then the same batch again as updates."""
+    from occurrence.models import EncounterType, TaxonAreaEncounter
+    from taxonomy.models import Taxon
+
+    name_ids = list(Taxon.objects.filter(current=True).order_by("pk").values_list("name_id", flat=True)[:100])
+    if not name_ids:
+        raise Skip("No taxa.")
+    url = reverse("api:occurrence_taxonarea_polys-list")
+
+    def upsert():
+        encounter_type, created = EncounterType.objects.get_or_create(
+            code="benchmark", defaults=dict(label="Benchmark"))
+        records = [dict(
+            source=TaxonAreaEncounter.SOURCE_THREATENED_FLORA,
+            source_id="benchmark-{0}".format(i),
+            taxon=name_ids[i % len(name_ids)],
+            encountered_by=runner.user.pk,
+            encounter_type=encounter_type.pk,
+            encountered_on=timezone.now().isoformat(),
+            code="benchmark-{0}".format(i),
+            label="Benchmark {0}".format(i),
+            name="Benchmark {0}".format(i),
+            point="SRID=4326;POINT ({0} -31.9)".format(115.0 + i * 1e-4),
+        ) for i in range(runner.rows)]
+        timings = []
+        for run in ("create", "update"):
+            start = time.perf_counter()
+            response = runner.client.post(url, records, format="json")
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                raise Skip("POST {0} returned {1}.".format(url, response.status_code))
+        return timings
+
+    seconds, (create, update) = rolled_back(upsert)
+    return dict(
+        rows=runner.rows,
+        seconds=create + update,
+        rows_per_second=2 * runner.rows / max(create + update, 1e-9),
+        create_rows_per_second=runner.rows / max(create, 1e-9),
+        update_rows_per_second=runner.rows / max(update, 1e-9),
+    )
+
+
+@benchmark("update_taxon")
+def update_taxon(runner):
+    """Update all taxa from the local WACensus copy, including the MPTT rebuild."""
+    from taxonomy import utils
+    from taxonomy.models import HbvName
+
+    if not HbvName.objects.exists():
+        raise Skip("No local WACensus copy (HbvName).")
+    seconds, msg = rolled_back(utils.update_taxon)
+    return dict(seconds=seconds)
+
+
+@benchmark("mptt_rebuild")
+def mptt_rebuild(runner):
+    """Rebuild the taxon tree."""
+    from taxonomy.models import Taxon
+
+    seconds, rows = rolled_back(lambda: Taxon.objects.rebuild() or Taxon.objects.count())
+    return throughput(seconds, rows)
+
+
+@benchmark("taxon_export")
+def taxon_export(runner):
+    """Export all taxa with TaxonResource, as the taxon list view does."""
+    from taxonomy.models import Taxon
+    from taxonomy.resources import TaxonResource
+
+    start = time.perf_counter()
+    dataset = TaxonResource().export(Taxon.objects.all())
+    return throughput(time.perf_counter() - start, len(dataset))
+
+
+@benchmark("taxon_list")
+def taxon_list(runner):
+    """List taxa through the API."""
+    from taxonomy.models import Taxon
+
+    return list_latency(runner, "taxon_full", Taxon)
+
+
+@benchmark("occ_taxon_points_list")
+def occ_taxon_points_list(runner):
+    """List TaxonAreaEncounter points through the API."""
+    from occurrence.models import TaxonAreaEncounter
+
+    return list_latency(runner, "occurrence_taxonarea_points", TaxonAreaEncounter)
+
+
+@benchmark("tiled_geojson")
+def tiled_geojson(runner):
+    """Serve the Encounter and CommunityAreaEncounter map tiles."""
+    results = OrderedDict()
+    for name in ("encounter-tiled-geojson", "community-area-encounter-tiled-geojson"):
+        durations = []
+        for z, x, y in TILES:
+            durations.append(runner.latency(reverse(name, kwargs=dict(z=z, x=x, y=y)))["p50"])
+        results[name.replace("-", "_")] = dict(
+            p50=percentile(durations, 50), p95=percentile(durations, 95), tiles=len(TILES))
+    return results
+
+
+@benchmark("odka_import")
+def odka_import(runner):
+    """Import a downloaded season of ODK Aggregate submissions."""
+    from wastd.observations.importers import odka
+
+    if not runner.odka_path:
+        raise Skip("No ODK Aggregate data, see --odka-path.")
+    seconds, results = rolled_back(odka.import_all_odka, path=runner.odka_path)
+    return throughput(seconds, sum(len(records) for records in results.values()))
+
+
+@benchmark("allocate_animal_names")
+def allocate_animal_names(runner):
+    """Name all animals after their first flipper tag."""
+    from wastd.observations import utils
+
+    seconds, result = rolled_back(utils.allocate_animal_names)
+    return dict(seconds=seconds)
+
+
+def load_results(filename=BASELINE_FILE):
+    """Return the results of a benchmark run, or an empty dict."""
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return dict()
+
+
+def save_results(results, filename=BASELINE_FILE):
+    """Write the results of a benchmark run."""
+    with open(filename, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+
+
+def compare(results, baseline, threshold=0.2):
+    """Return the metrics which regressed by more than threshold against baseline.
+
+    Arguments:
+    results The results of this run, as dict of benchmark: metrics
+    baseline The results of a baseline run
+    threshold The tolerated relative change, default: 0.2 (20%)
+
+    Returns:
+    A list of (benchmark, metric, baseline value, value, relative change),
+    where positive changes are regressions.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name, dict())
+        for metric, value in metrics.items():
+            if metric not in base or not base[metric]:
+                continue
+            if metric in LOWER_IS_BETTER:
+                change = (value - base[metric]) / base[metric]
+            elif metric.endswith(HIGHER_IS_BETTER):
+                change = (base[metric] - value) / base[metric]
+            else:
+                continue
+            if change > threshold:
+                regressions.append((name, metric, base[metric], value, change))
+    return regressions
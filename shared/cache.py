@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""A two-tier response cache for the read API.
+
+Rendered GET responses of viewsets with ``shared.api.CachedResponseMixin`` are kept
+
+* in a per-process LRU of ``settings.API_CACHE_LRU_SIZE`` responses, and
+* in the shared cache ``caches["api"]`` (file based by default) for all worker processes.
+
+Keys are built from the host, path, sorted query parameters, renderer, and the
+current version of each model the response depends on (``cache_models``).
+They hold no user, so output which depends on the user, e.g. the browsable API,
+is not cached.
+A version is a random token which is replaced on every save or delete of the
+model (see the receiver in ``shared.models``) and after every write through the API.
+Responses cached under older versions are never read again, and age out of
+the LRU and the shared cache.
+
+Versions are replaced once per model after the writing transaction commits,
+so that no response of the old data is cached under the new version.
+Responses read from a lagging read replica are not cached for
+``settings.READ_REPLICA_PIN_SECONDS`` after a version changed (see ``settled``).
+
+Only the models in ``settings.API_CACHE_MODELS`` and their subclasses are versioned.
+Subclasses share the version of their topmost concrete parent, so a saved
+TaxonAreaEncounter invalidates all responses depending on AreaEncounter.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from shared import db
+
+logger = logging.getLogger(__name__)
+
+VERSION_PREFIX = "api-version:"
+RESPONSE_PREFIX = "api-response:"
+
+
+class LRUCache(object):
+    """A thread-safe, least recently used cache of limited size."""
+
+    def __init__(self, size):
+        """Set up an empty cache for up to size entries."""
+        self.size = size
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return the value of key, or None."""
+        with self.lock:
+            if key not in self.data:
+                return None
+            self.data.move_to_end(key)
+            return self.data[key]
+
+    def set(self, key, value):
+        """Set the value of key, evicting the least recently used entries beyond size."""
+        with self.lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.size:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        with self.lock:
+            self.data.clear()
+
+
+local = LRUCache(settings.API_CACHE_LRU_SIZE)
+
+
+def shared():
+    """Return the shared cache backend."""
+    return caches["api"]
+
+
+def model_label(model):
+    """Return the label of the topmost concrete parent of a model, e.g. "occurrence.AreaEncounter"."""
+    parents = model._meta.get_parent_list()
+    return (parents[-1] if parents else model)._meta.label
+
+
+def is_versioned(model):
+    """Return whether cached responses depend on the version of a model."""
+    return model_label(model) in settings.API_CACHE_MODELS
+
+
+def versions(models):
+    """Return the current version tokens of the given models, creating missing ones.
+
+    If the shared cache does not keep versions (e.g. a dummy cache),
+    a new token is returned every time, so that nothing is served from cache.
+    """
+    keys = sorted({VERSION_PREFIX + model_label(model) for model in models})
+    found = shared().get_many(keys)
+    for key in keys:
+        if key not in found:
+            shared().add(key, uuid.uuid4().hex, None)
+            found[key] = shared().get(key) or uuid.uuid4().hex
+    return [found[key] for key in keys]
+
+
+def settled(models):
+    """Return whether the versions of all models are older than settings.READ_REPLICA_PIN_SECONDS.
+
+    A read replica may not have the data of a recent version yet.
+    """
+    changed = [float(version.partition(":")[2] or 0) for version in versions(models)]
+    return max(changed) < time.time() - settings.READ_REPLICA_PIN_SECONDS
+
+
+def replace_versions(labels):
+    """Replace the versions of the models of some labels by new tokens with the time of change."""
+    now = time.time()
+    shared().set_many({
+        VERSION_PREFIX + label: "{0}:{1:.3f}".format(uuid.uuid4().hex, now)
+        for label in sorted(labels)}, None)
+
+
+pending = db.CommitBatch(replace_versions)
+
+
+def bump(model):
+    """Replace the version of a model once the current transaction commits.
+
+    This invalidates all cached responses depending on the model.
+    """
+    pending.add(model_label(model))
+
+
+def response_key(request, models):
+    """Return the cache key of a DRF request.
+
+    Arguments:
+    request A DRF Request after content negotiation
+    models The models the response depends on
+    """
+    parts = [
+        request.get_host(),
+        request.path,
+        sorted((key, sorted(values)) for key, values in request.query_params.lists()),
+        request.accepted_renderer.format,
+        request.accepted_media_type,
+        versions(models),
+    ]
+    return RESPONSE_PREFIX + hashlib.sha1(repr(parts).encode()).hexdigest()
+
+
+def get_response(key):
+    """Return a cached response as HttpResponse, or None."""
+    cached = local.get(key)
+    if cached is None:
+        cached = shared().get(key)
+        if cached is None:
+            return None
+        local.set(key, cached)
+    content, content_type = cached
+    response = HttpResponse(content, content_type=content_type)
+    response["X-Cache"] = "HIT"
+    return response
+
+
+def set_response(key, response):
+    """Cache the content of a rendered response."""
+    cached = (response.content, response["Content-Type"])
+    local.set(key, cached)
+    shared().set(key, cached)
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""The change feed: what changed and what was deleted since a continuation token.
+
+Each entity of ``ENTITIES`` has an indexed ``last_modified`` column
+(``shared.models.LastModifiedMixin``), set on ``save()``. Bulk updates which
+bypass ``save()`` set it through ``stamped``. Deleted records are recorded as
+``shared.models.Tombstone``.
+
+``changes`` returns the keys of changed and deleted records in the order of
+their change, per entity, and a token to continue from. A token is an opaque
+string which holds the position (time and key of the last returned record)
+in each entity and in the tombstones. An ISO datetime is accepted as token
+to start from a point in time.
+
+Records changed within the last ``settings.CHANGE_FEED_LAG_SECONDS`` are left
+for the next request, so that a record whose transaction was still open when
+the feed was read is not skipped.
+"""
+import base64
+import json
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# Change feed entity: model label. Subclasses of AreaEncounter and
+# ObservationGroup are included in their parent entity.
+ENTITIES = (
+    ("taxon", "taxonomy.Taxon"),
+    ("community", "taxonomy.Community"),
+    ("taxon-conservationlisting", "conservation.TaxonConservationListing"),
+    ("community-conservationlisting", "conservation.CommunityConservationListing"),
+    ("occurrence", "occurrence.AreaEncounter"),
+    ("occurrence-observation", "occurrence.ObservationGroup"),
+)
+ENTITY_LABELS = {label: entity for entity, label in ENTITIES}
+DELETED = "deleted"
+
+
+def entity_of(model):
+    """Return the change feed entity of a model, or None.
+
+    Only the model itself matches, not its subclasses: deleting a subclass
+    instance also deletes (and signals) its parent.
+    """
+    return ENTITY_LABELS.get(model._meta.label)
+
+
+def stamped(model, data):
+    """Return update data with last_modified set to now, if the model has that field."""
+    try:
+        model._meta.get_field("last_modified")
+    except FieldDoesNotExist:
+        return data
+    return dict(data, last_modified=timezone.now())
+
+
+def encode_token(cursors):
+    """Return a token for a dict of entity: [last_modified isoformat, pk]."""
+    return base64.urlsafe_b64encode(json.dumps(cursors, sort_keys=True).encode()).decode()
+
+
+def decode_token(token):
+    """Return the cursors of a token or ISO datetime, raise ValueError if invalid."""
+    if not token:
+        return dict()
+    since = parse_datetime(token)
+    if since:
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return {entity: [since.isoformat(), 0] for entity in list(ENTITY_LABELS.values()) + [DELETED]}
+    try:
+        cursors = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid change feed token: {0}".format(token))
+    if not isinstance(cursors, dict):
+        raise ValueError("Invalid change feed token: {0}".format(token))
+    return cursors
+
+
+def after(queryset, field, cursor):
+    """Filter a queryset to records after the cursor [time, pk] in the order of field, pk."""
+    if not cursor:
+        return queryset
+    when = parse_datetime(cursor[0])
+    return queryset.filter(Q(**{field + "__gt": when}) | Q(**{field: when, "pk__gt": cursor[1]}))
+
+
+def page(queryset, field, cursor, until, limit):
+    """Return up to limit (time, pk, ...) rows after cursor and until, and whether there are more."""
+    rows = list(after(queryset, field, cursor).filter(**{field + "__lte": until}).order_by(
+        field, "pk")[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def changes(token=None, limit=None):
+    """Return the changed and deleted keys per entity since a token.
+
+    Arguments:
+    token A token from a previous response, an ISO datetime, or None (from the beginning)
+    limit The maximum number of changed keys per entity and of deleted keys,
+        default: settings.CHANGE_FEED_PAGE_SIZE
+
+    Returns:
+    A dict with:
+
+    * changes: a dict of entity: {"changed": [pk], "deleted": [pk]}
+    * next: the token to continue from
+    * more: whether further changes are waiting, to be fetched right away with next
+    """
+    from shared.models import Tombstone
+
+    limit = limit or settings.CHANGE_FEED_PAGE_SIZE
+    cursors = decode_token(token)
+    until = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_LAG_SECONDS)
+    result = OrderedDict((entity, {"changed": [], DELETED: []}) for entity, label in ENTITIES)
+    more = False
+
+    for entity, label in ENTITIES:
+        qs = apps.get_model(label).objects.all()
+        if hasattr(qs, "non_polymorphic"):
+            qs = qs.non_polymorphic()
+        rows, has_more = page(
+            qs.values_list("last_modified", "pk"), "last_modified", cursors.get(entity), until, limit)
+        if rows:
+            cursors[entity] = [rows[-1][0].isoformat(), rows[-1][1]]
+        result[entity]["changed"] = [pk for when, pk in rows]
+        more = more or has_more
+
+    rows, has_more = page(
+        Tombstone.objects.values_list("deleted_on", "pk", "entity", "key"),
+        "deleted_on", cursors.get(DELETED), until, limit)
+    if rows:
+        cursors[DELETED] = [rows[-1][0].isoformat(), rows[-1][1]]
+    for when, pk, entity, key in rows:
+        if entity in result:
+            result[entity][DELETED].append(int(key) if key.isdigit() else key)
+    more = more or has_more
+
+    return {"changes": result, "next": encode_token(cursors), "more": more}
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Routing of safe reads to a read database.
+
+``ReadReplicaMiddleware`` marks GET and HEAD requests on list, detail,
+tile and export views as reads. ``ReadReplicaRouter`` sends the queries of
+marked requests to ``settings.READ_DATABASE_ALIAS`` (a replica, or a second
+connection to the primary), and everything else to "default".
+
+Marked requests run outside the request transaction: ``ReadReplicaWSGIHandler``
+does not wrap read views in ``ATOMIC_REQUESTS``, so a routed read never checks
+out a connection to "default". The read alias has no ``ATOMIC_REQUESTS`` either.
+
+Reads stick to the primary
+
+* for the rest of a request once it has written anything, and
+* for ``settings.READ_REPLICA_PIN_SECONDS`` after a user's own unsafe request
+  (POST, PUT, PATCH, DELETE), through a cookie, so users read their own writes
+  even while the replica lags behind.
+
+``CommitBatch`` collects keys during a transaction and handles each once after
+the transaction commits, so that caches are never invalidated before the
+new data are visible to other connections.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.views.generic.detail import BaseDetailView
+from django.views.generic.list import BaseListView
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD")
+READ_ACTIONS = ("list", "retrieve")
+
+state = threading.local()
+
+
+def reading():
+    """Return whether queries of the current request may go to the read database."""
+    return getattr(state, "read", False) and not getattr(state, "written", False)
+
+
+def is_read_view(view_func):
+    """Return whether a view function is a list, detail, tile or export view.
+
+    DRF viewsets are read views for the actions list and retrieve.
+    Django class based views are read views if they list or show objects,
+    which includes the GeoJSON layer and tile views and the table exports.
+    """
+    actions = getattr(view_func, "actions", None)
+    if actions is not None:
+        return actions.get("get") in READ_ACTIONS
+    view_class = getattr(view_func, "view_class", None)
+    return view_class is not None and issubclass(view_class, (BaseListView, BaseDetailView))
+
+
+class ReadReplicaRouter(object):
+    """Send reads of marked requests to the read database, everything else to default."""
+
+    def db_for_read(self, model, **hints):
+        """Return the read alias while reading."""
+        return settings.READ_DATABASE_ALIAS if reading() else None
+
+    def db_for_write(self, model, **hints):
+        """Return default, and stick to it for the rest of the request."""
+        state.written = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Both databases hold the same data."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Only migrate the primary, replicas follow it."""
+        return db == "default"
+
+
+class ReadReplicaMiddleware(object):
+    """Mark safe requests on read views as reads, pin users to the primary after writes."""
+
+    def __init__(self, get_response):
+        """Keep the next handler."""
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Handle a request, pin the user to the primary after an unsafe request."""
+        state.read = False
+        state.written = False
+        try:
+            response = self.get_response(request)
+        finally:
+            state.read = False
+            state.written = False
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                settings.READ_REPLICA_PIN_COOKIE,
+                str(int(time.time()) + settings.READ_REPLICA_PIN_SECONDS),
+                max_age=settings.READ_REPLICA_PIN_SECONDS,
+                httponly=True)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Mark safe requests on read views as reads, unless pinned to the primary."""
+        state.read = (
+            request.method in SAFE_METHODS and
+            is_read_view(view_func) and
+            not self.pinned(request))
+
+    def pinned(self, request):
+        """Return whether the user wrote within the last READ_REPLICA_PIN_SECONDS."""
+        until = request.COOKIES.get(settings.READ_REPLICA_PIN_COOKIE, "")
+        return until.isdigit() and int(until) > time.time()
+
+
+class NonAtomicReadsMixin(object):
+    """A request handler mixin which leaves read views out of ``ATOMIC_REQUESTS``.
+
+    ``ReadReplicaMiddleware.process_view`` runs before the handler wraps the view,
+    so the handler knows whether the current request is a read.
+    """
+
+    def make_view_atomic(self, view):
+        """Return read views as they are, wrap all other views in the request transactions."""
+        if reading():
+            return view
+        return super(NonAtomicReadsMixin, self).make_view_atomic(view)
+
+
+class ReadReplicaWSGIHandler(NonAtomicReadsMixin, WSGIHandler):
+    """The WSGI handler of TSC, which runs read views outside the request transaction."""
+
+
+def get_wsgi_application():
+    """Return the WSGI application, like ``django.core.wsgi.get_wsgi_application``."""
+    django.setup(set_prefix=False)
+    return ReadReplicaWSGIHandler()
+
+
+class CommitBatch(object):
+    """Collect keys during a transaction, and handle them once after it commits.
+
+    Outside a transaction, keys are handled at once. Keys added in a transaction
+    which rolls back are dropped with it.
+
+    Arguments:
+    handler A function of the set of collected keys
+    using The database alias of the transaction, default: "default"
+    """
+
+    def __init__(self, handler, using=DEFAULT_DB_ALIAS):
+        """Keep the handler."""
+        self.handler = handler
+        self.using = using
+        self.local = threading.local()
+
+    def add(self, *keys):
+        """Handle keys after the current transaction commits, or now outside a transaction."""
+        connection = connections[self.using]
+        if not connection.in_atomic_block:
+            self.handler(set(keys))
+            return
+        # A rollback discards the registered callback, then start a new batch
+        callback = getattr(self.local, "callback", None)
+        if callback is None or not any(entry[1] is callback for entry in connection.run_on_commit):
+            pending = set()
+            self.local.pending = pending
+            self.local.callback = callback = lambda: self.handler(pending)
+            transaction.on_commit(callback, using=self.using)
+        self.local.pending.update(keys)
+
+
+@contextmanager
+def run_on_commit(using=DEFAULT_DB_ALIAS):
+    """Run all pending on_commit callbacks at the end of the block, as if the transaction committed.
+
+    Test cases run in a transaction which never commits, so that its on_commit
+    callbacks never run. This is close to ``TestCase.captureOnCommitCallbacks(execute=True)``
+    of Django 3.2.
+    """
+    connection = connections[using]
+    yield
+    callbacks, connection.run_on_commit = connection.run_on_commit, []
+    for entry in callbacks:
+        entry[1]()
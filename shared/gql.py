@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""Batching, pagination, cost limits and persisted queries for the GraphQL API.
+
+* ``paginate`` returns one page of a queryset as a Relay connection. Cursors
+  point to primary keys, so every page costs one query, however deep.
+* ``load`` and ``load_related`` fetch foreign keys, reverse foreign keys and
+  many-to-many relations through per-request DataLoaders. The relations of all
+  nodes of a level are fetched together in one ``__in`` query, so a query
+  costs a constant number of SQL statements, whatever the number of nodes.
+* ``cost`` returns the depth and complexity of a query. Each field costs 1,
+  times the page sizes of the connections and the estimated lengths of the lists
+  it is nested in. ``GraphQLView`` refuses queries over ``settings.GRAPHQL_MAX_DEPTH``
+  or ``settings.GRAPHQL_MAX_COMPLEXITY``.
+* ``GraphQLView`` accepts automatic persisted queries: clients send the SHA-256
+  of a query in ``extensions.persistedQuery.sha256Hash``, and the query itself only
+  if the server answers ``PersistedQueryNotFound``. Queries are kept in the shared cache.
+* ``CachedBackend`` parses and validates each distinct query once per process.
+"""
+import base64
+import binascii
+import hashlib
+import json
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponseBadRequest
+from graphene.relay import PageInfo
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql import GraphQLError, GraphQLList, GraphQLNonNull
+from graphql.backend.core import GraphQLCoreBackend, execute_and_validate
+from graphql.execution import ExecutionResult
+from graphql.language import ast
+from graphql.validation import validate
+from promise import Promise
+from promise.dataloader import DataLoader
+
+from shared.cache import LRUCache
+
+CURSOR_PREFIX = "pk:"
+PERSISTED_QUERY_PREFIX = "graphql-query:"
+
+
+def query_hash(query):
+    """Return the SHA-256 of a query as hex string."""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+# ----------------------------------------------------------------------------#
+# Pagination
+# ----------------------------------------------------------------------------#
+def encode_cursor(pk):
+    """Return the cursor of a primary key."""
+    return base64.b64encode("{0}{1}".format(CURSOR_PREFIX, pk).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Return the primary key of a cursor."""
+    try:
+        value = base64.b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeError):
+        value = ""
+    if not value.startswith(CURSOR_PREFIX) or not value[len(CURSOR_PREFIX):].isdigit():
+        raise GraphQLError("Invalid cursor {0}.".format(cursor))
+    return int(value[len(CURSOR_PREFIX):])
+
+
+def paginate(queryset, connection_type, first=None, after=None, last=None, before=None, **kwargs):
+    """Return a page of queryset, ordered by primary key, as connection_type.
+
+    Arguments:
+    queryset The objects to page through
+    connection_type The Relay Connection of the object type
+    first The page size, default: settings.GRAPHQL_PAGE_SIZE, at most settings.GRAPHQL_MAX_PAGE_SIZE
+    after The end cursor of the previous page, or None for the first page
+    last, before Backwards pagination, not supported
+    """
+    if last is not None or before is not None:
+        raise GraphQLError("Only forward pagination with first and after is supported.")
+    size = settings.GRAPHQL_PAGE_SIZE if first is None else first
+    if not 0 < size <= settings.GRAPHQL_MAX_PAGE_SIZE:
+        raise GraphQLError("first must be between 1 and {0}.".format(settings.GRAPHQL_MAX_PAGE_SIZE))
+
+    queryset = queryset.order_by("pk")
+    if after:
+        queryset = queryset.filter(pk__gt=decode_cursor(after))
+    rows = list(queryset[:size + 1])
+    edges = [connection_type.Edge(node=row, cursor=encode_cursor(row.pk)) for row in rows[:size]]
+    return connection_type(
+        edges=edges,
+        page_info=PageInfo(
+            has_next_page=len(rows) > size,
+            has_previous_page=bool(after),
+            start_cursor=edges[0].cursor if edges else None,
+            end_cursor=edges[-1].cursor if edges else None,
+        ),
+    )
+
+
+# ----------------------------------------------------------------------------#
+# DataLoaders
+# ----------------------------------------------------------------------------#
+class ObjectLoader(DataLoader):
+    """Load objects of a model by primary key, in one query per batch."""
+
+    def __init__(self, model):
+        """Load objects of model."""
+        super(ObjectLoader, self).__init__()
+        self.model = model
+
+    def batch_load_fn(self, keys):
+        """Return a Promise of the objects of keys, or None for missing objects."""
+        objects = self.model._default_manager.in_bulk(set(keys))
+        return Promise.resolve([objects.get(key) for key in keys])
+
+
+class RelatedLoader(DataLoader):
+    """Load the objects related to objects of a model, by their primary key, in one query per batch.
+
+    Arguments:
+    model The model of the objects
+    name The name of a reverse foreign key or many-to-many relation, e.g. "children"
+    """
+
+    def __init__(self, model, name):
+        """Load the relation name of model."""
+        super(RelatedLoader, self).__init__()
+        self.field = model._meta.get_field(name)
+
+    def batch_load_fn(self, keys):
+        """Return a Promise of the lists of related objects of keys."""
+        related = defaultdict(list)
+        field = self.field
+        if field.many_to_many:
+            m2m = field.field if field.auto_created else field
+            source, target = m2m.m2m_field_name(), m2m.m2m_reverse_field_name()
+            if field.auto_created:
+                source, target = target, source
+            rows = m2m.remote_field.through._default_manager.filter(
+                **{source + "__in": keys}).select_related(target)
+            for row in rows:
+                related[getattr(row, source + "_id")].append(getattr(row, target))
+        else:
+            foreign_key = field.field
+            for obj in field.related_model._default_manager.filter(**{foreign_key.name + "__in": keys}):
+                related[getattr(obj, foreign_key.attname)].append(obj)
+        return Promise.resolve([related.get(key, []) for key in keys])
+
+
+def loader(info, key, factory):
+    """Return the DataLoader of key for the current request, created by factory."""
+    loaders = getattr(info.context, "dataloaders", None)
+    if loaders is None:
+        loaders = dict()
+        if info.context is not None:
+            info.context.dataloaders = loaders
+    if key not in loaders:
+        loaders[key] = factory()
+    return loaders[key]
+
+
+def load(info, model, pk):
+    """Return a Promise of the object of model with primary key pk, or None."""
+    if pk is None:
+        return None
+    return loader(info, ("object", model._meta.label), partial(ObjectLoader, model)).load(pk)
+
+
+def load_related(info, instance, name):
+    """Return a Promise of the list of objects related to instance through the relation name."""
+    model = instance._meta.concrete_model
+    return loader(info, ("related", model._meta.label, name), partial(RelatedLoader, model, name)).load(instance.pk)
+
+
+# ----------------------------------------------------------------------------#
+# Query cost
+# ----------------------------------------------------------------------------#
+def is_list(field_type):
+    """Return whether a field type is a list, possibly non-null."""
+    if isinstance(field_type, GraphQLNonNull):
+        field_type = field_type.of_type
+    return isinstance(field_type, GraphQLList)
+
+
+def named_type(field_type):
+    """Return the object type of a field type, without non-null and list wrappers."""
+    while isinstance(field_type, (GraphQLNonNull, GraphQLList)):
+        field_type = field_type.of_type
+    return field_type
+
+
+def page_size(field, field_def, variables):
+    """Return the estimated number of objects of a field.
+
+    Arguments:
+    field The field of the query
+    field_def The field of the schema, or None if unknown
+    variables The variables of the query
+
+    Returns:
+    ``first`` or settings.GRAPHQL_PAGE_SIZE for connections, settings.GRAPHQL_LIST_SIZE
+    for unpaginated lists, e.g. the children of a taxon, and 1 for other fields.
+    The edges of a connection are counted by the connection.
+    """
+    for argument in field.arguments or []:
+        if argument.name.value == "first":
+            value = argument.value
+            if isinstance(value, ast.Variable):
+                return variables.get(value.name.value) or settings.GRAPHQL_PAGE_SIZE
+            if isinstance(value, ast.IntValue):
+                return int(value.value)
+    is_connection = any(
+        isinstance(selection, ast.Field) and selection.name.value == "edges"
+        for selection in field.selection_set.selections)
+    if is_connection:
+        return settings.GRAPHQL_PAGE_SIZE
+    if field_def is not None and field.name.value != "edges" and is_list(field_def.type):
+        return settings.GRAPHQL_LIST_SIZE
+    return 1
+
+
+def selection_cost(schema, parent_type, selection_set, fragments, variables, multiplier=1, visited=frozenset()):
+    """Return the depth and complexity of a selection set on parent_type, see cost."""
+    depth = complexity = 0
+    fields = getattr(parent_type, "fields", None) or dict()
+    for selection in selection_set.selections:
+        if isinstance(selection, ast.Field):
+            if selection.name.value.startswith("__"):
+                # Introspection
+                continue
+            complexity += multiplier
+            if selection.selection_set:
+                field_def = fields.get(selection.name.value)
+                d, c = selection_cost(
+                    schema, field_def and named_type(field_def.type), selection.selection_set, fragments, variables,
+                    multiplier * page_size(selection, field_def, variables), visited)
+                depth, complexity = max(depth, d + 1), complexity + c
+            else:
+                depth = max(depth, 1)
+        else:
+            if isinstance(selection, ast.FragmentSpread):
+                name = selection.name.value
+                if name in visited or name not in fragments:
+                    # Cycles and unknown fragments are refused by validation
+                    continue
+                fragment, visited = fragments[name], visited | {name}
+            else:
+                fragment = selection
+            fragment_type = parent_type
+            if fragment.type_condition:
+                fragment_type = schema.get_type(fragment.type_condition.name.value)
+            d, c = selection_cost(
+                schema, fragment_type, fragment.selection_set, fragments, variables, multiplier, visited)
+            depth, complexity = max(depth, d), complexity + c
+    return depth, complexity
+
+
+def cost(schema, document_ast, variables=None, operation_name=None):
+    """Return the depth and complexity of the operation operation_name of a query.
+
+    Each field costs 1, times the estimated sizes of the connections and lists it is
+    nested in, see page_size. Introspection is free.
+    """
+    fragments = {d.name.value: d for d in document_ast.definitions if isinstance(d, ast.FragmentDefinition)}
+    root_types = dict(
+        query=schema.get_query_type(),
+        mutation=schema.get_mutation_type(),
+        subscription=schema.get_subscription_type())
+    depth = complexity = 0
+    for definition in document_ast.definitions:
+        if not isinstance(definition, ast.OperationDefinition):
+            continue
+        if operation_name and not (definition.name and definition.name.value == operation_name):
+            continue
+        d, c = selection_cost(
+            schema, root_types.get(definition.operation), definition.selection_set, fragments, variables or dict())
+        depth, complexity = max(depth, d), complexity + c
+    return depth, complexity
+
+
+# ----------------------------------------------------------------------------#
+# Persisted queries and the view
+# ----------------------------------------------------------------------------#
+class CachedBackend(GraphQLCoreBackend):
+    """Parse and validate each distinct query once per process.
+
+    Valid documents are kept in an LRU by the SHA-256 of their query.
+    """
+
+    def __init__(self, size):
+        """Keep up to size documents."""
+        super(CachedBackend, self).__init__()
+        self.documents = LRUCache(size)
+
+    def document_from_string(self, schema, document_string):
+        """Return the parsed document of a query, validated once."""
+        key = query_hash(document_string)
+        document = self.documents.get(key)
+        if document is None:
+            document = super(CachedBackend, self).document_from_string(schema, document_string)
+            if validate(schema, document.document_ast):
+                # Validated again on execution, which reports the errors
+                return document
+            document.execute = partial(
+                execute_and_validate, schema, document.document_ast, validate=False, **self.execute_params)
+            self.documents.set(key, document)
+        return document
+
+
+backend = CachedBackend(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+persisted_queries = LRUCache(settings.GRAPHQL_DOCUMENT_CACHE_SIZE)
+
+
+def persist(sha, query):
+    """Keep a query under its SHA-256."""
+    persisted_queries.set(sha, query)
+    caches["api"].set(PERSISTED_QUERY_PREFIX + sha, query, None)
+
+
+def persisted(sha):
+    """Return the query of a SHA-256, or None."""
+    query = persisted_queries.get(sha)
+    if query is None:
+        query = caches["api"].get(PERSISTED_QUERY_PREFIX + sha)
+        if query is not None:
+            persisted_queries.set(sha, query)
+    return query
+
+
+class GraphQLView(BaseGraphQLView):
+    """The GraphQL endpoint, with persisted queries, cached documents and query cost limits."""
+
+    def __init__(self, **kwargs):
+        """Use the cached backend."""
+        kwargs.setdefault("backend", backend)
+        super(GraphQLView, self).__init__(**kwargs)
+        self.persisted_query_missing = False
+
+    def get_graphql_params(self, request, data):
+        """Return the query, variables, operation name and ID, looking up persisted queries."""
+        query, variables, operation_name, id = super(GraphQLView, self).get_graphql_params(request, data)
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if extensions and isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        sha = ((extensions or dict()).get("persistedQuery") or dict()).get("sha256Hash")
+        self.persisted_query_missing = False
+        if sha and query:
+            if query_hash(query) != sha:
+                raise HttpError(HttpResponseBadRequest("The sha256Hash does not match the query."))
+            persist(sha, query)
+        elif sha:
+            query = persisted(sha)
+            self.persisted_query_missing = query is None
+        return query, variables, operation_name, id
+
+    def execute_graphql_request(self, request, data, query, variables, operation_name, show_graphiql=False):
+        """Execute a query within the cost limits."""
+        if self.persisted_query_missing:
+            return ExecutionResult(errors=[GraphQLError("PersistedQueryNotFound")])
+        if query:
+            try:
+                document = self.get_backend(request).document_from_string(self.schema, query)
+            except Exception:
+                # Syntax errors are reported by the GraphQLView
+                document = None
+            if document is not None:
+                depth, complexity = cost(
+                    self.schema, document.document_ast, variables if isinstance(variables, dict) else None, operation_name)
+                if depth > settings.GRAPHQL_MAX_DEPTH:
+                    return ExecutionResult(errors=[GraphQLError("Query depth {0} exceeds the maximum of {1}.".format(
+                        depth, settings.GRAPHQL_MAX_DEPTH))], invalid=True)
+                if complexity > settings.GRAPHQL_MAX_COMPLEXITY:
+                    return ExecutionResult(errors=[GraphQLError(
+                        "Query complexity {0} exceeds the maximum of {1}, request smaller pages.".format(
+                            complexity, settings.GRAPHQL_MAX_COMPLEXITY))], invalid=True)
+        return super(GraphQLView, self).execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql)
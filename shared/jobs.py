@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""Stage-level timing of long-running jobs, kept as JobRuns.
+
+A job is split into stages. For the job and each stage, the wall time,
+the number and duration of SQL queries, the processed rows, rows per second
+and the peak RSS of the process are recorded::
+
+    with jobs.job("import_odka", report=True):
+        with jobs.stage("download") as stage:
+            stage.rows = download()
+        load()
+
+``job`` and ``stage`` are decorators, too. Decorated functions count the
+items of a returned list, tuple or set as rows::
+
+    @jobs.stage("families")
+    def make_all_families():
+        ...
+
+A stage without rows reports the rows of its sub-stages. A job started
+while another job runs in the same thread becomes a stage of the running job,
+so pipelines can be run on their own or as part of a larger task.
+
+Each job is saved as a ``shared.models.JobRun`` (see the admin for the history)
+and logs one structured summary. With ``report``, the summary is sent to Sentry.
+
+JobRuns are written through their own autocommit connection
+``settings.JOBS_DATABASE_ALIAS``, so that the run of a job which fails inside
+a transaction, e.g. of a request, is kept when the transaction rolls back.
+"""
+import functools
+import json
+import logging
+import resource
+import sys
+import threading
+import time
+from contextlib import ExitStack
+
+import sentry_sdk
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+from shared.metrics import QueryTimer
+
+logger = logging.getLogger(__name__)
+
+state = threading.local()
+
+
+def peak_rss_mb():
+    """Return the peak resident set size of this process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere
+    return rss / 1048576.0 if sys.platform == "darwin" else rss / 1024.0
+
+
+def running():
+    """Return the Job running in this thread, or None."""
+    return getattr(state, "job", None)
+
+
+def open_stages():
+    """Return the open stages of this thread, outermost first."""
+    if not hasattr(state, "stages"):
+        state.stages = []
+    return state.stages
+
+
+class Stage(object):
+    """Record one stage of a job.
+
+    Set ``rows`` to the number of processed records.
+    """
+
+    def __init__(self, name):
+        """Name the stage."""
+        self.name = name
+        self.path = name
+        self.rows = None
+        self.child_rows = None
+        self.seconds = None
+        self.peak_rss_mb = None
+        self.timer = None
+        self.index = None
+
+    def copy(self):
+        """Return a new, unstarted Stage of the same name."""
+        return Stage(self.name)
+
+    def __call__(self, func):
+        """Record every call of func as a stage."""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.copy() as stage:
+                result = func(*args, **kwargs)
+                if isinstance(result, (list, tuple, set)):
+                    stage.rows = len(result)
+            return result
+        return wrapper
+
+    def start(self):
+        """Start the clock and count the SQL queries on all connections."""
+        self.timer = QueryTimer()
+        self.wrappers = ExitStack()
+        for connection in connections.all():
+            self.wrappers.enter_context(connection.execute_wrapper(self.timer))
+        self.started = time.perf_counter()
+
+    def stop(self):
+        """Stop the clock, take the rows of the sub-stages if rows are not set."""
+        self.seconds = time.perf_counter() - self.started
+        self.wrappers.close()
+        self.peak_rss_mb = peak_rss_mb()
+        if self.rows is None:
+            self.rows = self.child_rows
+
+    def add_child_rows(self, rows):
+        """Add the rows of a finished sub-stage."""
+        if rows is not None:
+            self.child_rows = (self.child_rows or 0) + rows
+
+    def __enter__(self):
+        """Start the stage within the open stages."""
+        stages = open_stages()
+        self.path = "/".join([s.name for s in stages] + [self.name])
+        stages.append(self)
+        job = running()
+        if job is not None:
+            # Keep the stages of the job in the order they started
+            self.index = len(job.stages)
+            job.stages.append(None)
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop the stage and add it to the running job."""
+        self.stop()
+        stages = open_stages()
+        stages.pop()
+        parent = stages[-1] if stages else running()
+        if parent is not None:
+            parent.add_child_rows(self.rows)
+        job = running()
+        if job is not None and self.index is not None:
+            job.stages[self.index] = self.summary()
+        logger.debug("[shared.jobs.Stage] {0}".format(json.dumps(self.summary())))
+        return False
+
+    def summary(self):
+        """Return the metrics of the stage as dict."""
+        return dict(
+            name=self.path,
+            seconds=round(self.seconds, 3),
+            db_seconds=round(self.timer.duration, 3),
+            queries=self.timer.count,
+            rows=self.rows,
+            rows_per_second=None if self.rows is None else round(self.rows / max(self.seconds, 1e-6), 1),
+            peak_rss_mb=round(self.peak_rss_mb, 1),
+        )
+
+
+class Job(Stage):
+    """Record a job and its stages as a JobRun, or a stage if another job is running."""
+
+    def __init__(self, name, report=False):
+        """Name the job, and whether to send its summary to Sentry."""
+        super(Job, self).__init__(name)
+        self.report = report
+        self.nested = None
+        self.stages = []
+        self.error = None
+        self.record = None
+
+    def copy(self):
+        """Return a new, unstarted Job of the same name."""
+        return Job(self.name, report=self.report)
+
+    def __enter__(self):
+        """Start the job, or a stage of the running job."""
+        if running() is not None:
+            self.nested = Stage(self.name)
+            return self.nested.__enter__()
+        state.job = self
+        self.record = self.save(status="running")
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Stop, save and report the job."""
+        if self.nested is not None:
+            return self.nested.__exit__(exc_type, exc_value, traceback)
+        self.stop()
+        state.job = None
+        if exc_value is not None:
+            self.error = "{0}: {1}".format(exc_type.__name__, exc_value)
+        summary = self.summary()
+        self.record = self.save(**summary)
+        logger.info("[shared.jobs.Job] {0}".format(json.dumps(summary)))
+        if self.report:
+            report(summary)
+        return False
+
+    def summary(self):
+        """Return the metrics of the job and its stages as dict."""
+        summary = super(Job, self).summary()
+        summary.update(status="failed" if self.error else "succeeded", error=self.error, stages=self.stages)
+        return summary
+
+    def save(self, **values):
+        """Create or update the JobRun of this job, return it or None if the database refuses."""
+        from shared.models import JobRun
+
+        values.pop("name", None)
+        runs = JobRun.objects.using(settings.JOBS_DATABASE_ALIAS)
+        try:
+            if self.record is None:
+                return runs.create(name=self.name, started_on=timezone.now(), **values)
+            runs.filter(pk=self.record.pk).update(finished_on=timezone.now(), **values)
+            return self.record
+        except DatabaseError as e:
+            # E.g. the database is unavailable
+            logger.warning("[shared.jobs.Job] Could not save the run of {0}: {1}".format(self.name, e))
+            return self.record
+
+
+def job(name, report=False):
+    """Return a Job, to use as context manager or decorator.
+
+    Arguments:
+    name The name of the job, e.g. "import_odka"
+    report Whether to send the summary of the job to Sentry, default: False
+    """
+    return Job(name, report=report)
+
+
+def stage(name):
+    """Return a Stage, to use as context manager or decorator."""
+    return Stage(name)
+
+
+def report(summary):
+    """Send the summary of a job to Sentry, with the stages as context."""
+    with sentry_sdk.push_scope() as scope:
+        scope.set_context("job", summary)
+        sentry_sdk.capture_message(
+            "[shared.jobs] {name} {status} in {seconds:.1f}s, {rows} rows, {queries} SQL queries "
+            "in {db_seconds:.1f}s, peak RSS {peak_rss_mb:.0f} MB".format(**summary),
+            level="error" if summary["error"] else "info")
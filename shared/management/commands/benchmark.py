@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the ingest, query, export and map-serving hot paths against a baseline."""
+from django.core.management.base import BaseCommand, CommandError
+
+from shared import benchmarks
+
+
+class Command(BaseCommand):
+    """Run the benchmarks in shared.benchmarks, write and compare their results.
+
+    Writes are rolled back, so the command can run against a generated dataset
+    (see generate_dataset) or a copy of production data without changing it.
+    Fails if a metric regressed against the baseline by more than the threshold.
+    """
+
+    help = "Benchmark ingest, query, export and map-serving hot paths, compare to a baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "benchmarks", nargs="*",
+            help="Benchmarks to run, default: all of {0}".format(", ".join(benchmarks.BENCHMARKS)))
+        parser.add_argument(
+            "--output", default=None,
+            help="Write the results as JSON to this file")
+        parser.add_argument(
+            "--baseline", default=benchmarks.BASELINE_FILE,
+            help="Results to compare to, default: shared/benchmark_baseline.json")
+        parser.add_argument(
+            "--save-baseline", action="store_true",
+            help="Write the results to the baseline instead of comparing")
+        parser.add_argument(
+            "--threshold", type=float, default=0.2,
+            help="Tolerated relative regression, default: 0.2 (20%%)")
+        parser.add_argument(
+            "--repeat", type=int, default=20,
+            help="Requests per latency measurement, default: 20")
+        parser.add_argument(
+            "--rows", type=int, default=1000,
+            help="Records per batch upsert, default: 1000")
+        parser.add_argument(
+            "--odka-path", default=None,
+            help="Directory of downloaded ODK Aggregate submissions to import, default: skip")
+
+    def handle(self, *args, **options):
+        unknown = set(options["benchmarks"]) - set(benchmarks.BENCHMARKS)
+        if unknown:
+            raise CommandError("Unknown benchmarks: {0}".format(", ".join(sorted(unknown))))
+        runner = benchmarks.Runner(repeat=options["repeat"], rows=options["rows"], odka_path=options["odka_path"])
+        results = runner.run(options["benchmarks"])
+        for name, metrics in results.items():
+            self.stdout.write("{0}: {1}".format(name, ", ".join(
+                "{0} {1:.4g}".format(metric, value) for metric, value in metrics.items())))
+        if options["output"]:
+            benchmarks.save_results(results, options["output"])
+        if options["save_baseline"]:
+            benchmarks.save_results(results, options["baseline"])
+            self.stdout.write(self.style.SUCCESS("Saved the baseline to {0}.".format(options["baseline"])))
+            return
+
+        baseline = benchmarks.load_results(options["baseline"])
+        if not baseline:
+            self.stdout.write(self.style.WARNING("No baseline at {0}, nothing compared.".format(options["baseline"])))
+            return
+        regressions = benchmarks.compare(results, baseline, options["threshold"])
+        for name, metric, before, after, change in regressions:
+            self.stdout.write(self.style.ERROR("{0} {1}: {2:.4g} -> {3:.4g} ({4:+.0%})".format(
+                name, metric, before, after, change)))
+        if regressions:
+            raise CommandError("{0} metrics regressed by more than {1:.0%}.".format(
+                len(regressions), options["threshold"]))
+        self.stdout.write(self.style.SUCCESS("No regressions against {0}.".format(options["baseline"])))
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+"""Append a deterministic synthetic dataset of production scale."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from shared import synthetic
+
+
+class Command(BaseCommand):
+    """Generate taxa, communities, listings, occurrences and Encounters with COPY."""
+
+    help = ("Append a synthetic WACensus-like taxon tree, communities, conservation listings, "
+            "TAE, CAE and AnimalEncounters. The same scale and seed give the same data.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scale", type=float, default=1.0,
+            help="Factor for all record counts, default: 1 (about 140k taxa and 2.2 million encounters)")
+        parser.add_argument(
+            "--seed", type=int, default=0,
+            help="Random seed, default: 0")
+
+    def handle(self, *args, **options):
+        start = time.time()
+        with transaction.atomic():
+            counts = synthetic.generate(scale=options["scale"], seed=options["seed"])
+        for kind, count in counts.items():
+            self.stdout.write("{0}: {1}".format(kind.replace("_", " ").capitalize(), count))
+        self.stdout.write(self.style.SUCCESS("Generated in {0:.0f}s.".format(time.time() - start)))
+        self.stdout.write(
+            "Signals were bypassed: run ./manage.py cluster_occurrences to build duplicate clusters. "
+            "The Encounters are rendered by the render task.")
@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+"""Lightweight request metrics per endpoint, in the Prometheus text format.
+
+``MetricsMiddleware`` records per resolved URL name and method
+
+* the number of requests,
+* a latency histogram with the upper bounds ``settings.METRICS_BUCKETS`` (seconds),
+* the number and duration of SQL queries, through ``connection.execute_wrapper``, and
+* the response bytes.
+
+Each worker process counts in memory and writes its counters every
+``settings.METRICS_FLUSH_SECONDS`` to its own file in ``settings.METRICS_DIR``,
+which defaults to the shared memory file system /dev/shm.
+``collect`` adds up the files of all gunicorn workers, and folds the files
+of exited workers into one archive file, so that counters never go backwards
+when workers are recycled. ``metrics_view`` serves the sums at /metrics.
+
+Requests slower than ``settings.METRICS_SLOW_REQUEST_SECONDS`` (0: off) are
+logged with their ``settings.METRICS_SLOW_SQL_TOP`` most expensive SQL statements.
+
+The overhead per request is two timer calls per SQL query and a dict update.
+"""
+import atexit
+import bisect
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed, PermissionDenied
+from django.db import connections
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE = "archive.json"
+LOCK = "metrics.lock"
+UNRESOLVED = "<unresolved>"
+METHODS = ("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Position of the counters in a series, followed by one counter per bucket and one for +Inf
+COUNT, DURATION, QUERIES, SQL_DURATION, BYTES, BUCKETS = range(6)
+
+
+class Registry(object):
+    """The counters of this process, as a dict of "method view": list of counters.
+
+    Forked processes start from zero, and write to their own file,
+    named after their process ID and a random suffix against reused IDs.
+    """
+
+    def __init__(self):
+        """Start with no counters."""
+        self.series = dict()
+        self.lock = threading.Lock()
+        self.flushed = 0
+        self.pid = None
+        self.filename = None
+
+    def check_fork(self):
+        """Reset the counters in a newly forked process."""
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.filename = "{0}-{1}.json".format(self.pid, uuid.uuid4().hex[:8])
+            self.series = dict()
+
+    def observe(self, view, method, duration, queries, sql_duration, size):
+        """Count one request."""
+        buckets = settings.METRICS_BUCKETS
+        key = "{0} {1}".format(method, view)
+        with self.lock:
+            self.check_fork()
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (BUCKETS + len(buckets) + 1)
+            series[COUNT] += 1
+            series[DURATION] += duration
+            series[QUERIES] += queries
+            series[SQL_DURATION] += sql_duration
+            series[BYTES] += size
+            series[BUCKETS + bisect.bisect_left(buckets, duration)] += 1
+
+    def flush(self, force=False):
+        """Write the counters to this process' file, at most every METRICS_FLUSH_SECONDS."""
+        now = time.monotonic()
+        if not (force or now - self.flushed >= settings.METRICS_FLUSH_SECONDS):
+            return
+        self.flushed = now
+        with self.lock:
+            self.check_fork()
+            if not self.series:
+                return
+            data = json.dumps(self.series)
+            filename = self.filename
+        write(path(filename), data)
+
+
+registry = Registry()
+atexit.register(registry.flush, True)
+
+
+def path(name):
+    """Return the path of a file in METRICS_DIR, creating the directory."""
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    return os.path.join(settings.METRICS_DIR, name)
+
+
+def write(filename, data):
+    """Replace a file atomically."""
+    temp = "{0}.{1}.tmp".format(filename, threading.get_ident())
+    with open(temp, "w") as f:
+        f.write(data)
+    os.replace(temp, filename)
+
+
+def read(filename):
+    """Return the counters of a file, or an empty dict."""
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return dict()
+
+
+def merge(total, series):
+    """Add series to total, skipping series of a different bucket layout."""
+    for key, counters in series.items():
+        if key not in total:
+            total[key] = list(counters)
+        elif len(total[key]) == len(counters):
+            total[key] = [a + b for a, b in zip(total[key], counters)]
+    return total
+
+
+def is_alive(pid):
+    """Return whether a process is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def locked():
+    """Hold the lock of METRICS_DIR."""
+    with open(path(LOCK), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def collect():
+    """Return the counters of all worker processes, added up.
+
+    The files of exited workers are folded into the archive.
+    """
+    registry.flush(force=True)
+    with locked():
+        archive = read(path(ARCHIVE))
+        total = merge(dict(), archive)
+        folded = False
+        for name in os.listdir(settings.METRICS_DIR):
+            pid = name.split("-")[0]
+            if not (name.endswith(".json") and pid.isdigit()):
+                continue
+            series = read(path(name))
+            merge(total, series)
+            if not is_alive(int(pid)):
+                merge(archive, series)
+                os.remove(path(name))
+                folded = True
+        if folded:
+            write(path(ARCHIVE), json.dumps(archive))
+    return total
+
+
+def escape(value):
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render(series):
+    """Return the counters in the Prometheus text format."""
+    buckets = [str(b) for b in settings.METRICS_BUCKETS] + ["+Inf"]
+    rows = []
+    for key in sorted(series):
+        method, view = key.split(" ", 1)
+        counters = series[key]
+        if len(counters) != BUCKETS + len(buckets):
+            continue
+        rows.append(('view="{0}",method="{1}"'.format(escape(view), method), counters))
+
+    lines = [
+        "# HELP tsc_http_request_duration_seconds Request latency per view and method.",
+        "# TYPE tsc_http_request_duration_seconds histogram",
+    ]
+    for labels, counters in rows:
+        cumulative = 0
+        for bound, count in zip(buckets, counters[BUCKETS:]):
+            cumulative += count
+            lines.append('tsc_http_request_duration_seconds_bucket{{{0},le="{1}"}} {2}'.format(
+                labels, bound, cumulative))
+        lines.append("tsc_http_request_duration_seconds_sum{{{0}}} {1}".format(labels, counters[DURATION]))
+        lines.append("tsc_http_request_duration_seconds_count{{{0}}} {1}".format(labels, counters[COUNT]))
+
+    for name, position, description in (
+            ("tsc_http_requests_total", COUNT, "Requests per view and method."),
+            ("tsc_http_sql_queries_total", QUERIES, "SQL queries per view and method."),
+            ("tsc_http_sql_duration_seconds_total", SQL_DURATION, "SQL time per view and method."),
+            ("tsc_http_response_bytes_total", BYTES, "Response bytes per view and method.")):
+        lines.append("# HELP {0} {1}".format(name, description))
+        lines.append("# TYPE {0} counter".format(name))
+        lines.extend("{0}{{{1}}} {2}".format(name, labels, counters[position]) for labels, counters in rows)
+    return "\n".join(lines) + "\n"
+
+
+class QueryTimer(object):
+    """An execute wrapper counting and timing the SQL queries of a request."""
+
+    def __init__(self, statements=False):
+        """Start counting, and if statements, keep the count and time of each SQL statement."""
+        self.count = 0
+        self.duration = 0.0
+        self.statements = dict() if statements else None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Run and time a query."""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if self.statements is not None:
+                stats = self.statements.setdefault(sql, [0, 0.0])
+                stats[0] += 1
+                stats[1] += elapsed
+
+    def top(self, n):
+        """Return the n statements of the longest total time as (time, count, sql)."""
+        return sorted(((t, c, sql) for sql, (c, t) in self.statements.items()), reverse=True)[:n]
+
+
+class MetricsMiddleware(object):
+    """Count requests, latency, SQL queries and response bytes per view and method."""
+
+    def __init__(self, get_response):
+        """Keep the next handler, unless METRICS_ENABLED is off."""
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        """Handle and measure a request."""
+        slow = settings.METRICS_SLOW_REQUEST_SECONDS
+        timer = QueryTimer(statements=bool(slow))
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = (match.view_name or UNRESOLVED) if match else UNRESOLVED
+        method = request.method if request.method in METHODS else "OTHER"
+        size = 0 if response.streaming else len(response.content)
+        registry.observe(view, method, duration, timer.count, timer.duration, size)
+        registry.flush()
+
+        if slow and duration >= slow:
+            logger.warning(
+                "[shared.metrics.MetricsMiddleware] Slow request {0} {1} ({2}): {3:.2f}s, "
+                "{4} SQL queries in {5:.2f}s. Top SQL:\n{6}".format(
+                    method, request.get_full_path(), view, duration, timer.count, timer.duration,
+                    "\n".join("{0:.3f}s {1}x {2}".format(t, c, sql[:500])
+                              for t, c, sql in timer.top(settings.METRICS_SLOW_SQL_TOP))))
+        return response
+
+
+def metrics_view(request):
+    """Serve the request metrics of all workers in the Prometheus text format.
+
+    Open to staff, and to scrapers sending the header
+    ``Authorization: Bearer <METRICS_TOKEN>``.
+    """
+    token = settings.METRICS_TOKEN
+    authorized = bool(token) and request.META.get("HTTP_AUTHORIZATION") == "Bearer {0}".format(token)
+    if not (authorized or request.user.is_staff):
+        raise PermissionDenied
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
@@ -0,0 +1,27 @@
+# Generated by Django 3.1 on 2020-08-29 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeWatermark',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(help_text='The label of the tracked model, e.g. taxonomy.Taxon.', max_length=200, unique=True, verbose_name='Model')),
+                ('counter', models.BigIntegerField(default=0, help_text='The number of saves, deletes and bulk writes since tracking began.', verbose_name='Changes')),
+                ('changed_on', models.DateTimeField(blank=True, help_text='The time of the last change.', null=True, verbose_name='Last changed on')),
+            ],
+            options={
+                'verbose_name': 'Change Watermark',
+                'verbose_name_plural': 'Change Watermarks',
+            },
+        ),
+    ]
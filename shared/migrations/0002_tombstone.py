@@ -0,0 +1,27 @@
+# Generated by Django 3.1 on 2020-08-30 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entity', models.CharField(help_text='The change feed entity of the deleted record, e.g. taxon.', max_length=100, verbose_name='Entity')),
+                ('key', models.CharField(help_text='The primary key of the deleted record.', max_length=100, verbose_name='Key')),
+                ('deleted_on', models.DateTimeField(auto_now_add=True, db_index=True, help_text='The time of deletion.', verbose_name='Deleted on')),
+            ],
+            options={
+                'verbose_name': 'Tombstone',
+                'verbose_name_plural': 'Tombstones',
+                'ordering': ['deleted_on', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.1 on 2020-09-06 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shared', '0002_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobRun',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(db_index=True, help_text='The name of the job, e.g. import_odka.', max_length=200, verbose_name='Job')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='running', help_text='Whether the job is running, succeeded or failed.', max_length=20, verbose_name='Status')),
+                ('started_on', models.DateTimeField(db_index=True, help_text='The start time of the job.', verbose_name='Started on')),
+                ('finished_on', models.DateTimeField(blank=True, help_text='The end time of the job.', null=True, verbose_name='Finished on')),
+                ('seconds', models.FloatField(blank=True, help_text='The duration of the job in seconds.', null=True, verbose_name='Wall time (s)')),
+                ('db_seconds', models.FloatField(blank=True, help_text='The time spent in SQL queries in seconds.', null=True, verbose_name='DB time (s)')),
+                ('queries', models.PositiveIntegerField(blank=True, help_text='The number of SQL queries.', null=True, verbose_name='SQL queries')),
+                ('rows', models.PositiveIntegerField(blank=True, help_text='The number of processed records.', null=True, verbose_name='Rows')),
+                ('rows_per_second', models.FloatField(blank=True, help_text='The processed records per second.', null=True, verbose_name='Rows/s')),
+                ('peak_rss_mb', models.FloatField(blank=True, help_text='The peak resident memory of the process at the end of the job.', null=True, verbose_name='Peak RSS (MB)')),
+                ('stages', models.JSONField(default=list, help_text='The metrics of each stage, in the order the stages started.', verbose_name='Stages')),
+                ('error', models.TextField(blank=True, help_text='The exception which ended a failed job.', null=True, verbose_name='Error')),
+            ],
+            options={
+                'verbose_name': 'Job Run',
+                'verbose_name_plural': 'Job Runs',
+                'ordering': ['-started_on'],
+            },
+        ),
+    ]
@@ -8,6 +8,8 @@ import uuid
 
 from django.db import models
 from django.db.models import options
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 # from django.template import loader, TemplateDoesNotExist
 from django.urls import reverse
 from django.utils.safestring import mark_safe  # noqa
@@ -17,6 +19,8 @@ from django.utils.translation import ugettext_lazy as _
 from django_fsm import FSMField, transition
 from django_fsm_log.decorators import fsm_log_by
 
+from shared import cache as api_cache
+from shared import changefeed, watermarks
 from wastd.users.models import User
 
 # import urllib
@@ -33,6 +37,170 @@ from wastd.users.models import User
 logger = logging.getLogger(__name__)
 
 # Instantiated models --------------------------------------------------------#
+class ChangeWatermark(models.Model):
+    """The last change time and a change counter of one table, see shared.watermarks."""
+
+    label = models.CharField(
+        max_length=200,
+        unique=True,
+        verbose_name=_("Model"),
+        help_text=_("The label of the tracked model, e.g. taxonomy.Taxon."),
+    )
+
+    counter = models.BigIntegerField(
+        default=0,
+        verbose_name=_("Changes"),
+        help_text=_("The number of saves, deletes and bulk writes since tracking began."),
+    )
+
+    changed_on = models.DateTimeField(
+        blank=True, null=True,
+        verbose_name=_("Last changed on"),
+        help_text=_("The time of the last change."),
+    )
+
+    class Meta:
+        """Class options."""
+
+        verbose_name = "Change Watermark"
+        verbose_name_plural = "Change Watermarks"
+
+    def __str__(self):
+        """The unicode representation."""
+        return "{0} #{1} {2}".format(self.label, self.counter, self.changed_on)
+
+
+class Tombstone(models.Model):
+    """A deleted record of an entity in the change feed, see shared.changefeed."""
+
+    entity = models.CharField(
+        max_length=100,
+        verbose_name=_("Entity"),
+        help_text=_("The change feed entity of the deleted record, e.g. taxon."),
+    )
+
+    key = models.CharField(
+        max_length=100,
+        verbose_name=_("Key"),
+        help_text=_("The primary key of the deleted record."),
+    )
+
+    deleted_on = models.DateTimeField(
+        auto_now_add=True,
+        db_index=True,
+        verbose_name=_("Deleted on"),
+        help_text=_("The time of deletion."),
+    )
+
+    class Meta:
+        """Class options."""
+
+        ordering = ["deleted_on", "id"]
+        verbose_name = "Tombstone"
+        verbose_name_plural = "Tombstones"
+
+    def __str__(self):
+        """The unicode representation."""
+        return "{0} {1} deleted on {2}".format(self.entity, self.key, self.deleted_on)
+
+
+class JobRun(models.Model):
+    """One run of a long-running job with its stages, see shared.jobs."""
+
+    STATUS_RUNNING = "running"
+    STATUS_SUCCEEDED = "succeeded"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = (
+        (STATUS_RUNNING, _("Running")),
+        (STATUS_SUCCEEDED, _("Succeeded")),
+        (STATUS_FAILED, _("Failed")),
+    )
+
+    name = models.CharField(
+        max_length=200,
+        db_index=True,
+        verbose_name=_("Job"),
+        help_text=_("The name of the job, e.g. import_odka."),
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_RUNNING,
+        verbose_name=_("Status"),
+        help_text=_("Whether the job is running, succeeded or failed."),
+    )
+
+    started_on = models.DateTimeField(
+        db_index=True,
+        verbose_name=_("Started on"),
+        help_text=_("The start time of the job."),
+    )
+
+    finished_on = models.DateTimeField(
+        blank=True, null=True,
+        verbose_name=_("Finished on"),
+        help_text=_("The end time of the job."),
+    )
+
+    seconds = models.FloatField(
+        blank=True, null=True,
+        verbose_name=_("Wall time (s)"),
+        help_text=_("The duration of the job in seconds."),
+    )
+
+    db_seconds = models.FloatField(
+        blank=True, null=True,
+        verbose_name=_("DB time (s)"),
+        help_text=_("The time spent in SQL queries in seconds."),
+    )
+
+    queries = models.PositiveIntegerField(
+        blank=True, null=True,
+        verbose_name=_("SQL queries"),
+        help_text=_("The number of SQL queries."),
+    )
+
+    rows = models.PositiveIntegerField(
+        blank=True, null=True,
+        verbose_name=_("Rows"),
+        help_text=_("The number of processed records."),
+    )
+
+    rows_per_second = models.FloatField(
+        blank=True, null=True,
+        verbose_name=_("Rows/s"),
+        help_text=_("The processed records per second."),
+    )
+
+    peak_rss_mb = models.FloatField(
+        blank=True, null=True,
+        verbose_name=_("Peak RSS (MB)"),
+        help_text=_("The peak resident memory of the process at the end of the job."),
+    )
+
+    stages = models.JSONField(
+        default=list,
+        verbose_name=_("Stages"),
+        help_text=_("The metrics of each stage, in the order the stages started."),
+    )
+
+    error = models.TextField(
+        blank=True, null=True,
+        verbose_name=_("Error"),
+        help_text=_("The exception which ended a failed job."),
+    )
+
+    class Meta:
+        """Class options."""
+
+        ordering = ["-started_on"]
+        verbose_name = "Job Run"
+        verbose_name_plural = "Job Runs"
+
+    def __str__(self):
+        """The unicode representation."""
+        return "{0} {1} {2}".format(self.name, self.started_on, self.get_status_display())
 
 
 # Abstract models ------------------------------------------------------------#
@@ -239,6 +407,25 @@ class ObservationAuditMixin(models.Model):
         abstract = True
 
 
+class LastModifiedMixin(models.Model):
+    """Mixin class to track the last change of a record for the change feed.
+
+    ``last_modified`` is set on ``save()``. Bulk updates must set it explicitly,
+    see ``shared.changefeed.stamped``.
+    """
+
+    last_modified = models.DateTimeField(
+        verbose_name=_("Last modified"),
+        auto_now=True,
+        db_index=True,
+        help_text=_("The time of the last change to this record."))
+
+    class Meta:
+        """Class opts."""
+
+        abstract = True
+
+
 class LegacySourceMixin(models.Model):
     """Mixin class for Legacy source and source_id.
 
@@ -547,3 +734,25 @@ class QualityControlMixin(models.Model):
         Embargoed data is marked as curated, but not ready for release.
         """
         return
+
+
+@receiver([post_save, post_delete])
+def track_changes(sender, instance, *args, **kwargs):
+    """Invalidate cached API responses and move the watermark of the saved or deleted model."""
+    if sender.__module__ == "__fake__":
+        # Historical models in data migrations, possibly before the watermark table exists
+        return
+    if api_cache.is_versioned(sender):
+        api_cache.bump(sender)
+    if watermarks.is_tracked(sender):
+        watermarks.touch(sender)
+
+
+@receiver(post_delete)
+def record_tombstone(sender, instance, *args, **kwargs):
+    """Record deleted records of change feed entities."""
+    if sender.__module__ == "__fake__":
+        return
+    entity = changefeed.entity_of(sender)
+    if entity:
+        Tombstone.objects.create(entity=entity, key=str(instance.pk))
@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+"""Query budgets: SQL query counts of API endpoints and HTML list and detail views.
+
+``endpoints`` finds the list and detail URLs of every viewset in ``wastd.router``,
+and of every Django list and detail view (see ``shared.db.is_read_view``).
+``measure`` requests a URL and counts its SQL queries by fingerprint.
+
+``shared.tests.QueryBudgetTests`` seeds a small and a larger dataset with ``seed``,
+measures every endpoint at both sizes, and reports
+
+* endpoints whose query count grows with the number of rows (N+1 queries),
+  unless allowed in ``ALLOWED_GROWTH`` with a reason,
+* endpoints over their budget in ``BUDGET_FILE``, and
+* endpoints without a budget, once ``BUDGET_FILE`` holds any,
+
+each with the SQL fingerprints which ran more than once. Without any budgets,
+only the growth check runs and the test is reported as skipped.
+
+Refresh the budgets after an intended change with::
+
+    QUERY_BUDGET_UPDATE=1 ./manage.py test shared.tests.QueryBudgetTests
+"""
+import json
+import logging
+import os
+import re
+import uuid
+from collections import Counter
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from shared.db import is_read_view
+
+logger = logging.getLogger(__name__)
+
+BUDGET_FILE = os.path.join(os.path.dirname(__file__), "query_budgets.json")
+
+# Endpoints whose query count may grow with the number of rows: endpoint name: reason
+ALLOWED_GROWTH = {}
+
+# URL arguments which are not fields of the shown object, e.g. map tiles over WA
+URL_KWARGS = {"z": 8, "x": 209, "y": 151}
+
+STRINGS = re.compile(r"'(?:[^']|'')*'")
+NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+SPACE = re.compile(r"\s+")
+
+
+def fingerprint(sql):
+    """Return a SQL statement with literals and IN lists replaced, to group repeated queries."""
+    sql = STRINGS.sub("?", sql)
+    sql = NUMBERS.sub("?", sql)
+    sql = LISTS.sub("(...)", sql)
+    return SPACE.sub(" ", sql).strip()
+
+
+def load_budgets(filename=BUDGET_FILE):
+    """Return the budgets as dict of endpoint: maximum number of queries."""
+    try:
+        with open(filename) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return dict()
+
+
+def save_budgets(budgets, filename=BUDGET_FILE):
+    """Write the budgets, sorted by endpoint."""
+    with open(filename, "w") as f:
+        json.dump(budgets, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def url_patterns(patterns=None, namespace=None):
+    """Yield (URL name with namespace, URLPattern) of all named URL patterns."""
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            ns = pattern.namespace
+            if namespace and ns:
+                ns = "{0}:{1}".format(namespace, ns)
+            yield from url_patterns(pattern.url_patterns, ns or namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            name = "{0}:{1}".format(namespace, pattern.name) if namespace else pattern.name
+            yield name, pattern
+
+
+def first(model):
+    """Return the first object of a model, or None."""
+    return model.objects.order_by("pk").first() if model is not None else None
+
+
+def viewset_model(viewset):
+    """Return the model of a viewset, or None."""
+    return (getattr(viewset, "model", None) or
+            getattr(getattr(viewset, "queryset", None), "model", None) or
+            getattr(getattr(viewset, "Meta", None), "model", None))
+
+
+def url_kwargs(pattern, obj):
+    """Return the URL arguments of a pattern filled from an object, or None if one is missing."""
+    kwargs = dict()
+    for name in pattern.pattern.regex.groupindex:
+        if name in URL_KWARGS:
+            kwargs[name] = URL_KWARGS[name]
+        elif obj is not None and hasattr(obj, name):
+            kwargs[name] = getattr(obj, name)
+        else:
+            return None
+    return kwargs
+
+
+def endpoints():
+    """Return the URLs to measure, as a dict of endpoint name: URL.
+
+    Arguments are filled from the first object of the view's model.
+    Views whose arguments cannot be filled are left out and logged.
+    """
+    from wastd.router import router
+
+    urls = dict()
+    for prefix, viewset, basename in router.registry:
+        if hasattr(viewset, "list"):
+            urls["api:{0}-list".format(basename)] = reverse("api:{0}-list".format(basename)) + "?format=json"
+        obj = first(viewset_model(viewset))
+        if hasattr(viewset, "retrieve") and obj is not None:
+            lookup = getattr(viewset, "lookup_field", "pk")
+            urls["api:{0}-detail".format(basename)] = reverse(
+                "api:{0}-detail".format(basename), kwargs={lookup: getattr(obj, lookup)}) + "?format=json"
+
+    for name, pattern in url_patterns():
+        if name.startswith("api:") or not is_read_view(pattern.callback):
+            continue
+        view_class = pattern.callback.view_class
+        model = getattr(view_class, "model", None) or getattr(getattr(view_class, "queryset", None), "model", None)
+        kwargs = url_kwargs(pattern, first(model))
+        if kwargs is None:
+            logger.info("[shared.querybudget.endpoints] Skipping {0}: no URL arguments.".format(name))
+            continue
+        urls[name] = reverse(name, kwargs=kwargs)
+    return urls
+
+
+def measure(client, url):
+    """Request a URL, return the status code and a Counter of its SQL fingerprints."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    return response.status_code, Counter(fingerprint(q["sql"]) for q in context.captured_queries)
+
+
+def repeated(fingerprints):
+    """Return the fingerprints which ran more than once, most frequent first, as text."""
+    return "\n".join("  {0}x {1}".format(count, sql[:300])
+                     for sql, count in fingerprints.most_common() if count > 1)
+
+
+def seed(start, stop, user):
+    """Create the records number start to stop of each main model with their related records.
+
+    Each record gets its own related records, so that queries per row show up
+    as growing query counts.
+    """
+    from django.contrib.gis.geos import GEOSGeometry, Point, Polygon
+    from conservation import models as cons
+    from occurrence import models as occ
+    from taxonomy.models import Community, Taxon, Vernacular
+    from wastd.observations.models import AnimalEncounter, Area, Survey
+
+    clist, created = cons.ConservationList.objects.get_or_create(
+        code="budget-list", defaults=dict(label="Query budget list"))
+    category, created = cons.ConservationCategory.objects.get_or_create(
+        conservation_list=clist, code="budget-category", defaults=dict(label="Query budget category"))
+    threat_category, created = cons.ConservationThreatCategory.objects.get_or_create(
+        code="budget-threat", defaults=dict(label="Query budget threat"))
+    action_category, created = cons.ConservationActionCategory.objects.get_or_create(
+        code="budget-action", defaults=dict(label="Query budget action"))
+
+    for i in range(start, stop):
+        x, y = 114.0 + i * 0.1, -31.0
+        taxon = Taxon.objects.create(name_id=900000 + i, name="Budget taxon {0}".format(i))
+        Vernacular.objects.create(ogc_fid=900000 + i, taxon=taxon, name="Budget name {0}".format(i))
+        community = Community.objects.create(code="budget-{0}".format(i), name="Budget community {0}".format(i))
+
+        listing = cons.TaxonConservationListing.objects.create(taxon=taxon)
+        listing.category.add(category)
+        cons.CommunityConservationListing.objects.create(community=community).category.add(category)
+        cons.Document.objects.create(title="Budget document {0}".format(i)).taxa.add(taxon)
+        threat = cons.ConservationThreat.objects.create(category=threat_category, cause="Cause {0}".format(i))
+        threat.taxa.add(taxon)
+        action = cons.ConservationAction.objects.create(
+            category=action_category, instructions="Instructions {0}".format(i))
+        action.taxa.add(taxon)
+
+        tae = occ.TaxonAreaEncounter.objects.create(
+            taxon=taxon, source_id=uuid.uuid4(), encountered_on=timezone.now(), encountered_by=user,
+            code="budget-tae-{0}".format(i), label="Budget TAE {0}".format(i),
+            point=GEOSGeometry("POINT ({0} {1})".format(x, y), srid=4326))
+        occ.AreaAssessment.objects.create(encounter=tae)
+        occ.CommunityAreaEncounter.objects.create(
+            community=community, source_id=uuid.uuid4(), encountered_on=timezone.now(), encountered_by=user,
+            code="budget-cae-{0}".format(i), label="Budget CAE {0}".format(i),
+            point=GEOSGeometry("POINT ({0} {1})".format(x, y), srid=4326))
+
+        site = Area.objects.create(
+            area_type=Area.AREATYPE_SITE, name="Budget site {0}".format(i),
+            geom=Polygon.from_bbox((x - 0.05, y - 0.05, x + 0.05, y + 0.05)))
+        Survey.objects.create(site=site, reporter=user, start_location=Point(x, y), start_time=timezone.now())
+        AnimalEncounter.objects.create(where=Point(x, y), when=timezone.now(), observer=user, reporter=user)
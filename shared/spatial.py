@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Spatial helpers.
+
+A static, sort-tile-recursive (STR) packed R-tree over GEOS geometries,
+similar to shapely's STRtree, built on GeoDjango's GEOS bindings only.
+"""
+import math
+
+
+class STRtree(object):
+    """A read-only R-tree of (geometry, item) pairs, packed with sort-tile-recursive.
+
+    The tree is built once from all entries and cannot be modified.
+    Queries return the items whose geometry envelopes intersect the query
+    envelope; callers test the exact geometries, ideally prepared ones.
+
+    Example::
+
+        tree = STRtree([(a.geom, a) for a in areas])
+        [a for a in tree.query(point) if a.geom.prepared.contains(point)]
+    """
+
+    def __init__(self, entries, node_capacity=10):
+        """Build the tree.
+
+        Arguments:
+        entries An iterable of (geometry, item) pairs, where geometry is
+            a GEOSGeometry or an extent tuple (xmin, ymin, xmax, ymax)
+        node_capacity The maximum number of children per node, default: 10
+        """
+        self.node_capacity = node_capacity
+        nodes = [(self._extent(g), item) for g, item in entries]
+        self.size = len(nodes)
+        self.root = None
+        if not nodes:
+            return
+        # Leaves are (extent, item), nodes are (extent, [children]).
+        # Nodes of height 1 hold leaves, the root has height self.height.
+        level, height = nodes, 1
+        while len(level) > node_capacity:
+            level = self._pack(level)
+            height += 1
+        self.root = (self._union([n[0] for n in level]), level)
+        self.height = height
+
+    @staticmethod
+    def _extent(geom):
+        """Return the extent of a GEOSGeometry or an extent tuple as is."""
+        return tuple(geom) if isinstance(geom, (tuple, list)) else geom.extent
+
+    @staticmethod
+    def _union(extents):
+        """Return the extent covering all given extents."""
+        return (
+            min(e[0] for e in extents),
+            min(e[1] for e in extents),
+            max(e[2] for e in extents),
+            max(e[3] for e in extents),
+        )
+
+    def _pack(self, nodes):
+        """Group nodes into parent nodes of up to node_capacity children."""
+        cap = self.node_capacity
+        n_parents = int(math.ceil(len(nodes) / float(cap)))
+        n_slices = int(math.ceil(math.sqrt(n_parents)))
+        slice_size = n_slices * cap
+
+        def center_x(n):
+            return (n[0][0] + n[0][2]) / 2.0
+
+        def center_y(n):
+            return (n[0][1] + n[0][3]) / 2.0
+
+        parents = []
+        by_x = sorted(nodes, key=center_x)
+        for i in range(0, len(by_x), slice_size):
+            vertical_slice = sorted(by_x[i:i + slice_size], key=center_y)
+            for j in range(0, len(vertical_slice), cap):
+                children = vertical_slice[j:j + cap]
+                parents.append((self._union([c[0] for c in children]), children))
+        return parents
+
+    @staticmethod
+    def _intersects(a, b):
+        """Return whether two extents intersect."""
+        return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+    def query(self, geom):
+        """Return the items whose envelopes intersect the envelope of geom."""
+        if self.root is None:
+            return []
+        extent = self._extent(geom)
+        results = []
+        stack = [(self.root, self.height)]
+        while stack:
+            (node_extent, children), height = stack.pop()
+            if not self._intersects(node_extent, extent):
+                continue
+            if height == 1:
+                results.extend(item for e, item in children if self._intersects(e, extent))
+            else:
+                stack.extend((c, height - 1) for c in children)
+        return results
+
+    def __len__(self):
+        """Return the number of entries in the tree."""
+        return self.size
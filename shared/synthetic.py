@@ -0,0 +1,553 @@
+# -*- coding: utf-8 -*-
+"""Deterministic synthetic datasets at production scale, bulk loaded with PostgreSQL COPY.
+
+``generate`` appends, at a scale of 1,
+
+* a WACensus-like taxon tree from Kingdom to Forma of about 140,000 names,
+  with vernacular names, and superseded names linked through Crossreferences,
+* 2,000 Communities,
+* conservation lists with categories, listings for one in twenty current
+  species and subspecies, and for one in three communities,
+* 1,000,000 TaxonAreaEncounters and 200,000 CommunityAreaEncounters,
+  clustered around hotspots inside Western Australia, and
+* 1,000,000 WAStD AnimalEncounters, clustered around turtle nesting beaches.
+
+All counts are multiplied by the scale. The same scale and seed always give
+the same data: all times are derived from ``EPOCH`` and the seeded random numbers,
+and ``auto_now`` fields, e.g. ``last_modified``, are set to ``EPOCH``. Records get
+primary keys after the current maximum, and the sequences are moved past them afterwards.
+
+``save()`` and all signals are bypassed, so derived data are not built:
+run ``./manage.py cluster_occurrences`` for duplicate clusters, and let the
+render task render the Encounters, which are created ``render_dirty``.
+The daily Encounter statistics are rebuilt after loading the Encounters.
+"""
+import io
+import json
+import logging
+import math
+import random
+from datetime import date, datetime, timedelta
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+
+from shared import cache as api_cache
+from shared import watermarks
+
+logger = logging.getLogger(__name__)
+
+COPY_BATCH_SIZE = 50000
+# The "now" of all synthetic datasets
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+REQUIRED = object()
+
+# Records at scale 1
+FAMILIES = 3600
+COMMUNITIES = 2000
+TAXON_AREA_ENCOUNTERS = 1000000
+COMMUNITY_AREA_ENCOUNTERS = 200000
+ANIMAL_ENCOUNTERS = 1000000
+HOTSPOTS = 400
+
+KINGDOMS = ("Plantae", "Animalia", "Fungi", "Chromista")
+SYLLABLES = (
+    "ac", "al", "an", "ar", "bor", "cal", "car", "chi", "cor", "da", "del", "di", "er", "eu", "gal",
+    "hal", "hy", "la", "le", "li", "lo", "ma", "mel", "mi", "mon", "na", "ne", "no", "or", "pa",
+    "pe", "phy", "pi", "po", "ra", "ri", "ro", "sa", "se", "si", "ta", "te", "ti", "to", "va", "xa",
+)
+EPITHET_ENDINGS = ("us", "a", "um", "is", "ensis", "ii", "oides", "ata", "ifolia")
+VERNACULAR_WORDS = (
+    "Red", "Blue", "Golden", "Woolly", "Dwarf", "Giant", "Swamp", "Sand", "Granite", "Coastal",
+    "Desert", "Kimberley", "Pilbara", "Stirling", "Spiny", "Hairy", "Smooth", "Broad-leaved",
+)
+VERNACULAR_NOUNS = ("Bell", "Everlasting", "Wattle", "Orchid", "Banksia", "Grevillea", "Daisy", "Pea", "Mallee")
+AUTHORS = ("Benth.", "F.Muell.", "R.Br.", "Lindl.", "Diels", "Hopper", "S.Moore", "C.A.Gardner", "Keighery")
+
+# A coarse outline of Western Australia as (longitude, latitude)
+WA_OUTLINE = (
+    (129.0, -14.9), (129.0, -31.7), (126.0, -32.3), (123.5, -33.9), (119.9, -34.0), (117.9, -35.1),
+    (115.0, -34.3), (115.7, -33.3), (115.7, -31.5), (114.9, -29.0), (113.5, -26.5), (113.4, -24.5),
+    (113.7, -22.0), (114.6, -21.8), (116.8, -20.6), (119.0, -19.9), (121.3, -19.0), (122.3, -17.3),
+    (123.6, -16.2), (125.2, -14.5), (126.9, -13.8), (128.2, -14.9),
+)
+# Turtle nesting beaches as (longitude, latitude)
+BEACHES = (
+    (114.98, -21.46), (122.20, -17.96), (113.90, -22.20), (115.40, -20.80), (117.07, -20.45),
+    (116.60, -20.47), (118.60, -20.30), (122.10, -16.85), (113.00, -25.80), (114.10, -21.80),
+)
+
+
+def copy_text(value):
+    """Return a value in the text format of PostgreSQL COPY."""
+    if value is None:
+        return r"\N"
+    if value is True:
+        return "t"
+    if value is False:
+        return "f"
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    elif hasattr(value, "ewkt"):
+        value = value.ewkt
+    else:
+        value = str(value)
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def point(x, y):
+    """Return a WGS84 point as EWKT."""
+    return "SRID=4326;POINT({0:.6f} {1:.6f})".format(x, y)
+
+
+def field_default(field, now):
+    """Return the value of a field which is not given, or REQUIRED."""
+    if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False):
+        return now
+    value = field.get_default()
+    if value is None and not (field.null or field.primary_key):
+        return REQUIRED
+    return value
+
+
+class Copier(object):
+    """Bulk load rows of a model, and of its concrete parents, with COPY.
+
+    Primary keys are assigned from the current maximum upwards.
+    Fields which are not given get their default, ``auto_now`` fields get now.
+    """
+
+    def __init__(self, model, batch_size=COPY_BATCH_SIZE, now=EPOCH):
+        """Prepare the tables of model and its parents."""
+        self.model = model
+        self.batch_size = batch_size
+        chain = list(reversed(model._meta.get_parent_list())) + [model]
+        self.root = chain[0]
+        self.tables = [(m._meta.db_table, list(m._meta.local_concrete_fields)) for m in chain]
+        self.defaults = {f.attname: field_default(f, now) for table, fields in self.tables for f in fields}
+        self.buffers = [io.StringIO() for table in self.tables]
+        self.pending = 0
+        self.count = 0
+        self.next_pk = (self.root._base_manager.aggregate(pk=Max("pk"))["pk"] or 0) + 1
+
+    def add(self, **values):
+        """Add a row given by field attnames, e.g. taxon_id, return its primary key."""
+        pk = self.next_pk
+        self.next_pk += 1
+        for (table, fields), buffer in zip(self.tables, self.buffers):
+            row = []
+            for field in fields:
+                value = pk if field.primary_key else values.get(field.attname, self.defaults[field.attname])
+                if value is REQUIRED:
+                    raise ValueError("{0}.{1} needs a value.".format(self.model.__name__, field.attname))
+                row.append(copy_text(value))
+            buffer.write("\t".join(row))
+            buffer.write("\n")
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+        return pk
+
+    def flush(self):
+        """COPY the pending rows, parents first."""
+        if not self.pending:
+            return
+        qn = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            for (table, fields), buffer in zip(self.tables, self.buffers):
+                buffer.seek(0)
+                cursor.copy_expert("COPY {0} ({1}) FROM STDIN".format(
+                    qn(table), ", ".join(qn(f.column) for f in fields)), buffer)
+        self.count += self.pending
+        self.pending = 0
+        self.buffers = [io.StringIO() for table in self.tables]
+
+    def close(self):
+        """COPY the remaining rows, move the sequences past them, return the number of rows."""
+        self.flush()
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [self.root, self.model]):
+                cursor.execute(sql)
+        if self.count and watermarks.is_tracked(self.model):
+            watermarks.touch(self.model)
+        if self.count and api_cache.is_versioned(self.model):
+            api_cache.bump(self.model)
+        logger.info("[shared.synthetic.Copier] {0} {1} loaded.".format(self.count, self.model._meta.verbose_name_plural))
+        return self.count
+
+
+def scaled(count, scale):
+    """Return a count at scale, at least one."""
+    return max(1, int(round(count * scale)))
+
+
+def latin(rng, syllables, ending=""):
+    """Return a Latin-looking word."""
+    return "".join(rng.choice(SYLLABLES) for i in range(syllables)) + ending
+
+
+def is_inside(x, y, outline=WA_OUTLINE):
+    """Return whether a point lies inside a polygon, by ray casting."""
+    inside = False
+    j = len(outline) - 1
+    for i in range(len(outline)):
+        xi, yi = outline[i]
+        xj, yj = outline[j]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def random_point(rng, centres, sigma, clip=True):
+    """Return a point normally distributed around a random centre, if clip inside WA."""
+    while True:
+        cx, cy = rng.choice(centres)
+        x, y = rng.gauss(cx, sigma), rng.gauss(cy, sigma)
+        if not clip or is_inside(x, y):
+            return x, y
+
+
+def hotspots(rng, count):
+    """Return count random points inside WA."""
+    spots = []
+    while len(spots) < count:
+        x, y = rng.uniform(112.9, 129.0), rng.uniform(-35.2, -13.7)
+        if is_inside(x, y):
+            spots.append((x, y))
+    return spots
+
+
+def number_tree(parents, first_tree_id):
+    """Return the MPTT numbers (lft, rght, tree_id, level) of a forest.
+
+    Arguments:
+    parents The index of each node's parent, or None for roots,
+        in the order of the children within their parent
+    first_tree_id The tree_id of the first root
+    """
+    children = [[] for p in parents]
+    roots = []
+    for i, parent in enumerate(parents):
+        (roots if parent is None else children[parent]).append(i)
+    numbers = [None] * len(parents)
+    lft = [0] * len(parents)
+    for tree_id, root in enumerate(roots, start=first_tree_id):
+        counter = 1
+        stack = [(root, 0, False)]
+        while stack:
+            i, level, done = stack.pop()
+            if done:
+                numbers[i] = (lft[i], counter, tree_id, level)
+                counter += 1
+                continue
+            lft[i] = counter
+            counter += 1
+            stack.append((i, level, True))
+            stack.extend((child, level + 1, False) for child in reversed(children[i]))
+    return numbers
+
+
+def build_taxa(rng, scale):
+    """Return the taxon tree as a list of dicts, parents before their children."""
+    from taxonomy.models import Taxon
+
+    levels = (
+        (Taxon.RANK_DIVISION, 24, "phyta"),
+        (Taxon.RANK_CLASS, 120, "opsida"),
+        (Taxon.RANK_ORDER, 720, "ales"),
+        (Taxon.RANK_FAMILY, FAMILIES, "aceae"),
+    )
+    taxa = [dict(rank=Taxon.RANK_KINGDOM, name=name, parent=None, genus=None, species=None)
+            for name in KINGDOMS[:scaled(len(KINGDOMS), scale)]]
+    above = list(range(len(taxa)))
+    for rank, count, ending in levels:
+        count = scaled(count, scale)
+        level = []
+        for n in range(count):
+            level.append(len(taxa))
+            taxa.append(dict(rank=rank, name=latin(rng, 2, ending).capitalize(),
+                             parent=above[n * len(above) // count], genus=None, species=None))
+        above = level
+
+    infraspecific = (Taxon.RANK_SUBSPECIES, Taxon.RANK_VARIETY, Taxon.RANK_FORMA)
+    for family in above:
+        for g in range(rng.randint(1, 5)):
+            genus = latin(rng, rng.randint(2, 3)).capitalize()
+            genus_index = len(taxa)
+            taxa.append(dict(rank=Taxon.RANK_GENUS, name=genus, parent=family, genus=None, species=None))
+            for s in range(rng.randint(1, 17)):
+                species = latin(rng, 2, rng.choice(EPITHET_ENDINGS))
+                species_index = len(taxa)
+                taxa.append(dict(rank=Taxon.RANK_SPECIES, name=species, parent=genus_index,
+                                 genus=genus, species=None))
+                if rng.random() < 0.05:
+                    # A superseded name of the species
+                    taxa.append(dict(rank=Taxon.RANK_SPECIES, name=latin(rng, 2, rng.choice(EPITHET_ENDINGS)),
+                                     parent=genus_index, genus=genus, species=None, successor=species_index))
+                if rng.random() < 0.15:
+                    for i in range(rng.randint(1, 3)):
+                        taxa.append(dict(rank=rng.choice(infraspecific), name=latin(rng, 2, "a"),
+                                         parent=species_index, genus=genus, species=species))
+    return taxa
+
+
+def canonical_name(taxon):
+    """Return the canonical name of a generated taxon, as Taxon.build_canonical_name."""
+    from taxonomy.models import Taxon
+
+    if taxon["species"]:
+        return "{0} {1} {2} {3}".format(
+            taxon["genus"], taxon["species"], Taxon.RANK_ABBREVIATIONS[taxon["rank"]], taxon["name"])
+    if taxon["genus"]:
+        return "{0} {1}".format(taxon["genus"], taxon["name"])
+    return taxon["name"]
+
+
+def generate_taxa(rng, scale):
+    """Load the taxon tree with vernaculars and crossreferences, return the current species and below.
+
+    Returns:
+    A list of (Taxon ID, canonical name).
+    """
+    from taxonomy.models import Crossreference, Taxon, Vernacular
+
+    taxa = build_taxa(rng, scale)
+    first_tree_id = (Taxon.objects.aggregate(t=Max("tree_id"))["t"] or 0) + 1
+    numbers = number_tree([t["parent"] for t in taxa], first_tree_id)
+    first_name_id = (Taxon.objects.aggregate(n=Max("name_id"))["n"] or 0) + 1
+
+    taxon_copier = Copier(Taxon)
+    vernacular_copier = Copier(Vernacular)
+    xref_copier = Copier(Crossreference)
+    first_pk = taxon_copier.next_pk
+    first_ogc_fid = (Vernacular.objects.aggregate(n=Max("ogc_fid"))["n"] or 0) + 1
+    first_xref_id = (Crossreference.objects.aggregate(n=Max("xref_id"))["n"] or 0) + 1
+    leaves = []
+    vernacular_count = xref_count = 0
+    for i, (taxon, (lft, rght, tree_id, level)) in enumerate(zip(taxa, numbers)):
+        current = "successor" not in taxon
+        vernaculars = []
+        if taxon["rank"] >= Taxon.RANK_SPECIES and current and rng.random() < 0.3:
+            vernaculars.append("{0} {1}".format(rng.choice(VERNACULAR_WORDS), rng.choice(VERNACULAR_NOUNS)))
+            if rng.random() < 0.2:
+                vernaculars.append(latin(rng, 3).capitalize())
+        author = rng.choice(AUTHORS) if taxon["rank"] >= Taxon.RANK_GENUS else None
+        name = canonical_name(taxon)
+        pk = taxon_copier.add(
+            name_id=first_name_id + i,
+            parent_id=None if taxon["parent"] is None else first_pk + taxon["parent"],
+            rank=taxon["rank"],
+            name=taxon["name"],
+            canonical_name=name,
+            taxonomic_name="{0} ({1})".format(name, author) if author else name,
+            vernacular_name=vernaculars[0] if vernaculars else "",
+            vernacular_names=", ".join(vernaculars),
+            author=author,
+            current=current,
+            lft=lft, rght=rght, tree_id=tree_id, level=level,
+        )
+        for n, vernacular in enumerate(vernaculars):
+            vernacular_copier.add(
+                ogc_fid=first_ogc_fid + vernacular_count, taxon_id=pk, name=vernacular,
+                language=Vernacular.LANGUAGE_ENGLISH if n == 0 else Vernacular.LANGUAGE_INDIGENOUS,
+                preferred=n == 0)
+            vernacular_count += 1
+        if not current:
+            xref_copier.add(
+                xref_id=first_xref_id + xref_count, predecessor_id=pk,
+                successor_id=first_pk + taxon["successor"], reason=Crossreference.REASON_NSY)
+            xref_count += 1
+        elif taxon["rank"] >= Taxon.RANK_SPECIES:
+            leaves.append((pk, name))
+    taxon_copier.close()
+    vernacular_copier.close()
+    xref_copier.close()
+    return leaves
+
+
+def generate_communities(rng, scale):
+    """Load Communities, return their IDs."""
+    from taxonomy.models import Community
+
+    copier = Copier(Community)
+    pks = []
+    for n in range(scaled(COMMUNITIES, scale)):
+        pk = copier.next_pk
+        pks.append(copier.add(
+            code="syn-{0}".format(pk),
+            name="{0} {1} community".format(latin(rng, 3).capitalize(), rng.choice(VERNACULAR_NOUNS).lower()),
+            source=Community.SOURCE_THREATENED_COMMUNITIES,
+            source_id="synthetic-{0}".format(pk)))
+    copier.close()
+    return pks
+
+
+def generate_listings(rng, taxa, communities):
+    """Load conservation lists, categories and listings, return the number of listings."""
+    from conservation import models as cons
+
+    Category = cons.ConservationCategory
+    Listing = cons.ConservationListing
+    categories = (
+        ("CR", Category.LEVEL_THREATENED, Category.SHORTCODE_THREATENED),
+        ("EN", Category.LEVEL_THREATENED, Category.SHORTCODE_THREATENED),
+        ("VU", Category.LEVEL_THREATENED, Category.SHORTCODE_THREATENED),
+        ("P1", Category.LEVEL_PRIORITY, Category.SHORTCODE_P1),
+        ("P2", Category.LEVEL_PRIORITY, Category.SHORTCODE_P2),
+        ("P3", Category.LEVEL_PRIORITY, Category.SHORTCODE_P3),
+        ("P4", Category.LEVEL_PRIORITY, Category.SHORTCODE_P4),
+    )
+    lists = []
+    for code, label, scope, scope_field in (
+            ("WAWCA", "WA Wildlife Conservation Act", Listing.SCOPE_WESTERN_AUSTRALIA, "scope_wa"),
+            ("EPBC", "EPBC Act", Listing.SCOPE_COMMONWEALTH, "scope_cmw"),
+            ("IUCN", "IUCN Red List", Listing.SCOPE_INTERNATIONAL, "scope_intl")):
+        clist, created = cons.ConservationList.objects.get_or_create(
+            code="synthetic-{0}".format(code.lower()),
+            defaults={"label": label, "scope_species": True, "scope_communities": True, scope_field: True})
+        lists.append((scope, [
+            Category.objects.get_or_create(
+                conservation_list=clist, code=category,
+                defaults=dict(label=category, rank=rank, level=level, short_code=short_code))[0]
+            for rank, (category, level, short_code) in enumerate(categories)]))
+
+    statuses = (Listing.STATUS_EFFECTIVE,) * 8 + (Listing.STATUS_PROPOSED, Listing.STATUS_CLOSED)
+    count = 0
+    for model, subjects, subject_field, share in (
+            (cons.TaxonConservationListing, [pk for pk, name in taxa], "taxon_id", 0.05),
+            (cons.CommunityConservationListing, communities, "community_id", 0.33)):
+        copier = Copier(model)
+        through = Copier(model.category.through)
+        listing_field = model.category.field.m2m_column_name()
+        category_field = model.category.field.m2m_reverse_name()
+        for subject in subjects:
+            if rng.random() >= share:
+                continue
+            scope, list_categories = rng.choice(lists)
+            category = rng.choice(list_categories)
+            listed = EPOCH - timedelta(days=rng.randint(0, 20 * 365))
+            pk = copier.next_pk
+            copier.add(
+                source_id="synthetic-{0}".format(pk),
+                scope=scope,
+                status=rng.choice(statuses),
+                proposed_on=listed - timedelta(days=90),
+                effective_from=listed,
+                category_cache=str(category),
+                **{subject_field: subject})
+            through.add(**{listing_field: pk, category_field: category.pk})
+        count += copier.close()
+        through.close()
+    return count
+
+
+def generate_area_encounters(rng, scale, taxa, communities, user_id):
+    """Load TaxonAreaEncounters and CommunityAreaEncounters, return their numbers."""
+    from django.contrib.contenttypes.models import ContentType
+    from occurrence.models import CommunityAreaEncounter, TaxonAreaEncounter
+
+    spots = hotspots(rng, scaled(HOTSPOTS, math.sqrt(scale)))
+    qc = TaxonAreaEncounter
+    statuses = (qc.STATUS_NEW,) * 5 + (
+        qc.STATUS_PROOFREAD, qc.STATUS_CURATED, qc.STATUS_CURATED, qc.STATUS_PUBLISHED, qc.STATUS_FLAGGED)
+    start = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    counts = []
+    for model, count, subjects, subject_field, source in (
+            (TaxonAreaEncounter, TAXON_AREA_ENCOUNTERS, taxa, "taxon_id",
+             TaxonAreaEncounter.SOURCE_THREATENED_FLORA),
+            (CommunityAreaEncounter, COMMUNITY_AREA_ENCOUNTERS, communities, "community_id",
+             CommunityAreaEncounter.SOURCE_THREATENED_COMMUNITIES)):
+        copier = Copier(model)
+        ctype = ContentType.objects.get_for_model(model).pk
+        for n in range(scaled(count, scale)):
+            # A few subjects are recorded far more often than most
+            subject = subjects[int(len(subjects) * rng.random() ** 3)]
+            subject = subject[0] if isinstance(subject, tuple) else subject
+            x, y = random_point(rng, spots, rng.choice((0.01, 0.05, 0.2)))
+            pk = copier.next_pk
+            copier.add(
+                polymorphic_ctype_id=ctype,
+                code="syn-{0}".format(pk),
+                name="Synthetic occurrence {0}".format(pk),
+                label="Synthetic occurrence {0}".format(pk),
+                source=source,
+                source_id="synthetic-{0}".format(pk),
+                encountered_on=start + timedelta(minutes=rng.randint(0, 50 * 365 * 24 * 60)),
+                encountered_by_id=user_id,
+                status=rng.choice(statuses),
+                accuracy=rng.choice((5, 10, 50, 100, 1000)),
+                point=point(x, y),
+                northern_extent=y,
+                **{subject_field: subject})
+        counts.append(copier.close())
+    return counts
+
+
+def generate_encounters(rng, scale, user_id):
+    """Load AnimalEncounters on turtle nesting beaches over 20 seasons, return their number.
+
+    The daily Encounter statistics are rebuilt afterwards.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from wastd.observations import stats
+    from wastd.observations.models import TURTLE_SPECIES_CHOICES, AnimalEncounter, Encounter
+
+    species = [code for code, label in TURTLE_SPECIES_CHOICES[:4]]
+    statuses = (Encounter.STATUS_NEW, Encounter.STATUS_NEW, Encounter.STATUS_PROOFREAD, Encounter.STATUS_CURATED)
+    copier = Copier(AnimalEncounter)
+    ctype = ContentType.objects.get_for_model(AnimalEncounter).pk
+    for n in range(scaled(ANIMAL_ENCOUNTERS, scale)):
+        # The coarse outline cuts off the beaches
+        x, y = random_point(rng, BEACHES, 0.02, clip=False)
+        # Nesting seasons run from October to March, mostly at night
+        season = 2000 + rng.randint(0, 19)
+        when = datetime(season, 10, 1, 10, tzinfo=timezone.utc) + timedelta(
+            days=rng.randint(0, 180), minutes=rng.randint(0, 12 * 60))
+        pk = copier.next_pk
+        copier.add(
+            polymorphic_ctype_id=ctype,
+            source_id="synthetic-{0}".format(pk),
+            where=point(x, y),
+            when=when,
+            observer_id=user_id,
+            reporter_id=user_id,
+            encounter_type=Encounter.ENCOUNTER_TAGGING,
+            taxon="Cheloniidae",
+            species=rng.choice(species),
+            sex="female",
+            maturity="adult",
+            health="alive",
+            activity="arriving",
+            status=rng.choice(statuses))
+    count = copier.close()
+    stats.rebuild()
+    return count
+
+
+def generate(scale=1.0, seed=0):
+    """Append a synthetic dataset, return the numbers of loaded records per kind.
+
+    Arguments:
+    scale The factor for all record counts, default: 1 (about 2.5 million records)
+    seed The random seed, default: 0
+    """
+    from django.contrib.auth import get_user_model
+
+    rng = random.Random(seed)
+    user, created = get_user_model().objects.get_or_create(
+        username="synthetic", defaults=dict(name="Synthetic data", email="synthetic@example.com"))
+    counts = dict()
+    taxa = generate_taxa(rng, scale)
+    counts["taxa"] = len(taxa)
+    communities = generate_communities(rng, scale)
+    counts["communities"] = len(communities)
+    counts["listings"] = generate_listings(rng, taxa, communities)
+    counts["taxon_area_encounters"], counts["community_area_encounters"] = generate_area_encounters(
+        rng, scale, taxa, communities, user.pk)
+    counts["animal_encounters"] = generate_encounters(rng, scale, user.pk)
+    return counts
@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""Shared tasks."""
+import logging
+
+from background_task import background
+from django.apps import apps
+
+logger = logging.getLogger(__name__)
+
+
+@background(queue="render")
+def render_popups(label, pks):
+    """Re-render the cached popups of records changed in bulk, e.g. by a bulk QA transition."""
+    from shared import transitions
+
+    count = transitions.render_popups(apps.get_model(label), pks)
+    logger.info("[shared.tasks.render_popups] Rendered {0} {1}.".format(count, label))
@@ -1,8 +1,55 @@
 # -*- coding: utf-8 -*-
 """Shared test cases."""
 
-from django.test import TestCase
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point, Polygon
+from django.core.cache import caches
+from django.db import DatabaseError, connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.client import ClientHandler
+from django.urls import reverse
+from model_mommy import mommy
+
+from shared import cache as api_cache
+from shared import benchmarks, changefeed, db, jobs, metrics, querybudget, synthetic
+from shared.models import JobRun
+from shared.spatial import STRtree
 from shared.utils import force_as_list, sanitize_tag_label, BigIntConverter
+from taxonomy.models import Taxon
+
+# Web worker cold start: importing config.wsgi and loading all URL patterns
+IMPORT_BUDGET_SECONDS = 15
+IMPORT_BUDGET_MAX_RSS_MB = 400
+IMPORT_FORBIDDEN_MODULES = (
+    "pandas",
+    "xmltodict",
+    "wastd.observations.importers.helpers",
+    "wastd.observations.importers.legacy",
+    "wastd.observations.importers.odka",
+)
+IMPORT_PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import config.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+from django.db import connections
+print(json.dumps(dict(
+    seconds=time.perf_counter() - start,
+    max_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    modules=sorted(sys.modules),
+    db_connected=any(c.connection is not None for c in connections.all()),
+)))
+"""
 
 
 class UtilsTests(TestCase):
@@ -28,3 +75,491 @@ class UtilsTests(TestCase):
         self.assertTrue(isinstance(con.to_url('-101'), str))
         self.assertRaises(ValueError, con.to_python, 'abc')
         self.assertRaises(ValueError, con.to_python, '-abc')
+
+
+class STRtreeTests(SimpleTestCase):
+    """Tests for shared.spatial.STRtree."""
+
+    def test_query(self):
+        boxes = [Polygon.from_bbox((x, y, x + 1, y + 1)) for x in range(30) for y in range(30)]
+        tree = STRtree([(b, i) for i, b in enumerate(boxes)])
+        self.assertEqual(len(tree), 900)
+        point = Point(10.5, 20.5)
+        hits = [i for i in tree.query(point) if boxes[i].prepared.contains(point)]
+        self.assertEqual(hits, [10 * 30 + 20])
+        self.assertEqual(len(tree.query((0, 0, 29.5, 29.5))), 900)
+        self.assertEqual(tree.query(Point(100, 100)), [])
+
+    def test_empty(self):
+        self.assertEqual(STRtree([]).query(Point(0, 0)), [])
+
+
+class ImportBudgetTests(SimpleTestCase):
+    """Web workers must boot fast, lean, and without a database."""
+
+    def test_wsgi_import_budget(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+            "DJANGO_SETTINGS_MODULE", "config.settings.test"))
+        out = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE],
+            cwd=str(settings.ROOT_DIR),
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+        )
+        result = json.loads(out.stdout.decode().strip().splitlines()[-1])
+
+        for module in IMPORT_FORBIDDEN_MODULES:
+            self.assertNotIn(module, result["modules"])
+        self.assertFalse(result["db_connected"])
+        self.assertLess(result["seconds"], IMPORT_BUDGET_SECONDS)
+        self.assertLess(result["max_rss_mb"], IMPORT_BUDGET_MAX_RSS_MB)
+
+
+class LRUCacheTests(SimpleTestCase):
+    """Tests for the per-process tier of the API response cache."""
+
+    def test_evicts_least_recently_used(self):
+        lru = api_cache.LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+        self.assertEqual(lru.get("c"), 3)
+
+
+LOCMEM = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+
+
+@override_settings(
+    API_CACHE_ENABLED=True,
+    CACHES={"default": LOCMEM, "select2": LOCMEM, "api": dict(LOCMEM, LOCATION="api")})
+class ApiCacheTests(TestCase):
+    """Tests for the API response cache."""
+
+    def setUp(self):
+        api_cache.local.clear()
+        caches["api"].clear()
+        self.taxon = mommy.make(Taxon, name_id=1000, name="name0")
+        self.client.force_login(get_user_model().objects.create_superuser(
+            username="superuser", email="super@gmail.com", password="test"))
+
+    def test_model_versions(self):
+        url = reverse("api:taxon_fast-list")
+        first = self.client.get(url, {"format": "json"})
+        self.assertNotIn("X-Cache", first)
+        second = self.client.get(url, {"format": "json"})
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.content, second.content)
+
+        # Other query parameters are cached separately
+        self.assertNotIn("X-Cache", self.client.get(url, {"format": "json", "limit": 1}))
+
+        # Saving a Taxon invalidates all cached Taxon responses
+        with db.run_on_commit():
+            self.taxon.save()
+        self.assertNotIn("X-Cache", self.client.get(url, {"format": "json"}))
+
+    def test_browsable_api_not_cached(self):
+        """The browsable API shows the user and a CSRF token, and is never cached."""
+        url = reverse("api:taxon_fast-list")
+        self.client.get(url, {"format": "api"})
+        response = self.client.get(url, {"format": "api"})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Cache", response)
+        self.assertIn(b"superuser", response.content)
+
+        self.client.force_login(get_user_model().objects.create_superuser(
+            username="otheruser", email="other@gmail.com", password="test"))
+        response = self.client.get(url, {"format": "api"})
+        self.assertNotIn(b"superuser", response.content)
+        self.assertIn(b"otheruser", response.content)
+
+    def test_bump_on_commit(self):
+        """Versions change once per model after the transaction commits, not before."""
+        version = api_cache.versions([Taxon])
+        with db.run_on_commit():
+            with transaction.atomic():
+                self.taxon.save()
+                callbacks = len(connection.run_on_commit)
+                self.taxon.save()
+                self.assertEqual(len(connection.run_on_commit), callbacks)
+                self.assertEqual(api_cache.versions([Taxon]), version)
+            self.assertEqual(api_cache.versions([Taxon]), version)
+        self.assertNotEqual(api_cache.versions([Taxon]), version)
+
+        # Rolled back changes do not change the version
+        version = api_cache.versions([Taxon])
+        with db.run_on_commit():
+            try:
+                with transaction.atomic():
+                    self.taxon.save()
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertEqual(api_cache.versions([Taxon]), version)
+
+    def test_settled(self):
+        """Responses read from a replica are not cached right after a version changed."""
+        with db.run_on_commit():
+            self.taxon.save()
+        self.assertFalse(api_cache.settled([Taxon]))
+        with self.settings(READ_REPLICA_PIN_SECONDS=-1):
+            self.assertTrue(api_cache.settled([Taxon]))
+
+    def test_versioned_models(self):
+        from occurrence.models import TaxonAreaEncounter
+
+        self.assertEqual(api_cache.model_label(TaxonAreaEncounter), "occurrence.AreaEncounter")
+        self.assertTrue(api_cache.is_versioned(TaxonAreaEncounter))
+        self.assertFalse(api_cache.is_versioned(get_user_model()))
+
+
+class ConditionalGetTests(TestCase):
+    """Tests for ETag and Last-Modified from change watermarks."""
+
+    def setUp(self):
+        self.taxon = mommy.make(Taxon, name_id=1000, name="name0")
+        self.client.force_login(get_user_model().objects.create_superuser(
+            username="superuser", email="super@gmail.com", password="test"))
+        self.url = reverse("api:taxon_fast-list") + "?format=json"
+
+    def test_watermarks(self):
+        from shared import watermarks
+
+        with db.run_on_commit():
+            pass
+        (label, counter, changed_on), = watermarks.watermarks([Taxon])
+        self.assertEqual(label, "taxonomy.Taxon")
+        with db.run_on_commit():
+            self.taxon.save()
+            self.taxon.save()
+            self.assertEqual(watermarks.watermarks([Taxon])[0][1], counter)
+        self.assertEqual(watermarks.watermarks([Taxon])[0][1], counter + 1)
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+
+        with db.run_on_commit():
+            self.taxon.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(CHANGE_FEED_LAG_SECONDS=0)
+class ChangeFeedTests(TestCase):
+    """Tests for the change feed."""
+
+    def setUp(self):
+        self.taxon = mommy.make(Taxon, name_id=1000, name="name0")
+        self.other = mommy.make(Taxon, name_id=1001, name="name1")
+
+    def test_changes(self):
+        feed = changefeed.changes(limit=1)
+        self.assertEqual(feed["changes"]["taxon"]["changed"], [self.taxon.pk])
+        self.assertTrue(feed["more"])
+        feed = changefeed.changes(feed["next"], limit=1)
+        self.assertEqual(feed["changes"]["taxon"]["changed"], [self.other.pk])
+        feed = changefeed.changes(feed["next"])
+        self.assertEqual(feed["changes"]["taxon"]["changed"], [])
+        self.assertFalse(feed["more"])
+
+        self.taxon.save()
+        pk = self.other.pk
+        self.other.delete()
+        feed = changefeed.changes(feed["next"])
+        self.assertEqual(feed["changes"]["taxon"], {"changed": [self.taxon.pk], "deleted": [pk]})
+
+    def test_since_datetime(self):
+        feed = changefeed.changes(self.other.last_modified.isoformat())
+        self.assertEqual(feed["changes"]["taxon"]["changed"], [self.other.pk])
+        with self.assertRaises(ValueError):
+            changefeed.decode_token("not a token")
+
+    def test_api(self):
+        self.client.force_login(get_user_model().objects.create_superuser(
+            username="superuser", email="super@gmail.com", password="test"))
+        response = self.client.get(reverse("api:changes-list"), {"format": "json"})
+        self.assertEqual(response.json()["changes"]["taxon"]["changed"], [self.taxon.pk, self.other.pk])
+        response = self.client.get(reverse("api:changes-list"), {"format": "json", "since": "???"})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(READ_DATABASE_ALIAS="read")
+class ReadReplicaTests(SimpleTestCase):
+    """Tests for routing safe reads to the read database."""
+
+    def setUp(self):
+        self.router = db.ReadReplicaRouter()
+        self.factory = RequestFactory()
+        self.aliases = []
+
+        def view(request):
+            self.aliases.append(self.router.db_for_read(Taxon))
+            if request.method == "POST":
+                self.router.db_for_write(Taxon)
+                self.aliases.append(self.router.db_for_read(Taxon))
+            return HttpResponse()
+
+        view.actions = {"get": "list", "post": "create"}
+        self.view = view
+        self.middleware = db.ReadReplicaMiddleware(self.handle)
+
+    def handle(self, request):
+        self.middleware.process_view(request, self.view, (), {})
+        return self.view(request)
+
+    def test_is_read_view(self):
+        from django.views.generic import ListView, TemplateView
+
+        self.assertTrue(db.is_read_view(self.view))
+        self.assertTrue(db.is_read_view(ListView.as_view()))
+        self.assertFalse(db.is_read_view(TemplateView.as_view()))
+
+    def test_routing(self):
+        self.middleware(self.factory.get("/"))
+        response = self.middleware(self.factory.post("/"))
+        self.assertEqual(self.aliases, ["read", None, None])
+        self.assertFalse(db.reading())
+
+        # Pinned to the primary after a write
+        request = self.factory.get("/")
+        request.COOKIES = {key: morsel.value for key, morsel in response.cookies.items()}
+        self.middleware(request)
+        self.assertEqual(self.aliases[-1], None)
+
+    def test_read_views_not_atomic(self):
+        handler = db.ReadReplicaWSGIHandler()
+        try:
+            self.middleware.process_view(self.factory.get("/"), self.view, (), {})
+            self.assertIs(handler.make_view_atomic(self.view), self.view)
+            self.middleware.process_view(self.factory.post("/"), self.view, (), {})
+            self.assertIsNot(handler.make_view_atomic(self.view), self.view)
+        finally:
+            db.state.read = False
+
+
+class ReadReplicaClientHandler(db.NonAtomicReadsMixin, ClientHandler):
+    """The test client handler, with the request transactions of ReadReplicaWSGIHandler."""
+
+
+class ReadReplicaRequestTests(TestCase):
+    """Tests for running routed reads outside the request transaction."""
+
+    def setUp(self):
+        self.client.handler = ReadReplicaClientHandler()
+        self.client.force_login(get_user_model().objects.create_superuser(
+            username="superuser", email="super@gmail.com", password="test"))
+
+    def test_routed_get_never_opens_default(self):
+        url = reverse("api:taxon_fast-list")
+        with mock.patch.object(transaction, "atomic", wraps=transaction.atomic) as atomic:
+            self.assertEqual(self.client.get(url, {"format": "json"}).status_code, 200)
+            self.assertNotIn(mock.call(using="default"), atomic.call_args_list)
+
+            # Unsafe requests still run in the request transaction
+            self.client.post(url, {"format": "json"})
+            self.assertIn(mock.call(using="default"), atomic.call_args_list)
+
+
+class MetricsTests(SimpleTestCase):
+    """Tests for the request metrics."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.settings = override_settings(METRICS_DIR=self.directory.name, METRICS_BUCKETS=(0.1, 1.0))
+        self.settings.enable()
+        metrics.registry.series.clear()
+
+    def tearDown(self):
+        metrics.registry.series.clear()
+        self.settings.disable()
+        self.directory.cleanup()
+
+    def test_render(self):
+        metrics.registry.observe("api:taxon-list", "GET", 0.5, 3, 0.2, 100)
+        metrics.registry.observe("api:taxon-list", "GET", 2.0, 5, 0.3, 200)
+        text = metrics.render(metrics.collect())
+        self.assertIn('tsc_http_request_duration_seconds_bucket{view="api:taxon-list",method="GET",le="0.1"} 0', text)
+        self.assertIn('tsc_http_request_duration_seconds_bucket{view="api:taxon-list",method="GET",le="1.0"} 1', text)
+        self.assertIn('tsc_http_request_duration_seconds_bucket{view="api:taxon-list",method="GET",le="+Inf"} 2', text)
+        self.assertIn('tsc_http_requests_total{view="api:taxon-list",method="GET"} 2', text)
+        self.assertIn('tsc_http_sql_queries_total{view="api:taxon-list",method="GET"} 8', text)
+        self.assertIn('tsc_http_response_bytes_total{view="api:taxon-list",method="GET"} 300', text)
+
+    def test_collect_folds_exited_workers(self):
+        exited = {"GET home": [1, 0.5, 2, 0.1, 10, 0, 1, 0]}
+        metrics.write(os.path.join(self.directory.name, "999999999-abcdef01.json"), json.dumps(exited))
+        self.assertEqual(metrics.collect(), exited)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), sorted([metrics.ARCHIVE, metrics.LOCK]))
+        self.assertEqual(metrics.collect(), exited)
+
+
+class QueryBudgetTests(TestCase):
+    """Query counts of API endpoints and list and detail views, see shared.querybudget."""
+
+    SMALL = 3
+    LARGE = 8
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("budget", "budget@test.com", "pass")
+        self.client.force_login(self.user)
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            querybudget.fingerprint("SELECT * FROM t WHERE id IN (1, 2,3) AND name = 'a''b'  AND x > 1.5"),
+            "SELECT * FROM t WHERE id IN (...) AND name = ? AND x > ?")
+
+    def test_query_budgets(self):
+        querybudget.seed(0, self.SMALL, self.user)
+        small = {name: querybudget.measure(self.client, url) for name, url in querybudget.endpoints().items()}
+        querybudget.seed(self.SMALL, self.LARGE, self.user)
+
+        budgets = querybudget.load_budgets()
+        updating = bool(os.environ.get("QUERY_BUDGET_UPDATE"))
+        measured = dict()
+        violations = []
+        for name, url in sorted(querybudget.endpoints().items()):
+            status, fingerprints = querybudget.measure(self.client, url)
+            count = measured[name] = sum(fingerprints.values())
+            if status >= 500:
+                violations.append("{0} {1}: status {2}".format(name, url, status))
+            elif (name in small and count > sum(small[name][1].values()) and
+                    name not in querybudget.ALLOWED_GROWTH):
+                violations.append("{0} {1}: {2} queries for {3} rows, {4} for {5} rows\n{6}".format(
+                    name, url, sum(small[name][1].values()), self.SMALL, count, self.LARGE,
+                    querybudget.repeated(fingerprints)))
+            elif budgets and name not in budgets and not updating:
+                violations.append("{0} {1}: {2} queries, no budget".format(name, url, count))
+            elif name in budgets and count > budgets[name]:
+                violations.append("{0} {1}: {2} queries over the budget of {3}\n{4}".format(
+                    name, url, count, budgets[name], querybudget.repeated(fingerprints)))
+
+        if updating:
+            querybudget.save_budgets(measured)
+        self.assertFalse(violations, "\n\n".join(violations))
+        if not budgets and not updating:
+            self.skipTest("No query budgets in {0}, create them with: "
+                          "QUERY_BUDGET_UPDATE=1 ./manage.py test shared.tests.QueryBudgetTests".format(
+                              querybudget.BUDGET_FILE))
+
+
+class SyntheticDatasetTests(TestCase):
+    """Tests for the synthetic dataset generator."""
+
+    def test_generate(self):
+        from conservation.models import TaxonConservationListing
+        from occurrence.models import TaxonAreaEncounter
+        from wastd.observations import stats
+        from wastd.observations.models import AnimalEncounter
+
+        counts = synthetic.generate(scale=0.001, seed=1)
+        self.assertEqual(TaxonAreaEncounter.objects.count(), counts["taxon_area_encounters"])
+        self.assertEqual(AnimalEncounter.objects.count(), counts["animal_encounters"])
+        self.assertEqual(counts["taxon_area_encounters"], 1000)
+
+        # The MPTT numbers are consistent with the parents
+        species = Taxon.objects.filter(rank=Taxon.RANK_SPECIES, current=True).first()
+        self.assertIn(species.parent, species.get_ancestors())
+        self.assertEqual(species.get_ancestors().first().rank, Taxon.RANK_KINGDOM)
+        self.assertTrue(species.canonical_name.startswith(species.parent.name))
+
+        # Primary key sequences continue after the loaded records
+        tae = TaxonAreaEncounter.objects.get(source_id="synthetic-{0}".format(
+            TaxonAreaEncounter.objects.latest("pk").pk))
+        self.assertGreater(mommy.make(Taxon).pk, species.pk)
+        self.assertTrue(tae.point.within(Polygon(synthetic.WA_OUTLINE + synthetic.WA_OUTLINE[:1], srid=4326)))
+
+        # Times do not depend on the time of loading
+        self.assertEqual(tae.last_modified, synthetic.EPOCH)
+        self.assertFalse(TaxonConservationListing.objects.filter(effective_from__gt=synthetic.EPOCH).exists())
+
+        # The daily statistics count the loaded Encounters
+        self.assertEqual(stats.encounter_totals(group_by=())[0]["count"], counts["animal_encounters"])
+
+
+class BenchmarkTests(SimpleTestCase):
+    """Tests for the benchmark result comparison."""
+
+    def test_percentile(self):
+        self.assertEqual(benchmarks.percentile([3, 1, 2], 50), 2)
+        self.assertAlmostEqual(benchmarks.percentile(range(1, 101), 95), 95.05)
+
+    def test_compare(self):
+        baseline = {
+            "taxon_full_first_page": {"p50": 0.1, "p95": 0.2},
+            "batch_upsert": {"rows_per_second": 1000, "rows": 1000},
+        }
+        results = {
+            "taxon_full_first_page": {"p50": 0.11, "p95": 0.3},
+            "batch_upsert": {"rows_per_second": 700, "rows": 2000},
+            "mptt_rebuild": {"seconds": 5},
+        }
+        regressions = benchmarks.compare(results, baseline, threshold=0.2)
+        self.assertEqual([(name, metric) for name, metric, before, after, change in regressions],
+                         [("taxon_full_first_page", "p95"), ("batch_upsert", "rows_per_second")])
+        self.assertAlmostEqual(regressions[1][4], 0.3)
+
+
+class JobTests(TestCase):
+    """Tests for the stage timing of long-running jobs."""
+
+    def test_job(self):
+        @jobs.job("inner")
+        def inner():
+            Taxon.objects.count()
+            return [1, 2, 3]
+
+        with jobs.job("outer"):
+            with jobs.stage("first") as stage:
+                stage.rows = 10
+            inner()
+
+        record = JobRun.objects.get()
+        self.assertEqual(record.name, "outer")
+        self.assertEqual(record.status, JobRun.STATUS_SUCCEEDED)
+        self.assertEqual(record.rows, 13)
+        self.assertEqual([s["name"] for s in record.stages], ["first", "inner"])
+        self.assertEqual(record.stages[1]["queries"], 1)
+        self.assertGreaterEqual(record.queries, 1)
+        self.assertIsNotNone(record.finished_on)
+        self.assertIsNone(jobs.running())
+
+    def test_failed_job(self):
+        with self.assertRaises(ValueError):
+            with jobs.job("failing"):
+                with jobs.stage("broken"):
+                    raise ValueError("Broken stage")
+        record = JobRun.objects.get()
+        self.assertEqual(record.status, JobRun.STATUS_FAILED)
+        self.assertEqual(record.error, "ValueError: Broken stage")
+        self.assertEqual(jobs.open_stages(), [])
+
+
+@override_settings(JOBS_DATABASE_ALIAS="jobs")
+class JobConnectionTests(TransactionTestCase):
+    """Tests for saving JobRuns outside the transaction of the job."""
+
+    databases = {"default", "jobs"}
+
+    def test_failed_job_in_transaction(self):
+        with self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                with jobs.job("failing"):
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1 / 0")
+        record = JobRun.objects.get()
+        self.assertEqual(record.status, JobRun.STATUS_FAILED)
+        self.assertIn("DataError", record.error)
+        self.assertIsNotNone(record.finished_on)
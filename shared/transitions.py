@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Bulk QA status transitions.
+
+Running a ``QualityControlMixin`` transition on one record writes a StateLog,
+a reversion Version, and saves the record, which re-renders its cached popup.
+``bulk_transition`` runs a transition on all records of a queryset instead:
+
+* the source states and ``can_*`` conditions are checked in memory,
+* the status is changed with one UPDATE per target state,
+* the StateLogs are written with one ``bulk_create``,
+* the Versions of all records are grouped into one revision, and
+* the cached popups are re-rendered by a background task:
+  Encounters are marked ``render_dirty`` (see ``wastd.observations.rendering``),
+  other models with ``as_html`` are queued for ``shared.tasks.render_popups``.
+
+The django-fsm signals ``pre_transition`` and ``post_transition`` are not sent.
+"""
+import logging
+from collections import OrderedDict
+
+import reversion
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.utils import timezone
+
+from shared import cache as api_cache
+from shared import changefeed, watermarks
+
+logger = logging.getLogger(__name__)
+
+# The QA transitions of QualityControlMixin
+TRANSITIONS = (
+    "proofread",
+    "require_proofreading",
+    "curate",
+    "flag",
+    "reject",
+    "reset",
+    "publish",
+    "embargo",
+)
+
+
+def has_field(model, name):
+    """Return whether a model has a field of the given name."""
+    try:
+        model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+def transition_meta(model, name):
+    """Return the django-fsm meta of a QA transition, raise ValueError if there is none."""
+    meta = getattr(getattr(model, name, None), "_django_fsm", None)
+    if name not in TRANSITIONS or meta is None:
+        raise ValueError("{0} has no QA transition {1}.".format(model._meta.verbose_name, name))
+    return meta
+
+
+def verbose_name(name):
+    """Return the verbose name of a QA transition, e.g. "Accept as trustworthy" for curate."""
+    from shared.models import QualityControlMixin
+
+    transition = next(iter(transition_meta(QualityControlMixin, name).transitions.values()))
+    return transition.custom.get("verbose", name)
+
+
+def update_data(model, target):
+    """Return the UPDATE data for records moving to a target status."""
+    data = dict(status=target)
+    if has_field(model, "render_dirty"):
+        data["render_dirty"] = True
+    return changefeed.stamped(model, data)
+
+
+def queue_render(model, pks):
+    """Queue the re-rendering of the cached popups of the given records after commit."""
+    if has_field(model, "render_dirty"):
+        from wastd.observations import rendering
+        rendering.schedule_render()
+    elif has_field(model, "as_html"):
+        from shared.tasks import render_popups
+        label = model._meta.label
+        transaction.on_commit(lambda: render_popups(label, pks))
+
+
+def render_popups(model, pks, batch_size=500):
+    """Re-render and store the cached popups of the given records, return their number.
+
+    Arguments:
+    model A model with the field ``as_html`` and the property ``derived_html``
+    pks The primary keys of the records to render
+    batch_size The number of records to load and update at once, default: 500
+    """
+    count = 0
+    for start in range(0, len(pks), batch_size):
+        records = list(model.objects.filter(pk__in=pks[start:start + batch_size]))
+        for obj in records:
+            obj.as_html = obj.derived_html
+        model.objects.bulk_update(records, ["as_html"])
+        count += len(records)
+    return count
+
+
+def bulk_transition(queryset, name, by=None, description=None, batch_size=1000):
+    """Run a QA transition on all eligible records of a queryset.
+
+    Records are eligible if their status is a source state of the transition
+    and all its conditions are met. Other records are skipped.
+
+    Arguments:
+    queryset A queryset of a QualityControlMixin model
+    name The name of a QA transition, e.g. "curate"
+    by The user running the transition, default: None
+    description An optional description of the StateLogs, also used as revision comment
+    batch_size The number of StateLogs to insert at once, default: 1000
+
+    Returns:
+    A dict with the numbers of "transitioned" and "skipped" records.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from django_fsm_log.models import StateLog
+
+    model = queryset.model
+    meta = transition_meta(model, name)
+    total = queryset.count()
+
+    # Target status: records
+    targets = OrderedDict()
+    for obj in queryset.filter(status__in=list(meta.transitions)):
+        if meta.conditions_met(obj, obj.status):
+            targets.setdefault(meta.get_transition(obj.status).target, []).append(obj)
+    pks = [obj.pk for records in targets.values() for obj in records]
+    if not pks:
+        return {"transitioned": 0, "skipped": total}
+
+    now = timezone.now()
+    with transaction.atomic(), reversion.create_revision():
+        for target, records in targets.items():
+            model.objects.filter(pk__in=[obj.pk for obj in records]).update(**update_data(model, target))
+
+        StateLog.objects.bulk_create([
+            StateLog(
+                timestamp=now,
+                by=by,
+                source_state=obj.status,
+                state=target,
+                transition=name,
+                content_type=ContentType.objects.get_for_model(obj),
+                object_id=obj.pk,
+                description=description,
+            )
+            for target, records in targets.items() for obj in records
+        ], batch_size=batch_size)
+
+        for target, records in targets.items():
+            for obj in records:
+                obj.status = target
+                if reversion.is_registered(obj.__class__):
+                    reversion.add_to_revision(obj)
+        reversion.set_user(by)
+        reversion.set_comment(description or "{0}: {1} records".format(verbose_name(name), len(pks)))
+
+        if watermarks.is_tracked(model):
+            watermarks.touch(model)
+        queue_render(model, pks)
+
+    if api_cache.is_versioned(model):
+        api_cache.bump(model)
+    logger.info("[shared.transitions.bulk_transition] {0} {1}: {2} transitioned, {3} skipped.".format(
+        name, model._meta.verbose_name_plural, len(pks), total - len(pks)))
+    return {"transitioned": len(pks), "skipped": total - len(pks)}
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""Change watermarks: the last change time and a change counter per table.
+
+Models of the apps in ``settings.CHANGE_WATERMARK_APPS`` are tracked.
+Each save or delete touches the watermark of the model's topmost concrete
+parent (see the receiver in ``shared.models``), so that a saved
+TaxonAreaEncounter moves the watermark of AreaEncounter.
+
+Bulk writes which bypass ``save()`` and ``delete()``, such as
+``QuerySet.update()`` and ``bulk_update()``, must call ``touch`` themselves.
+
+Touches are collected per transaction, and each watermark is moved once
+after the transaction commits, in one statement in label order. Writers
+therefore neither hold the watermark row locks until their commit, nor
+take them in different orders.
+``shared.api.ConditionalGetMixin`` touches the watermark after every write
+through the API.
+
+``shared.api.ConditionalGetMixin`` derives ETag and Last-Modified from the
+watermarks, and answers conditional GET requests with 304 Not Modified
+without querying the data.
+"""
+import hashlib
+import logging
+
+from django.conf import settings
+from django.db import connection
+
+from shared.cache import model_label
+from shared.db import CommitBatch
+
+logger = logging.getLogger(__name__)
+
+
+def is_tracked(model):
+    """Return whether changes to a model move a watermark."""
+    return model._meta.app_label in settings.CHANGE_WATERMARK_APPS
+
+
+def move(labels):
+    """Increment the counters and set the change time of the watermarks of some labels."""
+    from shared.models import ChangeWatermark
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO {0} (label, counter, changed_on) "
+            "SELECT label, 1, now() FROM unnest(%s::text[]) AS label "
+            "ON CONFLICT (label) DO UPDATE "
+            "SET counter = {0}.counter + 1, changed_on = EXCLUDED.changed_on".format(
+                ChangeWatermark._meta.db_table),
+            [sorted(labels)])
+
+
+pending = CommitBatch(move)
+
+
+def touch(model):
+    """Move the watermark of a model once the current transaction commits."""
+    pending.add(model_label(model))
+
+
+def watermarks(models):
+    """Return the watermarks of the given models in one query.
+
+    Returns:
+    A list of (label, counter, changed_on), sorted by label.
+    Models which never changed have the counter 0 and changed_on None.
+    """
+    from shared.models import ChangeWatermark
+
+    labels = sorted({model_label(model) for model in models})
+    found = {
+        w.label: (w.label, w.counter, w.changed_on)
+        for w in ChangeWatermark.objects.filter(label__in=labels)
+    }
+    return [found.get(label, (label, 0, None)) for label in labels]
+
+
+def validators(models, *parts):
+    """Return the ETag and Last-Modified of a response depending on the given models.
+
+    Arguments:
+    models The models the response depends on
+    parts Anything else the representation depends on, e.g. the URL and renderer
+
+    Returns:
+    A tuple of a weak ETag, and the latest change time or None.
+    """
+    marks = watermarks(models)
+    digest = hashlib.sha1(repr([(label, counter) for label, counter, _ in marks] + list(parts)).encode())
+    changes = [changed_on for label, counter, changed_on in marks if changed_on]
+    return 'W/"{0}"'.format(digest.hexdigest()), max(changes) if changes else None
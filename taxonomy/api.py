@@ -1,9 +1,16 @@
-from django_filters.rest_framework import BooleanFilter
+from django.conf import settings
+from django_filters.rest_framework import BooleanFilter, CharFilter
 from rest_framework_filters import FilterSet, RelatedFilter
+from rest_framework import viewsets
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.serializers import ValidationError
 
 from shared.api import (
     BatchUpsertViewSet,
+    CachedResponseMixin,
     NameIDBatchUpsertViewSet,
     OgcFidBatchUpsertViewSet,
 )
@@ -22,7 +29,7 @@ from taxonomy.models import (
     Crossreference,
     Community,
 )
-from taxonomy import serializers
+from taxonomy import resolver, search, serializers, tree
 
 
 class HbvNameFilter(FilterSet):
@@ -460,6 +467,7 @@ class TaxonFilter(FilterSet):
     """Taxon filter."""
 
     current = BooleanFilter(field_name="current")
+    search = CharFilter(method="search_taxa")
 
     class Meta:
         """Class opts."""
@@ -482,8 +490,12 @@ class TaxonFilter(FilterSet):
 
         }
 
+    def search_taxa(self, queryset, name, value):
+        """Return taxa matching value by name, field code or NameID, best first, see taxonomy.search."""
+        return search.search(value, queryset) if value else queryset
 
-class TaxonViewSet(NameIDBatchUpsertViewSet):
+
+class TaxonViewSet(CachedResponseMixin, NameIDBatchUpsertViewSet):
     """View set for Taxon.
 
     Examples:
@@ -493,12 +505,13 @@ class TaxonViewSet(NameIDBatchUpsertViewSet):
     * [Only current taxa](/api/1/taxon/?current=true)
     * [Only non-current taxa](/api/1/taxon/?current=false)
     * [Vernacular names contains "woylie" (case insensitive)](/api/1/taxon/?vernacular_names__icontains=woylie) - same works with name, author, can/tax name
+    * [Search names, field code and NameID, best first](/api/1/taxon/?search=woylie) - indexed, see also /api/1/taxon-search/
     * [NameID exact match](/api/1/taxon/?name_id=25452)
     * [Taxonomic rank Species or lower](/api/1/taxon/?rank__gt=190) - see [Ranks](https://github.com/dbca-wa/wastd/blob/master/taxonomy/models.py#L1613)
     """
 
     queryset = Taxon.objects.prefetch_related(
-        # "paraphyletic_groups",
+        "paraphyletic_groups",
         # Prefetch("conservation_listings",
         #     queryset=TaxonConservationListing.objects.select_related("taxon")),
         "conservationthreat_set",
@@ -508,6 +521,7 @@ class TaxonViewSet(NameIDBatchUpsertViewSet):
     serializer_class = serializers.TaxonSerializer
     filterset_class = TaxonFilter
     model = Taxon
+    cache_models = (Taxon, )
     uid_fields = ("name_id", )
 
 
@@ -517,6 +531,98 @@ class FastTaxonViewSet(TaxonViewSet):
     serializer_class = serializers.FastTaxonSerializer
 
 
+class TaxonSearchViewSet(viewsets.ViewSet):
+    """Ranked taxon autocomplete over canonical, taxonomic and vernacular names, field code and NameID.
+
+    Parameters: ``q`` (or ``term``, as sent by select2) of at least two characters, and ``page`` from 1.
+    Returns ``{"results": [{"id": ..., "text": ..., "name_id": ...}, ...], "more": ...}``,
+    best matches first, see ``taxonomy.search``.
+
+    Examples:
+
+    * [Woylie](/api/1/taxon-search/?q=woylie)
+    * [Words as prefixes](/api/1/taxon-search/?q=caretta%20car)
+    * [NameID](/api/1/taxon-search/?q=25452)
+    """
+
+    model = Taxon
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """Return a page of matching taxa."""
+        q = request.query_params.get("q", request.query_params.get("term", ""))
+        try:
+            page = max(1, int(request.query_params.get("page", 1)))
+        except ValueError:
+            page = 1
+        return Response(search.autocomplete(q, page=page))
+
+
+class TaxonResolveViewSet(viewsets.ViewSet):
+    """Resolve names and NameIDs in bulk to current taxa, following synonymy in Crossreferences.
+
+    POST ``{"names": ["Caretta caretta", 24904, "CARCAR", "Loggerhead turtel"], "fuzzy": true}``,
+    or just the list, with up to ``settings.TAXON_RESOLVE_MAX_NAMES`` names and NameIDs.
+    Returns for each, in the same order,
+    ``{"query": ..., "name_id": ..., "canonical_name": ..., "current": ..., "match": ..., "score": ..., "candidates": [...]}``
+    where match is one of exact, synonym, fuzzy, ambiguous or none, see ``taxonomy.resolver``.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def create(self, request):
+        """Return the resolution of each name and NameID."""
+        data = request.data
+        names = data.get("names") if isinstance(data, dict) else data
+        if not isinstance(names, list):
+            raise ValidationError('Expected {"names": [...]} or a list of names and NameIDs.')
+        if len(names) > settings.TAXON_RESOLVE_MAX_NAMES:
+            raise ValidationError("At most {0} names per request, got {1}.".format(
+                settings.TAXON_RESOLVE_MAX_NAMES, len(names)))
+        fuzzy = data.get("fuzzy", True) if isinstance(data, dict) else True
+        return Response(resolver.resolve(names, fuzzy=bool(fuzzy)))
+
+
+class TaxonTreeViewSet(CachedResponseMixin, viewsets.ViewSet):
+    """Expand the taxonomic tree lazily, one taxon at a time.
+
+    The list returns the root taxa, the detail of a NameID its ancestors and immediate children,
+    as ``{"ancestors": [...], "taxon": {...}, "children": [...]}``, each row with
+    name_id, name, canonical_name, rank, child_count and has_children, see ``taxonomy.tree``.
+    Responses are cached until a taxon changes.
+
+    Examples:
+
+    * [Roots](/api/1/taxon-tree/)
+    * [Loggerhead turtle](/api/1/taxon-tree/24904/)
+    """
+
+    model = Taxon
+    cache_models = (Taxon, )
+    lookup_field = "name_id"
+    lookup_value_regex = "[0-9]+"
+    permission_classes = [IsAuthenticated]
+
+    def list(self, request):
+        """GET the root taxa, from cache if possible."""
+        return self.cached(self.roots, request)
+
+    def retrieve(self, request, name_id=None):
+        """GET the ancestors and children of a taxon, from cache if possible."""
+        return self.cached(self.subtree, request, name_id=name_id)
+
+    def roots(self, request):
+        """Return the root taxa."""
+        return Response(tree.roots())
+
+    def subtree(self, request, name_id=None):
+        """Return the ancestors and children of a taxon."""
+        result = tree.subtree(int(name_id))
+        if result is None:
+            raise NotFound("No taxon with NameID {0}.".format(name_id))
+        return Response(result)
+
+
 class VernacularFilter(FilterSet):
     """Vernacular filter."""
 
@@ -540,7 +646,7 @@ class VernacularViewSet(OgcFidBatchUpsertViewSet):
     All filters are available on all fields.
     """
 
-    queryset = Vernacular.objects.all()
+    queryset = Vernacular.objects.all().select_related("taxon")
     serializer_class = serializers.VernacularSerializer
     filterset_class = VernacularFilter
     model = Vernacular
@@ -606,7 +712,7 @@ class CrossreferenceViewSet(BatchUpsertViewSet):
 
     """
 
-    queryset = Crossreference.objects.all()
+    queryset = Crossreference.objects.all().select_related("predecessor", "successor")
     serializer_class = serializers.CrossreferenceSerializer
     filterset_class = CrossreferenceFilter
     pagination_class = LimitOffsetPagination
@@ -634,7 +740,7 @@ class CommunityFilter(FilterSet):
         }
 
 
-class CommunityViewSet(BatchUpsertViewSet):
+class CommunityViewSet(CachedResponseMixin, BatchUpsertViewSet):
     """View set for Community.
 
     See HBV Names for details and usage examples.
@@ -16,6 +16,7 @@ from leaflet.forms.widgets import LeafletWidget
 # from django import forms
 from conservation import models as cons_models
 from occurrence import models as occ_models
+from taxonomy import search
 from taxonomy.models import Community, Taxon
 from shared.filters import FILTER_OVERRIDES
 from wastd.observations.models import Area
@@ -24,6 +25,10 @@ from wastd.observations.models import Area
 class TaxonFilter(django_filters.FilterSet):
     """Filter for Taxon."""
 
+    search = CharFilter(
+        label="Name, field code or NameID",
+        method="search_taxa"
+    )
     is_terminal_taxon = BooleanFilter(
         label="Terminal Taxon",
         widget=BooleanWidget(),
@@ -79,8 +84,7 @@ class TaxonFilter(django_filters.FilterSet):
             "aoo",
             "conservation_level",
             "categories",
-            "taxonomic_name",
-            "vernacular_names",
+            "search",
             "rank",
             "is_terminal_taxon",
             "current",
@@ -90,6 +94,10 @@ class TaxonFilter(django_filters.FilterSet):
         ]
         filter_overrides = FILTER_OVERRIDES
 
+    def search_taxa(self, queryset, name, value):
+        """Return taxa matching value by name, field code or NameID, best first, see taxonomy.search."""
+        return search.search(value, queryset) if value else queryset
+
     def filter_leaf_nodes(self, queryset, name, value):
         """Return terminal taxa (leaf nodes) if value is true."""
         return queryset.filter(children__isnull=value)
@@ -0,0 +1,63 @@
+# Generated by Django 3.1 on 2020-09-14 09:30
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Keep search_text and search_vector in step with the names, on every insert
+# or update of a name column, including bulk updates and COPY.
+SEARCH_TRIGGER = """
+CREATE OR REPLACE FUNCTION taxonomy_taxon_search() RETURNS trigger AS $$
+BEGIN
+    NEW.search_text := lower(concat_ws(' ',
+        NEW.canonical_name, NEW.taxonomic_name, NEW.vernacular_names, NEW.field_code, NEW.name_id));
+    NEW.search_vector :=
+        setweight(to_tsvector('simple', concat_ws(' ', NEW.canonical_name, NEW.field_code, NEW.name_id)), 'A') ||
+        setweight(to_tsvector('simple', coalesce(NEW.taxonomic_name, '')), 'B') ||
+        setweight(to_tsvector('simple', coalesce(NEW.vernacular_names, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER taxonomy_taxon_search
+    BEFORE INSERT OR UPDATE OF canonical_name, taxonomic_name, vernacular_names, field_code, name_id
+    ON taxonomy_taxon FOR EACH ROW EXECUTE PROCEDURE taxonomy_taxon_search();
+
+UPDATE taxonomy_taxon SET name_id = name_id;
+"""
+
+DROP_SEARCH_TRIGGER = """
+DROP TRIGGER IF EXISTS taxonomy_taxon_search ON taxonomy_taxon;
+DROP FUNCTION IF EXISTS taxonomy_taxon_search();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0035_last_modified'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='taxon',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False, help_text='Canonical, taxonomic and vernacular names, field code and NameID in lower case.', null=True, verbose_name='Search text'),
+        ),
+        migrations.AddField(
+            model_name='taxon',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, help_text='The full text search document of canonical, taxonomic and vernacular names, field code and NameID.', null=True, verbose_name='Search vector'),
+        ),
+        migrations.RunSQL(sql=SEARCH_TRIGGER, reverse_sql=DROP_SEARCH_TRIGGER),
+        migrations.AddIndex(
+            model_name='taxon',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='taxon_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='taxon',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_text'], name='taxon_search_text_trgm', opclasses=['gin_trgm_ops']),
+        ),
+    ]
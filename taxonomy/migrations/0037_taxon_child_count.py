@@ -0,0 +1,79 @@
+# Generated by Django 3.1 on 2020-09-21 10:15
+
+from django.db import migrations, models
+
+# Keep child_count in step with the children of each taxon, on every insert,
+# delete or re-parenting, including bulk updates and COPY.
+# Saves of a taxon keep its count, only the triggers and a recount
+# (see taxonomy.tree.recount_children) write it.
+CHILD_COUNT_TRIGGER = """
+CREATE OR REPLACE FUNCTION taxonomy_taxon_keep_child_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        NEW.child_count := (SELECT count(*) FROM taxonomy_taxon WHERE parent_id = NEW.id);
+    ELSIF pg_trigger_depth() = 1
+          AND coalesce(current_setting('taxonomy.recount_children', true), '') <> 'on' THEN
+        NEW.child_count := OLD.child_count;
+    END IF;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER taxonomy_taxon_keep_child_count
+    BEFORE INSERT OR UPDATE OF child_count
+    ON taxonomy_taxon FOR EACH ROW EXECUTE PROCEDURE taxonomy_taxon_keep_child_count();
+
+CREATE OR REPLACE FUNCTION taxonomy_taxon_child_count() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.parent_id IS NOT NULL
+       AND (TG_OP = 'DELETE' OR NEW.parent_id IS DISTINCT FROM OLD.parent_id) THEN
+        UPDATE taxonomy_taxon SET child_count = child_count - 1 WHERE id = OLD.parent_id;
+    END IF;
+    IF TG_OP IN ('UPDATE', 'INSERT') AND NEW.parent_id IS NOT NULL
+       AND (TG_OP = 'INSERT' OR NEW.parent_id IS DISTINCT FROM OLD.parent_id) THEN
+        UPDATE taxonomy_taxon SET child_count = child_count + 1 WHERE id = NEW.parent_id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER taxonomy_taxon_child_count
+    AFTER INSERT OR DELETE OR UPDATE OF parent_id
+    ON taxonomy_taxon FOR EACH ROW EXECUTE PROCEDURE taxonomy_taxon_child_count();
+
+SET LOCAL taxonomy.recount_children = 'on';
+UPDATE taxonomy_taxon t SET child_count = c.n
+FROM (
+    SELECT p.id, count(ch.id) AS n
+    FROM taxonomy_taxon p LEFT JOIN taxonomy_taxon ch ON ch.parent_id = p.id
+    GROUP BY p.id
+) c
+WHERE t.id = c.id AND t.child_count <> c.n;
+"""
+
+DROP_CHILD_COUNT_TRIGGER = """
+DROP TRIGGER IF EXISTS taxonomy_taxon_child_count ON taxonomy_taxon;
+DROP FUNCTION IF EXISTS taxonomy_taxon_child_count();
+DROP TRIGGER IF EXISTS taxonomy_taxon_keep_child_count ON taxonomy_taxon;
+DROP FUNCTION IF EXISTS taxonomy_taxon_keep_child_count();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('taxonomy', '0036_taxon_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taxon',
+            name='child_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='The number of immediate children.', verbose_name='Child count'),
+        ),
+        migrations.RunSQL(sql=CHILD_COUNT_TRIGGER, reverse_sql=DROP_CHILD_COUNT_TRIGGER),
+        migrations.AddIndex(
+            model_name='taxon',
+            index=models.Index(fields=['tree_id', 'lft'], name='taxon_tree_lft'),
+        ),
+    ]
@@ -9,6 +9,8 @@ Community is initally populated from TEC through the API, then updated both thro
 """
 import logging
 from django.contrib.gis.db import models as geo_models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models.signals import pre_save  # , post_save
 from django.dispatch import receiver
@@ -16,7 +18,7 @@ from django.urls import reverse
 from django.utils.translation import ugettext_lazy as _
 from mptt.models import MPTTModel, TreeForeignKey
 
-from shared.models import LegacySourceMixin, UrlsMixin, RenderMixin
+from shared.models import LastModifiedMixin, LegacySourceMixin, UrlsMixin, RenderMixin
 
 logger = logging.getLogger(__name__)
 
@@ -1573,7 +1575,7 @@ class HbvParent(models.Model):
 # django-mptt tree models ----------------------------------------------------#
 
 
-class Taxon(RenderMixin, UrlsMixin, MPTTModel, geo_models.Model):
+class Taxon(RenderMixin, UrlsMixin, LastModifiedMixin, MPTTModel, geo_models.Model):
     """A taxonomic name at any taxonomic rank.
 
     A taxonomy is a directed graph with exactly one root node (Domain) and
@@ -1788,6 +1790,30 @@ class Taxon(RenderMixin, UrlsMixin, MPTTModel, geo_models.Model):
         verbose_name=_("Extent of Occurrence"),
         help_text=_("The extent of occurrence as polygon in WGS84, if available."))
 
+    # Maintained by the database trigger taxonomy_taxon_search, see taxonomy.search
+    search_text = models.TextField(
+        blank=True, null=True,
+        editable=False,
+        verbose_name=_("Search text"),
+        help_text=_("Canonical, taxonomic and vernacular names, field code and NameID in lower case."),
+    )
+
+    search_vector = SearchVectorField(
+        blank=True, null=True,
+        editable=False,
+        verbose_name=_("Search vector"),
+        help_text=_("The full text search document of canonical, taxonomic and vernacular names, "
+                    "field code and NameID."),
+    )
+
+    # Maintained by the database trigger taxonomy_taxon_child_count, see taxonomy.tree
+    child_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name=_("Child count"),
+        help_text=_("The number of immediate children."),
+    )
+
     # Approval Status FSM: [phrase name, ms name, current name, non-current name]
     # status = FSMField(default=STATUS_NEW, choices=STATUS_CHOICES, verbose_name=_("QA Status"))
 
@@ -1805,6 +1831,11 @@ class Taxon(RenderMixin, UrlsMixin, MPTTModel, geo_models.Model):
 
         verbose_name = "Taxon"
         verbose_name_plural = "Taxa"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="taxon_search_vector_gin"),
+            GinIndex(fields=["search_text"], name="taxon_search_text_trgm", opclasses=["gin_trgm_ops"]),
+            models.Index(fields=["tree_id", "lft"], name="taxon_tree_lft"),
+        ]
 
     def __str__(self):
         """The full name: [NameID] (RANK) TAXONOMIC NAME."""
@@ -1888,7 +1919,12 @@ class Taxon(RenderMixin, UrlsMixin, MPTTModel, geo_models.Model):
 
     @property
     def active_gazettals(self):
-        """Return a dict of active TaxonConservationListing labels and admin URLs."""
+        """Return a dict of active TaxonConservationListing labels and admin URLs.
+
+        Uses prefetched conservation_listings, e.g. from list views, without a query per taxon.
+        """
+        if "conservation_listings" in getattr(self, "_prefetched_objects_cache", {}):
+            return [x for x in self.conservation_listings.all() if x.is_active]
         from conservation import models as cons_models
         return cons_models.TaxonConservationListing.active.filter(taxon__pk=self.pk)
 
@@ -2190,7 +2226,7 @@ class Crossreference(models.Model):
         return list(set(pre + suc))
 
 
-class Community(RenderMixin, UrlsMixin, LegacySourceMixin, geo_models.Model):
+class Community(RenderMixin, UrlsMixin, LegacySourceMixin, LastModifiedMixin, geo_models.Model):
     """Ecological Community."""
 
     code = models.CharField(
@@ -2251,6 +2287,11 @@ class Community(RenderMixin, UrlsMixin, LegacySourceMixin, geo_models.Model):
 
     @property
     def active_gazettals(self):
-        """Return a dict of active TaxonConservationListing labels and admin URLs."""
+        """Return a dict of active TaxonConservationListing labels and admin URLs.
+
+        Uses prefetched conservation_listings, e.g. from list views, without a query per community.
+        """
+        if "conservation_listings" in getattr(self, "_prefetched_objects_cache", {}):
+            return [x for x in self.conservation_listings.all() if x.is_active]
         from conservation import models as cons_models
         return cons_models.CommunityConservationListing.active.filter(community__pk=self.pk)
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""Bulk resolution of names and NameIDs to current taxa.
+
+Field data and legacy datasets name taxa by NameIDs which are no longer current,
+or by canonical, taxonomic or vernacular names and field codes.
+``resolve`` maps many of them at once to current taxa. Each result has a match type:
+
+* ``exact``: a taxon of this NameID or name,
+* ``synonym``: a non-current taxon, followed through Crossreferences from predecessor
+  to successor, over any number of steps, to the current taxon it leads to,
+* ``fuzzy``: the taxon whose names are most similar (pg_trgm word similarity),
+  followed through Crossreferences as above,
+* ``ambiguous``: several current taxa, e.g. after a split or for a shared vernacular name,
+  listed as candidates,
+* ``none``: nothing found.
+
+Crossreferences of excluded names, and those past their ``effective_to``, are not followed.
+A non-current taxon without current successors resolves to itself.
+
+The name lookup and the transitive successor closure are built in one pass over
+all taxa and Crossreferences (``Index``), and kept in memory per process
+until a Taxon or Crossreference changes (see ``shared.cache``).
+"""
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from shared import cache as api_cache
+
+logger = logging.getLogger(__name__)
+
+EXACT = "exact"
+SYNONYM = "synonym"
+FUZZY = "fuzzy"
+AMBIGUOUS = "ambiguous"
+NONE = "none"
+
+FUZZY_MIN_LENGTH = 3
+FUZZY_CHUNK = 1000
+# The best match per name by word similarity, using the trigram index on search_text
+FUZZY_SQL = """
+SELECT q.name, t.name_id, t.score
+FROM unnest(%s::text[]) AS q(name)
+CROSS JOIN LATERAL (
+    SELECT name_id, word_similarity(q.name, search_text) AS score
+    FROM taxonomy_taxon
+    WHERE q.name <%% search_text
+    ORDER BY score DESC, current DESC, name_id
+    LIMIT 1
+) t
+"""
+
+IGNORED = re.compile(r"\(\?\)|[?.]")
+
+lock = threading.Lock()
+cached = dict()
+
+
+def normalise(name):
+    """Return a name in lower case without question marks, dots and repeated spaces."""
+    return " ".join(IGNORED.sub(" ", str(name)).split()).lower()
+
+
+def as_name_id(query):
+    """Return a query as NameID if it is a number, else None."""
+    if isinstance(query, bool):
+        return None
+    if isinstance(query, int):
+        return query
+    if isinstance(query, str) and query.strip().isdigit():
+        return int(query)
+    return None
+
+
+class Index(object):
+    """Names and the transitive successor closure of all taxa.
+
+    Arguments:
+    taxa An iterable of (name_id, current, canonical_name, taxonomic_name, field_code, vernacular_names)
+    xrefs An iterable of (predecessor name_id, successor name_id)
+    """
+
+    def __init__(self, taxa, xrefs):
+        """Index the names, and follow the successors of every non-current taxon."""
+        self.names = dict()
+        self.current = set()
+        self.by_name = defaultdict(set)
+        for name_id, current, canonical_name, taxonomic_name, field_code, vernacular_names in taxa:
+            self.names[name_id] = canonical_name
+            if current:
+                self.current.add(name_id)
+            for name in [canonical_name, taxonomic_name, field_code] + (vernacular_names or "").split(","):
+                if name and normalise(name):
+                    self.by_name[normalise(name)].add(name_id)
+
+        self.successors = defaultdict(set)
+        for predecessor, successor in xrefs:
+            if predecessor is not None and successor is not None and predecessor != successor:
+                self.successors[predecessor].add(successor)
+
+        self.closure = dict()
+        for name_id in self.successors:
+            if name_id not in self.current:
+                self.follow(name_id)
+
+    @classmethod
+    def build(cls):
+        """Return the Index of all taxa and Crossreferences in the database."""
+        from taxonomy.models import Crossreference, Taxon
+
+        start = time.perf_counter()
+        taxa = Taxon.objects.values_list(
+            "name_id", "current", "canonical_name", "taxonomic_name", "field_code", "vernacular_names")
+        xrefs = Crossreference.objects.exclude(
+            reason=Crossreference.REASON_EXC
+        ).filter(
+            Q(effective_to__isnull=True) | Q(effective_to__gt=timezone.now())
+        ).values_list("predecessor__name_id", "successor__name_id")
+        index = cls(taxa.iterator(), xrefs.iterator())
+        logger.info("[taxonomy.resolver.Index.build] Indexed {0} taxa, {1} names and {2} synonyms in {3:.1f}s.".format(
+            len(index.names), len(index.by_name), len(index.closure), time.perf_counter() - start))
+        return index
+
+    def follow(self, name_id):
+        """Return the set of current NameIDs a taxon leads to through its successors."""
+        if name_id in self.closure:
+            return self.closure[name_id]
+        found, seen, stack = set(), {name_id}, [name_id]
+        while stack:
+            for successor in self.successors.get(stack.pop(), ()):
+                if successor in seen:
+                    continue
+                seen.add(successor)
+                if successor in self.current:
+                    found.add(successor)
+                elif successor in self.closure:
+                    found |= self.closure[successor]
+                else:
+                    stack.append(successor)
+        self.closure[name_id] = frozenset(found)
+        return self.closure[name_id]
+
+    def current_of(self, name_ids):
+        """Return the current NameIDs of some taxa, and whether they were found through synonymy."""
+        direct = {name_id for name_id in name_ids if name_id in self.current}
+        if direct:
+            return direct, False
+        followed = set()
+        for name_id in name_ids:
+            followed |= self.closure.get(name_id, frozenset())
+        if followed:
+            return followed, True
+        return set(name_ids), False
+
+    def result(self, query, name_ids, score=None):
+        """Return the resolution of a query found as some taxa, with the score of a fuzzy match."""
+        if not name_ids:
+            return dict(query=query, name_id=None, canonical_name=None, current=False,
+                        match=NONE, score=0.0, candidates=[])
+        found, synonym = self.current_of(name_ids)
+        if len(found) > 1:
+            name_id, match = None, AMBIGUOUS
+        else:
+            name_id = next(iter(found))
+            match = FUZZY if score is not None else SYNONYM if synonym else EXACT
+        return dict(
+            query=query,
+            name_id=name_id,
+            canonical_name=self.names.get(name_id),
+            current=name_id in self.current,
+            match=match,
+            score=1.0 if score is None else round(score, 3),
+            candidates=sorted(found) if len(found) > 1 else [],
+        )
+
+
+def index():
+    """Return the Index of the current taxonomy version, building it if a taxon or xref changed."""
+    from taxonomy.models import Crossreference, Taxon
+
+    version = tuple(api_cache.versions([Taxon, Crossreference]))
+    with lock:
+        if cached.get("version") != version:
+            cached.update(version=version, index=Index.build())
+        return cached["index"]
+
+
+def fuzzy_matches(names):
+    """Return the most similar taxon of each name as dict of name: (name_id, score)."""
+    matches = dict()
+    with connection.cursor() as cursor:
+        for start in range(0, len(names), FUZZY_CHUNK):
+            cursor.execute(FUZZY_SQL, [names[start:start + FUZZY_CHUNK]])
+            for name, name_id, score in cursor.fetchall():
+                matches[name] = (name_id, score)
+    return matches
+
+
+def resolve(queries, fuzzy=True):
+    """Resolve names and NameIDs to current taxa.
+
+    Arguments:
+    queries A list of NameIDs (numbers or digit strings) and names
+    fuzzy Whether to look up names without an exact match by similarity, default: True
+
+    Returns:
+    A list of dicts of query, name_id, canonical_name, current, match, score and candidates,
+    in the order of queries, see the module documentation.
+    """
+    idx = index()
+    results = []
+    unmatched = defaultdict(list)
+    for position, query in enumerate(queries):
+        name_id = as_name_id(query)
+        if name_id is not None:
+            name_ids = {name_id} if name_id in idx.names else set()
+        else:
+            name = normalise(query) if query is not None else ""
+            name_ids = idx.by_name.get(name, set())
+            if not name_ids and fuzzy and len(name) >= FUZZY_MIN_LENGTH:
+                unmatched[name].append(position)
+        results.append(idx.result(query, name_ids))
+
+    if unmatched:
+        for name, (name_id, score) in fuzzy_matches(list(unmatched)).items():
+            for position in unmatched[name]:
+                results[position] = idx.result(queries[position], {name_id}, score=score)
+    return results
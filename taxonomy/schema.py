@@ -1,12 +1,15 @@
 import graphene
 import graphql_geojson
+from graphene.relay import Connection, ConnectionField
 from graphene_django.types import DjangoObjectType
 
+from shared import gql
 from taxonomy import models as tax_models
 
 # ----------------------------------------------------------------------------#
 # Types
 # ----------------------------------------------------------------------------#
+# Relations are fetched through per-request DataLoaders, see shared.gql
 
 
 class CommunityType(DjangoObjectType):
@@ -15,16 +18,77 @@ class CommunityType(DjangoObjectType):
         geojson_field = 'eoo'
 
 
+class HbvSupraType(DjangoObjectType):
+    class Meta:
+        model = tax_models.HbvSupra
+        fields = ('id', 'ogc_fid', 'supra_code', 'supra_name', 'updated_on')
+
+
 class TaxonType(DjangoObjectType):
     class Meta:
         model = tax_models.Taxon
         geojson_field = 'eoo'
+        exclude = ('search_text', 'search_vector')
+
+    def resolve_parent(self, info):
+        return gql.load(info, tax_models.Taxon, self.parent_id)
+
+    def resolve_children(self, info):
+        return gql.load_related(info, self, 'children')
+
+    def resolve_paraphyletic_groups(self, info):
+        return gql.load_related(info, self, 'paraphyletic_groups')
+
+    def resolve_vernacular_set(self, info):
+        return gql.load_related(info, self, 'vernacular')
+
+    def resolve_precedes(self, info):
+        return gql.load_related(info, self, 'precedes')
+
+    def resolve_supercedes(self, info):
+        return gql.load_related(info, self, 'supercedes')
+
+
+class VernacularType(DjangoObjectType):
+    class Meta:
+        model = tax_models.Vernacular
+        fields = ('id', 'ogc_fid', 'taxon', 'name', 'language', 'preferred')
+
+    def resolve_taxon(self, info):
+        return gql.load(info, tax_models.Taxon, self.taxon_id)
 
 
 class CrossreferenceType(DjangoObjectType):
     class Meta:
         model = tax_models.Crossreference
 
+    def resolve_predecessor(self, info):
+        return gql.load(info, tax_models.Taxon, self.predecessor_id)
+
+    def resolve_successor(self, info):
+        return gql.load(info, tax_models.Taxon, self.successor_id)
+
+
+# ----------------------------------------------------------------------------#
+# Connections
+# ----------------------------------------------------------------------------#
+# Pages ordered by ID with cursors, see shared.gql.paginate
+
+
+class CommunityConnection(Connection):
+    class Meta:
+        node = CommunityType
+
+
+class TaxonConnection(Connection):
+    class Meta:
+        node = TaxonType
+
+
+class CrossreferenceConnection(Connection):
+    class Meta:
+        node = CrossreferenceType
+
 
 # ----------------------------------------------------------------------------#
 # Queries
@@ -37,12 +101,15 @@ class Query(object):
                                description=graphene.String(),
                                )
 
-    all_communities = graphene.List(CommunityType)
+    all_communities = ConnectionField(CommunityConnection)
 
-    taxon = graphene.Field(TaxonType)
+    taxon = graphene.Field(TaxonType,
+                           id=graphene.Int(),
+                           name_id=graphene.Int(),
+                           )
 
-    all_taxa = graphene.List(TaxonType)
-    all_crossreferences = graphene.List(CrossreferenceType)
+    all_taxa = ConnectionField(TaxonConnection, current=graphene.Boolean())
+    all_crossreferences = ConnectionField(CrossreferenceConnection)
 
     def resolve_community(self, info, **kwargs):
         id = kwargs.get('id')
@@ -57,23 +124,25 @@ class Query(object):
         return None
 
     def resolve_all_communities(self, info, **kwargs):
-        return tax_models.Community.objects.all()
+        return gql.paginate(tax_models.Community.objects.all(), CommunityConnection, **kwargs)
 
     def resolve_taxon(self, info, **kwargs):
         id = kwargs.get('id')
-        name_id = kwargs.get('nameId')
+        name_id = kwargs.get('name_id')
 
         if id is not None:
-            return tax_models.Taxon.objects.get(pk=id)
+            return tax_models.Taxon.objects.filter(pk=id).first()
 
         if name_id is not None:
-            return tax_models.Taxon.objects.get(name_id=name_id)
+            return tax_models.Taxon.objects.filter(name_id=name_id).first()
 
         return None
 
-    def resolve_all_taxa(self, info, **kwargs):
-        return tax_models.Taxon.objects.all()
+    def resolve_all_taxa(self, info, current=None, **kwargs):
+        taxa = tax_models.Taxon.objects.all()
+        if current is not None:
+            taxa = taxa.filter(current=current)
+        return gql.paginate(taxa, TaxonConnection, **kwargs)
 
     def resolve_all_crossreferences(self, info, **kwargs):
-        # We can easily optimize query count in the resolve method
-        return tax_models.Crossreference.objects.select_related('predecessor', 'successor').all()
+        return gql.paginate(tax_models.Crossreference.objects.all(), CrossreferenceConnection, **kwargs)
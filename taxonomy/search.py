@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Ranked taxon search over the maintained search columns of Taxon.
+
+The database trigger ``taxonomy_taxon_search`` (migration 0036) keeps, on every
+insert or update of a name, including bulk updates and COPY,
+
+* ``Taxon.search_vector``, a tsvector of canonical name, field code and NameID (weight A),
+  taxonomic name (B) and all vernacular names (C), with a GIN index, and
+* ``Taxon.search_text``, the same text in lower case, with a pg_trgm GIN index.
+
+``search`` matches taxa whose search vector contains every word of the query
+as a prefix, or whose search text contains the query, e.g. the middle of a name.
+Both conditions are answered from their index. Exact matches of canonical name,
+field code or NameID come first, then current taxa, then by full text rank
+plus trigram similarity.
+
+``autocomplete`` returns a page of results in the select2 format.
+Pages are kept in a per-process LRU of ``settings.TAXON_SEARCH_LRU_SIZE`` searches
+under the current version of Taxon (see ``shared.cache``), so that repeated
+keystrokes are served from memory until a taxon changes and the change commits.
+"""
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+from django.db.models import Case, F, IntegerField, Q, Value, When
+
+from shared import cache as api_cache
+from shared import db
+from shared.cache import LRUCache
+
+MIN_LENGTH = 2
+WORDS = re.compile(r"[^\W_]+")
+RESULT_FIELDS = (
+    "pk", "name_id", "name", "canonical_name", "taxonomic_name",
+    "vernacular_name", "field_code", "rank", "current",
+)
+
+local = LRUCache(settings.TAXON_SEARCH_LRU_SIZE)
+
+
+def normalise(q):
+    """Return a query in lower case with single spaces."""
+    return " ".join((q or "").split()).lower()
+
+
+def search_query(text):
+    """Return a SearchQuery for all words of text as prefixes, or None if there are no words."""
+    words = WORDS.findall(text)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join("{0}:*".format(word) for word in words), search_type="raw", config="simple")
+
+
+def search(q, queryset=None):
+    """Return the taxa matching q, best first.
+
+    Arguments:
+    q The search text, e.g. "woylie", "caretta car", "CARCAR" or a NameID
+    queryset The taxa to search, default: all
+
+    Returns:
+    A queryset of taxa, annotated with ``search_rank``, or no taxa
+    if q is shorter than MIN_LENGTH or contains no words.
+    """
+    from taxonomy.models import Taxon
+
+    queryset = Taxon.objects.all() if queryset is None else queryset
+    text = normalise(q)
+    query = search_query(text)
+    if query is None or len(text) < MIN_LENGTH:
+        return queryset.none()
+
+    exact = Q(canonical_name__iexact=text) | Q(field_code__iexact=text)
+    if text.isdigit() and len(text) < 10:
+        exact |= Q(name_id=int(text))
+
+    return queryset.filter(
+        Q(search_vector=query) | Q(search_text__contains=text)
+    ).annotate(
+        search_exact=Case(When(exact, then=Value(0)), default=Value(1), output_field=IntegerField()),
+        search_rank=SearchRank(F("search_vector"), query) + TrigramSimilarity("search_text", text),
+    ).order_by("search_exact", "-current", "-search_rank", "canonical_name", "pk")
+
+
+def label(taxon):
+    """Return the label of a taxon from its values, as Taxon.__str__ does."""
+    from taxonomy.models import Taxon
+
+    return "[{0}][{1}] ({2}) {3}".format(
+        taxon["name_id"],
+        taxon["field_code"] or "",
+        dict(Taxon.RANKS).get(taxon["rank"], taxon["rank"]),
+        taxon["taxonomic_name"] or taxon["name"])
+
+
+def autocomplete(q, page=1, limit=None):
+    """Return a page of taxa matching q, in the format of select2.
+
+    Arguments:
+    q The search text
+    page The page number, starting from 1
+    limit The results per page, default: settings.TAXON_SEARCH_LIMIT
+
+    Returns:
+    A dict of "results", a list of dicts of id (the primary key), text (the label),
+    name_id, canonical_name, taxonomic_name, vernacular_name, field_code, rank and current,
+    and "more", whether there are more pages.
+    """
+    from taxonomy.models import Taxon
+
+    limit = limit or settings.TAXON_SEARCH_LIMIT
+    text = normalise(q)
+    key = (text, page, limit, tuple(api_cache.versions([Taxon])))
+    cached = local.get(key)
+    if cached is not None:
+        return cached
+
+    offset = (page - 1) * limit
+    taxa = list(search(text).values(*RESULT_FIELDS)[offset:offset + limit + 1])
+    results = [dict(
+        id=taxon["pk"],
+        text=label(taxon),
+        name_id=taxon["name_id"],
+        canonical_name=taxon["canonical_name"],
+        taxonomic_name=taxon["taxonomic_name"],
+        vernacular_name=taxon["vernacular_name"],
+        field_code=taxon["field_code"],
+        rank=taxon["rank"],
+        current=taxon["current"],
+    ) for taxon in taxa[:limit]]
+    result = dict(results=results, more=len(taxa) > limit)
+    # A lagging read replica may return taxa older than the version
+    if not db.reading() or api_cache.settled([Taxon]):
+        local.set(key, result)
+    return result
@@ -20,8 +20,13 @@ This suite tests the following use cases:
 * Communities: An `external script <https://github.com/dbca-wa/scarab-scripts/blob/master/data_etl_tec.Rmd>`_
   loads a list of communities through the community API endpoint.
 """
+import hashlib
+import json
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 
@@ -40,6 +45,8 @@ from taxonomy.models import (
     Crossreference,
     Community,
 )
+from shared import db
+from taxonomy import resolver, search, tree
 
 User = get_user_model()
 
@@ -285,6 +292,266 @@ class TaxonAPITests(TestCase):
         pass
 
 
+class TaxonSearchAPITests(TestCase):
+    """Ranked taxon search over the maintained search columns, see taxonomy.search."""
+
+    def setUp(self):
+        """Create taxa, and a client logged in as a user."""
+        with db.run_on_commit():
+            self.loggerhead = self.create_taxon(
+                24904, "Caretta caretta", "Caretta caretta (Linnaeus, 1758)", "Loggerhead Turtle", "CARCAR")
+            self.flatback = self.create_taxon(
+                24905, "Natator depressus", "Natator depressus (Garman, 1880)", "Flatback Turtle", "NATDEP")
+            self.old_name = self.create_taxon(
+                24906, "Testudo caretta", "Testudo caretta Linnaeus, 1758", None, None, current=False)
+        self.user = User.objects.create_user(username="searcher", password="test")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def create_taxon(self, name_id, canonical_name, taxonomic_name, vernacular_names, field_code, current=True):
+        """Create a species, with names set in bulk as the WACensus import does."""
+        taxon = Taxon.objects.create(
+            name_id=name_id, name=canonical_name.split()[-1], rank=Taxon.RANK_SPECIES, current=current)
+        Taxon.objects.filter(pk=taxon.pk).update(
+            canonical_name=canonical_name, taxonomic_name=taxonomic_name,
+            vernacular_names=vernacular_names, field_code=field_code)
+        return Taxon.objects.get(pk=taxon.pk)
+
+    def search(self, q):
+        """Return the NameIDs of the taxa found for q, best first."""
+        response = self.client.get("/api/1/taxon-search/", {"q": q, "format": "json"})
+        self.assertEqual(response.status_code, 200)
+        return [taxon["name_id"] for taxon in response.data["results"]]
+
+    def test_search_is_maintained(self):
+        """The search columns follow changes of the names, also through bulk updates."""
+        self.assertIn("loggerhead", self.loggerhead.search_text)
+        Taxon.objects.filter(pk=self.flatback.pk).update(vernacular_names="Flatback Sea Turtle")
+        self.assertEqual(list(search.search("sea tur").values_list("name_id", flat=True)), [24905])
+
+    def test_search_ranks_matches(self):
+        """Prefixes, substrings, field codes and NameIDs match, exact and current taxa first."""
+        self.assertCountEqual(self.search("turt"), [24904, 24905])
+        self.assertEqual(self.search("caretta car"), [24904, 24906])
+        self.assertEqual(self.search("arcar"), [24904])
+        self.assertEqual(self.search("natdep"), [24905])
+        self.assertEqual(self.search("24906"), [24906])
+        self.assertEqual(self.search("c"), [])
+
+    def test_search_select2_format(self):
+        """Results have select2's id and text, and select2's term parameter is understood."""
+        response = self.client.get("/api/1/taxon-search/", {"term": "flatback", "format": "json"})
+        self.assertEqual(response.data["more"], False)
+        self.assertEqual(response.data["results"][0]["id"], self.flatback.pk)
+        self.assertEqual(response.data["results"][0]["text"], str(self.flatback))
+
+
+class TaxonResolveAPITests(TestCase):
+    """Bulk resolution of names and NameIDs to current taxa, see taxonomy.resolver."""
+
+    def setUp(self):
+        """Create a chain of renamed taxa and a split, and a client logged in as a user."""
+        with db.run_on_commit():
+            for name_id, name, current in (
+                    (100, "Oldus nomen", False),
+                    (101, "Medius nomen", False),
+                    (102, "Novus nomen", True),
+                    (200, "Splitus totus", False),
+                    (201, "Splitus unus", True),
+                    (202, "Splitus duo", True)):
+                taxon = Taxon.objects.create(name_id=name_id, name=name, rank=Taxon.RANK_SPECIES, current=current)
+                Taxon.objects.filter(pk=taxon.pk).update(canonical_name=name, taxonomic_name=name)
+            for xref_id, (predecessor, successor, reason) in enumerate((
+                    (100, 101, Crossreference.REASON_NSY),
+                    (101, 102, Crossreference.REASON_TSY),
+                    (200, 201, Crossreference.REASON_CON),
+                    (200, 202, Crossreference.REASON_CON))):
+                Crossreference.objects.create(
+                    xref_id=xref_id, reason=reason,
+                    predecessor=Taxon.objects.get(name_id=predecessor),
+                    successor=Taxon.objects.get(name_id=successor))
+        self.user = User.objects.create_user(username="resolver", password="test")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def resolve(self, names, **kwargs):
+        """Return (name_id, match) of each resolved name."""
+        response = self.client.post("/api/1/taxon-resolve/", dict(names=names, **kwargs), format="json")
+        self.assertEqual(response.status_code, 200)
+        return [(result["name_id"], result["match"]) for result in response.data]
+
+    def test_resolve_names(self):
+        """NameIDs and names resolve through all synonyms to the current taxon, in the order given."""
+        self.assertEqual(
+            self.resolve([102, "100", "medius  nomen?", "Splitus totus", 999, "Novus nomem", "Nonsense"]),
+            [(102, "exact"), (102, "synonym"), (102, "synonym"), (None, "ambiguous"),
+             (None, "none"), (102, "fuzzy"), (None, "none")])
+        self.assertEqual(self.resolve(["Novus nomem"], fuzzy=False), [(None, "none")])
+
+    def test_resolve_follows_changes(self):
+        """A new Crossreference is followed in the next request."""
+        self.assertEqual(self.resolve([102]), [(102, "exact")])
+        with db.run_on_commit():
+            Taxon.objects.filter(name_id=102).update(current=False)
+            Crossreference.objects.create(
+                xref_id=99, reason=Crossreference.REASON_TSY,
+                predecessor=Taxon.objects.get(name_id=102), successor=Taxon.objects.get(name_id=201))
+        self.assertEqual(self.resolve([100, 102]), [(201, "synonym"), (201, "synonym")])
+
+    def test_closure_survives_cycles(self):
+        """Cyclic Crossreferences end at the current taxa reachable from them."""
+        index = resolver.Index(
+            [(1, False, "a", None, None, None), (2, False, "b", None, None, None), (3, True, "c", None, None, None)],
+            [(1, 2), (2, 1), (2, 3)])
+        self.assertEqual(index.closure, {1: {3}, 2: {3}})
+
+    def test_resolve_limit(self):
+        """Too many names are refused."""
+        with self.settings(TAXON_RESOLVE_MAX_NAMES=2):
+            response = self.client.post("/api/1/taxon-resolve/", [1, 2, 3], format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class TaxonGraphQLTests(TestCase):
+    """The GraphQL API: pagination, batched relations, cost limits and persisted queries."""
+
+    QUERY = """query ($first: Int, $after: String) {
+      allTaxa(first: $first, after: $after) {
+        pageInfo { hasNextPage endCursor }
+        edges { node { nameId parent { nameId } vernacularSet { name } paraphyleticGroups { supraCode } } }
+      }
+    }"""
+
+    def setUp(self):
+        """Log in a user."""
+        self.user = User.objects.create_user(username="graphql", password="test")
+        self.client.force_login(self.user)
+        self.group = HbvSupra.objects.create(ogc_fid=1, supra_code="ANIMALS")
+        self.root = Taxon.objects.create(name_id=1000, name="Root")
+
+    def create_taxa(self, start, stop):
+        """Create taxa under the root, each with a vernacular name and group."""
+        for i in range(start, stop):
+            taxon = Taxon.objects.create(name_id=1000 + i, name="Taxon {0}".format(i), parent=self.root)
+            taxon.paraphyletic_groups.add(self.group)
+            Vernacular.objects.create(ogc_fid=i, taxon=taxon, name="Name {0}".format(i))
+
+    def query(self, query=None, variables=None, **extensions):
+        """POST a query, return the response."""
+        data = dict(query=query, variables=variables or dict())
+        if extensions:
+            data["extensions"] = extensions
+        return self.client.post("/gql", json.dumps(data), content_type="application/json")
+
+    def test_relations_cost_constant_queries(self):
+        """Nested relations of a page cost the same number of queries for few and many taxa."""
+        counts = []
+        for start, stop in ((1, 4), (4, 40)):
+            self.create_taxa(start, stop)
+            with CaptureQueriesContext(connection) as context:
+                response = self.query(self.QUERY, dict(first=100))
+            self.assertEqual(response.status_code, 200, response.content)
+            counts.append(len(context.captured_queries))
+        taxa = response.json()["data"]["allTaxa"]["edges"]
+        self.assertEqual(len(taxa), 40)
+        self.assertEqual(taxa[1]["node"]["parent"]["nameId"], 1000)
+        self.assertEqual(taxa[1]["node"]["vernacularSet"][0]["name"], "Name 1")
+        self.assertEqual(taxa[1]["node"]["paraphyleticGroups"][0]["supraCode"], "ANIMALS")
+        self.assertEqual(counts[0], counts[1])
+
+    def test_cursor_pagination(self):
+        """Pages continue after the end cursor of the previous page."""
+        self.create_taxa(1, 5)
+        first = self.query(self.QUERY, dict(first=3)).json()["data"]["allTaxa"]
+        self.assertTrue(first["pageInfo"]["hasNextPage"])
+        second = self.query(self.QUERY, dict(first=3, after=first["pageInfo"]["endCursor"])).json()["data"]["allTaxa"]
+        self.assertFalse(second["pageInfo"]["hasNextPage"])
+        self.assertEqual([edge["node"]["nameId"] for edge in first["edges"] + second["edges"]],
+                         [1000, 1001, 1002, 1003, 1004])
+        response = self.query("{ taxon(nameId: 1002) { nameId } }")
+        self.assertEqual(response.json()["data"]["taxon"]["nameId"], 1002)
+
+    def test_cost_limits(self):
+        """Too deep and too expensive queries are refused."""
+        deep = "{ taxon(nameId: 1000) { " + "parent { " * 10 + "nameId" + " }" * 10 + " } }"
+        self.assertEqual(self.query(deep).status_code, 400)
+        wide = "{ allTaxa(first: 100) { edges { node { children { nameId parent { nameId } } } } } }"
+        with self.settings(GRAPHQL_MAX_COMPLEXITY=1000):
+            self.assertEqual(self.query(wide).status_code, 400)
+        self.assertEqual(self.query(wide).status_code, 200)
+
+    def test_cost_of_nested_lists(self):
+        """Unpaginated lists multiply the cost of the fields nested in them."""
+        nested = "{ allTaxa(first: %d) { edges { node { children { children { children { nameId } } } } } } }"
+        response = self.query(nested % 1000)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("complexity", response.json()["errors"][0]["message"])
+        self.assertEqual(self.query(nested % 10).status_code, 200)
+        with self.settings(GRAPHQL_LIST_SIZE=100):
+            self.assertEqual(self.query(nested % 10).status_code, 400)
+
+    def test_persisted_queries(self):
+        """A query is sent once with its hash, and then by its hash only."""
+        query = "{ taxon(nameId: 1000) { name } }"
+        persisted_query = dict(version=1, sha256Hash=hashlib.sha256(query.encode()).hexdigest())
+        response = self.query(persistedQuery=persisted_query)
+        self.assertEqual(response.json()["errors"][0]["message"], "PersistedQueryNotFound")
+        self.assertEqual(self.query(query, persistedQuery=persisted_query).json()["data"]["taxon"]["name"], "Root")
+        self.assertEqual(self.query(persistedQuery=persisted_query).json()["data"]["taxon"]["name"], "Root")
+
+
+class TaxonTreeAPITests(TestCase):
+    """Lazy expansion of the taxonomic tree, see taxonomy.tree."""
+
+    def setUp(self):
+        """Create a small tree, and a client logged in as a user."""
+        self.root = Taxon.objects.create(name_id=1, name="Animalia", rank=Taxon.RANK_KINGDOM)
+        self.genus = Taxon.objects.create(name_id=2, name="Caretta", rank=Taxon.RANK_GENUS, parent=self.root)
+        self.other = Taxon.objects.create(name_id=5, name="Natator", rank=Taxon.RANK_GENUS, parent=self.root)
+        for name_id, name in ((3, "caretta"), (4, "gigas")):
+            Taxon.objects.create(name_id=name_id, name=name, rank=Taxon.RANK_SPECIES, parent=self.genus)
+        self.user = User.objects.create_user(username="explorer", password="test")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def get(self, name_id=None):
+        """Return the data of the roots, or of the subtree of a NameID."""
+        url = "/api/1/taxon-tree/" if name_id is None else "/api/1/taxon-tree/{0}/".format(name_id)
+        response = self.client.get(url, {"format": "json"})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_subtree(self):
+        """A taxon comes with its ancestors and immediate children only."""
+        self.assertEqual([t["name_id"] for t in self.get()["children"]], [1])
+        data = self.get(1)
+        self.assertEqual(data["ancestors"], [])
+        self.assertEqual([t["name_id"] for t in data["children"]], [2, 5])
+        data = self.get(2)
+        self.assertEqual([t["name_id"] for t in data["ancestors"]], [1])
+        self.assertEqual(data["taxon"]["child_count"], 2)
+        self.assertTrue(data["taxon"]["has_children"])
+        self.assertEqual([t["name_id"] for t in data["children"]], [3, 4])
+        self.assertFalse(data["children"][0]["has_children"])
+        self.assertEqual(self.client.get("/api/1/taxon-tree/9/", {"format": "json"}).status_code, 404)
+
+    def test_child_count_is_maintained(self):
+        """Child counts follow inserts, deletes and re-parenting, and survive saves of the parent."""
+        self.genus.refresh_from_db()
+        self.genus.child_count = 0
+        self.genus.save()
+        self.assertEqual(self.get(2)["taxon"]["child_count"], 2)
+
+        gigas = Taxon.objects.get(name_id=4)
+        gigas.parent = Taxon.objects.get(name_id=5)
+        gigas.save()
+        Taxon.objects.get(name_id=3).delete()
+        self.assertEqual(self.get(2)["taxon"]["child_count"], 0)
+        self.assertEqual([t["name_id"] for t in self.get(5)["children"]], [4])
+        self.assertEqual(self.get(5)["taxon"]["child_count"], 1)
+        self.assertEqual(tree.recount_children(), 0)
+
+
 class CommunityAPITests(TestCase):
     """Community tests."""
 
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Lazy expansion of the taxonomic tree from MPTT ranges.
+
+Each taxon knows its position in the tree (``tree_id``, ``lft``, ``rght``, ``level``),
+so its ancestors are the taxa of the same tree whose range contains its own,
+and its immediate children the taxa one level down within its range.
+``subtree`` answers both in one indexed range query.
+
+``Taxon.child_count`` is maintained by the database trigger ``taxonomy_taxon_child_count``
+(migration 0037) on every insert, delete and re-parenting. Saves of a taxon keep
+the count, ``recount_children`` recounts all taxa after a bulk load.
+"""
+from django.db import connection, transaction
+from django.db.models import Q
+
+from shared import jobs
+
+ROW_FIELDS = ("name_id", "name", "canonical_name", "rank", "child_count", "lft", "rght", "level")
+
+RECOUNT_SQL = """
+UPDATE taxonomy_taxon t SET child_count = c.n
+FROM (
+    SELECT p.id, count(ch.id) AS n
+    FROM taxonomy_taxon p LEFT JOIN taxonomy_taxon ch ON ch.parent_id = p.id
+    GROUP BY p.id
+) c
+WHERE t.id = c.id AND t.child_count <> c.n
+"""
+
+
+def row(taxon):
+    """Return the compact row of a taxon from its values."""
+    return dict(
+        name_id=taxon["name_id"],
+        name=taxon["name"],
+        canonical_name=taxon["canonical_name"],
+        rank=taxon["rank"],
+        child_count=taxon["child_count"],
+        has_children=taxon["rght"] - taxon["lft"] > 1,
+    )
+
+
+def family(taxon, queryset=None):
+    """Return the ancestors, the taxon itself and its immediate children, ordered from the root.
+
+    Arguments:
+    taxon A Taxon
+    queryset The taxa to select from, default: all
+
+    Returns:
+    A queryset of taxa ordered by their position in the tree.
+    """
+    from taxonomy.models import Taxon
+
+    queryset = Taxon.objects.all() if queryset is None else queryset
+    return queryset.filter(
+        Q(tree_id=taxon.tree_id, lft__lte=taxon.lft, rght__gte=taxon.rght) |
+        Q(tree_id=taxon.tree_id, level=taxon.level + 1, lft__gt=taxon.lft, rght__lt=taxon.rght)
+    ).order_by("lft")
+
+
+def roots():
+    """Return the rows of the root taxa of all trees."""
+    from taxonomy.models import Taxon
+
+    return dict(
+        ancestors=[],
+        taxon=None,
+        children=[row(t) for t in Taxon.objects.filter(level=0).order_by("tree_id").values(*ROW_FIELDS)],
+    )
+
+
+def subtree(name_id):
+    """Return the ancestors and immediate children of a taxon.
+
+    Arguments:
+    name_id The NameID of the taxon
+
+    Returns:
+    A dict of "ancestors" (root first), "taxon" and "children" (in tree order),
+    each a row of name_id, name, canonical_name, rank, child_count and has_children,
+    or None if there is no taxon of this NameID.
+    """
+    from taxonomy.models import Taxon
+
+    taxon = Taxon.objects.filter(name_id=name_id).only("tree_id", "lft", "rght", "level").first()
+    if taxon is None:
+        return None
+    result = dict(ancestors=[], taxon=None, children=[])
+    for t in family(taxon).values(*ROW_FIELDS):
+        if t["lft"] == taxon.lft:
+            result["taxon"] = row(t)
+        elif t["level"] > taxon.level:
+            result["children"].append(row(t))
+        else:
+            result["ancestors"].append(row(t))
+    return result
+
+
+@jobs.stage("recount_children")
+def recount_children():
+    """Recount the immediate children of all taxa, return the number of corrected counts."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL taxonomy.recount_children = 'on'")
+        cursor.execute(RECOUNT_SQL)
+        return cursor.rowcount
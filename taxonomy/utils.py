@@ -19,7 +19,10 @@ from django.utils.dateparse import parse_datetime
 from django.utils.encoding import force_text
 
 from taxonomy import models as tax_models
+from taxonomy import tree
 from conservation import models as cons_models
+from shared import cache as api_cache
+from shared import jobs
 
 
 logger = logging.getLogger(__name__)
@@ -523,6 +526,7 @@ def make_crossreference(hbv_xref_obj, reason_dict):
 #     return
 
 
+@jobs.stage("kingdoms")
 def make_all_kingdoms():
     # Thing
     # logger.info("[update_taxon] Creating/updating thing...")
@@ -543,6 +547,7 @@ def make_all_kingdoms():
         for x in tax_models.HbvName.objects.filter(rank_name='Kingdom')]
     return kingdoms
 
+@jobs.stage("families")
 def make_all_families():
     # Divisions, Classes, Orders, Families
     logger.info("[update_taxon] Creating/updating divisions, classes, orders, families...")
@@ -560,6 +565,7 @@ def make_all_families():
     return families
 
 
+@jobs.stage("genera")
 def make_all_genera():
     # Genera
     logger.info("[update_taxon] Creating/updating genera...")
@@ -572,6 +578,7 @@ def make_all_genera():
     return genera
 
 
+@jobs.stage("species")
 def make_all_species():
     logger.info("[update_taxon] Creating/updating species...")
     CUR = {'N': False, 'Y': True}
@@ -584,6 +591,7 @@ def make_all_species():
     return species
 
 
+@jobs.stage("subspecies")
 def make_all_subspecies():
     # Subspecies
     logger.info("[update_taxon] Creating/updating subspecies...")
@@ -598,6 +606,7 @@ def make_all_subspecies():
     return subspecies
 
 
+@jobs.stage("varieties")
 def make_all_varieties():
     # Varieties
     logger.info("[update_taxon] Creating/updating varieties...")
@@ -611,6 +620,7 @@ def make_all_varieties():
     return varieties
 
 
+@jobs.stage("forms")
 def make_all_forms():
     # Forms
     logger.info("[update_taxon] Creating/updating forms...")
@@ -623,24 +633,29 @@ def make_all_forms():
     # rebuild_mptt_tree()
     return forms
 
+@jobs.stage("vernaculars")
 def make_all_vernaculars():
     # Vernaculars
     logger.info("[update_taxon] Updating Vernacular Names...")
     LANG = {"ENGLISH": 0, "INDIGENOUS": 1}
-    vernaculars = [make_vernacular(x, LANG) for x in tax_models.HbvVernacular.objects.all()]
+    with transaction.atomic():
+        vernaculars = [make_vernacular(x, LANG) for x in tax_models.HbvVernacular.objects.all()]
     logger.info("[update_taxon] Updated {0} Vernacular Names.".format(tax_models.Vernacular.objects.count()))
     return vernaculars
 
 
+@jobs.stage("crossreferences")
 def make_all_crossreferences():
     # Crossreferences
     logger.info("[update_taxon] Updating Crossreferences...")
     REASONS = {"MIS": 0, "TSY": 1, "NSY": 2, "EXC": 3, "CON": 4, "FOR": 5, "OGV": 6, "ERR": 7, "ISY": 8}
-    crossreferences = [make_crossreference(x, REASONS) for x in tax_models.HbvXref.objects.filter(active="Y")]
+    with transaction.atomic():
+        crossreferences = [make_crossreference(x, REASONS) for x in tax_models.HbvXref.objects.filter(active="Y")]
     logger.info("[update_taxon] Updated {0} Crossreferences.".format(tax_models.Crossreference.objects.count()))
     return crossreferences
 
 
+@jobs.stage("paraphyletic_groups")
 def make_all_paraphyletic_groups():
     # Paraphyletic Groups
     logger.info("[update_taxon] Updating Paraphyletic Groups from WACensus...")
@@ -681,13 +696,17 @@ def make_all_paraphyletic_groups():
     )
 
 
+@jobs.stage("mptt_rebuild")
 def rebuild_mptt_tree():
     # Rebuild MPTT tree
     logger.info("[update_taxon] Rebuilding taxonomic tree - this could take a while.")
     tax_models.Taxon.objects.rebuild()
+    # The rebuild updates the tree without saving taxa
+    api_cache.bump(tax_models.Taxon)
     logger.info("[update_taxon] Taxonomic tree rebuilt.")
 
 
+@jobs.job("update_taxon")
 def update_taxon():
     """Update Taxon from local copy of WACensus data.
 
@@ -706,6 +725,9 @@ def update_taxon():
     crossreferences = make_all_crossreferences()
     make_all_paraphyletic_groups()
     rebuild_mptt_tree()
+    recounted = tree.recount_children()
+    if recounted:
+        logger.warning("[update_taxon] Corrected the child count of {0} taxa.".format(recounted))
 
     # Say bye
     msg = ("[update_taxon] Updated {0} kingdoms, {1} families "
@@ -20,6 +20,7 @@ from taxonomy.models import Community, Taxon
 from taxonomy.tables import CommunityAreaEncounterTable, TaxonAreaEncounterTable
 from taxonomy.utils import update_taxon as update_taxon_util
 from taxonomy import resources as tax_resources
+from taxonomy import tree
 from shared.utils import Breadcrumb
 from shared.views import (
     # SuccessUrlMixin,
@@ -56,8 +57,8 @@ class TaxonListView(ListViewBreadcrumbMixin, ResourceDownloadMixin, ListView):
         context = super(TaxonListView, self).get_context_data(**kwargs)
         context["now"] = timezone.now()
         context["list_filter"] = TaxonFilter(
-            self.request.GET, queryset=self.get_queryset())
-        context["count"] = self.get_queryset().count()
+            self.request.GET, queryset=self.object_list)
+        context["count"] = context["paginator"].count
         return context
 
     def get_queryset(self):
@@ -66,7 +67,8 @@ class TaxonListView(ListViewBreadcrumbMixin, ResourceDownloadMixin, ListView):
         There are two mutually exclusive ways of filtering data:
 
         * Taxon card > explore: GET name_id = show this taxon, its parents
-          and all children. Do not process the other filter fields.
+          and its immediate children (see taxonomy.tree.family).
+          Do not process the other filter fields.
         * Search filter: name (icontains), rank, is current, publication status.
 
         DO NOT use taxon_filter.qs in template:
@@ -77,16 +79,15 @@ class TaxonListView(ListViewBreadcrumbMixin, ResourceDownloadMixin, ListView):
         # name_id is mutually exclusive to other parameters
         if self.request.GET.get("name_id"):
             try:
-                return queryset.filter(
-                    name_id=self.request.GET.get("name_id")
-                ).get(
-                ).get_family(
+                return tree.family(
+                    queryset.get(name_id=self.request.GET.get("name_id"))
                 ).prefetch_related(
                     "paraphyletic_groups",
                     "conservation_listings",
                     "conservationthreat_set",
                     "conservationaction_set",
                     "document_set",
+                    "document_set__attachments",
                 )
             except ObjectDoesNotExist:
                 messages.warning(self.request, "This Name ID does not exist.")
@@ -96,6 +97,7 @@ class TaxonListView(ListViewBreadcrumbMixin, ResourceDownloadMixin, ListView):
                     "conservationthreat_set",
                     "conservationaction_set",
                     "document_set",
+                    "document_set__attachments",
                 )
 
         return TaxonFilter(
@@ -106,6 +108,7 @@ class TaxonListView(ListViewBreadcrumbMixin, ResourceDownloadMixin, ListView):
                 "conservationthreat_set",
                 "conservationaction_set",
                 "document_set",
+                "document_set__attachments",
             )
 
 
@@ -125,9 +128,9 @@ class CommunityListView(ListViewBreadcrumbMixin, ResourceDownloadMixin, ListView
         context["now"] = timezone.now()
         context["list_filter"] = CommunityFilter(
             self.request.GET,
-            queryset=self.get_queryset()
+            queryset=self.object_list
         )
-        context["count"] = self.get_queryset().count()
+        context["count"] = context["paginator"].count
         return context
 
     def get_queryset(self):
@@ -139,6 +142,7 @@ class CommunityListView(ListViewBreadcrumbMixin, ResourceDownloadMixin, ListView
             "conservationthreat_set",
             "conservationaction_set",
             "document_set",
+            "document_set__attachments",
         )
         return prefetched
 
@@ -162,6 +166,7 @@ class TaxonDetailView(DetailViewBreadcrumbMixin, DetailView):
             "conservationaction_set",
             "conservationthreat_set",
             "document_set",
+            "document_set__attachments",
         ).first()
         if not t:
             raise Http404
@@ -217,6 +222,7 @@ class CommunityDetailView(DetailViewBreadcrumbMixin, DetailView):
             "conservationaction_set",
             "conservationthreat_set",
             "document_set",
+            "document_set__attachments",
         ).first()
         if not com:
             raise Http404  # pragma: no cover
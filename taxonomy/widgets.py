@@ -2,34 +2,44 @@
 """Taxonomy widgets."""
 from django_select2.forms import ModelSelect2Widget, ModelSelect2MultipleWidget
 from taxonomy import models as tax_models
+from taxonomy import search
 
 
-class TaxonWidget(ModelSelect2Widget):
+class TaxonSearchMixin(object):
+    """Search taxa through the ranked taxon search endpoint.
+
+    The browser requests ``/api/1/taxon-search/`` (see ``taxonomy.search``)
+    instead of the django-select2 view, so the widget is not written to the
+    select2 cache on every render. Only selected taxa are rendered.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """Point the widget at the taxon search endpoint."""
+        kwargs.setdefault("data_view", "api:taxon_search-list")
+        super(TaxonSearchMixin, self).__init__(*args, **kwargs)
+
+    def set_to_cache(self):
+        """Skip the select2 cache, the taxon search endpoint does not need the widget."""
+
+    def filter_queryset(self, request, term, queryset=None, **dependent_fields):
+        """Return the taxa matching term, best first."""
+        return search.search(term, self.get_queryset() if queryset is None else queryset)
+
+
+class TaxonWidget(TaxonSearchMixin, ModelSelect2Widget):
     """A reusable Taxon ModelSelect2Widget for taxa."""
 
     model = tax_models.Taxon
     queryset = tax_models.Taxon.objects.all()
     # filter(current=True,children__isnull=True)
-    search_fields = [
-        "taxonomic_name__icontains",
-        "vernacular_names__icontains",
-        "field_code__icontains",
-        "name_id__icontains",
-    ]
 
 
-class TaxonMultipleWidget(ModelSelect2MultipleWidget):
+class TaxonMultipleWidget(TaxonSearchMixin, ModelSelect2MultipleWidget):
     """A reusable Taxon ModelSelect2MultipleWidget for taxa."""
 
     model = tax_models.Taxon
     queryset = tax_models.Taxon.objects.all()
     # filter(current=True,children__isnull=True)
-    search_fields = [
-        "taxonomic_name__icontains",
-        "vernacular_names__icontains",
-        "field_code__icontains",
-        "name_id__icontains",
-    ]
 
 
 class CommunityWidget(ModelSelect2Widget):
@@ -18,11 +18,13 @@ from rest_framework.authtoken.admin import TokenAdmin
 from reversion.admin import VersionAdmin
 from shared.admin import CustomStateLogInline
 
+from wastd.observations import duplicates
 from wastd.observations.models import (
     AnimalEncounter,
     Area,
     DispatchRecord,
     DugongMorphometricObservation,
+    DuplicateGroup,
     Encounter,
     FieldMediaAttachment,
     HatchlingMorphometricObservation,
@@ -48,7 +50,7 @@ from wastd.observations.models import (
     LightSourceObservation
 )
 
-from shared.admin import FORMFIELD_OVERRIDES, S2ATTRS
+from shared.admin import FORMFIELD_OVERRIDES, QA_TRANSITION_ACTIONS, S2ATTRS
 
 TokenAdmin.raw_id_fields = ('user',)
 
@@ -429,6 +431,7 @@ class SurveyAdmin(FSMTransitionMixin, VersionAdmin, admin.ModelAdmin):
     form = s2form(Survey, attrs=S2ATTRS)
     formfield_overrides = FORMFIELD_OVERRIDES
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
     fieldsets = (
         (_('Device'),
             {'classes': ('grp-collapse', 'grp-open', 'wide', 'extrapretty'),
@@ -544,6 +547,7 @@ class EncounterAdmin(FSMTransitionMixin, VersionAdmin):
 
     # Django-fsm transitions config
     fsm_field = ['status', ]
+    actions = QA_TRANSITION_ACTIONS
 
     # Change_view form layout
     fieldsets = (
@@ -791,3 +795,37 @@ class LoggerEncounterAdmin(EncounterAdmin):
         """Make habitat human readable."""
         return obj.get_deployment_status_display()
     deployment_status_display.short_description = 'Deployment Status'
+
+
+@admin.register(DuplicateGroup)
+class DuplicateGroupAdmin(admin.ModelAdmin):
+    """Review queue of likely duplicate Encounters."""
+
+    date_hierarchy = 'created'
+    list_display = ('__str__', 'score', 'status', 'created', 'reviewed_by', 'reviewed_on', 'encounter_links')
+    list_filter = ('status', )
+    filter_horizontal = ('encounters', )
+    readonly_fields = ('key', 'score', 'created', 'reviewed_by', 'reviewed_on', 'encounter_links')
+    actions = ['flag_encounters', 'dismiss']
+
+    def get_queryset(self, request):
+        """Prefetch the Encounters of each group."""
+        return super(DuplicateGroupAdmin, self).get_queryset(request).prefetch_related('encounters')
+
+    def encounter_links(self, obj):
+        """Link to the admin change pages of the Encounters."""
+        return mark_safe(", ".join(
+            '<a href="{0}">{1}</a>'.format(e.absolute_admin_url, e.pk) for e in obj.encounters.all()))
+    encounter_links.short_description = 'Encounters'
+
+    def flag_encounters(self, request, queryset):
+        """Flag the curated Encounters of the selected groups."""
+        flagged = sum(duplicates.flag_group(group, by=request.user) for group in queryset)
+        self.message_user(request, "Flagged {0} Encounters of {1} groups.".format(flagged, queryset.count()))
+    flag_encounters.short_description = 'Flag curated Encounters as not trustworthy'
+
+    def dismiss(self, request, queryset):
+        """Dismiss the selected groups as not duplicates."""
+        [duplicates.dismiss_group(group, by=request.user) for group in queryset]
+        self.message_user(request, "Dismissed {0} groups.".format(queryset.count()))
+    dismiss.short_description = 'Dismiss as not duplicates'
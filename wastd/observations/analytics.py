@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""Nesting season analytics.
+
+Nest excavations (TurtleNestObservation), TurtleNestEncounters,
+TrackTallyObservations and TurtleNestDisturbanceTallyObservations are read
+as columns with ``values_list`` into pandas DataFrames, rather than as model
+instances. The Miller (1999) nest metrics of ``TurtleNestObservation``
+(``egg_count_calculated``, ``no_emerged``, ``hatching_success``,
+``emergence_success``) are computed on whole columns by ``nest_metrics``.
+
+``season_summary`` groups all of it by site, season, species and week.
+A season starts on the first day of ``settings.NESTING_SEASON_START_MONTH``
+(local time) and is named after the year it starts in.
+``cached_season_summary`` caches summaries for ``settings.SEASON_ANALYTICS_CACHE_SECONDS``.
+"""
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_KEYS = ["site_id", "season", "species", "week"]
+
+EXCAVATION_COLUMNS = [
+    "no_egg_shells",
+    "no_live_hatchlings",
+    "no_dead_hatchlings",
+    "no_undeveloped_eggs",
+    "no_unhatched_eggs",
+    "no_unhatched_term",
+    "no_depredated_eggs",
+]
+
+
+def nest_metrics(df):
+    """Add the Miller 1999 nest metrics as columns to a DataFrame of nest excavations.
+
+    The results equal the TurtleNestObservation properties of the same names:
+    missing counts are taken as 0, percentages are rounded to two decimals
+    and are 0 where no eggs were counted.
+
+    Arguments:
+    df A DataFrame with the columns EXCAVATION_COLUMNS
+
+    Returns:
+    The DataFrame with the added columns no_emerged, egg_count_calculated,
+    hatching_success and emergence_success.
+    """
+    import numpy
+
+    counts = df[EXCAVATION_COLUMNS].fillna(0).astype("int64")
+    egg_count = (
+        counts["no_egg_shells"] +
+        counts["no_undeveloped_eggs"] +
+        counts["no_unhatched_eggs"] +
+        counts["no_unhatched_term"] +
+        counts["no_depredated_eggs"]
+    )
+    no_emerged = counts["no_egg_shells"] - counts["no_live_hatchlings"] - counts["no_dead_hatchlings"]
+    divisor = egg_count.where(egg_count > 0, 1)
+
+    df["no_emerged"] = no_emerged
+    df["egg_count_calculated"] = egg_count
+    df["hatching_success"] = numpy.where(
+        egg_count > 0, (100 * counts["no_egg_shells"] / divisor).round(2), 0)
+    df["emergence_success"] = numpy.where(
+        egg_count > 0, (100 * no_emerged / divisor).round(2), 0)
+    return df
+
+
+def add_season_and_week(df, column="when"):
+    """Add the columns season and week (the local date of the week's Monday) from a datetime column.
+
+    Missing species are set to "na", as pandas drops missing group keys.
+    """
+    import pandas
+
+    df["species"] = df["species"].fillna("na")
+    local = pandas.to_datetime(df[column], utc=True).dt.tz_convert(settings.TIME_ZONE).dt.tz_localize(None)
+    df["season"] = local.dt.year - (local.dt.month < settings.NESTING_SEASON_START_MONTH).astype("int64")
+    df["week"] = (local - pandas.to_timedelta(local.dt.weekday, unit="D")).dt.date
+    return df
+
+
+def frame(queryset, columns):
+    """Return the values of a QuerySet as a DataFrame.
+
+    Arguments:
+    queryset A QuerySet
+    columns A dict of DataFrame column name: QuerySet field lookup
+    """
+    import pandas
+
+    return pandas.DataFrame.from_records(
+        list(queryset.values_list(*columns.values())), columns=list(columns.keys()))
+
+
+def filter_encounters(queryset, prefix="", site=None, species=None, season=None):
+    """Filter a QuerySet by site, species and season.
+
+    Arguments:
+    prefix The lookup prefix to the Encounter, e.g. "encounter__"
+    site An Area ID, default: None (all)
+    species A species, default: None (all)
+    season A season (year), default: None (all)
+    """
+    from datetime import datetime
+
+    import pytz
+
+    if site:
+        queryset = queryset.filter(**{prefix + "site_id": site})
+    if species:
+        species_lookup = "species" if not prefix else "encounter__turtlenestencounter__species"
+        queryset = queryset.filter(**{species_lookup: species})
+    if season:
+        tz = pytz.timezone(settings.TIME_ZONE)
+        month = settings.NESTING_SEASON_START_MONTH
+        start = tz.localize(datetime(int(season), month, 1))
+        end = tz.localize(datetime(int(season) + 1, month, 1))
+        queryset = queryset.filter(**{prefix + "when__gte": start, prefix + "when__lt": end})
+    return queryset
+
+
+def nest_encounters(**filters):
+    """Return TurtleNestEncounters as DataFrame with site_id, when, species and nest_type."""
+    from wastd.observations.models import TurtleNestEncounter
+
+    qs = filter_encounters(
+        TurtleNestEncounter.objects.non_polymorphic().exclude(site=None), **filters)
+    return frame(qs, dict(site_id="site_id", when="when", species="species", nest_type="nest_type"))
+
+
+def nest_excavations(**filters):
+    """Return nest excavations of TurtleNestEncounters as DataFrame with nest metrics."""
+    from wastd.observations.models import TurtleNestObservation
+
+    qs = filter_encounters(
+        TurtleNestObservation.objects.non_polymorphic().exclude(encounter__site=None).filter(
+            encounter__turtlenestencounter__isnull=False),
+        prefix="encounter__", **filters)
+    columns = dict(
+        site_id="encounter__site_id",
+        when="encounter__when",
+        species="encounter__turtlenestencounter__species")
+    columns.update((c, c) for c in EXCAVATION_COLUMNS)
+    return nest_metrics(frame(qs, columns))
+
+
+def track_tallies(model, value_columns, **filters):
+    """Return tally observations of model as DataFrame with site_id, when, species and value_columns."""
+    qs = model.objects.non_polymorphic().exclude(encounter__site=None)
+    if filters.get("species"):
+        qs = qs.filter(species=filters["species"])
+    qs = filter_encounters(qs, prefix="encounter__", site=filters.get("site"), season=filters.get("season"))
+    columns = dict(site_id="encounter__site_id", when="encounter__when", species="species")
+    columns.update(value_columns)
+    return frame(qs, columns)
+
+
+def season_summary(site=None, species=None, season=None):
+    """Return nesting season statistics by site, season, species and week.
+
+    Arguments:
+    site An Area ID, default: None (all)
+    species A species, default: None (all)
+    season A season (year), default: None (all)
+
+    Returns:
+    A DataFrame with one row per site_id, season, species and week, and the columns:
+
+    * nests_<nest_type>: the number of TurtleNestEncounters per nest type
+    * tally_<nest_type>: the sum of tallied tracks and nests per nest type
+    * nests_disturbed, tracks_disturbed: the sums of disturbance tallies
+    * excavations: the number of nest excavations
+    * egg_count_calculated, no_emerged: the sums over excavated nests
+    * hatching_success, emergence_success: the means over excavated nests
+    """
+    import pandas
+
+    from wastd.observations.models import TrackTallyObservation, TurtleNestDisturbanceTallyObservation
+
+    filters = dict(site=site, species=species, season=season)
+    parts = []
+
+    tne = nest_encounters(**filters)
+    if len(tne):
+        add_season_and_week(tne)
+        tne["nest_type"] = tne["nest_type"].fillna("na")
+        parts.append(
+            tne.pivot_table(index=SUMMARY_KEYS, columns="nest_type", values="when",
+                            aggfunc="count", fill_value=0).add_prefix("nests_"))
+
+    tally = track_tallies(TrackTallyObservation, dict(nest_type="nest_type", tally="tally"), **filters)
+    if len(tally):
+        add_season_and_week(tally)
+        tally["nest_type"] = tally["nest_type"].fillna("na")
+        parts.append(
+            tally.pivot_table(index=SUMMARY_KEYS, columns="nest_type", values="tally",
+                              aggfunc="sum", fill_value=0).add_prefix("tally_"))
+
+    disturbed = track_tallies(
+        TurtleNestDisturbanceTallyObservation,
+        dict(nests_disturbed="no_nests_disturbed", tracks_disturbed="no_tracks_encountered"),
+        **filters)
+    if len(disturbed):
+        add_season_and_week(disturbed)
+        parts.append(disturbed.groupby(SUMMARY_KEYS)[["nests_disturbed", "tracks_disturbed"]].sum())
+
+    excavations = nest_excavations(**filters)
+    if len(excavations):
+        add_season_and_week(excavations)
+        parts.append(excavations.groupby(SUMMARY_KEYS).agg(
+            excavations=("when", "count"),
+            egg_count_calculated=("egg_count_calculated", "sum"),
+            no_emerged=("no_emerged", "sum"),
+            hatching_success=("hatching_success", "mean"),
+            emergence_success=("emergence_success", "mean"),
+        ).round({"hatching_success": 2, "emergence_success": 2}))
+
+    if not parts:
+        return pandas.DataFrame(columns=SUMMARY_KEYS)
+    summary = pandas.concat(parts, axis=1)
+    counts = [c for c in summary.columns if c not in ("hatching_success", "emergence_success")]
+    summary[counts] = summary[counts].fillna(0).astype("int64")
+    return summary.sort_index().reset_index()
+
+
+def summary_filters(params):
+    """Return the season_summary filters site, species and season from request parameters."""
+    filters = dict(site=params.get("site"), species=params.get("species"), season=params.get("season"))
+    for key in ("site", "season"):
+        filters[key] = int(filters[key]) if filters[key] and filters[key].isdigit() else None
+    return filters
+
+
+def cached_season_summary(**filters):
+    """Return season_summary(**filters), cached for settings.SEASON_ANALYTICS_CACHE_SECONDS."""
+    key = "wastd.observations.analytics.season_summary.{0}".format(
+        hashlib.md5(json.dumps(filters, sort_keys=True, default=str).encode()).hexdigest())
+    summary = cache.get(key)
+    if summary is None:
+        summary = season_summary(**filters)
+        cache.set(key, summary, settings.SEASON_ANALYTICS_CACHE_SECONDS)
+    return summary
+
+
+def summary_records(summary):
+    """Return a season summary as a list of dicts, with missing values as None."""
+    summary = summary.astype(object).where(summary.notnull(), None)
+    records = summary.to_dict(orient="records")
+    for record in records:
+        record["week"] = str(record["week"]) if record.get("week") else None
+    return records
@@ -1,12 +1,18 @@
+from contextlib import contextmanager
+
 from django_filters.rest_framework import DateFilter
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet, ViewSet
 from rest_framework_filters import FilterSet
 
 from shared.api import (
     MyGeoJsonPagination,
-    BatchUpsertViewSet
+    BatchUpsertViewSet,
+    BulkTransitionMixin
 )
-from wastd.observations import models
+from wastd.observations import analytics, models, stats
 from wastd.observations import serializers
 try:
     from wastd.observations.utils import symlink_resources
@@ -15,6 +21,18 @@ except BaseException:
     pass
 
 
+class DailyStatsMixin(object):
+    """Refresh the daily statistics of Encounters or Surveys updated in bulk, see wastd.observations.stats."""
+
+    @contextmanager
+    def bulk_updating(self, pks):
+        """Refresh the site-days of the records before and after the update."""
+        before = stats.site_days(self.model, pks)
+        with super().bulk_updating(pks):
+            yield
+        stats.refresh_later(self.model, before | stats.site_days(self.model, pks))
+
+
 class AreaFilter(FilterSet):
 
     class Meta:
@@ -79,7 +97,7 @@ class SurveyFilter(FilterSet):
         }
 
 
-class SurveyViewSet(BatchUpsertViewSet):
+class SurveyViewSet(DailyStatsMixin, BulkTransitionMixin, BatchUpsertViewSet):
     """Survey ModelViewSet.
 
     All filters are available on all fields except location and team.
@@ -122,7 +140,7 @@ class FastEncounterFilter(FilterSet):
         }
 
 
-class EncounterViewSet(BatchUpsertViewSet):
+class EncounterViewSet(DailyStatsMixin, BulkTransitionMixin, BatchUpsertViewSet):
     """Encounters are a common, minimal, shared set of data about:
 
     * Strandings (turtles, dugong, ceataceans (pre-QA raw import), pinnipeds (coming soon), sea snakes)
@@ -343,7 +361,7 @@ class AnimalEncounterFilter(FilterSet):
         }
 
 
-class AnimalEncounterViewSet(BatchUpsertViewSet):
+class AnimalEncounterViewSet(DailyStatsMixin, BulkTransitionMixin, BatchUpsertViewSet):
     """AnimalEncounter view set.
 
     AnimalEncounters come from marine wildlife incidents (strandings and rescues),
@@ -434,7 +452,7 @@ class TurtleNestEncounterFilter(FilterSet):
         }
 
 
-class TurtleNestEncounterViewSet(BatchUpsertViewSet):
+class TurtleNestEncounterViewSet(DailyStatsMixin, BulkTransitionMixin, BatchUpsertViewSet):
     """TurtleNestEncounter view set.
 
     TNE are turtle tracks with or without nests.
@@ -523,7 +541,7 @@ class TurtleNestEncounterViewSet(BatchUpsertViewSet):
 
 
 
-class LineTransectEncounterViewSet(BatchUpsertViewSet):
+class LineTransectEncounterViewSet(DailyStatsMixin, BulkTransitionMixin, BatchUpsertViewSet):
     # latex_name = "latex/loggerencounter.tex"
     queryset = models.LineTransectEncounter.objects.all().prefetch_related(
         "observer", "reporter", "survey", "site", "area", "survey__reporter"
@@ -542,7 +560,7 @@ class LineTransectEncounterViewSet(BatchUpsertViewSet):
         symlink_resources(t_dir, data)
 
 
-class LoggerEncounterViewSet(BatchUpsertViewSet):
+class LoggerEncounterViewSet(DailyStatsMixin, BulkTransitionMixin, BatchUpsertViewSet):
     latex_name = "latex/loggerencounter.tex"
     queryset = models.LoggerEncounter.objects.all().prefetch_related(
         "observer", "reporter", "survey", "site", "area", "survey__reporter"
@@ -686,6 +704,133 @@ class NestTagObservationViewSet(ModelViewSet):
     model = models.NestTagObservation
 
 
+class RegisteredTagFilter(FilterSet):
+
+    class Meta:
+        model = models.RegisteredTag
+        fields = {
+            "tag_type": ["exact", "in"],
+            "name": ["exact", "in", "startswith"],
+            "last_seen__name": ["exact"],
+            "status": ["exact", "in"],
+        }
+
+
+class RegisteredTagViewSet(ReadOnlyModelViewSet):
+    """The tag registry: the sighting history of each tag.
+
+    One entry per tag type and tag ID, summarising all TagObservations and
+    NestTagObservations (tag type "nest-tag") of the tag.
+    Use it to check whether a tag has been seen before, and on which animal.
+
+    # Filters
+    * [/api/1/tag-registry/?name=WA1234](/api/1/tag-registry/?name=WA1234) All tags with ID WA1234
+    * [/api/1/tag-registry/?name__startswith=WA12](/api/1/tag-registry/?name__startswith=WA12)
+      All tags with IDs starting with WA12
+    * [/api/1/tag-registry/?tag_type=flipper-tag](/api/1/tag-registry/?tag_type=flipper-tag) Flipper tags
+    """
+    queryset = models.RegisteredTag.objects.all().select_related("last_seen")
+    serializer_class = serializers.RegisteredTagSerializer
+    filter_class = RegisteredTagFilter
+    model = models.RegisteredTag
+
+
+class SeasonSummaryViewSet(ViewSet):
+    """Nesting season statistics by site, season, species and week.
+
+    Counts of TurtleNestEncounters and tallies per nest type, disturbance tallies,
+    and the sums and means of nest excavation metrics (Miller 1999).
+    Seasons are named after the year they start in.
+    Results are cached for a few minutes.
+    Download as CSV from [/observations/season-summary.csv](/observations/season-summary.csv).
+
+    # Filters
+    * [/api/1/season-summary/?season=2019](/api/1/season-summary/?season=2019) Season 2019-20
+    * [/api/1/season-summary/?site=19](/api/1/season-summary/?site=19) Site with ID 19
+    * [/api/1/season-summary/?species=natator-depressus](/api/1/season-summary/?species=natator-depressus)
+      Flatback turtles
+    """
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        summary = analytics.cached_season_summary(**analytics.summary_filters(request.query_params))
+        return Response(analytics.summary_records(summary))
+
+
+class DailyEncounterCountFilter(FilterSet):
+
+    class Meta:
+        model = models.DailyEncounterCount
+        fields = {
+            "site": ["exact", "in"],
+            "date": ["exact", "gte", "lte", "year"],
+            "encounter_type": ["exact", "in"],
+            "species": ["exact", "in"],
+            "nest_type": ["exact", "in"],
+        }
+
+
+class DailyEncounterCountViewSet(ReadOnlyModelViewSet):
+    """Daily Encounter counts per site, encounter type, species and nest type.
+
+    Maintained from Encounters, these answer aggregate questions
+    without scanning the Encounters themselves.
+
+    # Filters
+    * [/api/1/daily-encounter-counts/?site=19&date__year=2019](/api/1/daily-encounter-counts/?site=19&date__year=2019)
+      Site with ID 19 in 2019
+    * [/api/1/daily-encounter-counts/?encounter_type=nest](/api/1/daily-encounter-counts/?encounter_type=nest) Nests
+
+    # Totals
+    [/api/1/daily-encounter-counts/totals/?by=site,nest_type&encounter_type=nest](/api/1/daily-encounter-counts/totals/?by=site,nest_type&encounter_type=nest)
+    Counts summed by any of site, date, encounter_type, species, nest_type, using the same filters.
+    """
+    queryset = models.DailyEncounterCount.objects.all()
+    serializer_class = serializers.DailyEncounterCountSerializer
+    filter_class = DailyEncounterCountFilter
+    model = models.DailyEncounterCount
+
+    @action(detail=False)
+    def totals(self, request):
+        group_by = request.query_params.get("by", "site").split(",")
+        return Response(stats.encounter_totals(
+            group_by=group_by, queryset=self.filter_queryset(self.get_queryset())))
+
+
+class DailySurveyEffortFilter(FilterSet):
+
+    class Meta:
+        model = models.DailySurveyEffort
+        fields = {
+            "site": ["exact", "in"],
+            "date": ["exact", "gte", "lte", "year"],
+            "production": ["exact"],
+        }
+
+
+class DailySurveyEffortViewSet(ReadOnlyModelViewSet):
+    """Daily Survey counts and durations per site.
+
+    # Filters
+    * [/api/1/daily-survey-effort/?site=19&production=true](/api/1/daily-survey-effort/?site=19&production=true)
+      Production surveys at site with ID 19
+
+    # Totals
+    [/api/1/daily-survey-effort/totals/?by=site&date__year=2019](/api/1/daily-survey-effort/totals/?by=site&date__year=2019)
+    Surveys and durations summed by any of site, date, production, using the same filters.
+    """
+    queryset = models.DailySurveyEffort.objects.all()
+    serializer_class = serializers.DailySurveyEffortSerializer
+    filter_class = DailySurveyEffortFilter
+    model = models.DailySurveyEffort
+
+    @action(detail=False)
+    def totals(self, request):
+        group_by = request.query_params.get("by", "site").split(",")
+        return Response(stats.survey_effort_totals(
+            group_by=group_by, queryset=self.filter_queryset(self.get_queryset())))
+
+
 class ManagementActionViewSet(ModelViewSet):
     """ManagementActions following Encounters.
 
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Detection of likely duplicate Encounters.
+
+ODK double submissions, reconstructed surveys and legacy imports can leave
+near-identical Encounters: same type and species, within metres and minutes.
+
+``find_duplicates`` avoids comparing all pairs of Encounters. Each Encounter
+is hashed into a grid cell of ``distance_m`` metres and a time bucket of
+``minutes``, and only compared with Encounters in the same or adjacent cells
+and buckets. Candidate pairs are scored on encounter type, species, reporter
+and tags, and pairs scoring at least ``min_score`` are joined into groups.
+
+``queue_duplicates`` writes new groups to the review queue (``DuplicateGroup``),
+where their Encounters can be flagged in bulk through the QA transition ``flag``.
+"""
+import hashlib
+import logging
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, FloatField, Func
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django_fsm import can_proceed
+
+from wastd.observations.identity import UnionFind
+
+logger = logging.getLogger(__name__)
+
+METRES_PER_DEGREE = 111320.0
+
+# Pair score weights, see pair_score
+SCORE_TYPE = 0.3
+SCORE_SPECIES = 0.3
+SCORE_REPORTER = 0.2
+SCORE_SHARED_TAG = 0.2
+SCORE_NO_TAGS = 0.1
+
+# Half of the adjacent cells (x, y, t), so that each pair of cells is visited once
+FORWARD_NEIGHBOURS = [
+    (dx, dy, dt)
+    for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dt in (-1, 0, 1)
+    if (dx, dy, dt) > (0, 0, 0)
+]
+
+
+def load_encounters(queryset=None):
+    """Return Encounters as tuples for duplicate detection.
+
+    Returns:
+    A list of (pk, longitude, latitude, when, encounter_type, species, reporter_id)
+    """
+    from wastd.observations.models import Encounter
+
+    qs = (Encounter.objects.all() if queryset is None else queryset).non_polymorphic()
+    return list(qs.exclude(where=None).annotate(
+        x=Func(F("where"), function="ST_X", output_field=FloatField()),
+        y=Func(F("where"), function="ST_Y", output_field=FloatField()),
+        animal_species=Coalesce("animalencounter__species", "turtlenestencounter__species"),
+    ).values_list("pk", "x", "y", "when", "encounter_type", "animal_species", "reporter_id").order_by())
+
+
+def to_metres(lon, lat):
+    """Return an equirectangular projection of WGS84 coordinates in metres."""
+    return (lon * METRES_PER_DEGREE * math.cos(math.radians(lat)), lat * METRES_PER_DEGREE)
+
+
+def candidate_pairs(records, distance_m, minutes):
+    """Return all pairs of records within distance_m metres and minutes of each other.
+
+    Arguments:
+    records A list of tuples as returned by ``load_encounters``
+    distance_m The maximum distance in metres
+    minutes The maximum time difference in minutes
+
+    Returns:
+    A list of pairs of indexes into records.
+    """
+    seconds = minutes * 60.0
+    points = []
+    buckets = defaultdict(list)
+    for i, (pk, lon, lat, when, *rest) in enumerate(records):
+        x, y = to_metres(lon, lat)
+        t = when.timestamp()
+        points.append((x, y, t))
+        buckets[(int(x // distance_m), int(y // distance_m), int(t // seconds))].append(i)
+
+    def close(i, j):
+        (xi, yi, ti), (xj, yj, tj) = points[i], points[j]
+        return abs(ti - tj) <= seconds and (xi - xj) ** 2 + (yi - yj) ** 2 <= distance_m ** 2
+
+    pairs = []
+    for (cx, cy, ct), members in buckets.items():
+        for n, i in enumerate(members):
+            pairs.extend((i, j) for j in members[n + 1:] if close(i, j))
+        for dx, dy, dt in FORWARD_NEIGHBOURS:
+            neighbours = buckets.get((cx + dx, cy + dy, ct + dt))
+            if neighbours:
+                pairs.extend((i, j) for i in members for j in neighbours if close(i, j))
+    return pairs
+
+
+def load_tags(encounter_ids, chunk_size=10000):
+    """Return a dict of encounter_id: set of tag names for the given Encounters."""
+    from wastd.observations.models import TagObservation
+
+    tags = defaultdict(set)
+    ids = list(encounter_ids)
+    for start in range(0, len(ids), chunk_size):
+        for encounter_id, name in TagObservation.objects.non_polymorphic().filter(
+                encounter_id__in=ids[start:start + chunk_size]).values_list("encounter_id", "name"):
+            tags[encounter_id].add(name)
+    return tags
+
+
+def pair_score(a, b, tags_a, tags_b):
+    """Return how likely two Encounters are duplicates, from 0 to 1.
+
+    Points are given for the same encounter type, the same species,
+    the same reporter, and shared tags (or no tags at both).
+    Tags at both but none shared show different animals and score 0.
+
+    Arguments:
+    a, b Tuples as returned by ``load_encounters``
+    tags_a, tags_b The sets of tag names of a and b
+    """
+    if tags_a and tags_b and not tags_a & tags_b:
+        return 0.0
+    score = 0.0
+    if a[4] == b[4]:
+        score += SCORE_TYPE
+    if a[5] and a[5] == b[5]:
+        score += SCORE_SPECIES
+    if a[6] == b[6]:
+        score += SCORE_REPORTER
+    if tags_a & tags_b:
+        score += SCORE_SHARED_TAG
+    elif not tags_a and not tags_b:
+        score += SCORE_NO_TAGS
+    return round(score, 2)
+
+
+def find_duplicates(queryset=None, distance_m=None, minutes=None, min_score=None):
+    """Return groups of likely duplicate Encounters.
+
+    Arguments:
+    queryset An Encounter QuerySet to search, default: None (all Encounters)
+    distance_m The maximum distance in metres, default: settings.DUPLICATE_DISTANCE_M
+    minutes The maximum time difference in minutes, default: settings.DUPLICATE_MINUTES
+    min_score The minimum pair score, default: settings.DUPLICATE_MIN_SCORE
+
+    Returns:
+    A list of (score, sorted list of Encounter IDs), where score is the
+    lowest pair score joining the group.
+    """
+    distance_m = distance_m or settings.DUPLICATE_DISTANCE_M
+    minutes = minutes or settings.DUPLICATE_MINUTES
+    min_score = min_score or settings.DUPLICATE_MIN_SCORE
+
+    records = load_encounters(queryset)
+    pairs = candidate_pairs(records, distance_m, minutes)
+    tags = load_tags({records[i][0] for pair in pairs for i in pair})
+
+    uf = UnionFind()
+    group_scores = dict()
+    for i, j in pairs:
+        a, b = records[i], records[j]
+        score = pair_score(a, b, tags.get(a[0], set()), tags.get(b[0], set()))
+        if score >= min_score:
+            uf.union(a[0], b[0])
+            group_scores[(a[0], b[0])] = score
+
+    scores = defaultdict(lambda: 1.0)
+    for (a, b), score in group_scores.items():
+        root = uf.find(a)
+        scores[root] = min(scores[root], score)
+    groups = [(scores[root], sorted(members)) for root, members in uf.groups().items()]
+    logger.info("[wastd.observations.duplicates.find_duplicates] {0} Encounters, {1} candidate pairs, "
+                "{2} duplicate groups.".format(len(records), len(pairs), len(groups)))
+    return groups
+
+
+def group_key(encounter_ids):
+    """Return a stable key for a set of Encounter IDs."""
+    return hashlib.sha1(",".join(str(i) for i in sorted(encounter_ids)).encode()).hexdigest()
+
+
+def queue_duplicates(**kwargs):
+    """Find duplicate groups and add new ones to the review queue.
+
+    Groups with exactly the same Encounters as a queued group are skipped,
+    including dismissed groups.
+
+    Arguments:
+    kwargs Arguments to ``find_duplicates``
+
+    Returns:
+    The number of queued groups.
+    """
+    from wastd.observations.models import DuplicateGroup
+
+    groups = {group_key(ids): (score, ids) for score, ids in find_duplicates(**kwargs)}
+    existing = set(DuplicateGroup.objects.filter(key__in=list(groups)).values_list("key", flat=True))
+    new = [(key, score, ids) for key, (score, ids) in groups.items() if key not in existing]
+
+    with transaction.atomic():
+        created = DuplicateGroup.objects.bulk_create(
+            [DuplicateGroup(key=key, score=score) for key, score, ids in new])
+        Through = DuplicateGroup.encounters.through
+        Through.objects.bulk_create([
+            Through(duplicategroup_id=group.pk, encounter_id=encounter_id)
+            for group, (key, score, ids) in zip(created, new) for encounter_id in ids
+        ], batch_size=5000)
+    logger.info("[wastd.observations.duplicates.queue_duplicates] Queued {0} new duplicate groups.".format(
+        len(created)))
+    return len(created)
+
+
+def flag_group(group, by=None):
+    """Flag all flaggable Encounters of a DuplicateGroup and mark the group as flagged.
+
+    Encounters are flagged through the QA transition ``flag``,
+    which is only available to curated Encounters. Other Encounters are left as they are.
+
+    Returns:
+    The number of flagged Encounters.
+    """
+    flagged = 0
+    with transaction.atomic():
+        for encounter in group.encounters.all():
+            if can_proceed(encounter.flag):
+                encounter.flag(by=by)
+                encounter.save()
+                flagged += 1
+        group.status = group.STATUS_FLAGGED
+        group.reviewed_by = by
+        group.reviewed_on = timezone.now()
+        group.save()
+    return flagged
+
+
+def dismiss_group(group, by=None):
+    """Mark a DuplicateGroup as not duplicates."""
+    group.status = group.STATUS_DISMISSED
+    group.reviewed_by = by
+    group.reviewed_on = timezone.now()
+    group.save()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""Batch resolution of animal identities from TagObservations.
+
+All Encounters of one animal are linked through shared tags: an Encounter
+recording tags A and B, and a later Encounter recording tags B and C
+concern the same animal. ``Encounter.related_encounters`` walks these links
+for one Encounter, one query per tag and Encounter.
+
+``resolve_animals`` instead loads all TagObservations in one query and
+clusters their Encounters into animals with a union-find (disjoint set)
+over shared tag names. ``allocate_names`` names each animal after the
+primary flipper tag of its first new capture and writes changed names
+with bulk updates.
+"""
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class UnionFind(object):
+    """A disjoint-set forest with path compression and union by size."""
+
+    def __init__(self):
+        """Start with no elements."""
+        self.parent = dict()
+        self.size = dict()
+
+    def find(self, x):
+        """Return the representative of the set containing x, adding x if new."""
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+        root = x
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        """Merge the sets containing a and b, return the new representative."""
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return ra
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return ra
+
+    def groups(self):
+        """Return a dict of representative: list of members."""
+        groups = defaultdict(list)
+        for x in self.parent:
+            groups[self.find(x)].append(x)
+        return groups
+
+
+def load_tag_observations():
+    """Return all TagObservations as tuples for identity resolution.
+
+    Returns:
+    A list of (encounter_id, tag name, tag_type, status, tag_location, when, pk)
+    """
+    from wastd.observations.models import TagObservation
+
+    return list(TagObservation.objects.non_polymorphic().values_list(
+        "encounter_id", "name", "tag_type", "status", "tag_location", "encounter__when", "pk"))
+
+
+def resolve_animals(tag_observations):
+    """Cluster Encounters into animals over shared tag names.
+
+    Arguments:
+    tag_observations A list of tuples as returned by ``load_tag_observations``
+
+    Returns:
+    A list of sets of Encounter IDs, one set per animal.
+    """
+    uf = UnionFind()
+    first_with_tag = dict()
+    for encounter_id, name, *rest in tag_observations:
+        uf.find(encounter_id)
+        if name in first_with_tag:
+            uf.union(first_with_tag[name], encounter_id)
+        else:
+            first_with_tag[name] = encounter_id
+    return [set(members) for members in uf.groups().values()]
+
+
+def new_capture_names(tag_observations, animal_encounter_ids):
+    """Return the name of each new capture.
+
+    A new capture is an AnimalEncounter with at least one newly applied flipper tag,
+    and no re-sighted flipper tags. It is named after its primary flipper tag,
+    the flipper tag with the first tag location.
+
+    Arguments:
+    tag_observations A list of tuples as returned by ``load_tag_observations``
+    animal_encounter_ids A set of the IDs of all AnimalEncounters
+
+    Returns:
+    A dict of encounter_id: (when, name)
+    """
+    from wastd.observations.models import TAG_STATUS_APPLIED_NEW, TAG_STATUS_RESIGHTED
+
+    flipper_tags = defaultdict(list)
+    for encounter_id, name, tag_type, status, tag_location, when, pk in tag_observations:
+        if tag_type == "flipper-tag" and encounter_id in animal_encounter_ids:
+            flipper_tags[encounter_id].append((tag_location, pk, name, status, when))
+
+    names = dict()
+    for encounter_id, tags in flipper_tags.items():
+        statuses = [t[3] for t in tags]
+        if TAG_STATUS_APPLIED_NEW in statuses and not any(s in TAG_STATUS_RESIGHTED for s in statuses):
+            tag_location, pk, name, status, when = min(tags)
+            names[encounter_id] = (when, name)
+    return names
+
+
+def animal_names(tag_observations, animal_encounter_ids):
+    """Return the animal name of each Encounter with a named animal.
+
+    Each animal is named after the primary flipper tag of its earliest new capture.
+    Animals without a new capture are not named.
+
+    Returns:
+    A dict of encounter_id: name
+    """
+    captures = new_capture_names(tag_observations, animal_encounter_ids)
+    names = dict()
+    for animal in resolve_animals(tag_observations):
+        firsts = [captures[e] + (e,) for e in animal if e in captures]
+        if firsts:
+            name = min(firsts)[1]
+            names.update((e, name) for e in animal)
+    return names
+
+
+def allocate_names(batch_size=1000):
+    """Name all Encounters after their animal's first new capture.
+
+    Only Encounters whose name changed are updated, and marked to be re-rendered.
+
+    Arguments:
+    batch_size The number of Encounters per UPDATE, default: 1000
+
+    Returns:
+    A list of the IDs of renamed Encounters.
+    """
+    from wastd.observations import rendering
+    from wastd.observations.models import AnimalEncounter, Encounter
+
+    tag_observations = load_tag_observations()
+    animal_encounter_ids = set(
+        AnimalEncounter.objects.non_polymorphic().values_list("pk", flat=True))
+    names = animal_names(tag_observations, animal_encounter_ids)
+
+    current = dict(Encounter.objects.non_polymorphic().filter(
+        pk__in=list(names)).values_list("pk", "name"))
+    changed = [Encounter(pk=pk, name=name, render_dirty=True)
+               for pk, name in names.items() if current.get(pk) != name]
+    with transaction.atomic():
+        Encounter.objects.bulk_update(changed, ["name", "render_dirty"], batch_size=batch_size)
+    rendering.schedule_render()
+
+    logger.info("[wastd.observations.identity.allocate_names] Resolved {0} named Encounters "
+                "from {1} TagObservations, renamed {2}.".format(
+                    len(names), len(tag_observations), len(changed)))
+    return [e.pk for e in changed]
@@ -0,0 +1,6 @@
+# -*- coding: utf-8 -*-
+"""Importers for ODK Aggregate and legacy data.
+
+The modules in this package depend on pandas, requests and xmltodict,
+and are imported on demand only.
+"""
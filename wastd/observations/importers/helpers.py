@@ -0,0 +1,950 @@
+# -*- coding: utf-8 -*-
+"""Helpers shared by the ODK Aggregate and legacy data importers.
+
+User and choice mappings, ODK geometry parsing, photo attachments,
+observation handlers, and the create/update/skip logic for QA'd records.
+"""
+import json
+import logging
+import os
+from datetime import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import LineString, Point
+from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
+from django.core.files import File
+from shared.utils import sanitize_tag_label
+
+from wastd.observations.media import fetch as fetch_media
+from wastd.observations.models import *
+
+logger = logging.getLogger(__name__)
+
+
+def int_or_none(string):
+    """Return the string as Integer or return None."""
+    try:
+        return int(string)
+    except:
+        return None
+
+
+def float_or_none(string):
+    """Return the string as Integer or return None."""
+    try:
+        return float(string)
+    except:
+        return None
+
+
+def str_or_na(string):
+    """Return the string or "na". """
+    try:
+        return string
+    except:
+        return "na"
+
+
+# -----------------------------------------------------------------------------#
+# Data import from ODK Aggregate
+# TODO create and use writable API
+#
+def lowersnake(unsafe_string):
+    """Slugify an unsafe string, e.g. turn a full name into a username."""
+    return unsafe_string.replace(" ", "_").replace(".", "_").replace("-", "_").lower()
+
+
+def upperwhite(safe_string):
+    """Return a username as full name."""
+    return safe_string.replace("_", " ").title()
+
+
+def make_user(d):
+    """Get or create a user.
+
+    Arguments:
+
+    d A Dict with keys:
+
+    name A human readable full name, required.
+        The unique username will be inferred through lowersnake(name).
+    email A valid email, optional.
+    phone A phone number, optional.
+    role A role description, optional.
+
+    Usage:
+    import sys; reload(sys); sys.setdefaultencoding('UTF8')
+    from wastd.observations.utils import *; import csv
+    with open("data/staff.csv") as df:
+        [make_user(u) for u in csv.DictReader(df)]
+
+    """
+    usermodel = get_user_model()
+    un = lowersnake(d["name"])
+
+    usr, created = usermodel.objects.get_or_create(username=un)
+    action = "created" if created else "found"
+    msg = "[make_user] {0} {1} ({2})".format(action, d["name"], un)
+
+    usr.name = d["name"]
+
+    usr.phone = d["phone"].replace(" ", "")
+    msg += ", phone updated"
+
+    usr.email = d["email"]
+    msg += ", email updated"
+
+    usr.role = d["role"]
+    msg += ", role updated"
+
+    if created:
+        usr.set_password(settings.DEFAULT_USER_PASSWORD)
+
+    usr.save()
+    logger.info(msg)
+    return usr
+
+
+def guess_user(un, default_username="FlorianM"):
+    """Find exact or fuzzy match of username, or create User.
+
+    Returns:
+
+    * An exact username match for lowersnake(un), or
+    * an exact name match for un, or
+    * the best or only trigram match of both username against lowersnake(un)
+      and name, nickname, and aliases against un, or
+    * if no match: a new user account for username lowersnake(un) and name un.
+
+    Arguments
+
+    un A name
+    default_username The default username if un is None
+
+    Returns
+    A dict of
+
+    user: An instance of settings.AUTH_USER_MODEL
+    message: The debug message
+    """
+    usermodel = get_user_model()
+    name = default_username if not un else un
+    username = default_username if not un else lowersnake(un)
+
+    try:
+        usr = usermodel.objects.get(username=username)
+        msg = "[guess_user][OK] Exact match for username {username} is {user}."
+
+    except ObjectDoesNotExist:
+
+        try:
+            usr = usermodel.objects.get(name=name)
+            msg = "[guess_user][OK] Exact match for name {name} is {user}."
+
+        except MultipleObjectsReturned:
+            usr = usermodel.objects.filter(name=name).first()
+            msg = "[guess_user][PROBLEM] Duplicate match for name {name}, picking {user}."
+
+        except ObjectDoesNotExist:
+            usrs = usermodel.objects.filter(username__trigram_similar=username,
+                                            name__trigram_similar=name,
+                                            nickname__trigram_similar=name,
+                                            aliases__trigram_similar=name)
+            if usrs.count() == 0:
+                usr = usermodel.objects.create(username=username, name=name)
+                msg = "[guess_user][CREATED] username {username} and name {name} not found. Created {user}."
+            elif usrs.count() == 1:
+                usr = usrs[0]
+                msg = "[guess_user][OK] Only match for username {username} and name {name} is {user}."
+            else:
+                usr = usrs[0]
+                msg = "[guess_user][NEEDS QA] Best match for username {username} and name {name} is {user}."
+
+    msgdict = {"username": username, "name": name, "user": usr}
+    message = msg.format(**msgdict)
+    logger.info(message)
+    return {'user': usr, 'message': message}
+
+
+def map_values(d):
+    """Return a dict of ODK:WAStD dropdown menu choices for a given choice dict.
+
+    Arguments
+
+    d The dict_name, e.g. NEST_TYPE_CHOICES
+
+    Returns
+
+    A dict of ODK (keys) to WAStD (values) choices, e.g. NEST_TYPE_CHOICES
+    {u'falsecrawl': 'false-crawl',
+     'hatchednest': 'hatched-nest',
+     'nest': 'nest',
+     'successfulcrawl': 'successful-crawl',
+     'tracknotassessed': 'track-not-assessed',
+     'trackunsure': 'track-unsure'}
+    """
+    return {k.replace("-", ""): k for k in dict(d).keys()}
+
+
+def keep_values(d):
+    """Return a dict of WAStD:WAStD dropdown menu choices for a given choice dict.
+
+    This is handy to generate a combined ODK and WAStD lookup.
+
+    Arguments
+
+    d The dict_name, e.g. NEST_TYPE_CHOICES
+
+    Returns
+
+    A dict of WAStD (keys) to WAStD (values) choices, e.g. NEST_TYPE_CHOICES
+    {u'false-crawl': 'false-crawl',
+     'hatched-nest': 'hatched-nest',
+     'nest': 'nest',
+     'successful-crawl': 'successful-crawl',
+     'track-not-assessed': 'track-not-assessed',
+     'track-unsure': 'track-unsure'}
+    """
+    return {k: k for k in dict(d).keys()}
+
+
+def map_and_keep(d):
+    """Return the combined result of keep_values and map_values."""
+    a = map_values(d)
+    b = keep_values(d)
+    a.update(b)
+    return a
+
+
+def read_odk_linestring(odk_str):
+    """Convert an ODK LineString string to a Django LineString."""
+    # in: "-31.99656982 115.88441855 0.0 0.0;-31.9965685 115.88441522 0.0 0.0;"
+    # out: Line(Point(115.88441855 -31.99656982) Point(115.88441522 -31.9965685))
+    return LineString(
+        [Point(float(c[1]), float(c[0])) for c in
+         [p.strip().split(" ")
+          for p in odk_str.split(";")
+          if len(p) > 0]
+         ]
+    )
+
+
+def odk_linestring_as_point(odk_str):
+    """Return the first point of an ODK LineString as Django Point."""
+    point_str = odk_str.split(";")[0].split(" ")
+    return Point(float(point_str[1]), float(point_str[0]))
+
+
+def odk_point_as_point(odk_str):
+    """Return an ODK Point location as Django Point."""
+    point_str = odk_str.split(" ")
+    return Point(float(point_str[1]), float(point_str[0]))
+
+
+def handle_photo(p, e, title="Track", enc=True):
+    """Create a MediaAttachment of photo p to Encounter e with a given title.
+
+    Arguments
+
+    p The filepath of a locally accessible photograph
+    e The related encounter (must exist)
+    title The attachment's title (default: "Track")
+    enc Whether to use Encounter / MediaAttachment (true, default) or
+        Expedition / FieldMediaAttachment
+    """
+    # Does the file exist locally?
+    logger.debug(
+        "  Creating photo attachment at filepath"
+        " {0} for encounter {1} with title {2}...".format(p, e.id, title))
+
+    if os.path.exists(p):
+        logger.debug("  File {0} exists".format(p))
+        with open(p, 'rb') as photo:
+            f = File(photo)
+            # Is the file a dud?
+            if f.size > 0:
+                logger.debug("  File size is {0}".format(f.size))
+
+                if enc:
+
+                    # Does the MediaAttachment exist already?
+                    if MediaAttachment.objects.filter(
+                            encounter=e, title=title).exists():
+                        m = MediaAttachment.objects.filter(
+                            encounter=e, title=title)[0]
+                        action = "updated"
+                    else:
+                        m = MediaAttachment(encounter=e, title=title)
+                        action = "Created"
+                else:
+                    # Does the MediaAttachment exist already?
+                    if FieldMediaAttachment.objects.filter(
+                            expedition=e, title=title).exists():
+                        m = FieldMediaAttachment.objects.filter(
+                            expedition=e, title=title)[0]
+                        action = "updated"
+                    else:
+                        m = FieldMediaAttachment(expedition=e, title=title)
+                        action = "Created"
+
+                # Update the file
+                m.attachment.save(p, f, save=True)
+                logger.debug("  Photo {0}: {1}".format(action, m))
+            else:
+                logger.debug("  [ERROR] zero size file {0}".format(p))
+    else:
+        logger.debug("  [ERROR] missing file {0}".format(p))
+
+
+def handle_media_attachment(e, photo_dict, title="Photo"):
+    """Download, then create or update a photo.
+
+    The photo is downloaded straight into its MediaAttachment's storage path,
+    or queued if called within a wastd.observations.media.batch().
+
+    Arguments:
+
+    e An Encounter with an attribute "source_id" (e.source_id)
+
+    {
+        "filename": "1485913363900.jpg",
+        "type": "image/jpeg",
+        "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=...",
+        "md5": "md5:6f60589b2d3fd5bb118c0287382ee734" (optional)
+    }
+    """
+    if photo_dict is None:
+        logger.debug("  ODK collect photo not taken, skipping {0}".format(title))
+        return
+
+    name = encounter_media(MediaAttachment(encounter=e), photo_dict["filename"])
+    logger.debug("  Photo storage name is {0}".format(name))
+    fetch_media(
+        photo_dict["url"],
+        name,
+        dict(model="observations.MediaAttachment",
+             lookup=dict(encounter_id=e.pk, title=title),
+             field="attachment",
+             create=True),
+        md5=photo_dict.get("md5"))
+
+
+def handle_fieldmedia_attachment(e, photo_dict, title="Photo"):
+    """Download, then create or update a photo.
+
+    Arguments:
+
+    e An Expedition
+
+    {
+        "filename": "1485913363900.jpg",
+        "type": "image/jpeg",
+        "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=...",
+        "md5": "md5:6f60589b2d3fd5bb118c0287382ee734" (optional)
+    }
+    """
+    if photo_dict is None:
+        logger.debug("  ODK collect photo not taken, skipping {0}".format(title))
+        return
+
+    name = expedition_media(FieldMediaAttachment(expedition=e), photo_dict["filename"])
+    logger.debug("  Photo storage name is {0}".format(name))
+    fetch_media(
+        photo_dict["url"],
+        name,
+        dict(model="observations.FieldMediaAttachment",
+             lookup=dict(expedition_id=e.pk, title=title),
+             field="attachment",
+             create=True),
+        md5=photo_dict.get("md5"))
+
+
+def handle_survey_photo(survey, media, photo_filename, field="start_photo"):
+    """Download a Survey or SurveyEnd photo straight into its file field.
+
+    Arguments:
+
+    survey A Survey or SurveyEnd
+    media A MediaDict of photo filename:url
+    photo_filename The photo's filename, or None if no photo was taken
+    field The name of the file field, "start_photo" or "end_photo"
+    """
+    if not photo_filename:
+        logger.debug("  [handle_survey_photo] skipping empty {0}".format(field))
+        return
+    fetch_media(
+        media[photo_filename],
+        survey_media(survey, photo_filename),
+        dict(model="observations.{0}".format(survey._meta.object_name),
+             lookup=dict(pk=survey.pk),
+             field=field),
+        md5=media.hashes.get(photo_filename))
+
+
+def handle_turtlenestdistobs(d, e, m):
+    """Get or create TurtleNestDisturbanceObservation.
+
+    Arguments
+
+    d A dictionary like
+        {
+            "disturbance_cause": "human",
+            "disturbance_cause_confidence": "expertopinion",
+            "disturbance_severity": "na",
+            "photo_disturbance": {
+                "filename": "1479173301849.jpg",
+                "type": "image/jpeg",
+                "url": "https://dpaw-data.appspot.com/view/..."
+            },
+            "comments": null
+        }
+    e The related TurtleNestEncounter (must exist)
+    m The ODK_MAPPING
+    """
+    logger.debug("  Creating TurtleNestDisturbanceObservation...")
+    dd, created = TurtleNestDisturbanceObservation.objects.get_or_create(
+        encounter=e,
+        disturbance_cause=d["disturbance_cause"],
+        disturbance_cause_confidence=m["confidence"][d["disturbance_cause_confidence"]],
+        disturbance_severity=d["disturbance_severity"],
+        comments=d["comments"]
+    )
+    dd.save()
+    action = "created" if created else "updated"
+    logger.debug("  TurtleNestDisturbanceObservation {0}: {1}".format(action, dd))
+
+    handle_media_attachment(
+        e, d["photo_disturbance"], title="Disturbance {0}".format(dd.disturbance_cause))
+
+
+def handle_turtlenestdistobs31(d, e):
+    """Get or create TurtleNestDisturbanceObservation.
+
+    Arguments
+
+    d A dictionary like
+        {
+            "disturbance_cause": "human",
+            "disturbance_cause_confidence": "expert-opinion",
+            "disturbance_severity": "na",
+            "photo_disturbance": {
+                "filename": "1479173301849.jpg",
+                "type": "image/jpeg",
+                "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+            },
+            "comments": null
+        }
+
+
+    "disturbanceobservation": [
+      {
+        "photo_disturbance": null,
+        "disturbance_cause": "pig",
+        "disturbance_cause_confidence": "guess",
+        "disturbance_severity": "partly",
+        "comments": null
+      }
+    ],
+
+    e The related (TurtleNest)Encounter (must exist)
+    """
+    logger.debug("  Creating TurtleNestDisturbanceObservation...")
+    dd, created = TurtleNestDisturbanceObservation.objects.get_or_create(
+        encounter=e,
+        disturbance_cause=d["disturbance_cause"],
+        disturbance_cause_confidence=d["disturbance_cause_confidence"],
+        comments=d["comments"]
+    )
+    if "disturbance_severity" in d:
+        dd.disturbance_severity = d["disturbance_severity"]
+    dd.save()
+    action = "created" if created else "updated"
+    logger.info("  TurtleNestDisturbanceObservation {0}: {1}".format(action, dd))
+
+    handle_media_attachment(
+        e, d["photo_disturbance"], title="Disturbance {0}".format(dd.disturbance_cause))
+
+
+def handle_turtlenestobs(d, e, m):
+    """Get or create a TurtleNestObservation and related MediaAttachments.
+
+    Arguments
+
+    d A dictionary containing at least:
+    {
+        "no_egg_shells": 120,
+        "no_live_hatchlings": 13,
+        "no_dead_hatchlings": 14,
+        "no_undeveloped_eggs": 15,
+        "no_unhatched_eggs": 16,
+        "no_unhatched_term": 17,
+        "no_depredated_eggs": 18,
+        "nest_depth_top": 19,
+        "nest_depth_bottom": 20,
+        "egg_photos": [
+            {
+                "photo_eggs": {
+                    "filename": "1485913363900.jpg",
+                    "type": "image/jpeg",
+                    "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+                }
+            },
+            {
+                "photo_eggs": {
+                    "filename": "1485913376020.jpg",
+                    "type": "image/jpeg",
+                    "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+                }
+            }
+        ],
+    }
+
+    e The related TurtleNestEncounter (must exist)
+    m The ODK_MAPPING
+    """
+    logger.debug("  Creating TurtleNestObservation...")
+    dd, created = TurtleNestObservation.objects.get_or_create(
+        encounter=e,
+        nest_position=m["habitat"][d["habitat"]],
+        no_egg_shells=d["no_egg_shells"],
+        no_live_hatchlings_neck_of_nest=d[
+            "no_live_hatchlings_neck_of_nest"] if "no_live_hatchlings_neck_of_nest" in d else None,
+        no_live_hatchlings=d["no_live_hatchlings"],
+        no_dead_hatchlings=d["no_dead_hatchlings"],
+        no_undeveloped_eggs=d["no_undeveloped_eggs"],
+        no_unhatched_eggs=d["no_unhatched_eggs"],
+        no_unhatched_term=d["no_unhatched_term"],
+        no_depredated_eggs=d["no_depredated_eggs"],
+        nest_depth_top=d["nest_depth_top"],
+        nest_depth_bottom=d["nest_depth_bottom"],
+        comments=d["comments"] if "comments" in d else ""
+    )
+    dd.save()
+    action = "created" if created else "updated"
+    logger.info("  TurtleNestObservation {0}: {1}".format(action, dd))
+
+    for idx, ep in enumerate(d["egg_photos"]):
+        handle_media_attachment(e, ep, title="Egg photo {0}".format(idx + 1))
+
+
+def handle_turtlenestobs31(d, e):
+    """Get or create a TurtleNestObservation and related MediaAttachments.
+
+    Arguments
+
+    d A dictionary containing at least:
+    {
+        "no_egg_shells": 120,
+        "no_live_hatchlings": 13,
+        "no_dead_hatchlings": 14,
+        "no_undeveloped_eggs": 15,
+        "no_unhatched_eggs": 16,
+        "no_unhatched_term": 17,
+        "no_depredated_eggs": 18,
+        "nest_depth_top": 19,
+        "nest_depth_bottom": 20,
+        "egg_photos": [
+            {
+                "photo_eggs": {
+                    "filename": "1485913363900.jpg",
+                    "type": "image/jpeg",
+                    "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey="
+                }
+            },
+            {
+                "photo_eggs": {
+                    "filename": "1485913376020.jpg",
+                    "type": "image/jpeg",
+                    "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey="
+                }
+            }
+        ],
+    }
+
+    e The related TurtleNestEncounter (must exist)
+    """
+    logger.debug("  Creating TurtleNestObservation...")
+    dd, created = TurtleNestObservation.objects.get_or_create(
+        encounter=e,
+        nest_position=d["habitat"],
+        no_egg_shells=int_or_none(d["no_egg_shells"]),
+        no_live_hatchlings_neck_of_nest=int_or_none(d[
+            "no_live_hatchlings_neck_of_nest"] if "no_live_hatchlings_neck_of_nest" in d else None),
+        no_live_hatchlings=int_or_none(d["no_live_hatchlings"]),
+        no_dead_hatchlings=int_or_none(d["no_dead_hatchlings"]),
+        no_undeveloped_eggs=int_or_none(d["no_undeveloped_eggs"]),
+        no_unhatched_eggs=int_or_none(d["no_unhatched_eggs"]),
+        no_unhatched_term=int_or_none(d["no_unhatched_term"]),
+        no_depredated_eggs=int_or_none(d["no_depredated_eggs"]),
+        nest_depth_top=int_or_none(d["nest_depth_top"]),
+        nest_depth_bottom=int_or_none(d["nest_depth_bottom"]),
+        comments=d["comments"] if "comments" in d else ""
+    )
+    dd.save()
+    action = "created" if created else "updated"
+    logger.info("  TurtleNestObservation {0}: {1}".format(action, dd))
+
+    if "egg_photos" in d:
+        [handle_media_attachment(
+            e, ep["photo_eggs"], title="Egg photo {0}".format(idx + 1))
+            for idx, ep in enumerate(d["egg_photos"])]
+
+
+def handle_turtlenesttagobs(d, e, m=None):
+    """Get or create a TagObservation and related MediaAttachments.
+
+    Arguments
+
+    d A dictionary containing at least:
+    {
+        "status": "resighted",
+        "flipper_tag_id": "S1234",
+        "date_nest_laid": "2017-02-01",
+        "tag_label": "M1",
+        "tag_comments": "test info",
+        "photo_tag": {
+            "filename": "1485913419914.jpg",
+            "type": "image/jpeg",
+            "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+
+    e The related TurtleNestEncounter (must exist)
+    m The ODK_MAPPING
+    """
+    if (d["flipper_tag_id"] is None and
+            d["date_nest_laid"] is None and
+            d["tag_label"] is None):
+        return None
+
+    else:
+        logger.info("[handle_turtlenesttagobs] looks like we have required fields")
+        dd, created = NestTagObservation.objects.get_or_create(
+            encounter=e,
+            status=m["tag_status"][d["status"]] if m else d["status"],
+            flipper_tag_id=sanitize_tag_label(d["flipper_tag_id"]),
+            date_nest_laid=datetime.strptime(d["date_nest_laid"], '%Y-%m-%d') if d["date_nest_laid"] else None,
+            tag_label=sanitize_tag_label(d["tag_label"]))
+        logger.debug("[handle_turtlenesttagobs] created new NTO")
+        dd.save()
+        logger.debug("[handle_turtlenesttagobs] saved NTO")
+        action = "created" if created else "updated"
+        logger.info("  NestTagObservation {0}: {1}".format(action, dd))
+
+    logger.debug("[handle_turtlenesttagobs] handle photo")
+    handle_media_attachment(e, d["photo_tag"], title="Nest tag photo")
+    logger.debug("[handle_turtlenesttagobs] done!")
+    return None
+
+
+def handle_hatchlingmorphometricobs(d, e):
+    """Get or create a HatchlingMorphometricObservation.
+
+    Arguments
+
+    d A dictionary like
+        {
+            "straight_carapace_length_mm": 12,
+            "straight_carapace_width_mm": 13,
+            "body_weight_g": 14
+        }
+    e The related TurtleNestEncounter (must exist)
+    """
+    logger.debug("  Creating Hatchling Obs...")
+    scl = int(d["straight_carapace_length_mm"]) if d["straight_carapace_length_mm"] else None
+    scw = int(d["straight_carapace_width_mm"]) if d["straight_carapace_width_mm"] else None
+    bwg = int(d["body_weight_g"]) if d["body_weight_g"] else None
+
+    dd, created = HatchlingMorphometricObservation.objects.get_or_create(
+        encounter=e,
+        straight_carapace_length_mm=scl,
+        straight_carapace_width_mm=scw,
+        body_weight_g=bwg
+    )
+    dd.save()
+    action = "created" if created else "updated"
+    logger.info("  Hatchling Obs {0}: {1}".format(action, dd))
+
+
+def handle_loggerenc(d, e):
+    """Get or create a LoggerEncounter with photo and nest tag obs.
+
+    If the related TurtleNestEncounter e has a NestTagObservation, an idential
+    NTO will be created for the LoggerEncounter. This will allow to traverse
+    the list of NestTagObservations by name to link related AnimalEncounters
+    (when labelling a nest during a tagging), TurtleNestEncounters (when
+    excavating a hatched nest) and LoggerEncounters (when retrieving loggers
+    from the excavated, tagged nest).
+
+    Arguments
+
+    d A dictionary like
+        {
+            "logger_id": "S1235",
+            "photo_logger": {
+                "filename": "1485913441063.jpg",
+                "type": "image/jpeg",
+                "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+            }
+        }
+    e The related TurtleNestEncounter (must exist)
+    """
+    logger.debug("  Creating LoggerEncounter...")
+    dd, created = LoggerEncounter.objects.get_or_create(
+        source=e.source,
+        source_id="{0}-{1}".format(e.source_id, d["logger_id"]))
+
+    dd.where = e.where
+    dd.when = e.when
+    dd.location_accuracy = e.location_accuracy
+    dd.observer = e.observer
+    dd.reporter = e.reporter
+    dd.deployment_status = "retrieved"
+    dd.logger_id = d["logger_id"]
+
+    dd.save()
+    action = "created" if created else "updated"
+    logger.debug("  LoggerEncounter {0}: {1}".format(action, dd))
+
+    handle_media_attachment(dd, d["photo_logger"], title="Logger ID")
+
+    # If e has NestTagObservation, replicate NTO on LoggerEncounter
+    if e.observation_set.instance_of(NestTagObservation).exists():
+        logger.debug("  TurtleNestEncounter has nest tag, replicating nest tag observation on LoggerEncounter...")
+        nto = e.observation_set.instance_of(NestTagObservation).first()
+        NestTagObservation.objects.get_or_create(
+            encounter=e,
+            status=nto.status,
+            flipper_tag_id=nto.flipper_tag_id,
+            date_nest_laid=nto.date_nest_laid,
+            tag_label=nto.tag_label,
+        )
+        nto.save()
+        action = "created" if created else "updated"
+        logger.info("  NestTag Observation {0} for {1}".format(action, nto))
+
+
+def handle_turtlenestdisttallyobs(d, e, m=None):
+    """Get or create a TurtleNestDisturbanceObservation.
+
+    Arguments
+
+    d A dictionary like
+        {
+            "disturbance_cause": "cyclone",
+            "no_nests_disturbed": 5,
+            "no_tracks_encountered": 4,
+            "disturbance_comments": "test"
+        }
+    e The related TurtleNestEncounter (must exist)
+    m The ODK_MAPPING
+    """
+    logger.debug("  Found disturbance observation...")
+
+    dd, created = TurtleNestDisturbanceTallyObservation.objects.get_or_create(
+        encounter=e,
+        disturbance_cause=d["disturbance_cause"],
+        no_nests_disturbed=d["no_nests_disturbed"] or 0,
+        no_tracks_encountered=d["no_tracks_encountered"] or 0,
+        comments=d["disturbance_comments"]
+    )
+    dd.save()
+    action = "created" if created else "updated"
+    logger.info("  Disturbance observation {0}: {1}".format(action, dd))
+    e.save()  # cache distobs in HTML
+
+
+def make_tallyobs(encounter, species, nest_age, nest_type, tally_number):
+    """Create a TrackTallyObservation."""
+    t, created = TrackTallyObservation.objects.get_or_create(
+        encounter=encounter,
+        species=species,
+        nest_age=nest_age,
+        nest_type=nest_type,
+        tally=tally_number
+    )
+    logger.info('  Tally (created: {0}) {1}'.format(created, t))
+
+
+def sanitize_tag_name(name):
+    """Return a string capitalised and stripped of all whitespace."""
+    return sanitize_tag_label(name)
+
+
+def make_tag_side(side, position):
+    """Return the WAStD tag_position from WAMTRAM side and position.
+
+    Arguments:
+
+    side The WAMTRAM tag side, values: NA L R
+    position The WAMTRAM tag position, values: NA 1 2 3
+
+    Return
+    The WAStD tag_position, e.g. flipper-front-left-1 or flipper-front-right-3
+    """
+    side_dict = {
+        "NA": "left",
+        "L": "left",
+        "R": "right"
+    }
+    pos_dict = {
+        "NA": "1",
+        "1": "1",
+        "2": "2",
+        "3": "3"
+    }
+    return "flipper-front-{0}-{1}".format(side_dict[side], pos_dict[position])
+
+
+# ---------------------------------------------------------------------------#
+# Munging JSON output from odka_*
+#
+def make_data(odka_dict):
+    """Return a dict of filename:downloadUrl of an ODK-A submission dict.
+
+    Arguments:
+    odka_dict An ODK-A submission parsed with xmltojson.
+
+    Returns:
+        The sub-node odka_dict["submission"]["data"]["data"]
+    """
+    return odka_dict["submission"]["data"]["data"]
+
+
+class MediaDict(dict):
+    """A dict of filename:downloadUrl which also keeps the files' md5 hashes.
+
+    The hashes are kept in ``hashes`` as filename:"md5:..." pairs.
+    """
+
+    def __init__(self, media_files=()):
+        """Build from a list of ODK-A mediaFile dicts."""
+        super(MediaDict, self).__init__()
+        self.hashes = dict()
+        for mf in media_files:
+            self[mf["filename"]] = mf["downloadUrl"]
+            self.hashes[mf["filename"]] = mf.get("hash")
+
+
+def make_media(odka_dict):
+    """Return a dict of filename:downloadUrl of an ODK-A submission dict.
+
+    Arguments:
+    odka_dict An ODK-A submission parsed with xmltojson.
+
+    Returns:
+        A MediaDict with zero to many filename:downloadUrl key-value pairs.
+    """
+    if "mediaFile" in odka_dict["submission"]:
+        mf = odka_dict["submission"]["mediaFile"]
+        if "filename" in mf:
+            logger.debug("[make_media] found single mediaFile")
+            return MediaDict([mf])
+        elif len(mf) > 0 and "filename" in mf[0]:
+            logger.debug("[make_media] found multiple mediaFiles")
+            return MediaDict(mf)
+        else:
+            logger.debug("[make_media] WARNING unknown data: {0}".format(
+                json.dumps(mf, indent=2)))
+            return MediaDict()
+    else:
+        logger.debug("[make_media] no mediaFile found")
+        return MediaDict()
+
+
+def make_photo_dict(filename, media):
+    """Generate a photo dict (filename, url, md5) as in the ODKA JSON export."""
+    if filename and filename in media:
+        return dict(filename=filename, url=media[filename], md5=media.hashes.get(filename))
+    else:
+        return None
+
+
+def listify(x):
+    """Wrap x in a list and return x if it already is a list or None.
+
+    This re-instates the incorrectly flattened lists with one element from xmltojson,
+    where repeating groups with only one element are flattened to a dict of the group.
+
+    Returns:
+
+    None > None
+    {} > [{}, ]
+    [] > []
+    """
+    if x:
+        if type(x) == list:
+            return x
+        else:
+            return [x, ]
+    else:
+        return None
+
+
+# ---------------------------------------------------------------------------#
+# Update logic for WAStD's custom QA django-fsm status
+#
+def create_update_skip(
+        unique_data,
+        extra_data=dict(),
+        cls=Encounter,
+        base_cls=Encounter,
+        retain_qa=True):
+    """Create, update or skip Encounter.
+
+    From minimal required data, create (if not existing),
+    update (if unchanged) or skip (if changed) an Encounter.
+
+
+    Arguments:
+    source An existing WAStD data source, e.g. "odk"
+    source_id The unique source ID for a record, e.g. the instanceID of an ODK submission.
+    unique_data A dict of arguments to base_cls.objects.filter(**unique_data), as
+        defined in base_cls.meta.unique_together or as unique=true on fields.
+    extra_data A dict of required fields to create a minimum new cls instance.
+        Default: dict()
+    cls The class to instantiate. Default: Encounter.
+    base_cls The base class to filter for unique_data.
+        This is required for polymorphic classes.
+        Default: Encounter.
+    retain_qa Whether to retain qa'd instances (proofread or higher Encounters).
+        Default: True. Set to false for models without QA status.
+
+    Returns:
+
+    If Encounter exists with STATUS_NEW, it already has been imported, but no
+    QA actions have updated the data, so the original data before import is
+    deemed the point of truth. The Encounter can safely be overwritten.
+    Returns updated Encounter and action verb "overwrite".
+
+    If Encounter exists with a status other than STATUS_NEW, this means that QA operators
+    have deemed this record the point of truth.
+    Returns the skipped Encounter and action verb "skip".
+
+    If the Encounter does not exist, it needs to be created.
+    Returns newly created Encounter and action verb "create".
+    """
+    enc = base_cls.objects.filter(**unique_data)
+    if enc.exists():
+        if (not retain_qa) or (enc.first().status == Encounter.STATUS_NEW):
+            action = "update"
+            instantiated = cls.objects.filter(pk=enc.first().pk)
+            instantiated.update(**extra_data)
+            e = enc.first()
+            msg = "[create_update_skip] Updating unchanged existing record {0}...".format(e.__str__())
+            e.save()
+        else:
+            action = "skip"
+            e = enc.first()
+            msg = "[create_update_skip] Skipping existing curated record {0}...".format(e.__str__())
+    else:
+        action = "create"
+        data = unique_data
+        data.update(extra_data)
+        e = cls.objects.create(**data)
+        e.save()
+        msg = "[create_update_skip] Created new record {0}".format(e.__str__())
+
+    logger.info(msg)
+    logger.info("[create_update_skip] Done, returning record.")
+    return (e, action)
@@ -0,0 +1,1773 @@
+# -*- coding: utf-8 -*-
+"""Legacy data importers.
+
+Imports ODK Aggregate JSON exports of retired forms, WAMTRAM 2 encounters and
+tags, and the cetacean and pinniped strandings databases.
+
+This module is only imported on demand, e.g. from a shell::
+
+    from wastd.observations.importers.legacy import *
+    import_odk('data/cetaceans.csv', flavour="cet")
+"""
+import csv
+import json
+import logging
+
+from dateutil import parser
+from django.contrib.gis.geos import Point
+from django.utils.dateparse import parse_datetime
+from shared.utils import sanitize_tag_label
+
+from wastd.observations.importers.helpers import *
+from wastd.observations import stats
+from wastd.observations.rendering import suspend_rendering
+from wastd.observations.models import *
+
+logger = logging.getLogger(__name__)
+
+
+def import_one_record_tt034(r, m):
+    """Import one ODK Track or Treat 0.34 record into WAStD.
+
+    The only change vs tt026 is that ODK now allows dashes in choice values.
+    The following choices are now are identical to WAStD
+    and do not require a mapping any longer:
+
+    * species
+    * nest_type
+    * habitat
+    * disturbance evident
+    * disturbance_cause_confidence
+    * status (tag status)
+
+    Arguments
+
+    r The record as dict
+
+    m The mapping of ODK to WAStD choices
+
+    Existing records will be overwritten.
+    Make sure to skip existing records which should be retained.
+    """
+    src_id = r["instanceID"]
+
+    new_data = dict(
+        source="odk",
+        source_id=src_id,
+        where=Point(r["observed_at:Longitude"], r["observed_at:Latitude"]),
+        when=parse_datetime(r["observation_start_time"]),
+        location_accuracy="10",
+        observer=m["users"][r["reporter"]],
+        reporter=m["users"][r["reporter"]],
+        nest_age=r["nest_age"],
+        nest_type=m["nest_type"][r["nest_type"]],
+        species=m["species"][r["species"]],
+        # comments
+    )
+    if r["nest_type"] in ["successfulcrawl", "nest", "hatchednest"]:
+        new_data["habitat"] = m["habitat"][r["habitat"]]
+        new_data["disturbance"] = r["disturbance"]
+
+    if src_id in m["overwrite"]:
+        logger.debug("Updating unchanged existing record {0}...".format(src_id))
+        TurtleNestEncounter.objects.filter(source_id=src_id).update(**new_data)
+        e = TurtleNestEncounter.objects.get(source_id=src_id)
+    else:
+        logger.debug("Creating new record {0}...".format(src_id))
+        e = TurtleNestEncounter.objects.create(**new_data)
+
+    e.save()
+
+    handle_media_attachment(e, r["photo_track"], title="Track")
+    handle_media_attachment(e, r["photo_nest"], title="Nest")
+
+    # TurtleNestDisturbanceObservation, MediaAttachment "Photo of disturbance"
+    [handle_turtlenestdistobs31(distobs, e)
+     for distobs in r["disturbanceobservation"]
+     if r["disturbance"] and len(r["disturbanceobservation"]) > 0]
+
+    # TurtleNestObservation
+    if r["eggs_counted"] == "yes":
+        handle_turtlenestobs31(r, e)
+
+    # NestTagObservation
+    if r["nest_tagged"]:
+        handle_turtlenesttagobs(r, e, m)
+
+    # HatchlingMorphometricObservation
+    [handle_hatchlingmorphometricobs(ho, e)
+     for ho in r["hatchling_measurements"]
+     if len(r["hatchling_measurements"]) > 0]
+
+    # LoggerEncounter retrieved HOBO logger
+    [handle_loggerenc(lg, e)
+     for lg in r["logger_details"]
+     if len(r["logger_details"]) > 0]
+
+    logger.info(" Saved {0}\n".format(e))
+    e.save()
+    return e
+
+
+def import_one_record_tt036(r, m):
+    """Import one ODK Track or Treat 0.35 or 0.36 record into WAStD.
+
+    The only change vs tt026 is that ODK now allows dashes in choice values.
+    The changes to tt034 are differently named track and nest photos.
+    The following choices are now are identical to WAStD
+    and do not require a mapping any longer:
+
+    * species
+    * nest_type
+    * habitat
+    * disturbance evident
+    * disturbance_cause_confidence
+    * status (tag status)
+
+    Arguments
+
+    r The record as dict
+
+    m The mapping of ODK to WAStD choices
+
+    Existing records will be overwritten.
+    Make sure to skip existing records which should be retained.
+    """
+    src_id = r["instanceID"]
+
+    new_data = dict(
+        source="odk",
+        source_id=src_id,
+        where=Point(r["observed_at:Longitude"], r["observed_at:Latitude"]),
+        when=parse_datetime(r["observation_start_time"]),
+        location_accuracy="10",
+        observer=m["users"][r["reporter"]],
+        reporter=m["users"][r["reporter"]],
+        nest_age=r["nest_age"],
+        nest_type=r["nest_type"],
+        species=r["species"],
+        # comments
+    )
+    if r["nest_type"] in ["successful-crawl", "nest", "hatched-nest"]:
+        new_data["habitat"] = r["habitat"]
+        new_data["disturbance"] = r["disturbance"]
+
+    if src_id in m["overwrite"]:
+        logger.debug("Updating unchanged existing record {0}...".format(src_id))
+        TurtleNestEncounter.objects.filter(source_id=src_id).update(**new_data)
+        e = TurtleNestEncounter.objects.get(source_id=src_id)
+    else:
+        logger.debug("Creating new record {0}...".format(src_id))
+        e = TurtleNestEncounter.objects.create(**new_data)
+
+    e.save()
+
+    handle_media_attachment(e, r["photo_track_1"], title="Uptrack")
+    handle_media_attachment(e, r["photo_track_2"], title="Downtrack")
+    handle_media_attachment(e, r["photo_nest_1"], title="Nest 1")
+    handle_media_attachment(e, r["photo_nest_2"], title="Nest 2")
+    handle_media_attachment(e, r["photo_nest_3"], title="Nest 3")
+
+    # TurtleNestDisturbanceObservation, MediaAttachment "Photo of disturbance"
+    [handle_turtlenestdistobs31(distobs, e)
+     for distobs in r["disturbanceobservation"]
+     if r["disturbance"] and len(r["disturbanceobservation"]) > 0]
+
+    # TurtleNestObservation
+    if r["eggs_counted"] == "yes":
+        handle_turtlenestobs31(r, e)
+
+    # NestTagObservation
+    if r["nest_tagged"]:
+        handle_turtlenesttagobs(r, e, m)
+
+    # HatchlingMorphometricObservation
+    [handle_hatchlingmorphometricobs(ho, e)
+     for ho in r["hatchling_measurements"]
+     if len(r["hatchling_measurements"]) > 0]
+
+    # LoggerEncounter retrieved HOBO logger
+    [handle_loggerenc(lg, e)
+     for lg in r["logger_details"]
+     if len(r["logger_details"]) > 0]
+
+    logger.info(" Saved {0}\n".format(e))
+    e.save()
+    return e
+
+
+def import_one_record_fs03(r, m):
+    """Import one ODK Fox Sake 0.3 record into WAStD.
+
+    The following choices are now are identical to WAStD
+    and do not require a mapping any longer:
+
+    * disturbance evident
+    * disturbance_cause_confidence
+
+    Arguments
+
+    r The record as dict
+
+    m The mapping of ODK to WAStD choices
+
+    Existing records will be overwritten.
+    Make sure to skip existing records which should be retained.
+    """
+    src_id = r["instanceID"]
+
+    new_data = dict(
+        source="odk",
+        source_id=src_id,
+        where=Point(r["location:Longitude"], r["location:Latitude"]),
+        when=parse_datetime(r["observation_start_time"]),
+        location_accuracy="10",
+        observer=m["users"][r["reporter"]],
+        reporter=m["users"][r["reporter"]]
+    )
+
+    if src_id in m["overwrite"]:
+        logger.debug("Updating unchanged existing record {0}...".format(src_id))
+        Encounter.objects.filter(source_id=src_id).update(**new_data)
+        e = Encounter.objects.get(source_id=src_id)
+    else:
+        logger.debug("Creating new record {0}...".format(src_id))
+        e = Encounter.objects.create(**new_data)
+
+    e.save()
+
+    handle_turtlenestdistobs31(r, e)
+
+    logger.info(" Saved {0}\n".format(e))
+    e.save()
+    return e
+
+
+def import_one_record_mwi01(r, m):
+    """Import one ODK Marine wildlife Incident 0.1 record into WAStD.
+
+    Arguments
+
+    r The record as dict
+
+    m The mapping of ODK to WAStD choices
+
+    Existing records will be overwritten.
+    Make sure to skip existing records which should be retained.
+
+    Input: a dict like
+
+    {
+    "instanceID": "uuid:2273f52a-276a-4972-bc45-034626a3c278",
+    "observation_start_time": "2017-08-15T04:17:31.194Z",
+    "reporter": null,
+    "observed_at:Latitude": -15.7072566667,
+    "observed_at:Longitude": 124.4008183333,
+    "observed_at:Altitude": -7.6,
+    "observed_at:Accuracy": 5.8,
+    "location_comment": null,
+    "incident_time": "2017-08-15T04:17:00.000Z",
+    "habitat": "beach",
+    "photo_habitat": {
+      "filename": "1502770702714.jpg",
+      "type": "image/jpeg",
+      "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "species": "turtle",
+    "maturity": "na",
+    "sex": "na",
+    "photo_carapace_top": null,
+    "photo_head_top": null,
+    "photo_head_side": null,
+    "photo_head_front": null,
+    "activity": "beachwashed",
+    "health": "na",
+    "behaviour": null,
+    "cause_of_death": "na",
+    "cause_of_death_confidence": "na",
+    "checked_for_injuries": "na",
+    "scanned_for_pit_tags": "na",
+    "checked_for_flipper_tags": "na",
+    "samples_taken": "na",
+    "damage_observation": [],
+    "tag_observation": [],
+    "curved_carapace_length_mm": null,
+    "curved_carapace_length_accuracy": "10",
+    "curved_carapace_width_mm": null,
+    "curved_carapace_width_accuracy": "10",
+    "tail_length_carapace_mm": null,
+    "tail_length_carapace_accuracy": "10",
+    "maximum_head_width_mm": null,
+    "maximum_head_width_accuracy": "10",
+    "photo_habitat_2": null,
+    "photo_habitat_3": null,
+    "photo_habitat_4": null,
+    "observation_end_time": "2017-08-15T04:18:55.033Z"
+    },
+    {
+    "instanceID": "uuid:87fcedb9-05ba-476e-90c0-9bfa40faf7f2",
+    "observation_start_time": "2017-10-24T23:26:00.396Z",
+    "reporter": "florianm",
+    "observed_at:Latitude": -31.9413368,
+    "observed_at:Longitude": 115.9716166,
+    "observed_at:Altitude": 0e-10,
+    "observed_at:Accuracy": 22.092,
+    "location_comment": null,
+    "incident_time": "2017-10-24T23:26:00.000Z",
+    "habitat": "harbour",
+    "photo_habitat": {
+      "filename": "1508887643518.jpg",
+      "type": "image/jpeg",
+      "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "species": "flatback",
+    "maturity": "adult",
+    "sex": "female",
+    "photo_carapace_top": {
+      "filename": "1508887669660.jpg",
+      "type": "image/jpeg",
+      "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "photo_head_top": {
+      "filename": "1508887683511.jpg",
+      "type": "image/jpeg",
+      "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "photo_head_side": {
+      "filename": "1508887698795.jpg",
+      "type": "image/jpeg",
+      "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "photo_head_front": {
+      "filename": "1508887714082.jpg",
+      "type": "image/jpeg",
+      "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "activity": "beachwashed",
+    "health": "deadedible",
+    "behaviour": "condition comments",
+    "cause_of_death": "poisoned",
+    "cause_of_death_confidence": "expertopinion",
+    "checked_for_injuries": "present",
+    "scanned_for_pit_tags": "present",
+    "checked_for_flipper_tags": "present",
+    "samples_taken": "present",
+    "damage_observation": [
+      {
+        "photo_damage": {
+          "filename": "1508887793593.jpg",
+          "type": "image/jpeg",
+          "url": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+        },
+        "body_part": "flipperfrontright",
+        "damage_type": "other",
+        "damage_age": "fresh",
+        "description": null
+      }
+    ],
+    "tag_observation": [
+      {
+        "photo_tag": {
+          "filename": "1508887828938.jpg",
+          "type": "image/jpeg",
+          "url":
+            "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+        },
+        "name": "wa1234",
+        "tag_type": "flippertag",
+        "tag_location": "flipperfrontright1",
+        "tag_status": "resighted",
+        "tag_comments": null
+      }
+    ],
+    "curved_carapace_length_mm": 890,
+    "curved_carapace_length_accuracy": "10",
+    "curved_carapace_width_mm": 560,
+    "curved_carapace_width_accuracy": "10",
+    "tail_length_carapace_mm": 210,
+    "tail_length_carapace_accuracy": "10",
+    "maximum_head_width_mm": 125,
+    "maximum_head_width_accuracy": "10",
+    "photo_habitat_2": {
+      "filename": "1508887910356.jpg",
+      "type": "image/jpeg",
+      "url":
+        "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "photo_habitat_3": {
+      "filename": "1508887919139.jpg",
+      "type": "image/jpeg",
+      "url":
+        "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "photo_habitat_4": {
+      "filename": "1508887930269.jpg",
+      "type": "image/jpeg",
+      "url":
+        "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+    },
+    "observation_end_time": "2017-10-24T23:32:20.630Z"
+    }
+    """
+    src_id = r["instanceID"]
+
+    new_data = dict(
+        source="odk",
+        source_id=src_id,
+        where=Point(r["observed_at:Longitude"], r["observed_at:Latitude"]),
+        when=parse_datetime(r["observation_start_time"]),
+        location_accuracy="10",
+        observer=m["users"][r["reporter"]],
+        reporter=m["users"][r["reporter"]],
+        species=m["species"][r["species"]],
+        habitat=m["habitat"][r["habitat"]],
+        maturity=m["maturity"][r["maturity"]],
+        sex=r["sex"],
+        activity=m["activity"][r["activity"]],
+        health=m["health"][r["health"]],
+        cause_of_death=m["cause_of_death"][r["cause_of_death"]],
+        cause_of_death_confidence=m["confidence"][r["cause_of_death_confidence"]],
+        behaviour=r["behaviour"],
+        checked_for_injuries=m["yes_no"][r["checked_for_injuries"]],
+        scanned_for_pit_tags=m["yes_no"][r["scanned_for_pit_tags"]],
+        checked_for_flipper_tags=m["yes_no"][r["checked_for_flipper_tags"]],
+        # comments
+    )
+
+    if src_id in m["overwrite"]:
+        logger.debug("Updating unchanged existing record {0}...".format(src_id))
+        AnimalEncounter.objects.filter(source_id=src_id).update(**new_data)
+        e = AnimalEncounter.objects.get(source_id=src_id)
+    else:
+        logger.debug("Creating new record {0}...".format(src_id))
+        e = AnimalEncounter.objects.create(**new_data)
+
+    e.save()
+
+    if r["checked_for_injuries"]:
+        logger.debug("  Damage seen - TODO")
+        # "damage_observation": [],
+
+    if r["samples_taken"]:
+        logger.debug("  Samples taken - TODO")
+
+    # "tag_observation": [],
+
+    # #TurtleMorphometricObservation
+    # "curved_carapace_length_mm": null,
+    # "curved_carapace_length_accuracy": "10",
+    # "curved_carapace_width_mm": null,
+    # "curved_carapace_width_accuracy": "10",
+    # "tail_length_carapace_mm": null,
+    # "tail_length_carapace_accuracy": "10",
+    # "maximum_head_width_mm": null,
+    # "maximum_head_width_accuracy": "10",
+
+    handle_media_attachment(e, r["photo_habitat"], title="Habitat")
+    handle_media_attachment(e, r["photo_habitat_2"], title="Habitat 2")
+    handle_media_attachment(e, r["photo_habitat_3"], title="Habitat 3")
+    handle_media_attachment(e, r["photo_habitat_4"], title="Habitat 4")
+    handle_media_attachment(e, r["photo_carapace_top"], title="Carapace top")
+    handle_media_attachment(e, r["photo_head_top"], title="Head top")
+    handle_media_attachment(e, r["photo_head_side"], title="Head side")
+    handle_media_attachment(e, r["photo_head_front"], title="Head front")
+
+    logger.info(" Saved {0}\n".format(e))
+    e.save()
+    return e
+
+
+def import_one_record_sv01(r, m):
+    """Import one ODK Site Visit 0.1 record into WAStD.
+
+    Arguments
+
+    r The record as dict, e.g.
+    {
+        "instanceID": "uuid:cc7224d7-f40f-4368-a937-1eb655e0203a",
+        "observation_start_time": "2017-03-08T07:10:43.378Z",
+        "reporter": "florianm",
+        "photo_start": {
+            "filename": "1488957113670.jpg",
+            "type": "image/jpeg",
+            "url": "https://..."
+        },
+        "transect": "-31.9966142 115.88456594 0.0 0.0;",
+        "photo_finish": {
+            "filename": "1488957172832.jpg",
+            "type": "image/jpeg",
+            "url": "https://..."
+        },
+        "comments": null,
+        "observation_end_time": "2017-03-08T07:13:23.317Z"
+    }
+
+    m The mapping of ODK to WAStD choices
+
+    All existing records will be updated.
+    Make sure to skip existing records which should be retained unchanged.
+
+    Creates a Survey, e.g.
+    {
+     'started_on': datetime.datetime(2017, 1, 31, 16, 0, tzinfo=<UTC>),
+     'finished_on': datetime.datetime(2017, 2, 4, 16, 0, tzinfo=<UTC>),
+     'site_id': 17,
+     'source': 'direct',
+     'source_id': None,
+     'transect': None,
+     'comments': '',
+    }
+    """
+    src_id = r["instanceID"]
+
+    new_data = dict(
+        source="odk",
+        source_id=src_id,
+        site_id=17,  # TODO: reconstruct site on Survey if not given
+        transect=read_odk_linestring(r["transect"]),
+        started_on=parse_datetime(r["observation_start_time"]),
+        finished_on=parse_datetime(r["observation_end_time"]),
+        # m["users"][r["reporter"]],
+        comments=r["comments"]
+    )
+
+    if Survey.objects.filter(source_id=src_id).exists():
+        logger.debug("Updating unchanged existing record {0}...".format(src_id))
+        Survey.objects.filter(source_id=src_id).update(**new_data)
+        e = Survey.objects.get(source_id=src_id)
+    else:
+        logger.debug("Creating new record {0}...".format(src_id))
+        e = Survey.objects.create(**new_data)
+
+    e.save()
+
+    # MediaAttachments
+    handle_media_attachment(e, r["photo_start"], title="Site conditions at start of suvey")
+    handle_media_attachment(e, r["photo_finish"], title="Site conditions at end of suvey")
+
+    logger.info(" Saved {0}\n".format(e))
+    e.save()
+    return e
+
+
+def import_one_record_tt05(r, m):
+    """Import one ODK Track Tally 0.5 record into WAStD.
+
+    Notably, counts of "None" are true absences and will be converted to "0".
+
+    Arguments
+
+    r The record as dict, e.g.
+        {
+            "instanceID": "uuid:29204c9c-3170-4dd1-b355-1d84d11e70e8",
+            "observation_start_time": "2017-01-19T04:42:41.195Z",
+            "reporter": "florianm",
+            "location": "-31.99656982 115.88441855 0.0 0.0;-31.9965685 115.88441522 0.0 0.0;",
+            "fb_evidence": "present",
+            "gn_evidence": "absent",
+            "hb_evidence": "absent",
+            "lh_evidence": "absent",
+            "or_evidence": "absent",
+            "unk_evidence": "present",
+            "predation_evidence": "present",
+            "fb_no_old_tracks": 10,
+            "fb_no_fresh_successful_crawls": 26,
+            "fb_no_fresh_false_crawls": 21,
+            "fb_no_fresh_tracks_unsure": 5,
+            "fb_no_fresh_tracks_not_assessed": 9,
+            "fb_no_hatched_nests": 2,
+            "gn_no_old_tracks": null,
+            "gn_no_fresh_successful_crawls": null,
+            "gn_no_fresh_false_crawls": null,
+            "gn_no_fresh_tracks_unsure": null,
+            "gn_no_fresh_tracks_not_assessed": null,
+            "gn_no_hatched_nests": null,
+            "hb_no_old_tracks": null,
+            "hb_no_fresh_successful_crawls": null,
+            "hb_no_fresh_false_crawls": null,
+            "hb_no_fresh_tracks_unsure": null,
+            "hb_no_fresh_tracks_not_assessed": null,
+            "hb_no_hatched_nests": null,
+            "lh_no_old_tracks": null,
+            "lh_no_fresh_successful_crawls": null,
+            "lh_no_fresh_false_crawls": null,
+            "lh_no_fresh_tracks_unsure": null,
+            "lh_no_fresh_tracks_not_assessed": null,
+            "lh_no_hatched_nests": null,
+            "or_no_old_tracks": null,
+            "or_no_fresh_successful_crawls": null,
+            "or_no_fresh_false_crawls": null,
+            "or_no_fresh_tracks_unsure": null,
+            "or_no_fresh_tracks_not_assessed": null,
+            "or_no_hatched_nests": null,
+            "unk_no_old_tracks": 10,
+            "unk_no_fresh_successful_crawls": 2,
+            "unk_no_fresh_false_crawls": 91,
+            "unk_no_fresh_tracks_unsure": 5,
+            "unk_no_fresh_tracks_not_assessed": 2,
+            "unk_no_hatched_nests": 5,
+            "disturbance": [
+                {
+                    "disturbance_cause": "cyclone",
+                    "no_nests_disturbed": 5,
+                    "no_tracks_encountered": 4,
+                    "disturbance_comments": "test"
+                }
+            ],
+            "observation_end_time": "2017-01-19T05:02:04.577Z"
+        }
+
+    m The mapping of ODK to WAStD choices
+
+    Existing records will be overwritten.
+    Make sure to skip existing records which should be retained.
+    """
+    src_id = r["instanceID"]
+
+    new_data = dict(
+        source="odk",
+        source_id=src_id,
+        where=odk_linestring_as_point(r["location"]),
+        transect=read_odk_linestring(r["location"]),
+        when=parse_datetime(r["observation_start_time"]),
+        location_accuracy="10",
+        observer=m["users"][r["reporter"]],
+        reporter=m["users"][r["reporter"]],
+    )
+
+    if src_id in m["overwrite"]:
+        logger.debug("Updating unchanged existing record {0}...".format(src_id))
+        LineTransectEncounter.objects.filter(source_id=src_id).update(**new_data)
+        e = LineTransectEncounter.objects.get(source_id=src_id)
+    else:
+        logger.debug("Creating new record {0}...".format(src_id))
+        e = LineTransectEncounter.objects.create(**new_data)
+
+    e.save()
+
+    # TurtleNestDisturbanceTallyObservation
+    [handle_turtlenestdisttallyobs(distobs, e, m)
+     for distobs in r["disturbance"] if len(r["disturbance"]) > 0]
+
+    #  TrackTallyObservations
+    FB = "natator-depressus"
+    GN = "chelonia-mydas"
+    HB = "eretmochelys-imbricata"
+    LH = "caretta-caretta"
+    OR = "lepidochelys-olivacea"
+    UN = "cheloniidae-fam"
+
+    tally_mapping = [
+        [FB, "old",   "track-not-assessed",     r["fb_no_old_tracks"] or 0],
+        [FB, "fresh", "successful-crawl",       r["fb_no_fresh_successful_crawls"] or 0],
+        [FB, "fresh", "false-crawl",            r["fb_no_fresh_false_crawls"] or 0],
+        [FB, "fresh", "track-unsure",           r["fb_no_fresh_tracks_unsure"] or 0],
+        [FB, "fresh", "track-not-assessed",     r["fb_no_fresh_tracks_not_assessed"] or 0],
+        [FB, "fresh", "hatched-nest",           r["fb_no_hatched_nests"] or 0],
+
+        [GN, "old",     "track-not-assessed",   r["gn_no_old_tracks"] or 0],
+        [GN, "fresh",   "successful-crawl",     r["gn_no_fresh_successful_crawls"] or 0],
+        [GN, "fresh",   "false-crawl",          r["gn_no_fresh_false_crawls"] or 0],
+        [GN, "fresh",   "track-unsure",         r["gn_no_fresh_tracks_unsure"] or 0],
+        [GN, "fresh",   "track-not-assessed",   r["gn_no_fresh_tracks_not_assessed"] or 0],
+        [GN, "fresh",   "hatched-nest",         r["gn_no_hatched_nests"] or 0],
+
+        [HB, "old",     "track-not-assessed",   r["hb_no_old_tracks"] or 0],
+        [HB, "fresh",   "successful-crawl",     r["hb_no_fresh_successful_crawls"] or 0],
+        [HB, "fresh",   "false-crawl",          r["hb_no_fresh_false_crawls"] or 0],
+        [HB, "fresh",   "track-unsure",         r["hb_no_fresh_tracks_unsure"] or 0],
+        [HB, "fresh",   "track-not-assessed",   r["hb_no_fresh_tracks_not_assessed"] or 0],
+        [HB, "fresh",   "hatched-nest",         r["hb_no_hatched_nests"] or 0],
+
+        [LH, "old",     "track-not-assessed",   r["lh_no_old_tracks"] or 0],
+        [LH, "fresh",   "successful-crawl",     r["lh_no_fresh_successful_crawls"] or 0],
+        [LH, "fresh",   "false-crawl",          r["lh_no_fresh_false_crawls"] or 0],
+        [LH, "fresh",   "track-unsure",         r["lh_no_fresh_tracks_unsure"] or 0],
+        [LH, "fresh",   "track-not-assessed",   r["lh_no_fresh_tracks_not_assessed"] or 0],
+        [LH, "fresh",   "hatched-nest",         r["lh_no_hatched_nests"] or 0],
+
+        [OR, "old",     "track-not-assessed",   r["or_no_old_tracks"] or 0],
+        [OR, "fresh",   "successful-crawl",     r["or_no_fresh_successful_crawls"] or 0],
+        [OR, "fresh",   "false-crawl",          r["or_no_fresh_false_crawls"] or 0],
+        [OR, "fresh",   "track-unsure",         r["or_no_fresh_tracks_unsure"] or 0],
+        [OR, "fresh",   "track-not-assessed",   r["or_no_fresh_tracks_not_assessed"] or 0],
+        [OR, "fresh",   "hatched-nest",         r["or_no_hatched_nests"] or 0],
+
+        [UN, "old",     "track-not-assessed",   r["unk_no_old_tracks"] or 0],
+        [UN, "fresh",   "successful-crawl",     r["unk_no_fresh_successful_crawls"] or 0],
+        [UN, "fresh",   "false-crawl",          r["unk_no_fresh_false_crawls"] or 0],
+        [UN, "fresh",   "track-unsure",         r["unk_no_fresh_tracks_unsure"] or 0],
+        [UN, "fresh",   "track-not-assessed",   r["unk_no_fresh_tracks_not_assessed"] or 0],
+        [UN, "fresh",   "hatched-nest",         r["unk_no_hatched_nests"] or 0],
+    ]
+
+    [make_tallyobs(e, x[0], x[1], x[2], x[3]) for x in tally_mapping]
+
+    e.save()
+    logger.info(" Saved {0}\n".format(e))
+    return e
+
+
+# -----------------------------------------------------------------------------#
+# WAMTRAM
+#
+def make_wamtram_source_id(original_id):
+    """Generate the source_id for WAMTRAM records."""
+    return "wamtram-observation-id-{0}".format(original_id)
+
+
+def import_one_encounter_wamtram(r, m, u):
+    """Import one WAMTRAM 2 tagging record into WAStD.
+
+    Arguments
+
+    r The record as dict, e.g.
+
+    {'ACTION_TAKEN': 'NA',
+    'ALIVE': 'Y',
+    'BEACH_POSITION_CODE': 'A',
+    'CC_LENGTH_Not_Measured': '0',
+    'CC_NOTCH_LENGTH_Not_Measured': '1',
+    'CC_WIDTH_Not_Measured': '0',
+    'CLUTCH_COMPLETED': 'N',
+    'COMMENTS': 'PTT: #103225-11858',
+    'COMMENT_FROMRECORDEDTAGSTABLE': 'PTT',
+    'CONDITION_CODE': 'NA',
+    'DATE_ENTERED': '2010-12-20 00:00:00',
+    'DATUM_CODE': 'WGS84',
+    'DidNotCheckForInjury': '0',
+    'EASTING': 'NA',
+    'EGG_COUNT_METHOD': 'NA',
+    'ENTERED_BY': 'NA',
+    'ENTERED_BY_PERSON_ID': '3537',
+    'ENTRY_BATCH_ID': '301',
+    'LATITUDE': '-21.46315',
+    'LATITUDE_DEGREES': 'NA',
+    'LATITUDE_MINUTES': 'NA',
+    'LATITUDE_SECONDS': 'NA',
+    'LONGITUDE': '115.01963',
+    'LONGITUDE': '115.01963',
+    'LONGITUDE_DEGREES': 'NA',
+    'LONGITUDE_MINUTES': 'NA',
+    'LONGITUDE_SECONDS': 'NA',
+    'MEASUREMENTS': 'Y',
+    'MEASURER_PERSON_ID': '623',
+    'MEASURER_REPORTER_PERSON_ID': '3826',
+    'Mund': '0',
+    'NESTING': 'Y',
+    'NORTHING': 'NA',
+    'NUMBER_OF_EGGS': 'NA',
+    'OBSERVATION_ID': '211465',
+    'OBSERVATION_STATUS': 'Initial Nesting',
+    'ORIGINAL_OBSERVATION_ID': 'NA',
+    'OTHER_TAGS': '103225-11858  PENV URS',
+    'OTHER_TAGS_IDENTIFICATION_TYPE': 'PTT',
+    'PLACE_CODE': 'THEE',
+    'PLACE_DESCRIPTION': 'NA',
+    'REPORTER_PERSON_ID': '3826',
+    'SCARS_LEFT': '0',
+    'SCARS_LEFT_SCALE_1': '0',
+    'SCARS_LEFT_SCALE_2': '0',
+    'SCARS_LEFT_SCALE_3': '0',
+    'SCARS_RIGHT': '0',
+    'SCARS_RIGHT_SCALE_1': '0',
+    'SCARS_RIGHT_SCALE_2': '0',
+    'SCARS_RIGHT_SCALE_3': '0',
+    'TAGGER_PERSON_ID': '623',
+    'TURTLE_ID': '55742',
+    'TagScarNotChecked': '0',
+    'TransferID': 'NA',
+    'ZONE': 'NA',
+    'activity_code': 'I',
+    'activity_description': 'Returning to water - Nesting',
+    'activity_is_nesting': 'Y',
+    'activity_label': 'Returning To Water',
+    'display_this_observation': '1',
+    'observation_datetime_gmt08': '2010-12-12T00:55:00Z',
+    'observation_datetime_utc': '2010-12-12T00:55:00Z'
+    }
+
+    m The ODK_MAPPING
+
+    u a dict of WAMTRAM PERSON_ID: WAStD User object
+
+    Returns
+
+    The created encounter, e.g.
+    {'activity': 'na',
+    'behaviour': '',
+    'cause_of_death': 'na',
+    'cause_of_death_confidence': 'na',
+    'checked_for_flipper_tags': 'na',
+    'checked_for_injuries': 'na',
+    'encounter_ptr_id': 2574,
+    'encounter_type': 'stranding',
+    'habitat': 'na',
+    'health': 'dead-edible',
+    'id': 2574,
+    'location_accuracy': '1000',
+    'maturity': 'adult',
+    'name': None,
+    'observer_id': 1,
+    'polymorphic_ctype_id': 17,
+    'reporter_id': 5,
+    'scanned_for_pit_tags': 'na',
+    'sex': 'na',
+    'site_visit_id': None,
+    'source': 'direct',
+    'source_id': '2017-02-03-10-35-00-112-3242-25-5623-dead-edible-adult-na-dugong-dugon',
+    'species': 'dugong-dugon',
+    'status': 'new',
+    'taxon': 'Sirenia',
+    'when': datetime.datetime(2017, 2, 3, 2, 35, tzinfo=<UTC>),
+    'where': <Point object at 0x7f16854fb400>}
+
+    TODO
+    Tags
+    'COMMENT_FROMRECORDEDTAGSTABLE': 'PTT',
+    'COMMENTS': 'PTT: #103225-11858',
+    'OTHER_TAGS_IDENTIFICATION_TYPE': 'PTT',
+    'OTHER_TAGS': '103225-11858  PENV URS',
+    'SCARS_LEFT': '0',
+    'SCARS_LEFT_SCALE_1': '0',
+    'SCARS_LEFT_SCALE_2': '0',
+    'SCARS_LEFT_SCALE_3': '0',
+    'SCARS_RIGHT': '0',
+    'SCARS_RIGHT_SCALE_1': '0',
+    'SCARS_RIGHT_SCALE_2': '0',
+    'SCARS_RIGHT_SCALE_3': '0',
+    'TagScarNotChecked': '0',
+    'TransferID': 'NA',
+
+    Measurements
+    'DidNotCheckForInjury': '0',
+    'Mund': '0',
+    'ALIVE': 'Y',
+    'CONDITION_CODE': 'NA',
+    'MEASUREMENTS': 'Y',
+    'NUMBER_OF_EGGS': 'NA',
+    'EGG_COUNT_METHOD': 'NA',
+    'CLUTCH_COMPLETED': 'N',
+    'MEASURER_PERSON_ID': '623',
+    'MEASURER_REPORTER_PERSON_ID': '3826',
+    'CC_LENGTH_Not_Measured': '0',
+    'CC_NOTCH_LENGTH_Not_Measured': '1',
+    'CC_WIDTH_Not_Measured': '0',
+
+
+    Personnel
+    'REPORTER_PERSON_ID': '3826',
+    'TAGGER_PERSON_ID': '623',
+
+    Event
+    'ACTION_TAKEN': 'NA',
+    'NESTING': 'Y',
+    'OBSERVATION_STATUS': 'Initial Nesting',
+
+    Comments
+    'display_this_observation': '1' # mention if "0"
+
+    Turtle
+    'OBSERVATION_ID': '211465',
+    'ORIGINAL_OBSERVATION_ID': 'NA',
+    'TURTLE_ID': '55742',
+
+    Audit trail
+    'DATE_ENTERED': '2010-12-20 00:00:00',
+    'ENTERED_BY': 'NA',
+    'ENTERED_BY_PERSON_ID': '3537',
+    'ENTRY_BATCH_ID': '301',
+    """
+    unique_data = dict(
+        source="wamtram",
+        source_id=make_wamtram_source_id(r["OBSERVATION_ID"])
+    )
+
+    extra_data = dict(
+        where=Point(float(r["LONGITUDE"]), float(r["LATITUDE"])),
+        when=parse_datetime(r["observation_datetime_utc"]),
+        location_accuracy="10",
+        observer_id=u[r["TAGGER_PERSON_ID"]] if r["TAGGER_PERSON_ID"] in u else 1,
+        reporter_id=u[r["REPORTER_PERSON_ID"]] if r["REPORTER_PERSON_ID"] in u else 1,
+        taxon="Cheloniidae",
+        species=m["species"][r["SPECIES_CODE"]],
+        activity=m["activity"][r["activity_code"]],
+        sex="female",
+        maturity="adult",
+        health=m["health"][r["CONDITION_CODE"]],
+        habitat=m["habitat"][r["BEACH_POSITION_CODE"]],
+        nesting_event=m["nesting"][r["CLUTCH_COMPLETED"]],
+    )
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=AnimalEncounter,
+        base_cls=Encounter)
+
+    enc.save()
+
+
+def import_one_tag(t, m):
+    """Import one WAMTRAM 2 tag observation record into WAStD.
+
+    Arguments
+
+    t The record as dict, e.g.
+
+    {
+     'observation_id': '267425',
+     'recorded_tag_id': '394783',
+     'tag_name': 'WB 9239',
+     'tag_state': 'A1',
+     'attached_on_side': 'R',
+     'tag_position': 'NA',
+     'comments': 'NA',
+     'tag_label': 'NA',
+     }
+
+    m The ODK_MAPPING
+
+    Return a TabObservation e.g.
+
+    {
+    'tag_type': 'flipper-tag'
+    'encounter_id': 80,
+    'handler_id': 1,
+    'recorder_id': 1,
+    'name': 'WA1234',
+    'status': 'resighted',
+    'tag_location': 'whole',
+    'comments': '',
+    }
+
+    Skip if tag status in:
+     # not tagged, no tags seen, no number recorded:
+        # "A2": '',  # TODO no tag applied
+        "PX": 'resighted',  # TODO tag present, not read
+        # "0": '',  # TODO false ID as lost
+        "#": 'applied-new',  # tag was applied, but tag number unknown
+        "Q": 'applied-new',  # tag number incompletely recorded
+        # M tag scar seen
+        # M1 missing
+        # N not recorded
+        # 0L falsely assumed to be tag scar, not a tag scar
+
+
+    """
+    if t["tag_state"] in ["A2", "PX", "0", "#", "Q", "M", "M1", "N", "0L", "NA"]:
+        logger.info("Skipping tag obs with status {0}".format(t["tag_state"]))
+        return None
+
+    tag_name = sanitize_tag_label(t["tag_name"])
+    enc = AnimalEncounter.objects.get(
+        source_id=make_wamtram_source_id(t["observation_id"]))
+
+    new_data = dict(
+        encounter_id=enc.id,
+        tag_type='flipper-tag',
+        handler_id=enc.observer_id,
+        recorder_id=enc.reporter_id,
+        name=tag_name,
+        tag_location=make_tag_side(t["attached_on_side"], t["tag_position"]),
+        status=m["tag_status"][t["tag_state"]],
+        comments='{0}\nLTag label: {1}\nOriginal status: {2}'.format(
+            t["comments"], t["tag_label"], t["tag_state"]),
+    )
+
+    if TagObservation.objects.filter(encounter_id=enc.id, name=tag_name).exists():
+        logger.info("Updating existing tag obs {0}...".format(tag_name))
+        e = TagObservation.objects.filter(
+            encounter_id=enc.id, name=tag_name).update(**new_data)
+        e = TagObservation.objects.get(encounter_id=enc.id, name=tag_name)
+
+    else:
+        logger.info("Creating new tag obs {0}...".format(tag_name))
+        e = TagObservation.objects.create(**new_data)
+
+    e.save()
+    logger.info(" Saved {0}\n".format(e))
+    return e
+
+
+# -----------------------------------------------------------------------------#
+# Cetacean strandings database (Filemaker Pro)
+def infer_cetacean_sex(f, m):
+    """Infer WAStD sex from Cetacean db values.
+
+    Arguments
+
+    f String The db value of column "is female". Females are '1'.
+    m String The db value of column "is male". Males are '1'.
+
+    Return
+    String One of WAStD SEX_CHOICES "na" (unknown sex), "female" or "male"
+    """
+    if f == "1":
+        return "female"
+    elif m == "1":
+        return "male"
+    else:
+        return "na"
+
+
+def fix_species_name(spname):
+    """Return one species name lowercase-dashseparated."""
+    return spname.replace(".", "").replace("? ", "").replace(
+        "(?)", "").replace("?", "").strip().replace(" ", "-").lower()
+
+
+def make_comment(dictobj, fieldname):
+    """Render a dict's field to text.
+
+    Return
+        '<fieldname>: <dictobj["fieldname"]>' or ''
+    """
+    return "{0}: {1}\n\n".format(fieldname, dictobj[fieldname]) if \
+        fieldname in dictobj and dictobj[fieldname] != "" else ""
+
+
+def import_one_record_cet(r, m):
+    r"""Import one Cetacean strandings database record into WAStD.
+
+    The Filemaker Pro db is exported to CSV, and read here as csv.DictReader.
+    This method imports one DictReader.next() record.
+
+    Arguments
+
+    r The record as dict, e.g.
+
+    {'A': '',
+    'Admin comment': '',
+    'Age': one of:
+    {'', '1', '1-2', '1-3', '11 years old', '2-3', '2-3 years old', '3 month',
+    '3-4 months', '4 months', '6 yrs ', 'A', 'A, C', 'AC', 'AMC', 'C', 'J',
+    'Juvenile', 'MC', 'Neonate', 'Possibly yearling', 'SA', 'Still born',
+    'X', 'Yearing', 'Yearling', 'Young', 'x', '~35', '~8-10 years'},
+    'Ailment_injury comment': '',
+    'Attachment': '',
+    'Boat_Ship Strike': '',
+    'C': '1',
+    'Carcass Location_Fate': 'Buried 300m NE of Doungup Park cut in dunes. See map on file.',
+    'Cause of Death _drop down_': 'Euthanasia - firearm',
+    'Comments': '',
+    'Common Name': 'Minke Whale',
+    'Condition comments': '',
+    'Condition when found': 'Live',
+    'Cow_calf pair Stranding': '',
+    'DPaW Attended': '',
+    'Date': '27/07/82',
+    'Dead Stranding': '',
+    'Demographic comment': '',
+    'El Nino': '',
+    'Entanglement': '',
+    'Entanglement gear': '',
+    'Entanglement gear details': '',
+    'Event': 'Single Stranding\nLive Stranding',
+    'F': '1',
+    'Fate': '',
+    'File Number': '025298F3803',
+    'Floating carcass': '',
+    'Heavy Metals': '',
+    'ID': '',
+    'Lat': '-33.4886',
+    'Length _m_': '3.98',
+    'Live Stranding': 'Yes',
+    'Location': 'Doungup Park',
+    'Long': '115.5406 ',
+    'M': '',
+    'Mass Stranding': '',
+    'Moon Phase': '',
+    'Near River': '',
+    'Number of animals': '1',
+    'Outcome': 'Euthanased',
+    'PCB': '',
+    'PM Report location': '',
+    'Photos taken': 'Yes',
+    'Post Mortem': 'Yes',
+    'Post mortem report summary': 'Cause of death - Haemorrhagic gastroenteritis',
+    'Record No.': '1',
+    'Rescue info': '',
+    'SA': '',
+    'Sampling comments': '',
+    'Scientific Name': 'Balaenoptera acutorostrata',
+    'Single Stranding': 'Yes',
+    'Site': 'Doungup Park beach, 20km SW of Bunbury, 8 km from Capel.',
+    'U': '',
+    'Weight _kg_': '',
+    '_U': '',
+    'latdeg': '33',
+    'latmin': '29',
+    'latsec': '19',
+    'longdeg': '115',
+    'longmin': '32',
+    'longsec': '26'}
+
+    m The ODK_MAPPING
+
+    Returns AnimalEncounter e.g.
+
+    'activity': 'na',
+    'behaviour': '',
+    'cause_of_death': 'na',
+    'cause_of_death_confidence': 'na',
+    'checked_for_flipper_tags': 'na',
+    'checked_for_injuries': 'na',
+    'habitat': 'na',
+    'health': 'dead-edible',
+    'location_accuracy': '1000',
+    'maturity': 'adult',
+    'name': None,
+    'observer_id': 1,
+    'reporter_id': 5,
+    'scanned_for_pit_tags': 'na',
+    'sex': 'na',
+    'source': 'cet',
+    'source_id': 'cet-1234',  # src_id
+    'species': 'dugong-dugon',
+    'taxon': 'Cetacea',
+    'when': datetime.datetime(2017, 2, 3, 2, 35, tzinfo=<UTC>),
+    'where': <Point object at 0x7fdede584b50>
+
+    The species name mapping is created from names found with:
+
+    from wastd.observations.importers.legacy import *
+    legacy_strandings = csv.DictReader(open("data/cetaceans.csv"))
+    wastd_cet_species = [d[0] for d in CETACEAN_SPECIES_CHOICES]]
+    set([fix_species_name(x["Scientific Name"])
+         for x in legacy_strandings
+         if fix_species_name(x["Scientific Name"]) not in wastd_cet_species)
+
+
+    """
+    species = map_and_keep(CETACEAN_SPECIES_CHOICES)
+    # TODO this mapping needs QA (add species to CETACEAN_SPECIES_CHOICES)
+    happy_little_mistakes = {
+        '': 'cetacea',
+        'balaenopter-musculus-brevicauda': "balaenoptera-musculus-brevicauda",
+        'balaenopters-cf-b-omurai': "balaenoptera-omurai",
+        'kogia-simus': "kogia-sima",
+        'sousa-chinensis': 'sousa-sahulensis',
+        'orcaella-heinsohni-x': "orcaella-heinsohni",
+        'stenella--sp-(coeruleoalba)': "stenella-sp",
+    }
+    species.update(happy_little_mistakes)
+
+    cod = {
+        'Birthing': "birthing",
+        'Boat/ship strike': "boat-strike",
+        'Complications from stranding': "stranded",
+        'Disease/health': "natural",
+        'Drowning/misadventure': "drowned-other",
+        'Entanglement': "drowned-entangled",
+        'Euthanasia': "euthanasia",
+        'Euthanasia - firearm': "euthanasia-firearm",
+        'Euthanasia - firearm - SOP 17(1)': "euthanasia-firearm",
+        'Euthanasia - implosion': "euthanasia-implosion",
+        'Euthanasia - injection': "euthanasia-injection",
+        'Failure to thrive/dependant calf': "calf-failure-to-thrive",
+        'Failure to thrive/dependent calf': "calf-failure-to-thrive",
+        'Live stranding': "na",  # not a cause of death then
+        'Misadventure': "natural",
+        'Misadventure 13 died during event': "natural",
+        'Mixed fate group': "na",  # split into individual strandings
+        'Old age': "natural",
+        'Predatory attack': "predation",
+        'PM report pending': "na",  # set COD once necropsy done
+        'Predatory attack - Orca': "predation",
+        'Predatory attack - shark': "predation",
+        'Remote stranding - died': "stranded",  # remoteness is not COD
+        'SEE Necropsy Report': "na",  # and transcribe here
+        'Spear/gunshot': "trauma-human-induced",
+        'Starvation': "starved",
+        'Still born': "still-born",
+        'Stingray barb': "trauma-animal-induced",
+        'Stranding': "stranded",
+        'Trauma': "trauma",
+        'Under nourished': "starved",  # if COD, else physical condition
+        'Unknown': "na",
+        'Unkown': "na",
+        '': "na",
+        'Weapon (gun, spear etc)': "trauma-human-induced",
+    }
+
+    src_id = "cet-{0}".format(r["Record No."])
+
+    """
+    Map:
+    'SA', # subadult?
+    'C': '1',
+    Attachments:
+    'Attachment': '',
+    'Photos taken': 'Yes',
+    'Post Mortem': 'Yes',
+    """
+
+    new_data = {
+        'when': parser.parse('{0} 12:00:00 +0800'.format(r["Date"])),
+        'where': Point(float(r["Long"] or 120), float(r["Lat"] or -35)),
+        'taxon': 'Cetacea',
+        'species': species[fix_species_name(r["Scientific Name"] or '')],
+        'activity': 'na',  # TODO
+        'behaviour': "".join([make_comment(r, x) for x in [
+            "File Number",
+            "Name",
+            "Age",
+
+            "Comments",
+            "Admin comment",
+
+            "Event",
+
+            'Boat_Ship Strike',
+            "Entanglement",
+            "Entanglement gear",
+            "Entanglement gear details",
+            "Floating carcass",
+            "Single Stranding",
+            "Cow_calf pair Stranding",
+            "Mass Stranding",
+            "Number of animals",
+            "Demographic comment",
+            'Live Stranding',
+            'Dead Stranding',
+
+            "DPaW Attended",
+            'Rescue info',
+            "Outcome",
+            "Fate",
+            "Carcass Location_Fate",
+
+            "El Nino",
+            "Heavy Metals",
+            'PCB',
+            "Moon Phase",
+            "Near River",
+
+            'Condition when found',
+            "Condition comments",
+            "Ailment_injury comment",
+            "PM Report location",
+            "Post mortem report summary",
+            'Sampling comments',
+            "Length _m_",
+            'Weight _kg_',
+
+            'Site',
+            'Location',
+        ]]),
+        'cause_of_death': cod[r["Cause of Death _drop down_"]],
+        'cause_of_death_confidence': 'na',  # TODO
+        'checked_for_flipper_tags': 'na',  # TODO
+        'checked_for_injuries': 'na',  # TODO
+        'habitat': 'na',  # TODO
+        'health': 'dead-edible',  # TODO
+        'location_accuracy': '10',
+        'maturity': 'adult',  # TODO
+        # 'name': r["ID"] or None,
+        'observer_id': 1,
+        'reporter_id': 1,
+        'scanned_for_pit_tags': 'na',  # TODO
+        'sex': infer_cetacean_sex(r["F"], r["M"]),
+        'source': 'cet',
+        'source_id': src_id,
+    }
+    # check if src_id exists
+    if src_id in m["overwrite"]:
+        logger.debug("Updating unchanged existing record {0}...".format(src_id))
+        AnimalEncounter.objects.filter(source_id=src_id).update(**new_data)
+        e = AnimalEncounter.objects.get(source_id=src_id)
+    else:
+        logger.debug("Creating new record {0}...".format(src_id))
+        e = AnimalEncounter.objects.create(**new_data)
+
+    e.save()
+    logger.debug(" Saved {0}\n".format(e))
+    return e
+
+
+def pinniped_coords_as_point(cstring):
+    r"""Convert the pinniped strandings coordinate format into a Point.
+
+    Arguments:
+
+    cstring, a string of coordinates in the following formats:
+
+    example_formats = [
+    '',
+    '-32.943382; 115.659916',  # Lat Lon   D.D; D.D
+    '121:56.04; 33:49.53',     # Lon Lat   D:M.M; D:M.M
+    '28:44.528; 114:37.096',   # Lat Lon   D:M.M; D:M.M
+    '29:56:39.6; 114:58:41.1', # Lat Lon   D:M:S.S; D:M:S.S
+    '28:46114:37',             # Lat Lon   D:MD:M
+    '28:46;114:36',            # Lat Lon   D:M;D:M
+    '30 29.955; 155 03.621',   # Lat Lon   D M.M; D M.M
+    '30:07:47;114:56:40',      # Lat Lon   D:M:S; D:M:S
+    '314394.595; 6237428.999', # UTM
+    '33 27 0.73s 115 34 35.00e',# Lat Lon  D M S.S"s" D M S"s"
+    '35:2 :11.198; 116:44:21.536',# weird space
+    '416247E; 6143585',        # UTM E N
+    'Hauled out, resting, good body condition.',  # column mismatch?
+    'Lat 6240557; Long 0236825', # UTM N E
+    '`31:00;115:19']           # Stray "`"
+
+    Returns
+    Point in WGS84 or None
+    """
+    logger.debug("Got coords {0}".format(cstring))
+    logger.debug("TODO: parse to point")
+    return None
+
+
+def import_one_record_pin(r, m):
+    r"""Import one Pinniped strandings database record into WAStD.
+
+    The Filemaker Pro db is exported to CSV, and read here as csv.DictReader.
+    This method imports one DictReader.next() record.
+
+    Arguments
+
+    r The record as dict, e.g.
+        {'Attachment': '',
+        'Comment': '',
+        'Common Name': 'Australian Sea Lion',
+        'Condition': 'Fish hooks ',
+        'Date': '30/01/80',
+        'Day': '30',
+        'ID No.': '1',
+        'Lat_Long': '30:08;114:57',
+        'Location': 'Fisherman\xe2\x80\x99s Island',
+        'Man Influenced': 'Yes',
+        'Month': 'January',
+        'Number': '1',
+        'Scientific Name': 'Neophoca cinerea',
+        'Sex': 'Female',
+        'Special': '',
+        'Year': '1980'}
+
+    Species:
+        {'': 'pinnipedia',
+        '1': 'pinnipedia',
+        'Female': 'pinnipedia',
+        'Arctocephalus forsteri': "arctocephalus-forsteri",
+        'Arctocephalus forsterii': "arctocephalus-forsteri",
+        'Arctocephalus tropicalis': "arctocephalus-tropicalis",
+        'Hydrurga leptonyx': "hydrurga-leptonyx",
+        'Lobodon carcinophagus': "lobodon-carcinophagus",
+        'Mirounga leonina': "mirounga-leonina",
+        'Neophoca cinerea': "neophoca-cinerea"}
+    """
+    pass
+
+
+def update_wastd_user(u):
+    """Create or update a WAStD user from a dict.
+
+    Arguments
+
+    u   A dict with name, email, role (SPECIALTY) and WAMTRAM PERSON_ID, e.g.
+
+    {'ADDRESS_LINE_1': 'NA',
+    'ADDRESS_LINE_2': 'NA',
+    'COMMENTS': 'MSP Thevenard 2016-17',
+    'COUNTRY': 'NA',
+    'EMAIL': 'NA',
+    'FAX': 'NA',
+    'FIRST_NAME': 'Joel',
+    'MIDDLE_NAME': 'NA',
+    'MOBILE': 'NA',
+    'PERSON_ID': '4725',
+    'POST_CODE': 'NA',
+    'Recorder': '0',
+    'SPECIALTY': 'NA',
+    'STATE': 'NA',
+    'SURNAME': 'Kerbey',
+    'TELEPHONE': 'NA',
+    'TOWN': 'NA',
+    'Transfer': 'NA',
+    'email': 'NA',
+    'name': 'Joel Kerbey'}
+
+    Return
+
+    The updated or created WAStD User ID
+    """
+    usrdict = guess_user(u["name"])
+    usr = usrdict["user"]
+
+    # Update name
+    if (usr.name is None or usr.name == "") and u["name"] != "NA" and u["name"] != "":
+        usr.name = u["name"]
+        logger.debug("  User name updated from name: {0}".format(usr.name))
+
+    # Update email
+    if (usr.email is None or usr.email == "") and u["EMAIL"] != "NA":
+        usr.email = u["EMAIL"]
+        logger.debug("  User email updated from EMAIL: {0}".format(usr.role))
+
+    # If role is not set, or doesn't already contain SPECIALTY, add SPECIALTY
+    if ((usr.role is None or usr.role == "" or u["SPECIALTY"] not in usr.role) and u["SPECIALTY"] != "NA"):
+        usr.role = "{0} Specialty: {1}".format(usr.role or '', u["SPECIALTY"]).strip()
+        logger.debug("  User role updated from SPECIALTY: {0}".format(usr.role))
+
+    if ((usr.role is None or usr.role == "" or u["COMMENTS"] not in usr.role) and u["COMMENTS"] != "NA"):
+        usr.role = "{0} Comments: {1}".format(usr.role or '', u["COMMENTS"]).strip()
+        logger.debug("  User role updated from COMMENTS: {0}".format(usr.role))
+
+    usr.save()
+    logger.debug(" Saved User {0}".format(usr))
+    return usr.id
+
+
+# -----------------------------------------------------------------------------#
+# Mapping
+#
+def make_mapping():
+    """Generate a mapping of ODK to WAStD keys."""
+    species = map_and_keep(SPECIES_CHOICES)
+    species.update({
+        # MWI < 0.4
+        'flatback': 'natator-depressus',
+        'green': 'chelonia-mydas',
+        'hawksbill': 'eretmochelys-imbricata',
+        'loggerhead': 'caretta-caretta',
+        'oliveridley': 'lepidochelys-olivacea',
+        'leatherback': 'dermochelys-coriacea',
+        'turtle': 'cheloniidae-fam',
+
+        # WAMTRAM
+        'FB': 'natator-depressus',
+        'GN': 'chelonia-mydas',
+        'HK': 'eretmochelys-imbricata',
+        'LO': 'caretta-caretta',
+        'OR': 'lepidochelys-olivacea',
+        'LB': 'dermochelys-coriacea',
+        '?': 'cheloniidae-fam',
+        '0': 'cheloniidae-fam',
+    })
+
+    habitat = map_and_keep(HABITAT_CHOICES)
+    habitat.update({
+        'abovehwm': 'beach-above-high-water',
+        'belowhwm': 'beach-below-high-water',
+        'edgeofvegetation': 'beach-edge-of-vegetation',
+        'vegetation': 'in-dune-vegetation',
+        'na': 'na',
+
+        # WAMTRAM BEACH_POSITION_CODE
+        'NA': 'na',
+        "?": "na",
+        "A": "beach-above-high-water",
+        "B": "beach-above-high-water",
+        "C": "beach-below-high-water",
+        "D": "beach-edge-of-vegetation",
+        "E": "in-dune-vegetation",
+    })
+
+    health = map_and_keep(HEALTH_CHOICES)
+    health.update({
+        "F": "dead-edible",     # Carcase - fresh
+        "G": "alive",           # Good - fat
+        "H": "alive",           # Live & fit
+        "I": "alive",           # Injured but OK
+        "M": "alive",           # Moribund
+        "P": "alive",           # Poor - thin
+        "NA": "na",
+    })
+
+    activity = map_and_keep(ACTIVITY_CHOICES)
+    activity.update({
+        "&": "captivity",       # Captive animal
+        "A": "arriving",        # Resting at waters edge - Nesting
+        "B": "arriving",        # Leaving water - Nesting
+        "C": "approaching",     # Climbing beach slope - Nesting
+        "D": "approaching",     # Moving over bare sand (=beach) - Nesting
+        "E": "digging-body-pit",  # Digging body hole - Nesting
+        "F": "excavating-egg-chamber",  # Excavating egg chamber - Nesting
+        "G": "laying-eggs",     # Laying eggs - confirmed observation - Nesting
+        "H": "filling-in-egg-chamber",  # Covering nest (filling in) - Nesting
+        "I": "returning-to-water",  # Returning to water - Nesting
+        # "J": "",              # Check/?edit these: only on VA records
+        "K": "non-breeding",    # Basking - on beach above waterline
+        "L": "arriving",        # Arriving - Nesting
+        "M": "other",           # Mating
+        "N": "other",           # Courting
+        "O": "non-breeding",    # Free at sea
+        "Q": "na",              # Not recorded in field
+        "R": "non-breeding",    # Released to wild
+        "S": "non-breeding",    # Rescued from stranding
+        "V": "non-breeding",    # Caught in fishing gear - Decd
+        "W": "non-breeding",    # Captured in water (reef or sea)
+        "X": "floating",        # Turtle dead
+        "Y": "floating",        # Caught in fishing gear - Relsd
+        "Z": "other",           # Hunted for food by Ab & others
+        "NA": "na",
+    })
+
+    yes_no = map_and_keep(OBSERVATION_CHOICES)
+    yes_no.update({
+        'Y': 'present',
+        'N': 'absent',
+        'U': 'na',
+        'NA': 'na',
+        'yes': 'present',
+        'no': 'absent',
+    })
+
+    confidence = map_and_keep(CONFIDENCE_CHOICES)
+    confidence.update({
+        "validate": "validated",
+    })
+
+    tag_status = map_and_keep(TAG_STATUS_CHOICES)
+    # 0L A1 A2 ae AE M M1 N OO OX p P P_ED P_OK PX Q R RC RQ
+    # Compare tag scar positions to previously tagged positions:
+    # could a tag have been applied in same position as tag scar?
+    tag_status.update({
+
+        # resighted
+        "P": 'resighted',
+        "p": 'resighted',  # typo duplicate of P
+        "P_OK": 'resighted',  # tag seen, good fix observed
+        "P_ED": 'resighted',  # resighted, but tag about to fall off
+        "RQ": 'resighted',  # observed but insecure, action taken unknown
+        "RC": 'reclinched',  # observed insecure, reclinched
+        "OX": 'reclinched',
+
+        # applied-new
+        "A1": 'applied-new',  # applied new, fix seems ok
+        "AE": 'applied-new',  # applied new, end clinch noted
+        "ae": 'applied-new',  # typo duplicate of AE
+
+        # removed
+        "R": 'removed',  # removed by obs
+        "OO": 'removed',  # fell off during observation
+
+        # not tagged, no tags seen, no number recorded:
+        # "A2": '',  # TODO no tag applied
+        "PX": 'resighted',  # TODO tag present, not read
+        # "0": '',  # TODO false ID as lost
+        "#": 'applied-new',  # tag was applied, but tag number unknown
+        "Q": 'applied-new',  # tag number incompletely recorded
+        # M tag scar seen
+        # M1 missing
+        # N not recorded
+        # 0L falsely assumed to be tag scar, not a tag scar
+        'resighted': 'resighted'
+    })
+
+    return {
+        "nest_type": map_and_keep(NEST_TYPE_CHOICES),
+
+        "tag_status": map_and_keep(TAG_STATUS_CHOICES),
+        "maturity": map_and_keep(MATURITY_CHOICES),
+        "cause_of_death": map_and_keep(CAUSE_OF_DEATH_CHOICES),
+        "confidence": confidence,
+        "yes_no": yes_no,
+        "species": species,
+        "activity": activity,
+        "habitat": habitat,
+        "health": health,
+        "tag_status": tag_status,
+        "disturbance": yes_no,
+        "nesting": yes_no,
+
+        "overwrite": [t["source_id"] for t in
+        Encounter.objects.filter(
+            source="odk",
+            status=Encounter.STATUS_NEW
+        ).values('source_id')]
+    }
+
+
+# -----------------------------------------------------------------------------#
+# Main import call
+#
+def import_odk(datafile,
+               flavour="odk-tt036",
+               extradata=None,
+               usercsv=None,
+               mapping=None):
+    """Import ODK data.
+
+    Arguments
+
+    datafile A filepath to the JSON exported from ODK Aggregate
+    flavour The ODK form with version
+
+    flavour A string indicating the type of input, see examples.
+
+    extradata A second datafile (tags for WAMTRAM)
+
+    usercsv A CSV file with columns "name" and "PERSON_ID"
+
+    mapping A dict mapping dropdown values from ODK to WAStD, default: make_mapping()
+
+    Preparation:
+
+    * https://dpaw-data.appspot.com/ > Submissions > Form e.g. "Track or Treat 0.31"
+    * Export > JSON > Export
+    * Submissions > Exported Submissions > download JSON
+
+    Behaviour:
+
+    * Records not in WAStD will be created
+    * Records in WAStD of status NEW (unchanged since import) will be updated
+    * Records in WAStD of status **above** NEW (QA'd and possibly locally changed) will be skipped
+
+    Example:
+
+        from wastd.observations.importers.legacy import *
+        # import_odk('data/Track_or_Treat_0_34_results.json', flavour="odk-tt034")
+        import_odk('data/cetaceans.csv', flavour="cet")
+        import_odk('media/wamtram_encounters.csv', flavour="wamtram", usercsv="media/wamtram_users.csv")
+        import_odk('media/wamtram_tagobservations.csv', flavour="whambam")
+        # import_odk('data/Site_Visit_0_1_results.json', flavour="sitevisit")
+
+        import_odk("data/latest/tt05.json", flavour="odk-tally05")
+        import_odk('data/latest/tt031.json', flavour="odk-tt031")
+        import_odk('data/latest/tt034.json', flavour="odk-tt034")
+        import_odk('data/latest/tt035.json', flavour="odk-tt036")
+        import_odk('data/latest/tt036.json', flavour="odk-tt036")
+        import_odk('data/latest/fs03.json', flavour="odk-fs03")
+        import_odk('data/latest/mwi01.json', flavour="odk-mwi01")
+    """
+    with suspend_rendering(), stats.deferred_refresh():
+        return _import_odk(datafile, flavour, extradata, usercsv, mapping)
+
+
+def _import_odk(datafile, flavour, extradata, usercsv, mapping):
+    """Import ODK data with rendering suspended, see import_odk."""
+    if mapping is None:
+        mapping = make_mapping()
+
+    if flavour == "odk-tt034":
+        logger.info("Using flavour ODK Track or Treat 0.34...")
+        with open(datafile) as df:
+            d = json.load(df)
+            logger.info("Loaded {0} records from {1}".format(len(d), datafile))
+        mapping["users"] = {u: guess_user(u)["user"] for u in set([r["reporter"] for r in d])}
+        mapping["keep"] = [t.source_id for t in Encounter.objects.exclude(
+            status=Encounter.STATUS_NEW).filter(source="odk")]
+
+        [import_one_record_tt034(r, mapping) for r in d
+         if r["instanceID"] not in mapping["keep"]]     # retain local edits
+        logger.info("Done!")
+
+    elif flavour == "odk-tt036":
+        logger.info("Using flavour ODK Track or Treat 0.35-0.36...")
+        with open(datafile) as df:
+            d = json.load(df)
+            logger.info("Loaded {0} records from {1}".format(len(d), datafile))
+        mapping["users"] = {u: guess_user(u)["user"] for u in set([r["reporter"] for r in d])}
+        mapping["keep"] = [t.source_id for t in Encounter.objects.exclude(
+            status=Encounter.STATUS_NEW).filter(source="odk")]
+
+        [import_one_record_tt036(r, mapping) for r in d
+         if r["instanceID"] not in mapping["keep"]]     # retain local edits
+        logger.info("Done!")
+
+    elif flavour == "odk-fs03":
+        logger.info("Using flavour ODK Fox Sake 0.3...")
+        with open(datafile) as df:
+            d = json.load(df)
+            logger.info("Loaded {0} records from {1}".format(len(d), datafile))
+        mapping["users"] = {u: guess_user(u)["user"] for u in set([r["reporter"] for r in d])}
+        mapping["keep"] = [t.source_id for t in Encounter.objects.exclude(
+            status=Encounter.STATUS_NEW).filter(source="odk")]
+
+        [import_one_record_fs03(r, mapping) for r in d
+         if r["instanceID"] not in mapping["keep"]]     # retain local edits
+        logger.info("Done!")
+
+    elif flavour == "odk-mwi01":
+        logger.info("Using flavour ODK Marine Wildlife Incident 0.1...")
+        with open(datafile) as df:
+            d = json.load(df)
+            logger.info("Loaded {0} records from {1}".format(len(d), datafile))
+        mapping["users"] = {u: guess_user(u)["user"] for u in set([r["reporter"] for r in d])}
+        mapping["keep"] = [t.source_id for t in Encounter.objects.exclude(
+            status=Encounter.STATUS_NEW).filter(source="odk")]
+
+        [import_one_record_mwi01(r, mapping) for r in d
+         if r["instanceID"] not in mapping["keep"]]     # retain local edits
+        logger.info("Done!")
+
+    elif flavour == "odk-tally05":
+        logger.info("Using flavour ODK Track Tally 0.5...")
+        with open(datafile) as df:
+            d = json.load(df)
+            logger.info("Loaded {0} records from {1}".format(len(d), datafile))
+        mapping["users"] = {u: guess_user(u)["user"] for u in set([r["reporter"] for r in d])}
+        mapping["keep"] = [t.source_id for t in Encounter.objects.exclude(
+            status=Encounter.STATUS_NEW).filter(source="odk")]
+
+        [import_one_record_tt05(r, mapping) for r in d
+         if r["instanceID"] not in mapping["keep"]]     # retain local edits
+        logger.info("Done!")
+
+    elif flavour == "cet":
+        logger.info("Using flavour Cetacean strandings...")
+        # ODK_MAPPING["users"] = {u: guess_user(u)["user"] for u in set([r["reporter"] for r in d])}
+        mapping["keep"] = [t.source_id for t in Encounter.objects.exclude(
+            status=Encounter.STATUS_NEW).filter(source="cet")]
+        mapping["overwrite"] = [t.source_id for t in Encounter.objects.filter(
+            source="cet", status=Encounter.STATUS_NEW)]
+
+        enc = csv.DictReader(open(datafile))
+
+        [import_one_record_cet(e, mapping) for e in enc
+         if e["Record No."] not in mapping["keep"]]
+
+    elif flavour == "pin":
+        logger.info("Using flavour Pinniped strandings...")
+        # mapping["users"] = {u: guess_user(u)["user"] for u in set([r["reporter"] for r in d])}
+        mapping["keep"] = [t.source_id for t in Encounter.objects.exclude(
+            status=Encounter.STATUS_NEW).filter(source="pin")]
+        enc = csv.DictReader(open(datafile))
+        logger.info("not impemented yet")
+
+    elif flavour == "wamtram":
+        logger.info("ALL ABOARD THE WAMTRAM!!!")
+        logger.info("Reading data...")
+        enc = csv.DictReader(open(datafile))
+        wamtram_users = csv.DictReader(open(usercsv))
+
+        # List of [WAStD User object (.id), WAMTRAM user dict (["PERSON_ID"])]
+        logger.info("Reconstructing users...")
+        users = {user["PERSON_ID"]: update_wastd_user(user)
+                 for user in wamtram_users if user["name"] != ""}
+
+        logger.info("Importing data...")
+        imported = [import_one_encounter_wamtram(e, mapping, users) for e in enc]
+        logger.info("Done, imported {0} records.".format(len(imported)))
+
+    elif flavour == "whambam":
+        logger.info("thank you ma'am")
+        tags = csv.DictReader(open(datafile))
+
+        logger.info("Caching tagging encounters...")
+        enc = [
+            x["source_id"]
+            for x
+            in AnimalEncounter.objects.filter(source="wamtram").values("source_id")
+        ]
+
+        logger.info("Loading tagging observations...")
+        tags = [import_one_tag(x, mapping) for x in tags
+                if make_wamtram_source_id(x["observation_id"]) in enc]
+        logger.info("Done loading {0} tagging observations.".format(len(tags)))
+
+    elif flavour == "sitevisit":
+        logger.info("Loading Site Visits...")
+        with open(datafile) as df:
+            d = json.load(df)
+            logger.info("Loaded {0} records from {1}".format(len(d), datafile))
+        mapping["users"] = {u: guess_user(u)["user"] for u in set(
+            [r["reporter"] for r in d])}
+
+        [import_one_record_sv01(r, mapping) for r in d]     # retain local edits
+        logger.info("Done!")
+
+    else:
+        logger.info("Format {0} not recognized. Exiting.".format(flavour))
@@ -0,0 +1,2615 @@
+# -*- coding: utf-8 -*-
+"""ODK Aggregate API client and importers for current ODK forms.
+
+This module pulls in requests and xmltodict, and is therefore only imported
+on demand, e.g. by ``wastd.observations.tasks.import_odka``.
+"""
+import io
+import json
+import logging
+import os
+
+import requests
+import xmltodict
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from requests.auth import HTTPDigestAuth
+
+from shared import jobs
+from wastd.observations.importers.helpers import *
+from wastd.observations.media import batch as media_batch
+from wastd.observations import stats
+from wastd.observations.rendering import suspend_rendering
+from wastd.observations.models import *
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------#
+# ODK Aggregate API helpers
+#
+def odka_credentials(url=None, un=None, pw=None):
+    """Return ODK Aggregate URL, username and password, defaulting to settings.ODKA_*."""
+    return (url or settings.ODKA_URL, un or settings.ODKA_UN, pw or settings.ODKA_PW)
+
+
+def odka_forms(url=None,
+               un=None,
+               pw=None):
+    """Return an OpenRosa xformsList XML response as list of dicts.
+
+    See http://docs.opendatakit.org/openrosa-form-list/
+
+    Arguments
+
+    url The OpenRosa xformsList API endpoint of an ODK Aggregate instance,
+        default: the value of environment variable "ODKA_URL".
+    un A username that exists on the ODK-A instance.
+        Default: the value of environment variable "ODKA_UN".
+    pw The username's password.
+        Default: the value of environment variable "ODKA_PW".
+
+    Returns
+    A list of dicts, each dict contains one xform:
+
+    forms = odka_forms()
+    logger.debug(json.dumps(forms, indent=4))
+
+
+    The whole response parses to:
+    res = {
+    "xforms": {
+        "@xmlns": "http://openrosa.org/xforms/xformsList",
+        "xform": [
+            {
+                "formID": "build_Track-Tally-0-5_1502342159",
+                "name": "Track Tally 0.5",
+                "majorMinorVersion": null,
+                "version": null,
+                "hash": "md5:2607df5d22571e1e55e1b90e90157473",
+                "downloadUrl": "https://dpaw-data.appspot.com/formXml?formId=build_Track-Tally-0-5_1502342159"
+            },
+            {... other form defs ...}
+            ]
+        }
+    }
+
+    This function returns res["xforms"]["xform"] and returns a list of dicts.
+        [
+            {
+                "formID": "build_Track-Tally-0-5_1502342159",
+                "name": "Track Tally 0.5",
+                "majorMinorVersion": null,
+                "version": null,
+                "hash": "md5:2607df5d22571e1e55e1b90e90157473",
+                "downloadUrl": "https://dpaw-data.appspot.com/formXml?formId=build_Track-Tally-0-5_1502342159"
+            },
+            {... other form defs ...}
+        ]
+
+    some_form_id = forms[0]["formID"]
+    """
+    url, un, pw = odka_credentials(url, un, pw)
+    api = "{0}/xformsList".format(url)
+    au = HTTPDigestAuth(un, pw)
+    logger.info("[odka_forms] Retrieving xformsList from {0}...".format(url))
+    res = requests.get(api, auth=au)
+    xforms = xmltodict.parse(res.content, xml_attribs=True)
+    forms = xforms["xforms"]["xform"]
+    logger.info("[odka_forms] Done, retrieved {0} forms.".format(len(forms)))
+    return forms
+
+
+def odka_submission_ids(form_id,
+                        limit=10000,
+                        url=None,
+                        un=None,
+                        pw=None,
+                        verbose=False):
+    """Return a list of submission IDs for a given ODKA formID.
+
+    See http://docs.opendatakit.org/aggregate-use/#briefcase-aggregate-api
+
+    TODO: should lower numEntries and load in idChunks
+
+    Arguments:
+
+    form_id An existing xform formID,
+        e.g. 'build_Site-Visit-End-0-1_1490756971'.
+    limit The maximum number of submission IDs to retrieve, default: 1 000 000.
+    url The OpenRosa xformsList API endpoint of an ODK Aggregate instance,
+        default: the value of environment variable "ODKA_URL".
+    un A username that exists on the ODK-A instance.
+        Default: the value of environment variable "ODKA_UN".
+    pw The username's password.
+        Default: the value of environment variable "ODKA_PW".
+
+
+    Returns
+    A list of submission IDs. Each ID can be used as input for odka_submission().
+
+    Example:
+
+    forms = odka_forms()
+    ids = odka_submission_ids(forms[6]["formID"])
+
+    ['uuid:c439fb45-3a1f-4127-be49-571af79a2c63',
+     'uuid:13f06748-54a4-4aac-9dc2-e547c80a1c37',
+     'uuid:fdde19ad-cc80-48d6-a0fd-adebfa3c5e02',
+     'uuid:ce83e6cf-df9f-4705-8cfc-5fc413e22c43',
+     'uuid:5d4b2bb6-21c0-4ec9-801a-f13b74a78add',
+     'uuid:a9772680-b6f9-45c0-8ed4-189f5e722a6c',
+     ...
+    ]
+    """
+    url, un, pw = odka_credentials(url, un, pw)
+    pars = {'formId': form_id, 'numEntries': limit}
+    api = "{0}/view/submissionList".format(url)
+    au = HTTPDigestAuth(un, pw)
+
+    logger.info("[odka_submission_ids] Retrieving submission IDs for formID '{0}'...".format(form_id))
+    logger.debug("[odka_submission_ids] Retrieving submission IDs from '{0}'...".format(api))
+
+    resumption_cursor = ''
+    resume = True
+    id_list = []
+    counter = 1
+
+    while resume:
+
+        logger.info("[odka_submission_ids] Retrieving chunk {0}...".format(counter))
+        res = requests.get(api, auth=au, params=pars)
+        parsed = xmltodict.parse(res.content, xml_attribs=True)
+
+        if not parsed["idChunk"]["idList"]:
+            # No submissions.
+            ids = []
+        elif type(parsed["idChunk"]["idList"]["id"]) == str:
+            # One submission.
+            ids = [parsed["idChunk"]["idList"]["id"], ]
+        else:
+            # More than one submission.
+            ids = parsed["idChunk"]["idList"]["id"]
+
+        id_list += ids
+        logger.info("[odka_submission_ids] Got {0} new IDs, total {1}".format(len(ids), len(id_list)))
+        resume = (resumption_cursor != parsed["idChunk"]["resumptionCursor"])
+        resumption_cursor = parsed["idChunk"]["resumptionCursor"]
+        pars["cursor"] = resumption_cursor
+        counter += 1
+
+    logger.info("[odka_submission_ids] Done, retrieved {0} submission IDs.".format(len(id_list)))
+    return id_list
+
+
+def odka_submission(form_id,
+                    submission_id,
+                    url=None,
+                    un=None,
+                    pw=None,
+                    verbose=False):
+    """Download one ODKA submission and return as dict.
+
+    See http://docs.opendatakit.org/aggregate-use/#briefcase-aggregate-api
+
+    Arguments:
+
+    form_id An existing xform formID,
+        e.g. 'build_Site-Visit-Start-0-1_1490753483'.
+    submission_id An existing opendatakit submission ID,
+        e.g. 'uuid:a9772680-b6f9-45c0-8ed4-189f5e722a6c'.
+    limit The maximum number of submission IDs to retrieve, default: 10000.
+    url The OpenRosa xformsList API endpoint of an ODK Aggregate instance,
+        default: the value of environment variable "ODKA_URL".
+    un A username that exists on the ODK-A instance.
+        Default: the value of environment variable "ODKA_UN".
+    pw The username's password.
+        Default: the value of environment variable "ODKA_PW".
+    verbose Whether to logger.debug verbose log messages, default: False.
+
+    Returns
+        A dict with key "submission" containing "data" and "mediaFile".
+
+    Example
+    d = odka_submission('build_Site-Visit-Start-0-1_1490753483',
+        'uuid:a9772680-b6f9-45c0-8ed4-189f5e722a6c')
+    logger.debug(json.dumps(d, indent=4))
+    {
+        "submission": {
+            "@xmlns": "http://opendatakit.org/submissions",
+            "@xmlns:orx": "http://openrosa.org/xforms",
+            "data": {
+                "data": {
+                    "@id": "build_Site-Visit-Start-0-1_1490753483",
+                    "@instanceID": "uuid:a9772680-b6f9-45c0-8ed4-189f5e722a6c",
+                    "@submissionDate": "2017-11-05T23:37:49.829Z",
+                    "@isComplete": "true",
+                    "@markedAsCompleteDate": "2017-11-05T23:40:51.534Z",
+                    "orx:meta": {
+                        "orx:instanceID": "uuid:a9772680-b6f9-45c0-8ed4-189f5e722a6c"
+                    },
+                    "reporter": "ali_goss",
+                    "survey_start_time": "2017-11-05T22:02:51.121Z",
+                    "site_visit": {
+                        "location": "-20.3136817000 118.6444200000 -2.1000000000 4.8000000000",
+                        "site_conditions": "1509919398254.jpg",
+                        "comments": null
+                    }
+                }
+            },
+            "mediaFile": {
+                "filename": "1509919398254.jpg",
+                "hash": "md5:4c112a49ab99aa6a5166741ff9ba2ea2",
+                "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+            }
+        }
+    }
+
+    d["submission"]["data"]["data"]["@id"]
+    'build_Site-Visit-Start-0-1_1490753483'
+    """
+    url, un, pw = odka_credentials(url, un, pw)
+    api = ("{0}/view/downloadSubmission?formId={1}"
+           "[@version=null%20and%20@uiVersion=null]/data[@key={2}]").format(
+        url, form_id, submission_id)
+    au = HTTPDigestAuth(un, pw)
+    logger.info("[odka_submission] Retrieving {0}".format(submission_id))
+    if verbose:
+        logger.info("[odka_submission] URL {0}".format(api))
+    res = requests.get(api, auth=au)
+    return xmltodict.parse(res.content, xml_attribs=True)
+
+
+def downloaded_data_filename(form_id, path):
+    """Generate a filename for a form_id in format path/form_id.json."""
+    return os.path.join(path, form_id) + ".json"
+
+
+def downloaded_data_exists(form_id, path):
+    """Whether data already was downloaded at path/form_id.json."""
+    return os.path.exists(downloaded_data_filename(form_id, path))
+
+
+def downloaded_data(form_id, path):
+    """Return downloaded data for form_id stored at path as parsed JSON or an empty list."""
+    if downloaded_data_exists(form_id, path):
+        logger.info("[downloaded_data] Parsing {0}".format(downloaded_data_filename(form_id, path)))
+        with io.open(downloaded_data_filename(form_id, path), mode="r", encoding="utf-8") as df:
+            data = json.load(df)
+    else:
+        data = []
+    return data
+
+
+def odka_submissions(form_id,
+                     path=".",
+                     url=None,
+                     un=None,
+                     pw=None,
+                     verbose=False,
+                     append=True
+                     ):
+    """Retrieve a list of all submissions for a given formID.
+
+    Arguments:
+
+    form_id An existing xform formID,
+        e.g. 'build_Site-Visit-Start-0-1_1490753483'.
+    url The OpenRosa xformsList API endpoint of an ODK Aggregate instance,
+        default: the value of environment variable "ODKA_URL".
+    un A username that exists on the ODK-A instance.
+        Default: the value of environment variable "ODKA_UN".
+    pw The username's password.
+        Default: the value of environment variable "ODKA_PW".
+    verbose Whether to logger.debug verbose log messages, default: False.
+    append Whether to retain already downloaded data and append new data, or
+        to overwrite all already downloaded data and download all data again.
+
+    Example
+    forms = odka_forms()
+    data = odka_submissions(forms[6]["formID"])
+    """
+    url, un, pw = odka_credentials(url, un, pw)
+    logger.info("[odka_submissions] Retrieving submissions for formID {0}...".format(form_id))
+
+    old_data = downloaded_data(form_id, path)
+    logger.info("[odka_submissions] Found {0} already downloaded submissions.".format(len(old_data)))
+    if append:
+        old_ids = [make_data(x)["@instanceID"] for x in old_data]
+        action = "retained"
+    else:
+        old_ids = []
+        action = "overwrote"
+
+    new_data = [odka_submission(form_id, x, url=url, un=un, pw=pw, verbose=verbose)
+                for x in odka_submission_ids(form_id, url=url, un=un, pw=pw, verbose=verbose)
+                if x not in old_ids]
+    logger.info("[odka_submissions] Done, retrieved {0} new submissions, "
+                "{1} {2} already downloaded submissions.".format(
+                    len(new_data), action, len(old_data)))
+    return old_data + new_data
+
+
+def save_odka(form_id,
+              path=".",
+              url=None,
+              un=None,
+              pw=None,
+              verbose=False,
+              append=True):
+    """Save all submissions for a given form_id as JSON to a given path.
+
+    Arguments:
+
+    form_id An existing form_id
+    path A locally existing path, default: "."
+    url The OpenRosa xformsList API endpoint of an ODK Aggregate instance,
+        default: the value of environment variable "ODKA_URL".
+    un A username that exists on the ODK-A instance.
+        Default: the value of environment variable "ODKA_UN".
+    pw The username's password.
+        Default: the value of environment variable "ODKA_PW".
+    verbose Whether to logger.debug verbose log messages, default: False.
+    append Whether to retain already downloaded data and append new data, or
+        to overwrite all already downloaded data and download all data again.
+
+    Returns:
+    The number of saved submissions.
+    """
+    url, un, pw = odka_credentials(url, un, pw)
+    submissions = odka_submissions(
+        form_id,
+        path=path,
+        url=url,
+        un=un,
+        pw=pw,
+        verbose=verbose,
+        append=append)
+    with io.open(downloaded_data_filename(form_id, path), mode="w", encoding="utf-8") as outfile:
+        data = json.dumps(submissions, indent=2, ensure_ascii=False)
+        outfile.write(data)
+    return len(submissions)
+
+
+@jobs.job("save_all_odka")
+def save_all_odka(path=".",
+                  url=None,
+                  un=None,
+                  pw=None,
+                  verbose=False,
+                  append=True):
+    """Save all submissions for all forms of an odka instance.
+
+    Arguments:
+
+    path A locally existing path, default: "."
+    url The OpenRosa xformsList API endpoint of an ODK Aggregate instance,
+        default: the value of environment variable "ODKA_URL".
+    un A username that exists on the ODK-A instance.
+        Default: the value of environment variable "ODKA_UN".
+    pw The username's password.
+        Default: the value of environment variable "ODKA_PW".
+    verbose Whether to logger.debug verbose log messages, default: False.
+    append Whether to retain already downloaded data and append new data, or
+        to overwrite all already downloaded data and download all data again.
+
+    Returns:
+    At the specified location (path) for each form, a file will be written
+    which contains all submissions (records) for that respective form.
+    """
+    url, un, pw = odka_credentials(url, un, pw)
+    for xform in odka_forms():
+        with jobs.stage(xform['formID']) as stage:
+            stage.rows = save_odka(
+                xform['formID'],
+                path=path,
+                url=url,
+                un=un,
+                pw=pw,
+                verbose=verbose,
+                append=append)
+
+
+def make_datapackage_json(xform,
+                          path=".",
+                          url=None,
+                          un=None,
+                          pw=None,
+                          verbose=False,
+                          download_submissions=False,
+                          download_config=False):
+    """Generate a datapacke.json config for a given xform dict.
+
+    Arguments:
+
+    xform An xform dict as produced by odka_forms()
+    path The local path to the downloaded submission JSON as produced by save_odka()
+    url The OpenRosa xformsList API endpoint of an ODK Aggregate instance,
+        default: the value of environment variable "ODKA_URL".
+    un A username that exists on the ODK-A instance.
+        Default: the value of environment variable "ODKA_UN".
+    pw The username's password.
+        Default: the value of environment variable "ODKA_PW".
+    verbose Whether to logger.debug verbose log messages, default: False.
+    download_submissions Whether to download submissions
+    download_config Whether to write the returned config to a local file
+
+    Returns:
+    A dict
+    """
+    url, un, pw = odka_credentials(url, un, pw)
+    fid = xform["formID"].lower()
+    datapackage_path = os.path.join(path, fid)
+
+    if not os.path.exists(datapackage_path):
+        os.makedirs(datapackage_path, exist_ok=True)
+
+    if download_submissions:
+        save_odka(
+            xform["formID"],
+            path=datapackage_path,
+            url=url,
+            un=un,
+            pw=pw,
+            verbose=verbose)
+
+    datapackage_config = {
+        "name": fid,
+        "title": xform["name"],
+        "description": "Hash: {0}\nversion: {1}\nmajorMinorVersion: {2}\ndownload URL: {3}".format(
+            xform["hash"], xform["version"], xform["majorMinorVersion"], xform["downloadUrl"]),
+        "licenses": [
+            {
+                "id": "odc-pddl",
+                "name": "Public Domain Dedication and License",
+                "version": "1.0",
+                "url": "http://opendatacommons.org/licenses/pddl/1.0/"
+            }
+        ],
+        "resources": [
+            {'encoding': 'utf-8',
+             'format': 'json',
+             'mediatype': 'text/json',
+             'name': fid,
+             'path': "{0}/{1}.json".format(datapackage_path, fid),
+             'profile': 'data-resource'}
+        ]
+    }
+
+    if download_config:
+        with open('{0}/datapackage.json'.format(datapackage_path), 'w') as outfile:
+            json.dump(datapackage_config, outfile)
+
+    return datapackage_config
+
+
+# ---------------------------------------------------------------------------#
+# WAStD data import helpers
+#
+def handle_media_attachment_odka(enc, media, photo_filename, title="Photo"):
+    """Handle MediaAttachment for ODKA data."""
+    if not photo_filename:
+        logger.debug("  [handle_media_attachment_odka] skipping empty photo {0}".format(title))
+    else:
+        handle_media_attachment(enc, make_photo_dict(photo_filename, media), title=title)
+    return None
+
+
+def handle_fieldmedia_attachment_odka(exp, media, photo_filename, title="Photo"):
+    """Handle MediaAttachment for ODKA data."""
+    if not photo_filename:
+        logger.debug("  [handle_fieldmedia_attachment_odka] skipping empty photo {0}".format(title))
+    else:
+        handle_fieldmedia_attachment(exp, make_photo_dict(photo_filename, media), title=title)
+    return None
+
+
+def handle_odka_disturbanceobservation(enc, media, data):
+    """Handle empty, one, or multiple TurtleNestDistObs.
+
+    Arguments:
+
+    enc A TurtleNestEncounter
+    media A dict of photo filename:url
+    data A "disturbance_observation" dict from ODK "Fox Sake 0.3" or "Track or Treat 0.36"
+
+    Returns
+    None
+    """
+    if "disturbanceobservation" in data:
+        distobs = listify(data["disturbanceobservation"])
+    elif "disturbance" in data:
+        distobs = listify(data["disturbance"])
+    else:
+        logger.debug("  [handle_odka_disturbanceobservation] found no TurtleNestDisturbanceObservation")
+        return None
+
+    if distobs:
+        logger.debug(
+            "  [handle_odka_disturbanceobservation] found "
+            "{0} TurtleNestDisturbanceObservation(s)".format(len(distobs)))
+        [handle_turtlenestdistobs31(
+            dict(
+                disturbance_cause=x["disturbance_cause"],
+                disturbance_cause_confidence=x["disturbance_cause_confidence"],
+                disturbance_severity="na"
+                if "disturbance_severity" not in x else x["disturbance_severity"],
+                photo_disturbance=make_photo_dict(x["photo_disturbance"], media),
+                comments=x["comments"]
+            ),
+            enc) for x in distobs]
+    else:
+        logger.debug("  [handle_odka_disturbanceobservation] found invalid data: {0}".format(
+            json.dumps(distobs, indent=2)))
+    return None
+
+
+def handle_odka_nesttagobservation(enc, media, data):
+    """Handle empty, one, or multiple NestTagObservations.
+
+    Arguments:
+
+        enc A TurtleNestEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Track or Treat 0.36" or higher.
+
+    Returns:
+
+        None
+
+    "nest_tag": {
+        "status": "resighted",
+        "flipper_tag_id": "WA1234",
+        "date_nest_laid": "2017-11-10",
+        "tag_label": "Test3",
+        "tag_comments": "Jup",
+        "photo_tag": "1510298358979.jpg"
+    }
+    """
+    if "nest_tag" not in data:
+        logger.debug("[handle_odka_nesttagobservation] found no TurtleNestTagObservation")
+        return None
+
+    obs = listify(data["nest_tag"])
+
+    if obs:
+        logger.debug("[handle_odka_nesttagobservation] found {0} TurtleNestTagObservation(s)".format(len(obs)))
+        [handle_turtlenesttagobs(
+            dict(
+                encounter=enc,
+                status=x["status"],
+                flipper_tag_id=x["flipper_tag_id"],
+                date_nest_laid=None if not x["date_nest_laid"] else x["date_nest_laid"],
+                tag_label=x["tag_label"],
+                photo_tag=make_photo_dict(x["photo_tag"], media)
+            ),
+            enc) for x in obs]
+    else:
+        logger.debug("[handle_odka_nesttagobservation] found invalid data:\n{0}".format(
+            json.dumps(obs, indent=2)))
+
+    return None
+
+
+def handle_odka_tagsobs(enc, media, data):
+    """Handle empty, one, or multiple TagObservations.
+
+    Arguments:
+
+        enc An AnimalEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Marine Wildlife Incident 0.1" or higher, can contain
+
+        No tagobs: key "tag_observation" missing from data.
+
+        One tagobs:
+        "tag_observation": {
+            "photo_tag": "1511046895915.jpg",
+            "name": "Wb6653",
+            "tag_status": "resighted",
+            "tag_comments": null,
+            "tag_location": "flipper-front-left-1",
+            "tag_type": "flipper-tag"
+          }
+
+        Multiple tagobs:
+        "tag_observation": [
+            {
+              "photo_tag": "1511005364137.jpg",
+              "name": "900119000520181",
+              "tag_status": "resighted",
+              "tag_comments": "applied-new",
+              "tag_location": "neck",
+              "tag_type": "pit-tag"
+            },
+            {
+              "photo_tag": "1511005464946.jpg",
+              "name": "wb14638",
+              "tag_status": "resighted",
+              "tag_comments": "applied-new",
+              "tag_location": "flipper-front-right-1",
+              "tag_type": "flipper-tag"
+            },
+            {
+              "photo_tag": "1511005522216.jpg",
+              "name": "f8904",
+              "tag_status": "removed",
+              "tag_comments": null,
+              "tag_location": "flipper-rear-left",
+              "tag_type": "biopsy-sample"
+            }
+          ]
+
+    Returns:
+
+        None
+    """
+    if "tag_observation" in data and data["tag_observation"]:
+
+        tag_type_dict = map_and_keep(TAG_TYPE_CHOICES)
+        tag_location_dict = map_and_keep(TURTLE_BODY_PART_CHOICES)
+        tag_status_dict = map_and_keep(TAG_STATUS_CHOICES)
+
+        for obs in listify(data["tag_observation"]):
+            # 0. Lookups
+            tag_name = sanitize_tag_name(obs["name"])
+            tag_type = tag_type_dict[obs["tag_type"]]
+
+            # 1. TagObservation
+            new_data = dict(
+                encounter_id=enc.id,
+                tag_type=tag_type,
+                handler_id=enc.observer_id,
+                recorder_id=enc.reporter_id,
+                name=tag_name,
+                tag_location=tag_location_dict[obs["tag_location"]],
+                status=tag_status_dict[obs["tag_status"]],
+                comments=obs["tag_comments"]
+            )
+
+            criteria = dict(encounter=enc, tag_type=tag_type, name=tag_name)
+            target = TagObservation.objects.filter(**criteria)
+            if target.exists():
+                logger.debug("  [handle_odka_tagsobs] Updating existing tag obs {0}...".format(tag_name))
+                e = target.update(**new_data)
+                e = TagObservation.objects.get(**criteria)
+
+            else:
+                logger.debug("  [handle_odka_tagsobs] Creating new tag obs {0}...".format(tag_name))
+                e = TagObservation.objects.create(**new_data)
+
+            # 2. Photo of tag
+            if obs["photo_tag"]:
+                handle_media_attachment_odka(
+                    enc, media, obs["photo_tag"], title="Photo {0}".format(e.__str__()))
+
+    else:
+        logger.info("  [handle_odka_tagsobs] found no TagObservation")
+
+    return None
+
+
+def handle_odka_turtlenestobservation(enc, media, data):
+    """Handle empty, one, or multiple TurtleNestObservations.
+
+    Arguments:
+
+        enc A TurtleNestEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Track or Treat 0.36" or higher, containing
+
+        "nest": {
+            "habitat": "in-dune-vegetation",
+            "disturbance": "present",
+            "nest_tagged": "yes",
+            "logger_found": "yes",
+            "eggs_counted": "yes",
+            "hatchlings_measured": "yes",
+            "fan_angles_measured": "yes"
+        },
+        "egg_count": {
+            "no_egg_shells": "60",
+            "no_live_hatchlings": "5",
+            "no_dead_hatchlings": "14",
+            "no_undeveloped_eggs": "15",
+            "no_unhatched_eggs": "5",
+            "no_unhatched_term": "6",
+            "no_depredated_eggs": "2",
+            "nest_depth_top": "25",
+            "nest_depth_bottom": "89"
+        },
+        "egg_photos": {
+            "photo_eggs": "1510298324400.jpg"
+        },
+
+    Returns:
+
+        None
+    """
+    if "egg_count" not in data:
+        logger.info("  [handle_odka_turtlenestobservation] found no TurtleNestObservation")
+        return None
+
+    if data["nest"]["eggs_counted"] == "yes":
+        nest_dict = data["egg_count"]
+        nest_dict["habitat"] = data["nest"]["habitat"]
+        handle_turtlenestobs31(nest_dict, enc)
+
+        # Photos of excavated eggs
+        if "egg_photos" in data and data["egg_photos"]:
+            [handle_media_attachment_odka(
+                enc, media, ep["photo_eggs"], title="Egg photo {0}".format(idx + 1))
+                for idx, ep in enumerate(listify(data["egg_photos"]))]
+    return None
+
+
+def handle_odka_managementaction(enc, media, data):
+    """Handle empty, one, or multiple ManagementAction.
+
+    Arguments:
+
+        enc An AnimalEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Marine Wildlife Incident 0.1" or higher, can contain
+
+        data["animal_fate"]["animal_fate_comment"]
+
+    Returns:
+
+        None
+    """
+    if "animal_fate" not in data:
+        msg = "  [handle_odka_managementaction] found no ManagementAction"
+    else:
+        new_data = dict(
+            encounter_id=enc.id,
+            management_actions=data["animal_fate"]["animal_fate_comment"]
+        )
+
+        criteria = dict(encounter=enc, management_actions=data["animal_fate"]["animal_fate_comment"])
+        target = ManagementAction.objects.filter(**criteria)
+        if target.exists():
+            e = target.update(**new_data)
+            e = ManagementAction.objects.get(**criteria)
+            msg = "  [handle_odka_managementaction] Updated existing {0}".format(e)
+
+        else:
+            e = ManagementAction.objects.create(**new_data)
+            msg = "  [handle_odka_managementaction] Created new {0}".format(e)
+
+    logger.info(msg)
+    return None
+
+
+def handle_odka_hatchlingmorphometricobservation(enc, media, data):
+    """Handle empty, one, or multiple TurtleNestObservations.
+
+    Arguments:
+
+        enc A TurtleNestEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Track or Treat 0.36" or higher, containing
+
+        "nest": {
+            "habitat": "in-dune-vegetation",
+            "disturbance": "present",
+            "nest_tagged": "yes",
+            "logger_found": "yes",
+            "eggs_counted": "yes",
+            "hatchlings_measured": "yes",
+            "fan_angles_measured": "yes"
+        },
+        "hatchling_measurements": [
+            {
+                "straight_carapace_length_mm": "125",
+                "straight_carapace_width_mm": "56",
+                "body_weight_g": "12"
+            },
+            {
+                "straight_carapace_length_mm": "145",
+                "straight_carapace_width_mm": "16",
+                "body_weight_g": "15"
+            }
+        ],
+
+    Returns:
+
+        None
+    """
+    if data["nest"]["hatchlings_measured"] == "yes" and "hatchling_measurements" in data:
+        [handle_hatchlingmorphometricobs(x, enc)
+         for x in listify(data["hatchling_measurements"])]
+    return None
+
+
+def handle_odka_turtlemorph(enc, media, data):
+    """Handle empty or one TurtleMorphometricObservation.
+
+    ODK forms collect up to one TurtleMorphometricObservation.
+    Records imported from ODK are assumed to be new.
+    Therefore, there can be up to one TurtleMorphometricObservation per AnimalEncounter via ODK.
+
+    Arguments:
+
+        enc An AnimalEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Marine Wildlife Incident 0.1" or higher, can contain
+
+        "morphometrics": {
+            "maximum_head_width_mm": "167",
+            "curved_carapace_width_accuracy": "5",
+            "curved_carapace_width_mm": "630",
+            "curved_carapace_length_mm": "950",
+            "curved_carapace_length_accuracy": "5",
+            "tail_length_carapace_mm": "125",
+            "maximum_head_width_accuracy": "1",
+            "tail_length_carapace_accuracy": "1"
+        },
+
+    Returns:
+
+        None
+    """
+    if "morphometrics" not in data:
+        msg = "  [handle_odka_turtlemorph] found no TurtleMorphometricObservation"
+    else:
+        obs = data["morphometrics"]
+        new_data = dict(
+            encounter_id=enc.id,
+            curved_carapace_length_mm=int_or_none(obs.get("curved_carapace_length_mm", None)),
+            curved_carapace_length_accuracy=obs.get("curved_carapace_length_accuracy", None),
+            curved_carapace_width_mm=int_or_none(obs.get("curved_carapace_width_mm", None)),
+            curved_carapace_width_accuracy=obs.get("curved_carapace_width_accuracy", None),
+            tail_length_carapace_mm=int_or_none(obs.get("tail_length_carapace_mm", None)),
+            tail_length_carapace_accuracy=obs.get("tail_length_carapace_accuracy", None),
+            maximum_head_width_mm=int_or_none(obs.get("maximum_head_width_mm", None)),
+            maximum_head_width_accuracy=obs.get("maximum_head_width_accuracy", None),
+            handler_id=enc.observer_id,
+            recorder_id=enc.reporter_id,
+        )
+
+        criteria = dict(encounter=enc)
+        target = TurtleMorphometricObservation.objects.filter(**criteria)
+        if target.exists():
+            e = target.update(**new_data)
+            e = TurtleMorphometricObservation.objects.get(**criteria)
+            msg = "  [handle_odka_turtlemorph] Updated existing {0}".format(e)
+
+        else:
+            e = TurtleMorphometricObservation.objects.create(**new_data)
+            msg = "  [handle_odka_turtlemorph] Created new {0}".format(e)
+
+    logger.info(msg)
+    return None
+
+
+def handle_odka_turtledamageobs(enc, media, data):
+    """Handle empty, one, or multiple TurtleDamageObservation.
+
+    Arguments:
+
+        enc An AnimalEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Marine Wildlife Incident 0.1" or higher, can contain
+
+        No tagobs: key "damage_observation" missing from data.
+
+        One damageobs:
+        "damage_observation":
+          {
+            "photo_damage": "1510473605661.jpg",
+            "body_part": "neck",
+            "description": "damage comments",
+            "damage_type": "amputatedentirely",
+            "damage_age": "healed-partially"
+          },
+
+        Multiple damageobs:
+
+        "damage_observation": [
+          {
+            "photo_damage": "1510473605661.jpg",
+            "body_part": "neck",
+            "description": "damage comments",
+            "damage_type": "amputatedentirely",
+            "damage_age": "healed-partially"
+          },
+          {
+            "photo_damage": "1510473630318.jpg",
+            "body_part": "eyes",
+            "description": "another comment",
+            "damage_type": "algal-growth",
+            "damage_age": "healed-entirely"
+          }
+        ],
+
+    Returns:
+
+        None
+    """
+    if "damage_observation" in data and data["damage_observation"]:
+
+        body_part_dict = map_and_keep(TURTLE_BODY_PART_CHOICES)
+        damage_type_dict = map_and_keep(DAMAGE_TYPE_CHOICES)
+        damage_age_dict = map_and_keep(DAMAGE_AGE_CHOICES)
+
+        for obs in listify(data["damage_observation"]):
+
+            # 1. DamageObservation
+            new_data = dict(
+                encounter_id=enc.id,
+                body_part=body_part_dict[obs["body_part"]],
+                damage_type=damage_type_dict[obs["damage_type"]],
+                damage_age=damage_age_dict[obs["damage_age"]],
+                description=obs["description"]
+            )
+
+            criteria = new_data
+            target = TurtleDamageObservation.objects.filter(**criteria)
+            if target.exists():
+                e = target.update(**new_data)
+                e = TurtleDamageObservation.objects.get(**criteria)
+                logger.debug("  [handle_odka_turtledamageobs] Updated existing {0}...".format(e.__str__()))
+
+            else:
+                e = TurtleDamageObservation.objects.create(**new_data)
+                logger.debug("  [handle_odka_turtledamageobs] Created new {0}...".format(e.__str__()))
+
+            # 2. Photo
+            if obs["photo_damage"]:
+                handle_media_attachment_odka(
+                    enc, media, obs["photo_damage"], title="Photo {0}".format(e.__str__()))
+
+    else:
+        logger.info("  [handle_odka_turtledamageobs] found no TurtleDamageObservation")
+
+    return None
+
+
+def handle_odka_fanangles(enc, media, data):
+    """Handle empty, one, or multiple fan angles.
+
+    TurtleHatchlingEmergenceObservation,
+    TurtleHatchlingEmergenceOutlierObservation,
+    LightSourceObservation
+
+    Arguments:
+
+        enc An AnimalEncounter
+        media A dict of photo filename:url
+        data A "data" dict from ODK "Marine Wildlife Incident 0.1" or higher, can contain
+
+        # TT0.44
+        "hatchling_emergence_time_group": {
+            "hatchling_emergence_time": null
+          },
+        "fan_angles_manual": {
+            "bearing_to_water_manual": "6",
+            "rightmost_track_manual": null,
+            "leftmost_track_manual": null
+          },
+        "fan_angles": {
+            "no_tracks_main_group": "1",
+            "device_compass_present": "no",
+            "light_sources_present": "na",
+            "rightmost_track_auto": null,
+            "hatchling_emergence_time_known": "no",
+            "bearing_to_water_auto": null,
+            "leftmost_track_auto": null,
+            "outlier_tracks_present": "no"
+          },
+
+        "outlier_track": [
+            {
+              "track_bearing_auto": null,
+              "track_bearing_manual": "347"
+            },
+            {
+              "track_bearing_auto": null,
+              "track_bearing_manual": "21"
+            }
+          ],
+
+        # TT0.45
+        "fan_angles_manual": {
+           "bearing_to_water_manual": null,
+           "rightmost_track_manual": null,
+           "leftmost_track_manual": null
+         },
+         "fan_angles": {
+           "no_tracks_main_group": "35",
+           "device_compass_present": "yes",
+           "light_sources_present": "no",
+           "rightmost_track_auto": "296.2910000000",
+           "hatchling_emergence_time_known": "no",
+           "bearing_to_water_auto": "296.7820000000",
+           "leftmost_track_auto": "296.6340000000",
+           "outlier_tracks_present": "yes"
+         },
+         "outlier_track": {
+           "track_bearing_auto": "296.9590000000",
+           "track_bearing_manual": null
+         },
+
+        # TT0.46
+        "fan_angles": {
+            "no_tracks_main_group": "8",
+            "device_compass_present": "no",
+            "light_sources_present": "no",
+            "rightmost_track_auto": null,
+            "hatchling_emergence_time_known": "no",
+            "bearing_to_water_auto": null,
+            "leftmost_track_auto": null,
+            "outlier_tracks_present": "yes"
+          },
+
+        # TT0.47
+        "fan_angles": {
+            "leftmost_track_auto": null,
+            "rightmost_track_auto": null,
+            "bearing_to_water_auto": null,
+            "device_compass_present": "no",
+            "no_tracks_main_group": "25",
+            "outlier_tracks_present": "no",
+            "light_sources_present": "no",
+            "hatchling_emergence_time_known": "no"
+          },
+          "fan_angles_manual": {
+            "leftmost_track_manual": "307",
+            "rightmost_track_manual": "29",
+            "bearing_to_water_manual": "342"
+          },
+          "hatchling_emergence_time_group": {
+            "hatchling_emergence_time": null,
+            "hatchling_emergence_time_source": null
+          },
+
+        # # TT0.51
+          "fan_angles": {
+            "photo_hatchling_tracks_seawards": "1517438465952.jpg",
+            "photo_hatchling_tracks_relief": "1517438498603.jpg",
+            "bearing_to_water_manual": "148.0000000000",
+            "leftmost_track_manual": "164.0000000000",
+            "rightmost_track_manual": "192.0000000000",
+            "no_tracks_main_group": "9",
+            "no_tracks_main_group_min": "9",
+            "no_tracks_main_group_max": "9",
+            "outlier_tracks_present": "present",
+            "hatchling_path_to_sea": "clear",
+            "path_to_sea_comments": null,
+            "hatchling_emergence_time_known": "no",
+            "cloud_cover_at_emergence_known": "no",
+            "light_sources_present": "present"
+          },
+          "hatchling_emergence_time_group": {
+            "hatchling_emergence_time": null,
+            "hatchling_emergence_time_source": null
+          },
+          "emergence_climate": {
+            "cloud_cover_at_emergence": null
+          },
+          "light_source": [
+            {
+              "light_source_photo": null,
+              "light_bearing_manual": "178.0000000000",
+              "light_source_type": "artificial",
+              "light_source_description": "W"
+            },
+            {
+              "light_source_photo": null,
+              "light_bearing_manual": "156.0000000000",
+              "light_source_type": "artificial",
+              "light_source_description": "O"
+            }
+          ],
+          "other_light_sources": {
+            "other_light_sources_present": "na"
+          },
+          "outlier_track": [
+            {
+              "outlier_track_photo": null,
+              "outlier_track_bearing_manual": "112.0000000000",
+              "outlier_group_size": "1",
+              "outlier_track_comment": null
+            },
+            {
+              "outlier_track_photo": null,
+              "outlier_track_bearing_manual": "142.0000000000",
+              "outlier_group_size": "2",
+              "outlier_track_comment": null
+            }
+          ],
+
+
+        # Track or Treat 0.53
+        "fan_angles": {
+            "photo_hatchling_tracks_seawards": "1542579937330.jpg",
+            "photo_hatchling_tracks_relief": null,
+            "bearing_to_water_manual": "9.0000000000",
+            "leftmost_track_manual": "308.0000000000",
+            "rightmost_track_manual": "59.0000000000",
+            "no_tracks_main_group": "26",
+            "no_tracks_main_group_min": "26",
+            "no_tracks_main_group_max": "26",
+            "outlier_tracks_present": "present",
+            "hatchling_path_to_sea": "natural-obstacles",
+            "path_to_sea_comments": null,
+            "hatchling_emergence_time_known": "no",
+            "cloud_cover_at_emergence_known": "no",
+            "light_sources_present": "absent"
+          },
+          "outlier_track": {
+            "outlier_track_photo": "1542579974334.jpg",
+            "outlier_track_bearing_manual": "1.0000000000",
+            "outlier_group_size": "1",
+            "outlier_track_comment": null
+          },
+          "hatchling_emergence_time_group": {
+            "hatchling_emergence_time": null,
+            "hatchling_emergence_time_source": null
+          },
+          "emergence_climate": {
+            "cloud_cover_at_emergence": null
+          },
+
+        # ToN 0.54
+        "fan_angles": {
+            "photo_hatchling_tracks_seawards": "1547327246933.jpg",
+            "photo_hatchling_tracks_relief": "1547327279086.jpg",
+            "bearing_to_water_manual": "150.0000000000",
+            "leftmost_track_manual": "29.0000000000",
+            "rightmost_track_manual": "253.0000000000",
+            "no_tracks_main_group": "28",
+            "no_tracks_main_group_min": "26",
+            "no_tracks_main_group_max": "35",
+            "outlier_tracks_present": "present",
+            "hatchling_path_to_sea": "clear uneven-ground",
+            "path_to_sea_comments": "Small grass shrub directly Infront of nest blocking path to sea",
+            "hatchling_emergence_time_known": "no",
+            "cloud_cover_at_emergence_known": "no",
+            "light_sources_present": "present"
+          },
+          "outlier_track": [
+            {
+              "outlier_track_photo": "1547327400073.jpg",
+              "outlier_track_bearing_manual": "341.0000000000",
+              "outlier_group_size": "1",
+              "outlier_track_comment": "Eventually did a U turn and went to sea"
+            },
+            {
+              "outlier_track_photo": "1547327445466.jpg",
+              "outlier_track_bearing_manual": "343.0000000000",
+              "outlier_group_size": "1",
+              "outlier_track_comment": "Did a U turn and went to sea after about 6m"
+            }
+          ],
+          "hatchling_emergence_time_group": {
+            "hatchling_emergence_time": null,
+            "hatchling_emergence_time_source": null
+          },
+          "emergence_climate": {
+            "cloud_cover_at_emergence": null
+          },
+          "light_source": [
+            {
+              "light_source_photo": "1547327464990.jpg",
+              "light_bearing_manual": "190.0000000000",
+              "light_source_type": "artificial",
+              "light_source_description": "Wheatstone flame and lights"
+            },
+            {
+              "light_source_photo": "1547327498461.jpg",
+              "light_bearing_manual": "236.0000000000",
+              "light_source_type": "artificial",
+              "light_source_description": "Chevron jetty lease"
+            }
+          ],
+
+
+        # ToN 0.54
+        "fan_angles": {
+            "photo_hatchling_tracks_seawards": "1547734428418.jpg",
+            "photo_hatchling_tracks_relief": "1547734482953.jpg",
+            "bearing_to_water_manual": "144.0000000000",
+            "leftmost_track_manual": "88.0000000000",
+            "rightmost_track_manual": "214.0000000000",
+            "no_tracks_main_group": "33",
+            "no_tracks_main_group_min": "30",
+            "no_tracks_main_group_max": "36",
+            "outlier_tracks_present": "absent",
+            "hatchling_path_to_sea": "clear",
+            "path_to_sea_comments": null,
+            "hatchling_emergence_time_known": "yes",
+            "cloud_cover_at_emergence_known": "no",
+            "light_sources_present": "present"
+          },
+          "hatchling_emergence_time_group": {
+            "hatchling_emergence_time": "2019-01-17T13:00:00.000Z",
+            "hatchling_emergence_time_source": "plusminus-30m"
+          },
+          "emergence_climate": {
+            "cloud_cover_at_emergence": null
+          },
+          "light_source": [
+            {
+              "light_source_photo": "1547734326084.jpg",
+              "light_bearing_manual": "259.0000000000",
+              "light_source_type": "artificial",
+              "light_source_description": "Chevron jetty lease rig"
+            },
+            {
+              "light_source_photo": "1547734360345.jpg",
+              "light_bearing_manual": "338.0000000000",
+              "light_source_type": "natural",
+              "light_source_description": "Moon"
+            },
+            {
+              "light_source_photo": "1547734544043.jpg",
+              "light_bearing_manual": "180.0000000000",
+              "light_source_type": "artificial",
+              "light_source_description": "Wheatstone"
+            }
+          ],
+
+
+        # outlier_track > outlier_track_photo
+        # light_source light_source_photo
+
+
+    Returns:
+
+        None
+
+    Examples:
+    import os; path = os.path.join(settings.MEDIA_ROOT, "odka"); from wastd.observations.importers.odka import *
+    fa=[import_odka_tt044(x) for x in downloaded_data("test_fanangles", path)]
+    tt51=[import_odka_tt044(x) for x in downloaded_data("build_Track-or-Treat-0-51_1517196378", path)]  # 39 fans
+    tt53=[import_odka_tt044(x) for x in downloaded_data("build_Track-or-Treat-0-53_1535702040", path)]  # 695 fans
+    tt54=[import_odka_tt044(x) for x in downloaded_data("build_Turtle-Track-or-Nest-0-54_1539933206", path)] # 336 fans
+    """
+    if "fan_angles_measured" in data["nest"] and data["nest"]["fan_angles_measured"] == "yes":
+
+        for obs in listify(data["fan_angles"]):
+
+            # Build data dict for update
+            new_data = dict(
+                encounter_id = enc.id,
+                bearing_to_water_degrees = float_or_none(
+                    obs.get("bearing_to_water_manual", None) or
+                    obs.get("bearing_to_water_auto", None)
+                ),
+                bearing_leftmost_track_degrees = float_or_none(
+                    obs.get("leftmost_track_manual", None) or
+                    obs.get("leftmost_track_auto", None)
+                ),
+                bearing_rightmost_track_degrees = float_or_none(
+                    obs.get("rightmost_track_manual", None) or
+                    obs.get("rightmost_track_auto", None)
+                ),
+                no_tracks_main_group = int_or_none(
+                    obs["no_tracks_main_group"]),
+                no_tracks_main_group_min = int_or_none(
+                    obs["no_tracks_main_group_min"]),
+                no_tracks_main_group_max = int_or_none(
+                    obs["no_tracks_main_group_max"]),
+                outlier_tracks_present = str_or_na(
+                    obs.get("outlier_tracks_present", "na")),
+                path_to_sea_comments = "{0} {1}".format(
+                    obs["hatchling_path_to_sea"], obs["path_to_sea_comments"]),
+                hatchling_emergence_time_known = str_or_na(
+                    obs["hatchling_emergence_time_known"]),
+                light_sources_present = str_or_na(
+                    obs["light_sources_present"]),
+                hatchling_emergence_time = int_or_none(
+                    data["hatchling_emergence_time_group"]["hatchling_emergence_time"]),
+                hatchling_emergence_time_accuracy = str_or_na(
+                    data["hatchling_emergence_time_group"]["hatchling_emergence_time_source"]),
+                cloud_cover_at_emergence = int_or_none(data["emergence_climate"]["cloud_cover_at_emergence"]),
+            )
+
+            criteria = new_data
+            target = TurtleHatchlingEmergenceObservation.objects.filter(**criteria)
+            if target.exists():
+                e = target.update(**new_data)
+                e = TurtleHatchlingEmergenceObservation.objects.get(**criteria)
+                logger.info("  [handle_odka_fanangle] Updated existing {0}...".format(e.__str__()))
+
+            else:
+                e = TurtleHatchlingEmergenceObservation.objects.create(**new_data)
+                logger.info("  [handle_odka_fanangle] Created new {0}...".format(e.__str__()))
+
+            # Handle photos
+            if obs["photo_hatchling_tracks_seawards"]:
+                handle_media_attachment_odka(
+                    enc, media, obs["photo_hatchling_tracks_seawards"], title="Photo {0}".format(e.__str__()))
+
+
+            if obs["photo_hatchling_tracks_relief"]:
+                handle_media_attachment_odka(
+                    enc, media, obs["photo_hatchling_tracks_relief"], title="Photo {0}".format(e.__str__()))
+    else:
+        logger.info("  [handle_odka_fanangle] found no TurtleHatchlingEmergenceObservation")
+        logger.info(str(data))
+
+    # outliers
+    if "outlier_track" in data and data["outlier_track"] and data["nest"]["fan_angles_measured"] == "yes":
+        for obs in listify(data["outlier_track"]):
+            # "outlier_track": {
+            #     "outlier_track_photo": "1546837474680.jpg",
+            #     "outlier_track_bearing_manual": "180.0000000000",
+            #     "outlier_group_size": "1",
+            #     "outlier_track_comment": null
+            #  },
+            new_data = dict(
+                    encounter_id = enc.id,
+                    bearing_outlier_track_degrees = float_or_none(
+                        obs.get("outlier_track_bearing_manual", None) or
+                        obs.get("track_bearing_manual", None) or
+                        obs.get("track_bearing_auto", None)
+                    ),
+                    outlier_group_size = int_or_none(obs["outlier_group_size"]),
+                    outlier_track_comment = obs["outlier_track_comment"],
+                )
+            criteria = new_data
+            target = TurtleHatchlingEmergenceOutlierObservation.objects.filter(**criteria)
+            if target.exists():
+                e = target.update(**new_data)
+                e = TurtleHatchlingEmergenceOutlierObservation.objects.get(**criteria)
+                logger.info("  [handle_odka_fanangle_outlier] Updated existing {0}...".format(e.__str__()))
+
+            else:
+                e = TurtleHatchlingEmergenceOutlierObservation.objects.create(**new_data)
+                logger.info("  [handle_odka_fanangle_outlier] Created new {0}...".format(e.__str__()))
+
+            if obs["outlier_track_photo"]:
+                handle_media_attachment_odka(
+                    enc, media, obs["outlier_track_photo"], title="Photo {0}".format(e.__str__()))
+
+    # light sources
+    if "light_source" in data and data["light_source"] and data["nest"]["fan_angles_measured"] == "yes":
+        for obs in listify(data["light_source"]):
+            # "light_source": [
+            #     {
+            #       "light_source_photo": null,
+            #       "light_bearing_manual": "50.0000000000",
+            #       "light_source_type": "artificial",
+            #       "light_source_description": "Oil rig#5"
+            #     },
+            #     {
+            #       "light_source_photo": null,
+            #       "light_bearing_manual": "190.0000000000",
+            #       "light_source_type": "natural",
+            #       "light_source_description": "Moon"
+            #     }
+            # ]
+            new_data = dict(
+                    encounter_id = enc.id,
+                    bearing_light_degrees = float_or_none(
+                        obs.get("light_bearing_manual", None) or
+                        obs.get("light_bearing_auto", None)
+                    ),
+                    light_source_type = obs["light_source_type"],
+                    light_source_description = obs["light_source_description"],
+                )
+            criteria = new_data
+            target = LightSourceObservation.objects.filter(**criteria)
+            if target.exists():
+                e = target.update(**new_data)
+                e = LightSourceObservation.objects.get(**criteria)
+                logger.info("  [handle_odka_fanangle_lightsource] Updated existing {0}...".format(e.__str__()))
+
+            else:
+                e = LightSourceObservation.objects.create(**new_data)
+                logger.info("  [handle_odka_fanangle_lightsource] Created new {0}...".format(e.__str__()))
+
+
+
+
+    return None
+
+
+
+# ---------------------------------------------------------------------------#
+# Site Visit Start 0.1-0.2
+#
+def import_odka_svs02(r):
+    """Import one ODK Site Visit Start 0.1 or 0.2 record from the OKA-A API into WAStD.
+
+    The start point becomes a Survey, the end point can be matched to the
+    corresponding Survey (containing start point) later.
+
+    Arguments
+
+    r The submission record as dict, e.g.
+
+    save_all_odka(path="data/odka")
+    with open("data/odka/build_Site-Visit-Start-0-1_1490753483.json") as df:
+        d = json.load(df)
+    r = d[1]
+
+    r
+
+    {
+    "submission": {
+      "@xmlns": "http://opendatakit.org/submissions",
+      "@xmlns:orx": "http://openrosa.org/xforms",
+      "data": {
+        "data": {
+          "reporter": null,
+          "@instanceID": "uuid:d8decc72-a789-411a-b071-aabc871965a5",
+          "orx:meta": {
+            "orx:instanceID": "uuid:d8decc72-a789-411a-b071-aabc871965a5"
+          },
+          "@submissionDate": "2017-08-23T03:46:26.706Z",
+          "survey_start_time": "2017-08-15T03:40:57.512Z",
+          "@isComplete": "true",
+          "@markedAsCompleteDate": "2017-08-23T03:46:26.706Z",
+          "site_visit": {
+            "location": "-15.7113833333 124.3992633333 8.5000000000 4.9000000000",
+            "comments": null,
+            "site_conditions": "1502768495317.jpg"
+          },
+          "@id": "build_Site-Visit-Start-0-1_1490753483"
+            }
+          },
+      "mediaFile": {
+        "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=...",
+        "hash": "md5:9fcf6ae0ffb8676c933ee43027b45dae",
+        "filename": "1502768495317.jpg"
+        }
+      }
+    }
+
+
+    with open("data/odka/build_Site-Visit-Start-0-2_1510716686.json") as df:
+        d = json.load(df)
+    r = d[1]
+
+    r
+
+    {
+    "submission": {
+      "@xmlns": "http://opendatakit.org/submissions",
+      "@xmlns:orx": "http://openrosa.org/xforms",
+      "data": {
+        "data": {
+          "reporter": "sam_pegg",
+          "@instanceID": "uuid:c58fe0d6-179a-47b6-af1d-508555fbd1b9",
+          "@isComplete": "true",
+          "@submissionDate": "2017-11-15T11:42:52.444Z",
+          "survey_start_time": "2017-11-15T11:41:27.652Z",
+          "orx:meta": {
+            "orx:instanceID": "uuid:c58fe0d6-179a-47b6-af1d-508555fbd1b9"
+          },
+          "@markedAsCompleteDate": "2017-11-15T11:42:52.444Z",
+          "site_visit": {
+            "location": "-17.9711817000 122.2323750000 17.4000000000 11.2000000000",
+            "comments": "Training with tash and matt",
+            "site_conditions": "1510746110532.jpg"
+          },
+          "@id": "build_Site-Visit-Start-0-2_1510716686",
+          "device_id": "febd1d3515c97a61"
+        }
+      },
+      "mediaFile": {
+        "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=b...",
+        "hash": "md5:6f60589b2d3fd5bb118c0287382ee734",
+        "filename": "1510746110532.jpg"
+          }
+        }
+      },
+
+    Existing records will be overwritten unless marked in WAStD as "proofread"
+    or higher levels of QA.
+
+    Returns:
+        The WAStD Survey object.
+    """
+    logger.info("Found Site Visit Start...")
+    data = make_data(r)
+    media = make_media(r)
+    reporter_match = guess_user(data["reporter"])
+
+    unique_data = dict(
+        source="odk",
+        source_id=data["@instanceID"])
+    extra_data = dict(
+        start_location=odk_point_as_point(data["site_visit"]["location"]),
+        start_time=parse_datetime(data["survey_start_time"]),
+        start_comments="{0}\n\n\n{1}".format(reporter_match["message"], data["site_visit"]["comments"]),
+        reporter=reporter_match["user"],
+        device_id=None if "device_id" not in data else data["device_id"],
+        # TODO team if present
+    )
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=Survey,
+        base_cls=Survey,
+        retain_qa=True)
+
+    if action in ["update", "create"]:
+        enc.save()
+
+        handle_survey_photo(enc, media, data["site_visit"]["site_conditions"], field="start_photo")
+
+    logger.info("Done: {0}\n".format(enc))
+    return enc
+
+
+# ---------------------------------------------------------------------------#
+# Site Visit End 0.1-0.2
+#
+def import_odka_sve02(r):
+    """Import one ODK Site Visit End 0.1 or 0.2 record from the OKA-A API into WAStD.
+
+    Arguments
+
+    r The submission record as dict, e.g.
+
+    save_all_odka(path="data/odka")
+    with open("data/odka/build_Site-Visit-Start-0-1_1490753483.json") as df:
+        d = json.load(df)
+    r = d[1]
+
+    r
+
+    { # SVE01
+        "submission": {
+          "@xmlns": "http://opendatakit.org/submissions",
+          "@xmlns:orx": "http://openrosa.org/xforms",
+          "data": {
+            "data": {
+              "@id": "build_Site-Visit-End-0-1_1490756971",
+              "@instanceID": "uuid:bd16c5b0-dcf2-4ef2-b3bf-ccf0ac7f9a4b",
+              "@submissionDate": "2017-08-23T03:46:20.663Z",
+              "@isComplete": "true",
+              "@markedAsCompleteDate": "2017-08-23T03:46:20.663Z",
+              "orx:meta": {
+                "orx:instanceID": "uuid:bd16c5b0-dcf2-4ef2-b3bf-ccf0ac7f9a4b"
+              },
+              "reporter": null,
+              "survey_end_time": "2017-08-15T03:17:22.024Z",
+              "site_visit": {
+                "location": "-15.7593433333 124.4011133333 50.0000000000 5.0000000000",
+                "site_conditions": "1502767093482.jpg",
+                "comments": null
+              }
+            }
+          },
+          "mediaFile": {
+            "filename": "1502767093482.jpg",
+            "hash": "md5:5c837c90b20bf3cc49c43c32605fdb62",
+            "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+          }
+        }
+      },
+        { #SVE02
+        "submission": {
+          "@xmlns": "http://opendatakit.org/submissions",
+          "@xmlns:orx": "http://openrosa.org/xforms",
+          "data": {
+            "data": {
+              "@id": "build_Site-Visit-End-0-2_1510716716",
+              "@instanceID": "uuid:d6ca6ab9-e4ed-461f-9449-e52248c05ff0",
+              "@submissionDate": "2017-11-15T11:49:31.694Z",
+              "@isComplete": "true",
+              "@markedAsCompleteDate": "2017-11-15T11:49:31.694Z",
+              "orx:meta": {
+                "orx:instanceID": "uuid:d6ca6ab9-e4ed-461f-9449-e52248c05ff0"
+              },
+              "reporter": "jessamy_ham",
+              "survey_end_time": "2017-11-15T09:33:05.370Z",
+              "device_id": "febd1d3515c97a61",
+              "site_visit": {
+                "location": "-17.9711717000 122.2326200000 1.2000000000 4.7000000000",
+                "site_conditions": "1510746532962.jpg",
+                "comments": "Training"
+              }
+            }
+          },
+          "mediaFile": {
+            "filename": "1510746532962.jpg",
+            "hash": "md5:b3320f6a4425d711c6c0546d740ae07c",
+            "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+          }
+        }
+      },
+
+
+    with open("data/odka/build_Site-Visit-Start-0-2_1510716686.json") as df:
+        d = json.load(df)
+    r = d[1]
+
+    r
+
+    {
+    "submission": {
+      "@xmlns": "http://opendatakit.org/submissions",
+      "@xmlns:orx": "http://openrosa.org/xforms",
+      "data": {
+        "data": {
+          "reporter": "sam_pegg",
+          "@instanceID": "uuid:c58fe0d6-179a-47b6-af1d-508555fbd1b9",
+          "@isComplete": "true",
+          "@submissionDate": "2017-11-15T11:42:52.444Z",
+          "survey_start_time": "2017-11-15T11:41:27.652Z",
+          "orx:meta": {
+            "orx:instanceID": "uuid:c58fe0d6-179a-47b6-af1d-508555fbd1b9"
+          },
+          "@markedAsCompleteDate": "2017-11-15T11:42:52.444Z",
+          "site_visit": {
+            "location": "-17.9711817000 122.2323750000 17.4000000000 11.2000000000",
+            "comments": "Training with tash and matt",
+            "site_conditions": "1510746110532.jpg"
+          },
+          "@id": "build_Site-Visit-Start-0-2_1510716686",
+          "device_id": "febd1d3515c97a61"
+        }
+      },
+      "mediaFile": {
+        "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=b...",
+        "hash": "md5:6f60589b2d3fd5bb118c0287382ee734",
+        "filename": "1510746110532.jpg"
+          }
+        }
+      },
+
+    Existing records will be overwritten unless marked in WAStD as "proofread"
+    or higher levels of QA.
+
+    Returns:
+        The WAStD SurveyEnd object.
+    """
+    logger.info("Found Site Visit End...")
+    data = make_data(r)
+    media = make_media(r)
+    reporter_match = guess_user(data["reporter"])
+
+    unique_data = dict(
+        source="odk",
+        source_id=data["@instanceID"])
+    extra_data = dict(
+        end_location=odk_point_as_point(data["site_visit"]["location"]),
+        end_time=parse_datetime(data["survey_end_time"]),
+        end_comments="{0}\n\n\n{1}".format(reporter_match["message"], data["site_visit"]["comments"]),
+        reporter=reporter_match["user"],
+        device_id=None if "device_id" not in data else data["device_id"],
+    )
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=SurveyEnd,
+        base_cls=SurveyEnd,
+        retain_qa=False)
+
+    if action in ["update", "create"]:
+        enc.save()
+
+        handle_survey_photo(enc, media, data["site_visit"]["site_conditions"], field="end_photo")
+
+    logger.info("Done: {0}\n".format(enc))
+    return enc
+
+
+# ---------------------------------------------------------------------------#
+# Fox Sake 0.3
+#
+def import_odka_fs03(r):
+    """Import one ODK Fox Sake 0.3 record from the OKA-A API into WAStD.
+
+    The following choices are now are identical to WAStD
+    and do not require a mapping any longer:
+
+    * disturbance evident
+    * disturbance_cause_confidence
+
+    Arguments
+
+    r The submission record as dict, e.g.
+
+    save_all_odka(path="data/odka")
+    with open("data/odka/build_Fox-Sake-0-3_1490757423.json") as df:
+        d = json.load(df)
+    r = d[1]
+
+    r
+
+    {
+      "submission": {
+        "@xmlns": "http://opendatakit.org/submissions",
+        "mediaFile": {
+          "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=...",
+          "hash": "md5:ed81ee17661c5abd50d1afcd8e286df1",
+          "filename": "1502766687358.jpg"
+        },
+        "data": {
+          "data": {
+            "@id": "build_Fox-Sake-0-3_1490757423",
+            "observation_end_time": "2017-08-15T03:12:40.171Z",
+            "reporter": null,
+            "@instanceID": "uuid:01c1d466-d759-4bea-a740-1dbf29031060",
+            "orx:meta": {
+              "orx:instanceID": "uuid:01c1d466-d759-4bea-a740-1dbf29031060"
+            },
+            "@submissionDate": "2017-08-23T03:45:56.782Z",
+            "disturbanceobservation": {
+              "disturbance_cause": "unknown",
+              "photo_disturbance": "1502766687358.jpg",
+              "location": "-15.7594300000 124.4009683333 57.1000000000 5.0000000000",
+              "comments": "Fire pits X 6",
+              "disturbance_cause_confidence": "expert-opinion"
+            },
+            "@isComplete": "true",
+            "observation_start_time": "2017-08-15T03:10:41.862Z",
+            "@markedAsCompleteDate": "2017-08-23T03:45:56.782Z"
+          }
+        },
+        "@xmlns:orx": "http://openrosa.org/xforms"
+      }
+    }
+
+    Existing records will be overwritten unless marked in WAStD as "proofread"
+    or higher levels of QA.
+
+    Returns:
+        The WAStD Encounter object.
+    """
+    logger.info("Found Fox Sake...")
+    data = make_data(r)
+    media = make_media(r)
+    reporter_match = guess_user(data["reporter"])
+
+    unique_data = dict(
+        source="odk",
+        source_id=data["@instanceID"])
+    extra_data = dict(
+        where=odk_point_as_point(data["disturbanceobservation"]["location"]),
+        when=parse_datetime(data["observation_start_time"]),
+        location_accuracy="10",
+        observer=reporter_match["user"],
+        reporter=reporter_match["user"],
+        comments=reporter_match["message"],
+    )
+
+    # if cls == LineTransectEncounter:
+    #     extra_data["transect"] = read_odk_linestring(where)
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=Encounter,
+        base_cls=Encounter)
+
+    if action in ["update", "create"]:
+        handle_odka_disturbanceobservation(enc, media, data)
+        enc.save()
+
+    logger.info("Done: {0}\n".format(enc))
+    return enc
+
+
+def import_odka_tsi01(r):
+    """Import one ODK TurtleSighting 0.1 record from the OKA-A API into WAStD.
+
+    Arguments
+
+    r The submission record as dict, e.g.
+
+    save_all_odka(path="data/odka")
+    with open("data/odka/build_Turtle-Sighting-0-1_1535090015.json") as df:
+        d = json.load(df)
+    r = d[1]
+
+    r
+
+    {
+    "submission": {
+      "@xmlns": "http://opendatakit.org/submissions",
+      "@xmlns:orx": "http://openrosa.org/xforms",
+      "data": {
+        "data": {
+          "@id": "build_Turtle-Sighting-0-1_1535090015",
+          "@instanceID": "uuid:6cf7578d-027b-4187-81bf-a7c1f408301a",
+          "@submissionDate": "2018-08-27T10:52:34.872Z",
+          "@isComplete": "true",
+          "@markedAsCompleteDate": "2018-08-27T10:52:34.872Z",
+          "orx:meta": {
+            "orx:instanceID": "uuid:6cf7578d-027b-4187-81bf-a7c1f408301a"
+          },
+          "observation_start_time": "2018-08-27T06:47:31.153Z",
+          "reporter": "scott whiting",
+          "device_id": "d0:f8:8c:77:cc:77",
+          "phone_number": null,
+          "encounter": {
+            "observed_at": "-18.0297883333 122.2724933333 -10.1000000000 5.0000000000",
+            "species": "natator-depressus",
+            "sex": "male",
+            "maturity": "adult",
+            "activity": "na",
+            "observer_acticity": "na",
+            "photo_habitat": null
+          },
+          "observation_end_time": "2018-08-27T06:48:15.344Z"
+        }
+      }
+    }
+    },
+
+    Existing records will be overwritten unless marked in WAStD as "proofread"
+    or higher levels of QA.
+
+    Returns:
+        The WAStD Encounter object.
+    """
+    logger.info("Found Turtle Sighting...")
+    data = make_data(r)
+    media = make_media(r)
+    reporter_match = guess_user(data["reporter"])
+
+    unique_data = dict(
+        source="odk",
+        source_id=data["@instanceID"])
+    extra_data = dict(
+        where=odk_point_as_point(data["encounter"]["observed_at"]),
+        when=parse_datetime(data["observation_start_time"]),
+        location_accuracy="10",
+        observer=reporter_match["user"],
+        reporter=reporter_match["user"],
+        comments="{0}\n{1}".format(
+            reporter_match["message"],
+            data["encounter"]["observer_acticity"]),
+        species=data["encounter"]["species"],
+        sex=data["encounter"]["sex"],
+        maturity=data["encounter"]["maturity"],
+        activity=data["encounter"]["activity"]
+    )
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=AnimalEncounter,
+        base_cls=Encounter)
+
+    handle_media_attachment_odka(enc, media, data["encounter"]["photo_habitat"], title="Habitat")
+
+    logger.info("Done: {0}\n".format(enc))
+    return enc
+
+
+# ---------------------------------------------------------------------------#
+# Track or Treat 0.36-0.44
+#
+def import_odka_tt044(r):
+    """Import one ODK Track or Treat 0.44 record from the OKA-A API into WAStD.
+
+    This should work for versions 0.36, 0.44 and up.
+
+    Arguments
+
+    r The submission record as dict, e.g.
+
+    save_all_odka(path="data/odka")
+    from wastd.observations.importers.odka import *
+
+    with open("data/odka/build_Track-or-Treat-0-44_1509422138.json") as df:
+        d = json.load(df)
+
+    logger.debug(json.dumps(d[0], indent=4))
+
+    {
+        "submission": {
+            "@xmlns": "http://opendatakit.org/submissions",
+            "@xmlns:orx": "http://openrosa.org/xforms",
+            "data": {
+                "data": {
+                    "@id": "build_Track-or-Treat-0-44_1509422138",
+                    "@instanceID": "uuid:e4106979-e2d8-4020-9bd7-49f47579dfb5",
+                    "@submissionDate": "2017-11-10T07:22:40.265Z",
+                    "@isComplete": "true",
+                    "@markedAsCompleteDate": "2017-11-10T07:22:40.265Z",
+                    "orx:meta": {
+                        "orx:instanceID": "uuid:e4106979-e2d8-4020-9bd7-49f47579dfb5"
+                    },
+                    "observation_start_time": "2017-11-10T07:15:43.160Z",
+                    "reporter": "Thevenard3",
+                    "device_id": "d0:f8:8c:78:f5:f0",
+                    "details": {
+                        "nest_age": "fresh",
+                        "species": "natator-depressus",
+                        "nest_type": "successful-crawl",
+                        "observed_at": "-31.9965742000 115.8842839000 0E-10 50.0000000000"
+                    },
+                    "track_photos": {
+                        "photo_track_1": null,
+                        "photo_track_2": null
+                    },
+                    "nest_photos": {
+                        "photo_nest_1": null,
+                        "photo_nest_2": null,
+                        "photo_nest_3": null
+                    },
+                    "nest": {
+                        "habitat": "in-dune-vegetation",
+                        "disturbance": "present",
+                        "nest_tagged": "yes",
+                        "logger_found": "yes",
+                        "eggs_counted": "yes",
+                        "hatchlings_measured": "yes",
+                        "fan_angles_measured": "yes"
+                    },
+                    "disturbanceobservation": [
+                        {
+                            "photo_disturbance": "1510298200138.jpg",
+                            "disturbance_cause": "vehicle",
+                            "disturbance_cause_confidence": "guess",
+                            "disturbance_severity": "completely",
+                            "comments": "Yeah"
+                        },
+                        {
+                            "photo_disturbance": "1510298254227.jpg",
+                            "disturbance_cause": "goanna",
+                            "disturbance_cause_confidence": "guess",
+                            "disturbance_severity": "partly",
+                            "comments": "Jup"
+                        }
+                    ],
+                    "egg_count": {
+                        "no_egg_shells": "60",
+                        "no_live_hatchlings": "5",
+                        "no_dead_hatchlings": "14",
+                        "no_undeveloped_eggs": "15",
+                        "no_unhatched_eggs": "5",
+                        "no_unhatched_term": "6",
+                        "no_depredated_eggs": "2",
+                        "nest_depth_top": "25",
+                        "nest_depth_bottom": "89"
+                    },
+                    "egg_photos": {
+                        "photo_eggs": "1510298324400.jpg"
+                    },
+                    "nest_tag": {
+                        "status": "resighted",
+                        "flipper_tag_id": "WA1234",
+                        "date_nest_laid": "2017-11-10",
+                        "tag_label": "Test3",
+                        "tag_comments": "Jup",
+                        "photo_tag": "1510298358979.jpg"
+                    },
+                    "hatchling_measurements": [
+                        {
+                            "straight_carapace_length_mm": "125",
+                            "straight_carapace_width_mm": "56",
+                            "body_weight_g": "12"
+                        },
+                        {
+                            "straight_carapace_length_mm": "145",
+                            "straight_carapace_width_mm": "16",
+                            "body_weight_g": "15"
+                        }
+                    ],
+        # TON 0.54+
+        "fan_angles": {
+            "photo_hatchling_tracks_seawards": "1546836969404.jpg",
+            "photo_hatchling_tracks_relief": null,
+            "bearing_to_water_manual": "98.0000000000",
+            "leftmost_track_manual": "58.0000000000",
+            "rightmost_track_manual": "122.0000000000",
+            "no_tracks_main_group": "7",
+            "no_tracks_main_group_min": "7",
+            "no_tracks_main_group_max": "7",
+            "outlier_tracks_present": "present",
+            "hatchling_path_to_sea": "clear",
+            "path_to_sea_comments": null,
+            "hatchling_emergence_time_known": "yes",
+            "cloud_cover_at_emergence_known": "yes",
+            "light_sources_present": "present"
+          },
+          "outlier_track": {
+            "outlier_track_photo": "1546837474680.jpg",
+            "outlier_track_bearing_manual": "180.0000000000",
+            "outlier_group_size": "1",
+            "outlier_track_comment": null
+          },
+          "hatchling_emergence_time_group": {
+            "hatchling_emergence_time": "2019-01-06T23:07:00.000Z",
+            "hatchling_emergence_time_source": "plusminus-2h"
+          },
+          "emergence_climate": {
+            "cloud_cover_at_emergence": "3"
+          },
+          "light_source": [
+            {
+              "light_source_photo": null,
+              "light_bearing_manual": "50.0000000000",
+              "light_source_type": "artificial",
+              "light_source_description": "Oil rig#5"
+            },
+            {
+              "light_source_photo": null,
+              "light_bearing_manual": "190.0000000000",
+              "light_source_type": "natural",
+              "light_source_description": "Moon"
+            }
+          ],
+          "other_light_sources": {
+            "other_light_sources_present": "na"
+          },
+                    "observation_end_time": "2017-11-10T07:21:50.211Z"
+                }
+            },
+            "mediaFile": [
+                {
+                    "filename": "1510298200138.jpg",
+                    "hash": "md5:c4e49a94ba76623160fd2dbebf34eff2",
+                    "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey="
+                },
+                {
+                    "filename": "1510298254227.jpg",
+                    "hash": "md5:0da51be6b4e6fb3f0210d473c979d85c",
+                    "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey="
+                },
+                {
+                    "filename": "1510298324400.jpg",
+                    "hash": "md5:351d1043a5cc49c2fbf093e8d60508a1",
+                    "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey="
+                },
+                {
+                    "filename": "1510298358979.jpg",
+                    "hash": "md5:16b72612f5297b04846f4cba73bf0988",
+                    "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey="
+                }
+            ]
+        }
+    }
+
+
+    Existing records will be overwritten unless marked in WAStD as "proofread"
+    or higher levels of QA.
+
+    Important note: repeating groups with only one element are flattened into
+    a simple dict consisting of the element's keys.
+    Repeating groups with multiple elements consist of lists of dicts.
+    This is an artifact of the XML parser.
+
+    Returns:
+        The WAStD Encounter object.
+    """
+    logger.info("Found Track or Treat...")
+    data = make_data(r)
+    media = make_media(r)
+    usr = guess_user(data["reporter"])
+
+    unique_data = dict(
+        source="odk",
+        source_id=data["@instanceID"])
+    extra_data = dict(
+        where=odk_point_as_point(data["details"]["observed_at"]),
+        when=parse_datetime(data["observation_start_time"]),
+        location_accuracy="10",
+        observer=usr["user"],
+        reporter=usr["user"],
+        comments=usr["message"],
+    )
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=TurtleNestEncounter,
+        base_cls=Encounter)
+
+    if action in ["update", "create"]:
+        enc.nest_age = data["details"]["nest_age"]
+        enc.species = data["details"]["species"]
+        enc.nest_type = data["details"]["nest_type"]
+        enc.habitat = data["nest"]["habitat"] or "na"
+        enc.disturbance = data["nest"]["disturbance"] or "na"
+        enc.save()
+        handle_media_attachment_odka(enc, media, data["track_photos"]["photo_track_1"], title="Uptrack")
+        handle_media_attachment_odka(enc, media, data["track_photos"]["photo_track_2"], title="Downtrack")
+        handle_media_attachment_odka(enc, media, data["nest_photos"]["photo_nest_1"], title="Nest 1")
+        handle_media_attachment_odka(enc, media, data["nest_photos"]["photo_nest_2"], title="Nest 2")
+        handle_media_attachment_odka(enc, media, data["nest_photos"]["photo_nest_3"], title="Nest 3")
+        handle_odka_disturbanceobservation(enc, media, data)
+        handle_odka_nesttagobservation(enc, media, data)
+        handle_odka_turtlenestobservation(enc, media, data)
+        handle_odka_hatchlingmorphometricobservation(enc, media, data)
+        handle_odka_fanangles(enc, media, data)
+        enc.save()
+
+    # # bonus round for fan angles imported post QA (proofread records won't update)
+    # # ran once and disabled again, kept as reminder to circumvent QA-skip logic for new supplementary data
+    # handle_odka_fanangles(enc, media, data)
+    # enc.save()
+
+    logger.info("Done: {0}\n".format(enc))
+    return enc
+
+
+# ---------------------------------------------------------------------------#
+# Track Tally 0.5
+#
+def import_odka_tal05(r):
+    """Import one ODK Track or Treat 0.44 record from the OKA-A API into WAStD.
+
+    This should work for versions 0.36, 0.44 and up.
+
+    Arguments
+
+    r The submission record as dict, e.g.
+
+    save_all_odka(path="data/odka")
+    from wastd.observations.importers.odka import *
+
+    with open("data/odka/build_Track-Tally-0-5_1502342159.json") as df:
+        tal05 = json.load(df)
+
+    logger.debug(json.dumps(tal05[0], indent=4))
+
+    {
+        "submission": {
+            "@xmlns": "http://opendatakit.org/submissions",
+            "@xmlns:orx": "http://openrosa.org/xforms",
+            "data": {
+                "data": {
+                    "@id": "build_Track-Tally-0-5_1502342159",
+                    "@instanceID": "uuid:a0954e6a-14ff-4099-9bae-0b1bdc466675",
+                    "@submissionDate": "2017-10-12T08:20:06.257Z",
+                    "@isComplete": "true",
+                    "@markedAsCompleteDate": "2017-10-12T08:20:06.257Z",
+                    "orx:meta": {
+                        "orx:instanceID": "uuid:a0954e6a-14ff-4099-9bae-0b1bdc466675"
+                    },
+                    "observation_start_time": "2017-10-12T08:13:41.990Z",
+                    "reporter": "SarahM",
+                    "overview": {
+                        "location": "-17.97119 122.23269499999999 0.0 0.0;
+                        -17.971113333333335 122.23275333333335 0.0 0.0;
+                        -17.970951666666668 122.23281166666666 0.0 0.0;
+                        -17.970821666666666 122.232755 0.0 0.0;
+                        -17.970818333333334 122.23259166666666 0.0 0.0;
+                        -17.970824999999998 122.23257666666665",
+                        "fb_evidence": "present",
+                        "gn_evidence": "absent",
+                        "hb_evidence": "absent",
+                        "lh_evidence": "absent",
+                        "or_evidence": "absent",
+                        "unk_evidence": "absent",
+                        "predation_evidence": "present"
+                    },
+                    "fb": {
+                        "fb_no_old_tracks": "0",
+                        "fb_no_fresh_successful_crawls": "1",
+                        "fb_no_fresh_false_crawls": "0",
+                        "fb_no_fresh_tracks_unsure": "0",
+                        "fb_no_fresh_tracks_not_assessed": "0",
+                        "fb_no_hatched_nests": "2"
+                    },
+                    "gn": {
+                        "gn_no_old_tracks": null,
+                        "gn_no_fresh_successful_crawls": null,
+                        "gn_no_fresh_false_crawls": null,
+                        "gn_no_fresh_tracks_unsure": null,
+                        "gn_no_fresh_tracks_not_assessed": null,
+                        "gn_no_hatched_nests": null
+                    },
+                    "hb": {
+                        "hb_no_old_tracks": null,
+                        "hb_no_fresh_successful_crawls": null,
+                        "hb_no_fresh_false_crawls": null,
+                        "hb_no_fresh_tracks_unsure": null,
+                        "hb_no_fresh_tracks_not_assessed": null,
+                        "hb_no_hatched_nests": null
+                    },
+                    "lh": {
+                        "lh_no_old_tracks": null,
+                        "lh_no_fresh_successful_crawls": null,
+                        "lh_no_fresh_false_crawls": null,
+                        "lh_no_fresh_tracks_unsure": null,
+                        "lh_no_fresh_tracks_not_assessed": null,
+                        "lh_no_hatched_nests": null
+                    },
+                    "or": {
+                        "or_no_old_tracks": null,
+                        "or_no_fresh_successful_crawls": null,
+                        "or_no_fresh_false_crawls": null,
+                        "or_no_fresh_tracks_unsure": null,
+                        "or_no_fresh_tracks_not_assessed": null,
+                        "or_no_hatched_nests": null
+                    },
+                    "unk": {
+                        "unk_no_old_tracks": null,
+                        "unk_no_fresh_successful_crawls": null,
+                        "unk_no_fresh_false_crawls": null,
+                        "unk_no_fresh_tracks_unsure": null,
+                        "unk_no_fresh_tracks_not_assessed": null,
+                        "unk_no_hatched_nests": null
+                    },
+                    "disturbance": {
+                        "disturbance_cause": "vehicle",
+                        "no_nests_disturbed": "1",
+                        "no_tracks_encountered": null,
+                        "disturbance_comments": null
+                    },
+                    "observation_end_time": "2017-10-12T08:20:04.296Z"
+                }
+            }
+        }
+    }
+    Existing records will be overwritten unless marked in WAStD as "proofread"
+    or higher levels of QA.
+
+    Important note: repeating groups with only one element are flattened into
+    a simple dict consisting of the element's keys.
+    Repeating groups with multiple elements consist of lists of dicts.
+    This is an artifact of the XML parser.
+
+    Returns:
+        The WAStD Encounter object.
+    """
+    logger.info("Found Track Tally...")
+    data = make_data(r)
+    # media = make_media(r)
+    usr = guess_user(data["reporter"])
+
+    unique_data = dict(
+        source="odk",
+        source_id=data["@instanceID"])
+    extra_data = dict(
+        where=odk_point_as_point(data["overview"]["location"]),
+        transect=read_odk_linestring(data["overview"]["location"]),
+        when=parse_datetime(data["observation_start_time"]),
+        location_accuracy="10",
+        observer=usr["user"],
+        reporter=usr["user"],
+        comments=usr["message"],
+    )
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=LineTransectEncounter,
+        base_cls=Encounter)
+
+    if action in ["update", "create"]:
+
+        # TurtleNestDisturbanceTallyObservation
+        [handle_turtlenestdisttallyobs(distobs, enc)
+         for distobs in listify(data["disturbance"])
+         if len(listify(data["disturbance"])) > 0]
+
+        #  TrackTallyObservations
+        FB = "natator-depressus"
+        GN = "chelonia-mydas"
+        HB = "eretmochelys-imbricata"
+        LH = "caretta-caretta"
+        OR = "lepidochelys-olivacea"
+        UN = "cheloniidae-fam"
+
+        tally_mapping = [
+            [FB, "old",   "track-not-assessed",     data["fb"]["fb_no_old_tracks"] or 0],
+            [FB, "fresh", "successful-crawl",       data["fb"]["fb_no_fresh_successful_crawls"] or 0],
+            [FB, "fresh", "false-crawl",            data["fb"]["fb_no_fresh_false_crawls"] or 0],
+            [FB, "fresh", "track-unsure",           data["fb"]["fb_no_fresh_tracks_unsure"] or 0],
+            [FB, "fresh", "track-not-assessed",     data["fb"]["fb_no_fresh_tracks_not_assessed"] or 0],
+            [FB, "fresh", "hatched-nest",           data["fb"]["fb_no_hatched_nests"] or 0],
+
+            [GN, "old",     "track-not-assessed",   data["gn"]["gn_no_old_tracks"] or 0],
+            [GN, "fresh",   "successful-crawl",     data["gn"]["gn_no_fresh_successful_crawls"] or 0],
+            [GN, "fresh",   "false-crawl",          data["gn"]["gn_no_fresh_false_crawls"] or 0],
+            [GN, "fresh",   "track-unsure",         data["gn"]["gn_no_fresh_tracks_unsure"] or 0],
+            [GN, "fresh",   "track-not-assessed",   data["gn"]["gn_no_fresh_tracks_not_assessed"] or 0],
+            [GN, "fresh",   "hatched-nest",         data["gn"]["gn_no_hatched_nests"] or 0],
+
+            [HB, "old",     "track-not-assessed",   data["hb"]["hb_no_old_tracks"] or 0],
+            [HB, "fresh",   "successful-crawl",     data["hb"]["hb_no_fresh_successful_crawls"] or 0],
+            [HB, "fresh",   "false-crawl",          data["hb"]["hb_no_fresh_false_crawls"] or 0],
+            [HB, "fresh",   "track-unsure",         data["hb"]["hb_no_fresh_tracks_unsure"] or 0],
+            [HB, "fresh",   "track-not-assessed",   data["hb"]["hb_no_fresh_tracks_not_assessed"] or 0],
+            [HB, "fresh",   "hatched-nest",         data["hb"]["hb_no_hatched_nests"] or 0],
+
+            [LH, "old",     "track-not-assessed",   data["lh"]["lh_no_old_tracks"] or 0],
+            [LH, "fresh",   "successful-crawl",     data["lh"]["lh_no_fresh_successful_crawls"] or 0],
+            [LH, "fresh",   "false-crawl",          data["lh"]["lh_no_fresh_false_crawls"] or 0],
+            [LH, "fresh",   "track-unsure",         data["lh"]["lh_no_fresh_tracks_unsure"] or 0],
+            [LH, "fresh",   "track-not-assessed",   data["lh"]["lh_no_fresh_tracks_not_assessed"] or 0],
+            [LH, "fresh",   "hatched-nest",         data["lh"]["lh_no_hatched_nests"] or 0],
+
+            [OR, "old",     "track-not-assessed",   data["or"]["or_no_old_tracks"] or 0],
+            [OR, "fresh",   "successful-crawl",     data["or"]["or_no_fresh_successful_crawls"] or 0],
+            [OR, "fresh",   "false-crawl",          data["or"]["or_no_fresh_false_crawls"] or 0],
+            [OR, "fresh",   "track-unsure",         data["or"]["or_no_fresh_tracks_unsure"] or 0],
+            [OR, "fresh",   "track-not-assessed",   data["or"]["or_no_fresh_tracks_not_assessed"] or 0],
+            [OR, "fresh",   "hatched-nest",         data["or"]["or_no_hatched_nests"] or 0],
+
+            [UN, "old",     "track-not-assessed",   data["unk"]["unk_no_old_tracks"] or 0],
+            [UN, "fresh",   "successful-crawl",     data["unk"]["unk_no_fresh_successful_crawls"] or 0],
+            [UN, "fresh",   "false-crawl",          data["unk"]["unk_no_fresh_false_crawls"] or 0],
+            [UN, "fresh",   "track-unsure",         data["unk"]["unk_no_fresh_tracks_unsure"] or 0],
+            [UN, "fresh",   "track-not-assessed",   data["unk"]["unk_no_fresh_tracks_not_assessed"] or 0],
+            [UN, "fresh",   "hatched-nest",         data["unk"]["unk_no_hatched_nests"] or 0],
+        ]
+
+        [make_tallyobs(enc, x[0], x[1], x[2], x[3]) for x in tally_mapping]
+
+        enc.save()
+
+    logger.info("Done: {0}\n".format(enc))
+    return enc
+
+
+# ---------------------------------------------------------------------------#
+# Marine Wildlife Incident 0.5
+#
+def import_odka_mwi05(r):
+    """
+    Import one ODK Marine Wildlife Incident 0.5 record from the OKA-A API into WAStD.
+
+    This should work for versions 0.4 and up.
+
+    Arguments
+
+    r The submission record as dict, e.g.
+
+    save_all_odka(path="data/odka")
+    from wastd.observations.importers.odka import *
+
+    with open("data/odka/build_Marine-Wildlife-Incident-0-4_1509605702.json") as df:
+        d = json.load(df)
+
+    logger.debug(json.dumps(d[0], indent=4))
+
+    {
+        "submission": {
+          "@xmlns": "http://opendatakit.org/submissions",
+          "@xmlns:orx": "http://openrosa.org/xforms",
+          "data": {
+            "data": {
+              "@id": "build_Marine-Wildlife-Incident-0-5_1510547403",
+              "@instanceID": "uuid:a9cf803b-174f-44a9-a0e9-5dff96ddc3c3",
+              "@submissionDate": "2017-11-13T04:33:07.558Z",
+              "@isComplete": "true",
+              "@markedAsCompleteDate": "2017-11-13T04:33:07.558Z",
+              "orx:meta": {
+                "orx:instanceID": "uuid:a9cf803b-174f-44a9-a0e9-5dff96ddc3c3"
+              },
+              "observation_start_time": "2017-11-13T04:30:32.482Z",
+              "reporter": "Thevenard3",
+              "device_id": "d0:f8:8c:78:f5:f0",
+              "phone_number": null,
+              "incident": {
+                "observed_at": "-31.9966218000 115.8843043000 0E-10 50.0000000000",
+                "location_comment": null,
+                "incident_time": "2017-11-13T04:30:00.000Z",
+                "habitat": "below-mshwm",
+                "photo_habitat": "1510547487217.jpg"
+              },
+              "details": {
+                "taxon": "Cheloniidae",
+                "species": "caretta-caretta",
+                "maturity": "na",
+                "sex": "na"
+              },
+              "photos_turtle": {
+                "photo_carapace_top": null,
+                "photo_head_top": null,
+                "photo_head_side": null,
+                "photo_head_front": null
+              },
+              "status": {
+                "activity": "beach-washed",
+                "health": "dead-advanced",
+                "behaviour": null
+              },
+              "death": {
+                "cause_of_death": "drowned-entangled-infrastructure",
+                "cause_of_death_confidence": "expert-opinion"
+              },
+              "checks": {
+                "checked_for_injuries": "na",
+                "scanned_for_pit_tags": "na",
+                "checked_for_flipper_tags": "na",
+                "samples_taken": "na"
+              },
+              "morphometrics": {
+                "curved_carapace_length_mm": null,
+                "curved_carapace_length_accuracy": "10",
+                "curved_carapace_width_mm": null,
+                "curved_carapace_width_accuracy": "10",
+                "tail_length_carapace_mm": null,
+                "tail_length_carapace_accuracy": "10",
+                "maximum_head_width_mm": null,
+                "maximum_head_width_accuracy": "10"
+              },
+              "habitat_photos": {
+                "photo_habitat_2": null,
+                "photo_habitat_3": null,
+                "photo_habitat_4": null
+              },
+              "animal_fate": {
+                "animal_fate_comment": "Detonation"
+              },
+              "observation_end_time": "2017-11-13T04:33:01.780Z"
+            }
+          },
+          "mediaFile": {
+            "filename": "1510547487217.jpg",
+            "hash": "md5:3fc23a100c0767bcff56420648d9ecc7",
+            "downloadUrl": "https://dpaw-data.appspot.com/view/binaryData?blobKey=..."
+          }
+        }
+      }
+
+
+    Existing records will be overwritten unless marked in WAStD as "proofread"
+    or higher levels of QA.
+
+    Important note: repeating groups with only one element are flattened into
+    a simple dict consisting of the element's keys.
+    Repeating groups with multiple elements consist of lists of dicts.
+    This is an artifact of the XML parser.
+
+    Returns:
+    The WAStD Encounter object.
+    """
+    logger.info("Found Marine Wildlife Incident...")
+    data = make_data(r)
+    media = make_media(r)
+    usr = guess_user(data["reporter"])
+
+    # Older versions of this form use the dashless, pardon, dash-less keys
+    # required for older versions of ODK Collect.
+    # We'll build lookup dicts with current and dash-less keys,
+    # but we'll do so programmatically because we're not savages.
+    health_dict = map_and_keep(HEALTH_CHOICES)
+    habitat_dict = map_and_keep(HABITAT_CHOICES)
+    activity_dict = map_and_keep(ACTIVITY_CHOICES)
+    maturity_dict = map_and_keep(MATURITY_CHOICES)
+    species_dict = map_and_keep(SPECIES_CHOICES)
+    species_dict.update({
+        'turtle': 'cheloniidae-fam',
+        'flatback': 'natator-depressus',
+        'green': 'chelonia-mydas',
+        'hawksbill': 'eretmochelys-imbricata',
+        'loggerhead': 'caretta-caretta',
+        'oliveridley': 'lepidochelys-olivacea',
+        'leatherback': 'dermochelys-coriacea'
+    })
+
+    unique_data = dict(
+        source="odk",
+        source_id=data["@instanceID"])
+    extra_data = dict(
+        where=odk_point_as_point(data["incident"]["observed_at"]),
+        when=parse_datetime(data["incident"]["incident_time"]),
+        location_accuracy="10",
+        observer=usr["user"],
+        reporter=usr["user"],
+        comments=usr["message"]
+    )
+
+    enc, action = create_update_skip(
+        unique_data,
+        extra_data,
+        cls=AnimalEncounter,
+        base_cls=Encounter)
+
+    if action in ["update", "create"]:
+
+        enc.taxon = data["details"].get("taxon", "Cheloniidae")
+        enc.species = species_dict[data["details"]["species"]]
+        enc.maturity = maturity_dict[data["details"]["maturity"]]
+        enc.sex = data["details"]["sex"]
+        enc.health = health_dict[data["status"]["health"]]
+        enc.activity = activity_dict[data["status"]["activity"]]
+        enc.behaviour = "Behaviour: {0}\nLocation: {1}".format(
+            data["status"]["behaviour"] or "",
+            data["incident"]["location_comment"] or "")
+        enc.habitat = habitat_dict[data["incident"]["habitat"]]
+        enc.nesting_event = "absent"
+        enc.checked_for_injuries = data["checks"]["checked_for_injuries"]
+        enc.scanned_for_pit_tags = data["checks"]["scanned_for_pit_tags"]
+        enc.checked_for_flipper_tags = data["checks"]["checked_for_flipper_tags"]
+        enc.cause_of_death = data["death"]["cause_of_death"] or 'na'
+        enc.cause_of_death_confidence = data["death"]["cause_of_death_confidence"] or 'na'
+
+        #  "checks": {
+        #   "samples_taken": "present",
+
+        enc.save()
+
+        # Photos
+        handle_media_attachment_odka(enc, media, data["incident"]["photo_habitat"], title="Initial photo of habitat")
+        handle_media_attachment_odka(enc, media, data["habitat_photos"]["photo_habitat_2"], title="Habitat 2")
+        handle_media_attachment_odka(enc, media, data["habitat_photos"]["photo_habitat_3"], title="Habitat 3")
+        handle_media_attachment_odka(enc, media, data["habitat_photos"]["photo_habitat_4"], title="Habitat 4")
+        handle_media_attachment_odka(enc, media, data["photos_turtle"]["photo_head_top"], title="Turtle head top")
+        handle_media_attachment_odka(enc, media, data["photos_turtle"]["photo_head_front"], title="Turtle head front")
+        handle_media_attachment_odka(enc, media, data["photos_turtle"]["photo_head_side"], title="Turtle head side")
+        handle_media_attachment_odka(enc, media, data["photos_turtle"]["photo_carapace_top"], title="Turtle carapace top")
+
+        handle_odka_tagsobs(enc, media, data)
+        handle_odka_managementaction(enc, media, data)
+        handle_odka_turtlemorph(enc, media, data)
+        handle_odka_turtledamageobs(enc, media, data)
+
+        enc.save()
+
+    logger.info("Done: {0}\n".format(enc))
+    return enc
+
+
+# ---------------------------------------------------------------------------#
+# Turtle Tagging
+# Turtle Encounter
+# TODO
+
+@jobs.job("import_all_odka")
+def import_all_odka(path="."):
+    """Import all known ODKA data.
+
+    Example usage on shell_plus:
+
+    import sys; reload(sys); sys.setdefaultencoding('UTF8');
+    import os; path = os.path.join(settings.MEDIA_ROOT, "odka")
+    from wastd.observations.importers.odka import *
+    save_all_odka(path=path)
+    enc = import_all_odka(path="data/odka")
+
+    TODO: disable deprecated forms after adding fan angles etc to import
+    """
+    logger.info("[import_all_odka] Starting import of all downloaded ODKA data...")
+    with suspend_rendering(), media_batch(), stats.deferred_refresh():
+        results = _import_all_odka(path)
+    logger.info("[import_all_odka] Finished import. Stats:")
+    logger.info("\n".join(["[import_all_odka]  Imported {0} {1}".format(len(results[x]), x.upper()) for x in results]))
+    return results
+
+
+# Imported forms as (key, importer, form ID)
+ODKA_IMPORTS = (
+    ("mwi01", import_odka_mwi05, "build_Marine-Wildlife-Incident-0-1_1502342347"),
+    ("mwi04", import_odka_mwi05, "build_Marine-Wildlife-Incident-0-4_1509605702"),
+    ("mwi05", import_odka_mwi05, "build_Marine-Wildlife-Incident-0-5_1510547403"),
+    ("mwi06", import_odka_mwi05, "build_Marine-Wildlife-Incident-0-6_1535597111"),
+
+    ("tsi01", import_odka_tsi01, "build_Turtle-Sighting-0-1_1535090015"),
+    ("tal05", import_odka_tal05, "build_Track-Tally-0-5_1502342159"),
+    ("fs03", import_odka_fs03, "build_Fox-Sake-0-3_1490757423"),
+    ("fs04", import_odka_fs03, "build_Fox-Sake-0-4_1534140913"),
+    ("fs04a", import_odka_fs03, "build_Predator-or-Disturbance-1-0_1539932798"),
+
+    ("tt35", import_odka_tt044, "build_Track-or-Treat-0-35_1507882361"),
+    ("tt36", import_odka_tt044, "build_Track-or-Treat-0-36_1508561995"),
+    ("tt44", import_odka_tt044, "build_Track-or-Treat-0-44_1509422138"),
+    ("tt45", import_odka_tt044, "build_Track-or-Treat-0-45_1511079712"),
+    ("tt46", import_odka_tt044, "build_Track-or-Treat-0-46_1512095567"),
+    ("tt47", import_odka_tt044, "build_Track-or-Treat-0-47_1512461621"),
+    ("tt50", import_odka_tt044, "build_Track-or-Treat-0-50_1516929392"),
+    ("tt51", import_odka_tt044, "build_Track-or-Treat-0-51_1517196378"),
+    ("tt52", import_odka_tt044, "build_Track-or-Treat-0-52_1518683842"),
+    ("tt53", import_odka_tt044, "build_Track-or-Treat-0-53_1535702040"),
+    ("tt54", import_odka_tt044, "build_Turtle-Track-or-Nest-0-54_1539933206"),
+    ("tt55", import_odka_tt044, "build_Turtle-Track-or-Nest-0-55_1548318718"),
+
+    ("sve01", import_odka_sve02, "build_Site-Visit-End-0-1_1490756971"),
+    ("sve02", import_odka_sve02, "build_Site-Visit-End-0-2_1510716716"),
+    ("svs01", import_odka_svs02, "build_Site-Visit-Start-0-1_1490753483"),
+    ("svs02", import_odka_svs02, "build_Site-Visit-Start-0-2_1510716686"),
+    ("svs03", import_odka_svs02, "build_Site-Visit-Start-0-3_1535694081"),
+)
+
+
+def _import_all_odka(path):
+    """Import all known ODKA data, return a dict of form: imported records.
+
+    Not yet imported: turtle tagging 0.3, turtle encounter 0.4.
+    """
+    results = dict()
+    for key, importer, form_id in ODKA_IMPORTS:
+        with jobs.stage(key) as stage:
+            results[key] = [importer(x) for x in downloaded_data(form_id, path)]
+            stage.rows = len(results[key])
+    return results
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the vectorised nest metrics against the TurtleNestObservation properties."""
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+
+from wastd.observations import analytics
+from wastd.observations.models import TurtleNestObservation
+
+
+class Command(BaseCommand):
+    """Compute season nest metrics on a synthetic season both ways.
+
+    The synthetic nest excavations are generated in memory, nothing is written
+    to the database.
+    """
+
+    help = "Benchmark vectorised season analytics against the per-object properties on a synthetic season."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--nests", type=int, default=200000,
+            help="Number of synthetic nest excavations, default: 200000")
+        parser.add_argument(
+            "--sites", type=int, default=50,
+            help="Number of synthetic sites, default: 50")
+        parser.add_argument("--seed", type=int, default=1999, help="Random seed, default: 1999")
+
+    def synthetic_season(self, nests, sites, seed):
+        """Return a DataFrame of synthetic nest excavations over one season."""
+        import numpy
+        import pandas
+
+        rng = numpy.random.RandomState(seed)
+        df = pandas.DataFrame({c: rng.randint(0, 60, nests) for c in analytics.EXCAVATION_COLUMNS})
+        # Some excavations miss counts, some nests have no eggs at all
+        for c in analytics.EXCAVATION_COLUMNS:
+            df[c] = df[c].astype(object).where(rng.rand(nests) > 0.05, None)
+        df.loc[rng.rand(nests) < 0.01, analytics.EXCAVATION_COLUMNS] = None
+        df["site_id"] = rng.randint(0, sites, nests)
+        df["week"] = rng.randint(0, 26, nests)
+        return df
+
+    def handle(self, *args, **options):
+        df = self.synthetic_season(options["nests"], options["sites"], options["seed"])
+        nests = [TurtleNestObservation(**{c: row[c] for c in analytics.EXCAVATION_COLUMNS})
+                 for row in df.to_dict(orient="records")]
+        self.stdout.write("Synthetic season: {0} nest excavations at {1} sites".format(
+            len(nests), options["sites"]))
+
+        start = time.perf_counter()
+        sums = defaultdict(lambda: [0, 0, 0, 0.0, 0.0])
+        per_object = []
+        for site, week, nest in zip(df["site_id"], df["week"], nests):
+            metrics = (nest.egg_count_calculated, nest.no_emerged,
+                       nest.hatching_success, nest.emergence_success)
+            per_object.append(metrics)
+            group = sums[(site, week)]
+            group[0] += 1
+            group[1] += metrics[0]
+            group[2] += metrics[1]
+            group[3] += metrics[2]
+            group[4] += metrics[3]
+        properties_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        analytics.nest_metrics(df)
+        grouped = df.groupby(["site_id", "week"]).agg(
+            egg_count_calculated=("egg_count_calculated", "sum"),
+            no_emerged=("no_emerged", "sum"),
+            hatching_success=("hatching_success", "mean"),
+            emergence_success=("emergence_success", "mean"))
+        vectorised_seconds = time.perf_counter() - start
+
+        vectorised = list(zip(df["egg_count_calculated"], df["no_emerged"],
+                              df["hatching_success"], df["emergence_success"]))
+        self.stdout.write("Per-object properties: {0:.2f}s".format(properties_seconds))
+        self.stdout.write("Vectorised: {0:.2f}s".format(vectorised_seconds))
+        self.stdout.write("Speed-up: {0:.1f}x".format(properties_seconds / max(vectorised_seconds, 1e-6)))
+        # numpy and Python may round halves differently in the second decimal
+        matches = all(
+            v[0] == p[0] and v[1] == p[1] and abs(v[2] - p[2]) <= 0.01 and abs(v[3] - p[3]) <= 0.01
+            for v, p in zip(vectorised, per_object))
+        if matches and len(grouped) == len(sums):
+            self.stdout.write(self.style.SUCCESS("Results match."))
+        else:
+            self.stdout.write(self.style.ERROR("Results differ."))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the set-based Survey reconstruction against the signal path."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from wastd.observations import surveys, utils
+
+
+class Rollback(Exception):
+    """Raised to roll back a benchmark run."""
+
+
+class Command(BaseCommand):
+    """Reconstruct missing Surveys with both implementations and roll back.
+
+    Both runs start from the same data and are rolled back, so the command
+    can be run against a copy of production data without changing it.
+    """
+
+    help = "Benchmark the set-based Survey reconstruction against the signal path (rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--buffer-mins", type=int, default=30,
+            help="Minutes to buffer reconstructed surveys by, default: 30")
+        parser.add_argument(
+            "--skip-legacy", action="store_true",
+            help="Only run the set-based reconstruction")
+
+    def run(self, func, buffer_mins):
+        """Run func in a rolled back transaction, return duration and claimed Encounters."""
+        result = dict()
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                func(buffer_mins=buffer_mins)
+                result["seconds"] = time.perf_counter() - start
+                result["assignments"] = surveys.survey_assignments()
+                raise Rollback()
+        except Rollback:
+            pass
+        return result["seconds"], result["assignments"]
+
+    def handle(self, *args, **options):
+        buffer_mins = options["buffer_mins"]
+        self.stdout.write("Orphaned site-days: {0}".format(len(surveys.missing_surveys())))
+
+        new_seconds, new_assignments = self.run(surveys.reconstruct_missing_surveys, buffer_mins)
+        self.stdout.write("Set-based: {0:.2f}s, {1} Encounters claimed".format(
+            new_seconds, len(new_assignments)))
+        if options["skip_legacy"]:
+            return
+
+        old_seconds, old_assignments = self.run(utils.reconstruct_missing_surveys_legacy, buffer_mins)
+        self.stdout.write("Signal path: {0:.2f}s, {1} Encounters claimed".format(
+            old_seconds, len(old_assignments)))
+        self.stdout.write("Speed-up: {0:.1f}x".format(old_seconds / max(new_seconds, 1e-6)))
+        if new_assignments == old_assignments:
+            self.stdout.write(self.style.SUCCESS("Results match."))
+        else:
+            self.stdout.write(self.style.ERROR("Results differ for {0} Encounters.".format(
+                len(new_assignments ^ old_assignments))))
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""Queue groups of likely duplicate Encounters for review."""
+from django.core.management.base import BaseCommand
+
+from wastd.observations import duplicates
+
+
+class Command(BaseCommand):
+    """Find likely duplicate Encounters and add new groups to the review queue."""
+
+    help = "Find likely duplicate Encounters and queue new groups for review in the admin."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--distance", type=float, default=None,
+            help="Maximum distance in metres, default: settings.DUPLICATE_DISTANCE_M")
+        parser.add_argument(
+            "--minutes", type=float, default=None,
+            help="Maximum time difference in minutes, default: settings.DUPLICATE_MINUTES")
+        parser.add_argument(
+            "--min-score", type=float, default=None,
+            help="Minimum score from 0 to 1, default: settings.DUPLICATE_MIN_SCORE")
+
+    def handle(self, *args, **options):
+        queued = duplicates.queue_duplicates(
+            distance_m=options["distance"], minutes=options["minutes"], min_score=options["min_score"])
+        self.stdout.write(self.style.SUCCESS("Queued {0} new duplicate groups.".format(queued)))
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+"""Rebuild the daily encounter counts and survey effort per site."""
+from django.core.management.base import BaseCommand
+
+from wastd.observations import stats
+
+
+class Command(BaseCommand):
+    """Rebuild all DailyEncounterCounts and DailySurveyEfforts."""
+
+    help = "Rebuild the daily encounter counts and survey effort per site from all Encounters and Surveys."
+
+    def handle(self, *args, **options):
+        counts, effort = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            "Rebuilt {0} daily encounter counts and {1} daily survey efforts.".format(counts, effort)))
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""Rebuild the tag registry from all tag observations."""
+from django.core.management.base import BaseCommand
+
+from wastd.observations import tag_registry
+
+
+class Command(BaseCommand):
+    """Rebuild all RegisteredTags from TagObservations and NestTagObservations."""
+
+    help = "Rebuild the tag registry from all TagObservations and NestTagObservations."
+
+    def handle(self, *args, **options):
+        registered = tag_registry.rebuild()
+        self.stdout.write(self.style.SUCCESS("Registered {0} tags.".format(registered)))
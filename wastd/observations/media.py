@@ -0,0 +1,367 @@
+# -*- coding: utf-8 -*-
+"""Concurrent, hash-verified media download pipeline for ODK attachments.
+
+ODK Aggregate lists every media file of a submission with a download URL and
+an ``md5:`` hash. This module downloads such files through one pooled HTTP
+session on a thread pool, verifies the md5 while streaming, and writes each
+file straight to its final storage path (the ``upload_to`` path of the field
+it is attached to), so no second copy through the storage backend is needed.
+
+Identical files (same content hash) are downloaded and stored once per batch,
+and every further attachment simply references the stored file.
+Downloads which fail, arrive incomplete or empty are retried, and if they still fail,
+queued as a background task for a later retry. Jobs which failed
+``settings.MEDIA_FETCH_MAX_RETRIES`` retries are logged as errors and dropped.
+
+The thread pool only does network and file IO; all database work (creating
+or updating the attachment records) happens in the calling thread.
+
+Example::
+
+    from wastd.observations import media
+
+    with media.batch():
+        for r in submissions:
+            import_odka_tt044(r)    # queues photos via handle_media_attachment
+    # all queued photos are downloaded and attached here
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+import requests
+from django.apps import apps
+from django.conf import settings
+from django.core.files.storage import default_storage
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+PART_SUFFIX = ".part"
+
+_session = None
+_session_lock = threading.Lock()
+_local = threading.local()
+
+
+class MediaChecksumError(Exception):
+    """A downloaded file does not match its expected md5 hash."""
+
+    pass
+
+
+def get_session():
+    """Return a process-wide requests Session with a connection pool.
+
+    The pool holds one connection per download worker, and transient server
+    errors are retried with a back-off at the transport level.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                workers = settings.MEDIA_FETCH_WORKERS
+                adapter = HTTPAdapter(
+                    pool_connections=workers,
+                    pool_maxsize=workers,
+                    max_retries=Retry(
+                        total=2,
+                        backoff_factor=0.5,
+                        status_forcelist=[500, 502, 503, 504],
+                    ),
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def parse_md5(value):
+    """Return the hex digest from an ODKA hash like "md5:6f60...", or None.
+
+    Arguments:
+    value An ODKA mediaFile "hash" value, a bare md5 hex digest, or None.
+    """
+    if not value:
+        return None
+    if value.startswith("md5:"):
+        value = value[4:]
+    return value.lower() or None
+
+
+def file_md5(path):
+    """Return the md5 hex digest of a local file."""
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def download(url, name, md5=None):
+    """Stream a URL into storage name and return the file's md5 hex digest.
+
+    The file is streamed to a temporary ".part" file next to its target,
+    hashed on the fly, and only moved into place once complete and verified.
+    An existing file with the expected hash is kept and not downloaded again.
+
+    Arguments:
+    url The URL to download from
+    name The storage name (relative to MEDIA_ROOT) to write to
+    md5 The expected md5 hex digest, or None to skip verification
+
+    Raises:
+    MediaChecksumError if the received content does not match md5,
+    requests.RequestException on network errors, incomplete or empty transfers.
+    """
+    path = default_storage.path(name)
+    if md5 and os.path.exists(path) and file_md5(path) == md5:
+        logger.debug("[media.download] Found verified file {0}".format(name))
+        return md5
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    part = path + PART_SUFFIX
+    digest = hashlib.md5()
+    received = 0
+    try:
+        with get_session().get(url, stream=True, timeout=settings.MEDIA_FETCH_TIMEOUT) as response:
+            response.raise_for_status()
+            expected_size = response.headers.get("Content-Length")
+            with open(part, "wb") as out_file:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    out_file.write(chunk)
+                    digest.update(chunk)
+                    received += len(chunk)
+
+        if not received:
+            raise requests.RequestException("Empty download of {0}".format(url))
+
+        if expected_size and received != int(expected_size):
+            raise requests.RequestException(
+                "Incomplete download of {0}: {1} of {2} bytes".format(url, received, expected_size))
+
+        if md5 and digest.hexdigest() != md5:
+            raise MediaChecksumError(
+                "Checksum mismatch for {0}: expected {1}, got {2}".format(url, md5, digest.hexdigest()))
+
+        os.replace(part, path)
+    finally:
+        if os.path.exists(part):
+            os.remove(part)
+
+    logger.debug("[media.download] Downloaded {0} ({1} bytes)".format(name, received))
+    return digest.hexdigest()
+
+
+def attach(job, name):
+    """Point the file field described in job["attach"] to storage name.
+
+    job["attach"] is a dict of:
+    model The app label and model name, e.g. "observations.MediaAttachment"
+    lookup A dict of filter arguments identifying the record
+    field The name of the FileField to set
+    create Whether to create the record from lookup if it does not exist
+    """
+    spec = job["attach"]
+    model = apps.get_model(spec["model"])
+    obj = model.objects.filter(**spec["lookup"]).first()
+    if obj is None:
+        if not spec.get("create", False):
+            logger.warning(
+                "[media.attach] {0} {1} not found, skipping {2}".format(
+                    spec["model"], spec["lookup"], name))
+            return None
+        obj = model(**spec["lookup"])
+    getattr(obj, spec["field"]).name = name
+    obj.save()
+    logger.debug("[media.attach] Attached {0} to {1}".format(name, obj))
+    return obj
+
+
+class MediaFetcher(object):
+    """Collect media downloads, then fetch and attach them concurrently.
+
+    Jobs are plain, JSON-serialisable dicts, so that failed jobs can be
+    handed to a background task as they are. A job's "retries" counts the
+    background retries it has been queued for.
+    """
+
+    def __init__(self, max_workers=None, max_attempts=None):
+        """Set up an empty batch.
+
+        Arguments:
+        max_workers The number of download threads, default: settings.MEDIA_FETCH_WORKERS
+        max_attempts The number of attempts per download before a job is queued
+            for a later retry, default: settings.MEDIA_FETCH_ATTEMPTS
+        """
+        self.max_workers = max_workers or settings.MEDIA_FETCH_WORKERS
+        self.max_attempts = max_attempts or settings.MEDIA_FETCH_ATTEMPTS
+        self.jobs = []
+        self.stored = dict()  # md5: storage name
+        self.failed = []
+
+    def add(self, url, name, attach, md5=None):
+        """Queue a download of url to storage name, to be attached as per attach."""
+        self.jobs.append(dict(url=url, name=name, md5=parse_md5(md5), attach=attach))
+
+    def _plan(self, jobs):
+        """Split jobs into downloads and duplicates of a known or queued hash."""
+        downloads, duplicates = [], []
+        queued = set()
+        for job in jobs:
+            if job["md5"] and (job["md5"] in self.stored or job["md5"] in queued):
+                duplicates.append(job)
+            else:
+                if job["md5"]:
+                    queued.add(job["md5"])
+                downloads.append(job)
+        return downloads, duplicates
+
+    def _download_all(self, jobs):
+        """Download jobs on the thread pool, retrying failures.
+
+        Returns a list of (job, md5) for successful downloads, and leaves jobs
+        which failed on every attempt in self.failed.
+        """
+        done = []
+        pending = jobs
+        for attempt in range(1, self.max_attempts + 1):
+            if not pending:
+                break
+            if attempt > 1:
+                logger.info("[media.fetch] Retrying {0} downloads (attempt {1} of {2})...".format(
+                    len(pending), attempt, self.max_attempts))
+                time.sleep(2 ** (attempt - 2))
+
+            failed = []
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {pool.submit(download, j["url"], j["name"], j["md5"]): j for j in pending}
+                for future in as_completed(futures):
+                    job = futures[future]
+                    try:
+                        done.append((job, future.result()))
+                    except (requests.RequestException, MediaChecksumError, OSError) as e:
+                        logger.warning("[media.fetch] Download {0} failed: {1}".format(job["name"], e))
+                        failed.append(job)
+            pending = failed
+
+        self.failed.extend(pending)
+        return done
+
+    def run(self):
+        """Download and attach all queued jobs, return a dict of counts.
+
+        Files with a known hash are downloaded once per hash. Files without a
+        known hash (legacy ODK exports) are hashed after download, and dropped
+        in favour of an already stored file with identical content.
+        """
+        jobs, self.jobs = self.jobs, []
+        if not jobs:
+            return dict(downloaded=0, deduplicated=0, failed=0, dropped=0)
+
+        downloads, duplicates = self._plan(jobs)
+        logger.info("[media.fetch] Fetching {0} files ({1} duplicates) with {2} workers...".format(
+            len(downloads), len(duplicates), self.max_workers))
+
+        done = self._download_all(downloads)
+        deduplicated = len(duplicates)
+        for job, md5 in done:
+            name = self.stored.setdefault(md5, job["name"])
+            if name != job["name"]:
+                logger.debug("[media.fetch] {0} duplicates {1}, keeping one copy".format(job["name"], name))
+                os.remove(default_storage.path(job["name"]))
+                deduplicated += 1
+            attach(job, name)
+
+        for job in duplicates:
+            if job["md5"] in self.stored:
+                attach(job, self.stored[job["md5"]])
+            else:
+                # The first job for this hash failed, so this one fails too.
+                self.failed.append(job)
+
+        dropped = queue_retry(self.failed) if self.failed else 0
+
+        stats = dict(
+            downloaded=len(done),
+            deduplicated=deduplicated,
+            failed=len(self.failed) - dropped,
+            dropped=dropped,
+        )
+        logger.info("[media.fetch] Done: {downloaded} downloaded, {deduplicated} "
+                    "deduplicated, {failed} queued for retry, {dropped} dropped.".format(**stats))
+        self.failed = []
+        return stats
+
+
+def queue_retry(jobs):
+    """Schedule failed jobs for a later retry as a background task, return the number of dropped jobs.
+
+    Jobs which have been retried settings.MEDIA_FETCH_MAX_RETRIES times are
+    logged as errors and dropped.
+    """
+    from wastd.observations.tasks import retry_media_fetch
+
+    retry, dropped = [], []
+    for job in jobs:
+        job = dict(job, retries=job.get("retries", 0) + 1)
+        (retry if job["retries"] <= settings.MEDIA_FETCH_MAX_RETRIES else dropped).append(job)
+    for job in dropped:
+        logger.error("[media.queue_retry] Dropping {0} from {1} after {2} retries.".format(
+            job["name"], job["url"], settings.MEDIA_FETCH_MAX_RETRIES))
+    if retry:
+        logger.warning("[media.queue_retry] Queueing {0} failed downloads for retry.".format(len(retry)))
+        retry_media_fetch(retry, schedule=settings.MEDIA_FETCH_RETRY_DELAY)
+    return len(dropped)
+
+
+def run_jobs(jobs):
+    """Fetch and attach a list of job dicts, e.g. from a retry task.
+
+    Jobs which fail again are queued again, up to settings.MEDIA_FETCH_MAX_RETRIES times.
+    """
+    fetcher = MediaFetcher()
+    fetcher.jobs = list(jobs)
+    return fetcher.run()
+
+
+@contextmanager
+def batch(max_workers=None, max_attempts=None):
+    """Collect all media fetched within the block, then download them concurrently.
+
+    Batches can be nested; media are always collected by the innermost batch.
+    """
+    fetcher = MediaFetcher(max_workers=max_workers, max_attempts=max_attempts)
+    previous = getattr(_local, "fetcher", None)
+    _local.fetcher = fetcher
+    try:
+        yield fetcher
+    finally:
+        _local.fetcher = previous
+        fetcher.run()
+
+
+def fetch(url, name, attach, md5=None):
+    """Download url to storage name and attach it, or queue it in the current batch.
+
+    Arguments:
+    url The URL to download from
+    name The final storage name, e.g. as returned by a field's upload_to
+    attach A dict describing the record and field to attach the file to,
+        see attach()
+    md5 The expected hash, e.g. "md5:6f60589b2d3fd5bb118c0287382ee734", or None
+    """
+    fetcher = getattr(_local, "fetcher", None)
+    if fetcher is not None:
+        fetcher.add(url, name, attach, md5=md5)
+        return None
+    fetcher = MediaFetcher()
+    fetcher.add(url, name, attach, md5=md5)
+    return fetcher.run()
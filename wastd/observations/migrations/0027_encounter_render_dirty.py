@@ -0,0 +1,24 @@
+# Generated by Django 3.1 on 2020-08-04 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('observations', '0026_auto_20200723_1625'),
+    ]
+
+    operations = [
+        # Existing Encounters have been rendered on save, new ones need rendering.
+        migrations.AddField(
+            model_name='encounter',
+            name='render_dirty',
+            field=models.BooleanField(db_index=True, default=False, editable=False, help_text='Whether the cached HTML and Latex representations are outdated.', verbose_name='Needs rendering'),
+        ),
+        migrations.AlterField(
+            model_name='encounter',
+            name='render_dirty',
+            field=models.BooleanField(db_index=True, default=True, editable=False, help_text='Whether the cached HTML and Latex representations are outdated.', verbose_name='Needs rendering'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.1 on 2020-08-06 09:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('observations', '0027_encounter_render_dirty'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tagobservation',
+            name='name',
+            field=models.CharField(db_index=True, help_text='The ID of a tag must be unique within the tag type.', max_length=1000, verbose_name='Tag ID'),
+        ),
+        migrations.CreateModel(
+            name='RegisteredTag',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tag_type', models.CharField(help_text="The TagObservation tag type, or 'nest-tag' for NestTagObservations.", max_length=300, verbose_name='Tag type')),
+                ('name', models.CharField(db_index=True, help_text='The ID of the tag.', max_length=1000, verbose_name='Tag ID')),
+                ('status', models.CharField(blank=True, help_text='The status the tag was last seen in.', max_length=300, null=True, verbose_name='Tag status')),
+                ('status_history', models.JSONField(default=list, help_text='A list of sightings [datetime, status, encounter ID] in chronological order.', verbose_name='Status history')),
+                ('observation_count', models.PositiveIntegerField(default=0, help_text='The number of observations of the tag.', verbose_name='Observations')),
+                ('first_seen_on', models.DateTimeField(blank=True, help_text='The datetime the tag was first seen.', null=True, verbose_name='First seen on')),
+                ('last_seen_on', models.DateTimeField(blank=True, help_text='The datetime the tag was last seen.', null=True, verbose_name='Last seen on')),
+                ('first_seen', models.ForeignKey(blank=True, help_text='The Encounter the tag was first seen in.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='observations.Encounter', verbose_name='First seen')),
+                ('last_seen', models.ForeignKey(blank=True, help_text='The Encounter the tag was last seen in.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='observations.Encounter', verbose_name='Last seen')),
+            ],
+            options={
+                'verbose_name': 'Registered tag',
+                'ordering': ['tag_type', 'name'],
+                'unique_together': {('tag_type', 'name')},
+            },
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 3.1 on 2020-08-07 11:02
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('observations', '0028_registeredtag'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEncounterCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='The local date of the Encounters.', verbose_name='Date')),
+                ('encounter_type', models.CharField(blank=True, help_text='The primary concern of the Encounters.', max_length=300, null=True, verbose_name='Encounter type')),
+                ('species', models.CharField(blank=True, help_text='The species of AnimalEncounters and TurtleNestEncounters.', max_length=300, null=True, verbose_name='Species')),
+                ('nest_type', models.CharField(blank=True, help_text='The track or nest type of TurtleNestEncounters.', max_length=300, null=True, verbose_name='Type')),
+                ('count', models.PositiveIntegerField(default=0, help_text='The number of Encounters.', verbose_name='Encounters')),
+                ('site', models.ForeignKey(blank=True, help_text='The surveyed site, if known.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='observations.Area', verbose_name='Surveyed site')),
+            ],
+            options={
+                'verbose_name': 'Daily encounter count',
+                'ordering': ['-date', 'site'],
+                'index_together': {('site', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DailySurveyEffort',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='The local date of the Survey starts.', verbose_name='Date')),
+                ('production', models.BooleanField(default=True, help_text='Whether the surveys are real (production) surveys, or training surveys.', verbose_name='Production run')),
+                ('surveys', models.PositiveIntegerField(default=0, help_text='The number of Surveys.', verbose_name='Surveys')),
+                ('duration', models.DurationField(default=datetime.timedelta(0), help_text='The total duration of the Surveys.', verbose_name='Duration')),
+                ('site', models.ForeignKey(blank=True, help_text='The surveyed site, if known.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='observations.Area', verbose_name='Surveyed site')),
+            ],
+            options={
+                'verbose_name': 'Daily survey effort',
+                'ordering': ['-date', 'site'],
+                'index_together': {('site', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.1 on 2020-08-10 14:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('observations', '0029_daily_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateGroup',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(editable=False, help_text='A hash of the Encounter IDs.', max_length=40, unique=True, verbose_name='Key')),
+                ('score', models.FloatField(help_text='How likely the Encounters are duplicates, from 0 to 1.', verbose_name='Score')),
+                ('status', models.CharField(choices=[('new', 'New'), ('flagged', 'Encounters flagged'), ('dismissed', 'Not duplicates')], db_index=True, default='new', help_text='The outcome of the review.', max_length=30, verbose_name='Review status')),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='When the group was found.', verbose_name='Found on')),
+                ('reviewed_on', models.DateTimeField(blank=True, help_text='When the group was reviewed.', null=True, verbose_name='Reviewed on')),
+                ('encounters', models.ManyToManyField(help_text='The likely duplicate Encounters.', related_name='duplicate_groups', to='observations.Encounter', verbose_name='Encounters')),
+                ('reviewed_by', models.ForeignKey(blank=True, help_text='The person who reviewed the group.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Reviewed by')),
+            ],
+            options={
+                'verbose_name': 'Duplicate Encounter group',
+                'ordering': ['status', '-score', '-created'],
+            },
+        ),
+    ]
@@ -32,7 +32,7 @@ from django.conf import settings
 from django.contrib.gis.db import models as geo_models
 from django.db import models
 from django.db.models.fields import DurationField
-from django.db.models.signals import post_save, pre_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
 from django.dispatch import receiver
 from django.template import loader
 from django.urls import reverse
@@ -53,6 +53,7 @@ from shared.models import (
     UrlsMixin
 )
 from shared.utils import sanitize_tag_label
+from wastd.observations import rendering, spatial, stats, tag_registry
 
 from wastd.users.models import User
 
@@ -790,6 +791,13 @@ class Area(geo_models.Model):
                             kwargs={'pk': self.pk, 'format': format})
 
 
+@receiver(post_save, sender=Area)
+@receiver(post_delete, sender=Area)
+def area_post_save_delete(sender, instance, *args, **kwargs):
+    """Area: Invalidate the Site and Locality index of all processes."""
+    spatial.invalidate_area_index()
+
+
 class SiteVisitStartEnd(geo_models.Model):
     """A start or end point to a site visit."""
 
@@ -1164,19 +1172,15 @@ class Survey(QualityControlMixin, geo_models.Model):
             logger.info("[wastd.observations.models.survey.encounters] No site set, can't filter Encounters")
             return None
         else:
-            e = Encounter.objects.filter(
+            return Encounter.objects.filter(
                 where__contained=self.site.geom,
                 when__gte=self.start_time,
                 when__lte=self.end_time)
-            logger.info("[Survey.encounters] {0} found {1} Encounters".format(self, len(e)))
-            return e
 
 
 def guess_site(survey_instance):
     """Return the first Area containing the start_location or None."""
-    return Area.objects.filter(
-        area_type=Area.AREATYPE_SITE,
-        geom__contains=survey_instance.start_location).first()
+    return spatial.site_at(survey_instance.start_location)
 
 
 def claim_end_points(survey_instance):
@@ -1220,10 +1224,11 @@ def claim_end_points(survey_instance):
 def claim_encounters(survey_instance):
     """Update Encounters within this Survey to reference survey=self."""
     enc = survey_instance.encounters
-    if enc:
-        enc.update(survey=survey_instance)
-        logger.info("[wastd.observations.models.claim_encounters] "
-                    "Survey {0} claimed {1} Encounters".format(survey_instance, len(enc)))
+    if enc is not None:
+        claimed = enc.update(survey=survey_instance)
+        if claimed:
+            logger.info("[wastd.observations.models.claim_encounters] "
+                        "Survey {0} claimed {1} Encounters".format(survey_instance, claimed))
 
 
 @receiver(pre_save, sender=Survey)
@@ -1235,11 +1240,13 @@ def survey_pre_save(sender, instance, buffer_mins=30, *args, **kwargs):
         claim_end_points(instance)
     if instance.end_time == instance.start_time + timedelta(hours=6):
         et = instance.end_time
-        if instance.encounters:
-            instance.end_time = instance.encounters.last().when + timedelta(minutes=buffer_mins)
+        encounters = instance.encounters
+        last = encounters.order_by("when").last() if encounters is not None else None
+        if last:
+            instance.end_time = last.when + timedelta(minutes=buffer_mins)
             msg = ("[survey_pre_save] End time adjusted from {0} to {1}, "
                    "{2} minutes after last of {3} encounters.").format(
-                et, instance.end_time, buffer_mins, len(instance.encounters))
+                et, instance.end_time, buffer_mins, encounters.count())
         else:
             instance.end_time = instance.start_time + timedelta(minutes=buffer_mins)
             msg = ("[survey_pre_save] End time adjusted from {0} to {1}, "
@@ -1340,11 +1347,8 @@ class SurveyEnd(geo_models.Model):
 
     @property
     def guess_site(self):
-        """Return the first Area containing the start_location or None."""
-        candidates = Area.objects.filter(
-            area_type=Area.AREATYPE_SITE,
-            geom__contains=self.end_location)
-        return None if not candidates else candidates.first()
+        """Return the first Area containing the end_location or None."""
+        return spatial.site_at(self.end_location)
 
 
 # Utilities ------------------------------------------------------------------#
@@ -1549,6 +1553,13 @@ class Encounter(QualityControlMixin, PolymorphicModel, geo_models.Model):
         blank=True, null=True, editable=False,
         help_text=_("The cached Latex fragment for reporting purposes."),)
 
+    render_dirty = models.BooleanField(
+        default=True,
+        db_index=True,
+        editable=False,
+        verbose_name=_("Needs rendering"),
+        help_text=_("Whether the cached HTML and Latex representations are outdated."),)
+
     encounter_type = models.CharField(
         max_length=300,
         blank=True, null=True, editable=False,
@@ -1633,10 +1644,13 @@ class Encounter(QualityControlMixin, PolymorphicModel, geo_models.Model):
     @property
     def tx_logs(self):
         """A list of dicts of QA timestamp, status and operator."""
+        logs = getattr(self, "_prefetched_logs", None)
+        if logs is None:
+            logs = StateLog.objects.for_(self)
         return [dict(timestamp=log.timestamp.isoformat(),
                      status=log.state,
                      operator=log.by.name)
-                for log in StateLog.objects.for_(self)]
+                for log in logs]
 
     @property
     def get_encounter_type(self):
@@ -1693,13 +1707,14 @@ class Encounter(QualityControlMixin, PolymorphicModel, geo_models.Model):
         return self.when
 
     def save(self, *args, **kwargs):
-        """Cache popup, encounter type and source ID.
+        """Cache encounter type and source ID, mark popup for re-rendering.
 
         The popup content changes when fields change, and is expensive to build.
         As it is required ofen and under performance-critical circumstances -
-        populating the home screen with lots of popups - is is re-calculated
-        whenever the contents change (on save) rather when it is required for
-        display.
+        populating the home screen with lots of popups - it is cached in
+        ``as_html`` and ``as_latex``. Rather than rendering both on every save,
+        the Encounter is marked ``render_dirty`` and re-rendered in batches by
+        a background task, see ``wastd.observations.rendering``.
 
         The source ID will be auto-generated from ``short_name`` (if not set)
         but is not guaranteed to be unique.
@@ -1719,26 +1734,22 @@ class Encounter(QualityControlMixin, PolymorphicModel, geo_models.Model):
         if not self.area:
             self.area = self.guess_area
         self.encounter_type = self.get_encounter_type
-        self.as_html = self.get_popup()
-        self.as_latex = self.get_latex()
+        self.render_dirty = True
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = set(kwargs["update_fields"]) | {"render_dirty"}
         super(Encounter, self).save(*args, **kwargs)
+        rendering.schedule_render()
 
     # Name -------------------------------------------------------------------#
     @property
     def guess_site(self):
-        """Return the first Area containing the start_location or None."""
-        candidates = Area.objects.filter(
-            area_type=Area.AREATYPE_SITE,
-            geom__contains=self.where)
-        return None if not candidates else candidates.first()
+        """Return the first Site containing the location or None."""
+        return spatial.site_at(self.where)
 
     @property
     def guess_area(self):
-        """Return the first Area containing the start_location or None."""
-        candidates = Area.objects.filter(
-            area_type=Area.AREATYPE_LOCALITY,
-            geom__contains=self.where)
-        return None if not candidates else candidates.first()
+        """Return the first Locality containing the location or None."""
+        return spatial.locality_at(self.where)
 
     def set_name(self, name):
         """Set the animal name to a given value."""
@@ -1899,6 +1910,10 @@ class Encounter(QualityControlMixin, PolymorphicModel, geo_models.Model):
     @property
     def photographs(self):
         """Return the URLs of all attached photograph or none."""
+        observations = getattr(self, "_prefetched_observations", None)
+        if observations is not None:
+            return [o for o in observations
+                    if isinstance(o, MediaAttachment) and o.media_type == "photograph"]
         try:
             return list(
                 self.observation_set.instance_of(
@@ -2639,6 +2654,7 @@ class TagObservation(Observation):
 
     name = models.CharField(
         max_length=1000,
+        db_index=True,
         verbose_name=_("Tag ID"),
         help_text=_("The ID of a tag must be unique within the tag type."),)
 
@@ -2802,6 +2818,301 @@ def nesttagobservation_pre_save(sender, instance, *args, **kwargs):
         instance.encounter.save(update_fields=['name', ])
 
 
+class RegisteredTag(models.Model):
+    """The sighting history of one tag, summarised from all its tag observations.
+
+    The tag registry answers "has this tag been seen before, and on which animal?"
+    without scanning TagObservations and NestTagObservations.
+    It is kept up to date when tag observations are saved or deleted,
+    and can be rebuilt with ``./manage.py rebuild_tag_registry``.
+
+    Nest tags are registered with tag type ``nest-tag`` under their
+    ``NestTagObservation.name``.
+    """
+
+    tag_type = models.CharField(
+        max_length=300,
+        verbose_name=_("Tag type"),
+        help_text=_("The TagObservation tag type, or 'nest-tag' for NestTagObservations."),)
+
+    name = models.CharField(
+        max_length=1000,
+        db_index=True,
+        verbose_name=_("Tag ID"),
+        help_text=_("The ID of the tag."),)
+
+    status = models.CharField(
+        max_length=300,
+        blank=True, null=True,
+        verbose_name=_("Tag status"),
+        help_text=_("The status the tag was last seen in."),)
+
+    status_history = models.JSONField(
+        default=list,
+        verbose_name=_("Status history"),
+        help_text=_("A list of sightings [datetime, status, encounter ID] in chronological order."),)
+
+    observation_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Observations"),
+        help_text=_("The number of observations of the tag."),)
+
+    first_seen = models.ForeignKey(
+        Encounter,
+        on_delete=models.SET_NULL,
+        blank=True, null=True,
+        related_name="+",
+        verbose_name=_("First seen"),
+        help_text=_("The Encounter the tag was first seen in."),)
+
+    first_seen_on = models.DateTimeField(
+        blank=True, null=True,
+        verbose_name=_("First seen on"),
+        help_text=_("The datetime the tag was first seen."),)
+
+    last_seen = models.ForeignKey(
+        Encounter,
+        on_delete=models.SET_NULL,
+        blank=True, null=True,
+        related_name="+",
+        verbose_name=_("Last seen"),
+        help_text=_("The Encounter the tag was last seen in."),)
+
+    last_seen_on = models.DateTimeField(
+        blank=True, null=True,
+        verbose_name=_("Last seen on"),
+        help_text=_("The datetime the tag was last seen."),)
+
+    class Meta:
+        """Class options."""
+
+        ordering = ["tag_type", "name"]
+        unique_together = ("tag_type", "name")
+        verbose_name = "Registered tag"
+
+    def __str__(self):
+        """The unicode representation."""
+        return "{0} {1} ({2})".format(self.tag_type, self.name, self.status)
+
+    @property
+    def animal_name(self):
+        """Return the name of the animal the tag was last seen on."""
+        return self.last_seen.name if self.last_seen else None
+
+    @property
+    def is_recapture(self):
+        """Return whether the tag has been seen more than once."""
+        return self.observation_count > 1
+
+
+@receiver(pre_save, sender=TagObservation)
+@receiver(pre_save, sender=NestTagObservation)
+def tag_registry_pre_save(sender, instance, *args, **kwargs):
+    """Remember the registry key of a changed tag observation before it is saved."""
+    instance._registry_key = tag_registry.saved_key(instance)
+
+
+@receiver(post_save, sender=TagObservation)
+@receiver(post_save, sender=NestTagObservation)
+@receiver(post_delete, sender=TagObservation)
+@receiver(post_delete, sender=NestTagObservation)
+def tag_registry_post_save_delete(sender, instance, *args, **kwargs):
+    """Update the tag registry entries of a saved or deleted tag observation."""
+    keys = {tag_registry.tag_key(instance), getattr(instance, "_registry_key", None)}
+    tag_registry.refresh_tags([k for k in keys if k])
+
+
+# Daily statistics -----------------------------------------------------------#
+class DailyEncounterCount(models.Model):
+    """The number of Encounters per site, local date, encounter type, species and nest type.
+
+    Maintained from Encounter saves and deletes, see ``wastd.observations.stats``.
+    """
+
+    site = models.ForeignKey(
+        Area,
+        on_delete=models.CASCADE,
+        blank=True, null=True,
+        related_name="+",
+        verbose_name=_("Surveyed site"),
+        help_text=_("The surveyed site, if known."),)
+
+    date = models.DateField(
+        verbose_name=_("Date"),
+        help_text=_("The local date of the Encounters."),)
+
+    encounter_type = models.CharField(
+        max_length=300,
+        blank=True, null=True,
+        verbose_name=_("Encounter type"),
+        help_text=_("The primary concern of the Encounters."),)
+
+    species = models.CharField(
+        max_length=300,
+        blank=True, null=True,
+        verbose_name=_("Species"),
+        help_text=_("The species of AnimalEncounters and TurtleNestEncounters."),)
+
+    nest_type = models.CharField(
+        max_length=300,
+        blank=True, null=True,
+        verbose_name=_("Type"),
+        help_text=_("The track or nest type of TurtleNestEncounters."),)
+
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Encounters"),
+        help_text=_("The number of Encounters."),)
+
+    class Meta:
+        """Class options."""
+
+        ordering = ["-date", "site"]
+        index_together = [("site", "date")]
+        verbose_name = "Daily encounter count"
+
+    def __str__(self):
+        """The unicode representation."""
+        return "{0} {1} {2} {3} {4}: {5}".format(
+            self.site_id, self.date, self.encounter_type, self.species, self.nest_type, self.count)
+
+
+class DailySurveyEffort(models.Model):
+    """The number and duration of Surveys per site and local date of their start."""
+
+    site = models.ForeignKey(
+        Area,
+        on_delete=models.CASCADE,
+        blank=True, null=True,
+        related_name="+",
+        verbose_name=_("Surveyed site"),
+        help_text=_("The surveyed site, if known."),)
+
+    date = models.DateField(
+        verbose_name=_("Date"),
+        help_text=_("The local date of the Survey starts."),)
+
+    production = models.BooleanField(
+        default=True,
+        verbose_name=_("Production run"),
+        help_text=_("Whether the surveys are real (production) surveys, or training surveys."),)
+
+    surveys = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Surveys"),
+        help_text=_("The number of Surveys."),)
+
+    duration = models.DurationField(
+        default=timedelta(0),
+        verbose_name=_("Duration"),
+        help_text=_("The total duration of the Surveys."),)
+
+    class Meta:
+        """Class options."""
+
+        ordering = ["-date", "site"]
+        index_together = [("site", "date")]
+        verbose_name = "Daily survey effort"
+
+    def __str__(self):
+        """The unicode representation."""
+        return "{0} {1}: {2} surveys, {3}".format(self.site_id, self.date, self.surveys, self.duration)
+
+
+DAILY_STATS_MODELS = (
+    Encounter, AnimalEncounter, TurtleNestEncounter, LineTransectEncounter, LoggerEncounter, Survey)
+
+
+def daily_stats_pre_save(sender, instance, *args, **kwargs):
+    """Remember the site-day of a changed Encounter or Survey before it is saved."""
+    if not instance._state.adding and instance.pk:
+        saved = stats.site_days(sender, [instance.pk])
+        instance._stats_site_day = saved.pop() if saved else None
+
+
+def daily_stats_post_save_delete(sender, instance, *args, **kwargs):
+    """Refresh the daily statistics of the old and new site-day of an Encounter or Survey."""
+    stats.refresh_later(sender, {
+        stats.site_day(instance.site_id, getattr(instance, stats.date_field(sender))),
+        getattr(instance, "_stats_site_day", None)})
+
+
+for _sender in DAILY_STATS_MODELS:
+    pre_save.connect(daily_stats_pre_save, sender=_sender)
+    post_save.connect(daily_stats_post_save_delete, sender=_sender)
+    post_delete.connect(daily_stats_post_save_delete, sender=_sender)
+
+
+class DuplicateGroup(models.Model):
+    """A group of likely duplicate Encounters awaiting review.
+
+    Groups are found by ``wastd.observations.duplicates.queue_duplicates``.
+    Reviewers either flag the Encounters of a group, or dismiss the group.
+    """
+
+    STATUS_NEW = "new"
+    STATUS_FLAGGED = "flagged"
+    STATUS_DISMISSED = "dismissed"
+    STATUS_CHOICES = (
+        (STATUS_NEW, "New"),
+        (STATUS_FLAGGED, "Encounters flagged"),
+        (STATUS_DISMISSED, "Not duplicates"),
+    )
+
+    key = models.CharField(
+        max_length=40,
+        unique=True,
+        editable=False,
+        verbose_name=_("Key"),
+        help_text=_("A hash of the Encounter IDs."),)
+
+    encounters = models.ManyToManyField(
+        Encounter,
+        related_name="duplicate_groups",
+        verbose_name=_("Encounters"),
+        help_text=_("The likely duplicate Encounters."),)
+
+    score = models.FloatField(
+        verbose_name=_("Score"),
+        help_text=_("How likely the Encounters are duplicates, from 0 to 1."),)
+
+    status = models.CharField(
+        max_length=30,
+        default=STATUS_NEW,
+        choices=STATUS_CHOICES,
+        db_index=True,
+        verbose_name=_("Review status"),
+        help_text=_("The outcome of the review."),)
+
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_("Found on"),
+        help_text=_("When the group was found."),)
+
+    reviewed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True, null=True,
+        related_name="+",
+        verbose_name=_("Reviewed by"),
+        help_text=_("The person who reviewed the group."),)
+
+    reviewed_on = models.DateTimeField(
+        blank=True, null=True,
+        verbose_name=_("Reviewed on"),
+        help_text=_("When the group was reviewed."),)
+
+    class Meta:
+        """Class options."""
+
+        ordering = ["status", "-score", "-created"]
+        verbose_name = "Duplicate Encounter group"
+
+    def __str__(self):
+        """The unicode representation."""
+        return "Duplicate group {0} ({1}, score {2})".format(self.pk, self.get_status_display(), self.score)
+
+
 class ManagementAction(Observation):
     """
     Management actions following an AnimalEncounter.
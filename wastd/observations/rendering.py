@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""Deferred, batched rendering of the Encounter caches as_html and as_latex.
+
+``Encounter.save()`` no longer renders the popup and Latex templates inline.
+It marks the Encounter as ``render_dirty`` and, once the transaction commits,
+schedules the background task ``wastd.observations.tasks.render_encounters``
+(unless one is already pending), once per transaction however many Encounters it saved.
+
+The task re-renders dirty Encounters in batches. Each batch is loaded with
+its users, site, area, survey, observations, photographs and QA logs
+prefetched, and batches are rendered across ``settings.ENCOUNTER_RENDER_PROCESSES``
+worker processes.
+
+Bulk jobs which save the same Encounters many times suspend rendering and
+flush once at the end::
+
+    with suspend_rendering():
+        import_all_odka(path)
+    # all dirty Encounters are rendered here, in batches
+"""
+import logging
+import multiprocessing
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from shared.db import CommitBatch
+
+logger = logging.getLogger(__name__)
+
+RENDER_TASK_NAME = "wastd.observations.tasks.render_encounters"
+
+_local = threading.local()
+
+
+def rendering_suspended():
+    """Return whether rendering is suspended in this thread."""
+    return getattr(_local, "suspended", 0) > 0
+
+
+@contextmanager
+def suspend_rendering(flush=True):
+    """Do not schedule rendering within the block, then render all dirty Encounters.
+
+    Arguments:
+    flush Whether to render all dirty Encounters at the end, default: True.
+        If False, rendering is left to the next scheduled task.
+    """
+    _local.suspended = getattr(_local, "suspended", 0) + 1
+    try:
+        yield
+    finally:
+        _local.suspended -= 1
+    if flush and not rendering_suspended():
+        render_dirty()
+
+
+def _schedule_render_task(keys):
+    """Enqueue the render task unless one is already pending."""
+    from background_task.models import Task
+    from wastd.observations.tasks import render_encounters
+
+    if not Task.objects.filter(task_name=RENDER_TASK_NAME, locked_by=None).exists():
+        render_encounters(schedule=settings.ENCOUNTER_RENDER_DELAY)
+
+
+pending = CommitBatch(_schedule_render_task)
+
+
+def schedule_render():
+    """Schedule the render task once after the current transaction commits.
+
+    Does nothing while rendering is suspended.
+    """
+    if not rendering_suspended():
+        pending.add(RENDER_TASK_NAME)
+
+
+def prefetch_for_render(encounters):
+    """Load the observations, photographs and QA logs of a list of Encounters.
+
+    Each Encounter gets ``_prefetched_observations`` and ``_prefetched_logs``,
+    which Encounter.photographs and Encounter.tx_logs use
+    instead of one query each per render.
+    """
+    from django.contrib.contenttypes.models import ContentType
+    from django_fsm_log.models import StateLog
+    from wastd.observations.models import Observation
+
+    ids = [e.pk for e in encounters]
+    observations = defaultdict(list)
+    for obs in Observation.objects.filter(encounter_id__in=ids).order_by("pk"):
+        observations[obs.encounter_id].append(obs)
+
+    # QA logs reference the polymorphic content type of each Encounter
+    content_types = {e.pk: ContentType.objects.get_for_model(e).pk for e in encounters}
+    logs = defaultdict(list)
+    for log in StateLog.objects.filter(
+            object_id__in=ids,
+            content_type_id__in=set(content_types.values())).select_related("by").order_by("timestamp"):
+        if content_types.get(log.object_id) == log.content_type_id:
+            logs[log.object_id].append(log)
+
+    for e in encounters:
+        e._prefetched_observations = observations[e.pk]
+        e._prefetched_logs = logs[e.pk]
+    return encounters
+
+
+def render_batch(pks):
+    """Render the popup and Latex caches of the Encounters with the given pks.
+
+    Returns a list of (pk, as_html, as_latex).
+    """
+    from wastd.observations.models import Encounter
+
+    encounters = list(
+        Encounter.objects.filter(pk__in=pks).select_related(
+            "observer", "reporter", "site", "area", "survey"))
+    prefetch_for_render(encounters)
+    return [(e.pk, e.get_popup(), e.get_latex()) for e in encounters]
+
+
+def _render_batch_in_worker(pks):
+    """Render a batch in a worker process with its own database connection."""
+    connections.close_all()
+    return render_batch(pks)
+
+
+def _batches(pks, size):
+    """Split a list of pks into lists of at most size pks."""
+    return [pks[i:i + size] for i in range(0, len(pks), size)]
+
+
+def render_dirty(batch_size=None, processes=None):
+    """Re-render all dirty Encounters, return the number of rendered Encounters.
+
+    The dirty flag is cleared before rendering, so that Encounters saved again
+    while being rendered stay dirty and are rendered again by the next run.
+
+    Arguments:
+    batch_size The number of Encounters per batch, default: settings.ENCOUNTER_RENDER_BATCH_SIZE
+    processes The number of worker processes, default: settings.ENCOUNTER_RENDER_PROCESSES
+    """
+    from wastd.observations.models import Encounter
+
+    batch_size = batch_size or settings.ENCOUNTER_RENDER_BATCH_SIZE
+    processes = processes or settings.ENCOUNTER_RENDER_PROCESSES
+
+    dirty = Encounter.objects.filter(render_dirty=True)
+    pks = list(dirty.order_by("pk").values_list("pk", flat=True))
+    if not pks:
+        return 0
+    logger.info("[wastd.observations.rendering.render_dirty] Rendering {0} Encounters "
+                "in batches of {1} with {2} processes...".format(len(pks), batch_size, processes))
+    Encounter.objects.filter(pk__in=pks).update(render_dirty=False)
+
+    batches = _batches(pks, batch_size)
+    if processes > 1 and len(batches) > 1:
+        connections.close_all()
+        with multiprocessing.get_context("fork").Pool(processes=processes) as pool:
+            results = pool.imap_unordered(_render_batch_in_worker, batches)
+            for rendered in results:
+                save_rendered(rendered)
+    else:
+        for batch in batches:
+            save_rendered(render_batch(batch))
+
+    logger.info("[wastd.observations.rendering.render_dirty] Rendered {0} Encounters.".format(len(pks)))
+    return len(pks)
+
+
+def save_rendered(rendered):
+    """Write a list of (pk, as_html, as_latex) with one UPDATE."""
+    from wastd.observations.models import Encounter
+
+    Encounter.objects.bulk_update(
+        [Encounter(pk=pk, as_html=html, as_latex=latex) for pk, html, latex in rendered],
+        ["as_html", "as_latex"])
@@ -474,6 +474,40 @@ class NestTagObservationSerializer(ObservationSerializer):
         )
 
 
+class RegisteredTagSerializer(ModelSerializer):
+    animal_name = ReadOnlyField()
+
+    class Meta:
+        model = models.RegisteredTag
+        fields = (
+            "pk",
+            "tag_type",
+            "name",
+            "animal_name",
+            "status",
+            "observation_count",
+            "first_seen",
+            "first_seen_on",
+            "last_seen",
+            "last_seen_on",
+            "status_history",
+        )
+
+
+class DailyEncounterCountSerializer(ModelSerializer):
+
+    class Meta:
+        model = models.DailyEncounterCount
+        fields = ("pk", "site", "date", "encounter_type", "species", "nest_type", "count")
+
+
+class DailySurveyEffortSerializer(ModelSerializer):
+
+    class Meta:
+        model = models.DailySurveyEffort
+        fields = ("pk", "site", "date", "production", "surveys", "duration")
+
+
 class ManagementActionSerializer(ObservationSerializer):
 
     class Meta:
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+"""In-process spatial index of Site and Locality Areas.
+
+Encounters, Surveys and SurveyEnds are assigned the Site and Locality which
+contain their location. Instead of two PostGIS queries per saved record,
+each process keeps an STRtree of prepared Site and Locality polygons,
+loaded on first use.
+
+The index is invalidated through a version key in the default cache,
+which is replaced whenever an Area is saved or deleted, once the transaction
+commits. Each process checks the version key at most every
+``settings.AREA_INDEX_CHECK_SECONDS``.
+
+For bulk (re)assignment, ``assign_areas`` sets the Site or Locality of all
+unassigned Encounters in one ``UPDATE ... FROM`` statement.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from shared.db import CommitBatch
+from shared.spatial import STRtree
+from wastd.observations import stats
+
+logger = logging.getLogger(__name__)
+
+AREA_INDEX_VERSION_KEY = "wastd.observations.area_index.version"
+AREA_INDEX_TYPES = ("Site", "Locality")  # Area.AREATYPE_SITE, Area.AREATYPE_LOCALITY
+
+_index = None
+_checked = 0.0
+_lock = threading.Lock()
+
+
+def area_order(area):
+    """Return a sort key matching Area.Meta.ordering ("-northern_extent", "name").
+
+    PostgreSQL sorts NULLs first in descending order.
+    """
+    if area.northern_extent is None:
+        return (float("-inf"), area.name)
+    return (-area.northern_extent, area.name)
+
+
+class AreaIndex(object):
+    """An STRtree of prepared Area polygons per area type."""
+
+    def __init__(self, areas, version=None):
+        """Build one STRtree per area type from an iterable of Areas."""
+        self.version = version
+        entries = defaultdict(list)
+        for area in areas:
+            entries[area.area_type].append(
+                (area.geom, (area_order(area), area, area.geom.prepared)))
+        self.trees = {area_type: STRtree(e) for area_type, e in entries.items()}
+
+    def lookup(self, area_type, point):
+        """Return the first Area of area_type containing point, or None.
+
+        Of several containing Areas, the first in Area.Meta.ordering wins,
+        which is the Area that ``Area.objects.filter(...).first()`` returns.
+        The returned Area is shared by the process and must not be modified.
+        """
+        tree = self.trees.get(area_type)
+        if point is None or tree is None:
+            return None
+        if point.srid and point.srid != 4326:
+            point = point.transform(4326, clone=True)
+        hits = [(key, area) for key, area, prepared in tree.query(point)
+                if prepared.contains(point)]
+        if not hits:
+            return None
+        return min(hits, key=lambda hit: hit[0])[1]
+
+
+def current_version():
+    """Return the current Area index version from the cache."""
+    version = cache.get(AREA_INDEX_VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.add(AREA_INDEX_VERSION_KEY, version, None)
+        version = cache.get(AREA_INDEX_VERSION_KEY, version)
+    return version
+
+
+def load_area_index(version=None):
+    """Load all Sites and Localities into a new AreaIndex."""
+    from wastd.observations.models import Area
+
+    start = time.monotonic()
+    areas = Area.objects.filter(area_type__in=AREA_INDEX_TYPES).only(
+        "id", "area_type", "name", "northern_extent", "geom")
+    index = AreaIndex(areas, version=version)
+    logger.info("[wastd.observations.spatial.load_area_index] Indexed {0} in {1:.2f}s".format(
+        ", ".join("{0} {1}s".format(len(t), k) for k, t in index.trees.items()),
+        time.monotonic() - start))
+    return index
+
+
+def get_area_index():
+    """Return this process's AreaIndex, (re)loading it if missing or outdated."""
+    global _index, _checked
+    index = _index
+    now = time.monotonic()
+    if index is not None and now - _checked < settings.AREA_INDEX_CHECK_SECONDS:
+        return index
+
+    version = current_version()
+    if index is None or index.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                _index = load_area_index(version)
+            index = _index
+    _checked = now
+    return index
+
+
+def replace_version(keys):
+    """Drop this process's AreaIndex and make all other processes reload theirs."""
+    global _index
+    _index = None
+    cache.set(AREA_INDEX_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+pending = CommitBatch(replace_version)
+
+
+def invalidate_area_index():
+    """Invalidate the AreaIndex of all processes once the current transaction commits.
+
+    Before the commit, a concurrent reload would index the old Areas under the new version.
+    """
+    pending.add(AREA_INDEX_VERSION_KEY)
+
+
+def site_at(point):
+    """Return the first Site containing point, or None."""
+    return get_area_index().lookup("Site", point)
+
+
+def locality_at(point):
+    """Return the first Locality containing point, or None."""
+    return get_area_index().lookup("Locality", point)
+
+
+def assign_areas(area_type="Site", field="site", status=None):
+    """Assign the first containing Area of area_type to all Encounters without one.
+
+    All Encounters with an empty ``field`` (and, if given, the QA status
+    ``status``) are updated in one set-based ``UPDATE ... FROM`` statement.
+    Cached popups (``as_html``, ``as_latex``) are not re-rendered.
+    The daily statistics of the changed site-days are refreshed.
+
+    Arguments:
+    area_type The Area type, "Site" (default) or "Locality"
+    field The Encounter foreign key to set, "site" (default) or "area"
+    status An Encounter QA status to restrict the update to, default: None (all)
+
+    Returns:
+    The number of updated Encounters.
+    """
+    from wastd.observations.models import Area, Encounter
+
+    qn = connection.ops.quote_name
+    column = qn(Encounter._meta.get_field(field).column)
+    status_sql = "AND e2.status = %s" if status else ""
+    params = [area_type] + ([status] if status else [])
+    sql = """
+        UPDATE {enc} AS e
+        SET {column} = s.area_id
+        FROM (
+            SELECT DISTINCT ON (e2.id) e2.id AS encounter_id, a.id AS area_id
+            FROM {enc} AS e2
+            JOIN {area} AS a
+              ON a.area_type = %s AND ST_Contains(a.geom, e2.{where})
+            WHERE e2.{column} IS NULL {status_sql}
+            ORDER BY e2.id, a.northern_extent DESC, a.name
+        ) AS s
+        WHERE e.id = s.encounter_id
+        RETURNING s.area_id, e.{when}
+    """.format(
+        enc=qn(Encounter._meta.db_table),
+        area=qn(Area._meta.db_table),
+        column=column,
+        where=qn("where"),
+        when=qn("when"),
+        status_sql=status_sql,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    updated = len(rows)
+    if field == "site":
+        stats.refresh_later(Encounter, {
+            key for area_id, when in rows
+            for key in (stats.site_day(None, when), stats.site_day(area_id, when)) if key is not None})
+    logger.info("[wastd.observations.spatial.assign_areas] "
+                "Assigned {0} {1} to {2} Encounters".format(area_type, field, updated))
+    return updated
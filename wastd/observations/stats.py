@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""Materialised daily statistics per site.
+
+``DailyEncounterCount`` counts Encounters per site, local date, encounter type,
+species and nest type. ``DailySurveyEffort`` counts Surveys and their duration
+per site and local date of ``Survey.start_time``.
+
+The site-days of saved or deleted Encounters and Surveys (see the receivers
+in ``wastd.observations.models``) are collected per transaction, and
+recounted once after the transaction commits (``refresh_later``).
+Bulk jobs which save many records, such as imports, collect the site-days
+of the whole job with ``deferred_refresh`` and recount them at its end.
+Bulk updates which bypass ``save()`` refresh the site-days they touch
+themselves. ``./manage.py rebuild_daily_stats`` rebuilds everything from scratch.
+
+A recount locks its site-days (PostgreSQL advisory locks, in a fixed order)
+before counting, so that concurrent recounts of a site-day run one after another.
+
+Aggregate questions ("how many nests per site this season?") are answered
+from the summaries by ``encounter_totals`` and ``survey_effort_totals``.
+"""
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from shared.db import CommitBatch
+
+logger = logging.getLogger(__name__)
+
+ENCOUNTER_GROUPS = ("site", "date", "encounter_type", "species", "nest_type")
+SURVEY_GROUPS = ("site", "date", "production")
+REFRESH_CHUNK = 500
+
+_local = threading.local()
+
+
+def site_day(site_id, when):
+    """Return the site-day key (site_id, local date) of a datetime, or None."""
+    if when is None:
+        return None
+    return (site_id, timezone.localdate(when))
+
+
+def day_bounds(date):
+    """Return the aware start and end datetime of a local date."""
+    start = timezone.make_aware(datetime.combine(date, time.min))
+    return start, timezone.make_aware(datetime.combine(date + timedelta(days=1), time.min))
+
+
+def is_survey(model):
+    """Return whether a model is Survey, else an Encounter model."""
+    from wastd.observations.models import Survey
+
+    return issubclass(model, Survey)
+
+
+def date_field(model):
+    """Return the datetime field defining the date of an Encounter or Survey model."""
+    return "start_time" if is_survey(model) else "when"
+
+
+def site_days(model, pks):
+    """Return the site-days of some Encounters or Surveys."""
+    return {
+        site_day(site_id, when)
+        for site_id, when in model.objects.filter(pk__in=list(pks)).values_list("site_id", date_field(model))
+    }
+
+
+def lock_site_days(model, keys):
+    """Lock site-days of a summary model until the end of the transaction, in a fixed order."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_advisory_xact_lock(hashtext(%s), hashtext(k)) "
+            "FROM (SELECT k FROM unnest(%s::text[]) AS k ORDER BY k) AS site_days",
+            [model._meta.db_table, sorted("{0}:{1}".format(site_id, date) for site_id, date in keys)])
+
+
+def chunks(keys):
+    """Return sorted lists of at most REFRESH_CHUNK site-days."""
+    keys = sorted(keys, key=lambda k: (k[0] or 0, k[1]))
+    return [keys[i:i + REFRESH_CHUNK] for i in range(0, len(keys), REFRESH_CHUNK)]
+
+
+def site_days_q(keys, field):
+    """Return a Q matching records of the given site-days.
+
+    Arguments:
+    keys A set of (site_id, date)
+    field The datetime field defining the date, e.g. "when"
+    """
+    q = Q()
+    for site_id, date in keys:
+        start, end = day_bounds(date)
+        q |= Q(site_id=site_id, **{field + "__gte": start, field + "__lt": end})
+    return q
+
+
+# Encounters -----------------------------------------------------------------#
+def encounter_counts(keys=None):
+    """Return unsaved DailyEncounterCounts for the given site-days, or for all Encounters."""
+    from wastd.observations.models import DailyEncounterCount, Encounter
+
+    qs = Encounter.objects.non_polymorphic()
+    if keys is not None:
+        qs = qs.filter(site_days_q(keys, "when"))
+    rows = qs.annotate(
+        date=TruncDate("when"),
+        animal_species=Coalesce("animalencounter__species", "turtlenestencounter__species"),
+        tne_nest_type=F("turtlenestencounter__nest_type"),
+    ).values(
+        "site_id", "date", "encounter_type", "animal_species", "tne_nest_type"
+    ).annotate(count=Count("id")).order_by()
+    return [
+        DailyEncounterCount(
+            site_id=r["site_id"], date=r["date"], encounter_type=r["encounter_type"],
+            species=r["animal_species"], nest_type=r["tne_nest_type"], count=r["count"])
+        for r in rows
+    ]
+
+
+def refresh_encounter_days(keys):
+    """Recount the Encounters of the given site-days."""
+    from wastd.observations.models import DailyEncounterCount
+
+    for chunk in chunks({k for k in keys if k}):
+        q = Q()
+        for site_id, date in chunk:
+            q |= Q(site_id=site_id, date=date)
+        with transaction.atomic():
+            lock_site_days(DailyEncounterCount, chunk)
+            counts = encounter_counts(chunk)
+            DailyEncounterCount.objects.filter(q).delete()
+            DailyEncounterCount.objects.bulk_create(counts)
+
+
+# Surveys --------------------------------------------------------------------#
+def survey_effort(keys=None):
+    """Return unsaved DailySurveyEfforts for the given site-days, or for all Surveys."""
+    from wastd.observations.models import DailySurveyEffort, Survey
+
+    qs = Survey.objects.all()
+    if keys is not None:
+        qs = qs.filter(site_days_q(keys, "start_time"))
+    rows = qs.annotate(date=TruncDate("start_time")).values("site_id", "date", "production").annotate(
+        surveys=Count("id"),
+        duration=Sum(ExpressionWrapper(F("end_time") - F("start_time"), output_field=DurationField())),
+    ).order_by()
+    return [
+        DailySurveyEffort(
+            site_id=r["site_id"], date=r["date"], production=r["production"],
+            surveys=r["surveys"], duration=r["duration"] or timedelta(0))
+        for r in rows
+    ]
+
+
+def refresh_survey_days(keys):
+    """Recount the Surveys of the given site-days."""
+    from wastd.observations.models import DailySurveyEffort
+
+    for chunk in chunks({k for k in keys if k}):
+        q = Q()
+        for site_id, date in chunk:
+            q |= Q(site_id=site_id, date=date)
+        with transaction.atomic():
+            lock_site_days(DailySurveyEffort, chunk)
+            effort = survey_effort(chunk)
+            DailySurveyEffort.objects.filter(q).delete()
+            DailySurveyEffort.objects.bulk_create(effort)
+
+
+# Refresh --------------------------------------------------------------------#
+encounter_days = CommitBatch(refresh_encounter_days)
+survey_days = CommitBatch(refresh_survey_days)
+
+
+def refresh_later(model, keys):
+    """Refresh the daily statistics of some site-days of an Encounter or Survey model.
+
+    Within ``deferred_refresh`` at the end of its block, else once the current transaction commits.
+    """
+    keys = {k for k in keys if k}
+    if not keys:
+        return
+    batch = survey_days if is_survey(model) else encounter_days
+    pending = getattr(_local, "pending", None)
+    if pending is not None:
+        pending[batch].update(keys)
+    else:
+        batch.add(*keys)
+
+
+@contextmanager
+def deferred_refresh():
+    """Collect the site-days changed within the block, and refresh each once at its end."""
+    if getattr(_local, "pending", None) is not None:
+        yield
+        return
+    _local.pending = {encounter_days: set(), survey_days: set()}
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        for batch, keys in pending.items():
+            if keys:
+                batch.add(*keys)
+
+
+def rebuild(batch_size=1000):
+    """Rebuild all daily statistics, return the numbers of encounter and survey rows."""
+    from wastd.observations.models import DailyEncounterCount, DailySurveyEffort
+
+    counts = encounter_counts()
+    effort = survey_effort()
+    with transaction.atomic():
+        DailyEncounterCount.objects.all().delete()
+        DailyEncounterCount.objects.bulk_create(counts, batch_size=batch_size)
+        DailySurveyEffort.objects.all().delete()
+        DailySurveyEffort.objects.bulk_create(effort, batch_size=batch_size)
+    logger.info("[wastd.observations.stats.rebuild] Rebuilt {0} daily encounter counts "
+                "and {1} daily survey efforts.".format(len(counts), len(effort)))
+    return len(counts), len(effort)
+
+
+# Aggregates -----------------------------------------------------------------#
+def encounter_totals(group_by=("site",), queryset=None, **filters):
+    """Return Encounter counts from the daily summaries, grouped and filtered.
+
+    Arguments:
+    group_by A list of fields from ENCOUNTER_GROUPS, default: ("site", )
+    queryset A DailyEncounterCount QuerySet, default: None (all)
+    filters Any DailyEncounterCount lookups, e.g. date__gte, encounter_type, species
+
+    Returns:
+    A list of dicts with the group_by fields and count.
+    """
+    from wastd.observations.models import DailyEncounterCount
+
+    group_by = [g for g in group_by if g in ENCOUNTER_GROUPS]
+    qs = (DailyEncounterCount.objects.all() if queryset is None else queryset).filter(**filters)
+    if not group_by:
+        return [qs.aggregate(count=Coalesce(Sum("count"), 0))]
+    return list(qs.values(*group_by).annotate(count=Sum("count")).order_by(*group_by))
+
+
+def survey_effort_totals(group_by=("site",), queryset=None, **filters):
+    """Return Survey counts and durations from the daily summaries, grouped and filtered.
+
+    Arguments:
+    group_by A list of fields from SURVEY_GROUPS, default: ("site", )
+    queryset A DailySurveyEffort QuerySet, default: None (all)
+    filters Any DailySurveyEffort lookups, e.g. date__gte, production
+
+    Returns:
+    A list of dicts with the group_by fields, surveys and duration.
+    """
+    from wastd.observations.models import DailySurveyEffort
+
+    group_by = [g for g in group_by if g in SURVEY_GROUPS]
+    qs = (DailySurveyEffort.objects.all() if queryset is None else queryset).filter(**filters)
+    if not group_by:
+        return [qs.aggregate(surveys=Coalesce(Sum("surveys"), 0), duration=Sum("duration"))]
+    return list(qs.values(*group_by).annotate(
+        surveys=Sum("surveys"), duration=Sum("duration")).order_by(*group_by))
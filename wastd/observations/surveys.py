@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Set-based Survey reconstruction and Encounter claiming.
+
+Saving a Survey claims its Encounters through the signals ``survey_pre_save``
+and ``survey_post_save``, one spatial and temporal query per Survey.
+This is fine for a Survey captured in the field, but slow for the thousands
+of Surveys reconstructed from orphaned TurtleNestEncounters after an import.
+
+Here, reconstruction and claiming are done in SQL:
+
+* ``missing_surveys`` groups orphaned TurtleNestEncounters by site and (UTC) date
+  with ``GROUP BY``, returning the earliest and latest ``when`` and the first reporter.
+* ``reconstruct_missing_surveys`` bulk-creates one Survey per group.
+* ``claim_encounters_bulk`` links all Encounters to the Surveys they fall into
+  with one interval join ``UPDATE``.
+
+The results match the signal path (``utils.reconstruct_missing_surveys_legacy``):
+of several Surveys containing an Encounter, the last created Survey wins.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+
+from wastd.observations import rendering, stats
+
+logger = logging.getLogger(__name__)
+
+RECONSTRUCTED_COMMENT = "[QA][AUTO] Reconstructed by WAStD from TurtleNestEncounters without surveys."
+
+
+def missing_surveys():
+    """Return site, date, earliest and latest time, and reporter of orphaned TurtleNestEncounters.
+
+    TurtleNestEncounters with a site but without a survey are grouped by site and UTC date.
+    The reporter is the reporter of the earliest TurtleNestEncounter of each group.
+
+    Returns:
+    A list of tuples (site_id, date, min_when, max_when, reporter_id) ordered by date and site.
+    """
+    from wastd.observations.models import Encounter, TurtleNestEncounter
+
+    qn = connection.ops.quote_name
+    sql = """
+        SELECT e.site_id,
+               (e.{when} AT TIME ZONE 'UTC')::date AS day,
+               min(e.{when}),
+               max(e.{when}),
+               (array_agg(e.reporter_id ORDER BY e.{when}, e.{where})
+                    FILTER (WHERE e.reporter_id IS NOT NULL))[1]
+        FROM {enc} AS e
+        JOIN {tne} AS t ON t.encounter_ptr_id = e.id
+        WHERE e.site_id IS NOT NULL AND e.survey_id IS NULL
+        GROUP BY e.site_id, day
+        ORDER BY day, e.site_id
+    """.format(
+        enc=qn(Encounter._meta.db_table),
+        tne=qn(TurtleNestEncounter._meta.db_table),
+        when=qn("when"),
+        where=qn("where"),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.fetchall()
+
+
+def claim_encounters_bulk(survey_ids):
+    """Link all Encounters within the given Surveys to their Survey in one UPDATE.
+
+    An Encounter falls into a production Survey if it lies within the bounding box
+    of the Survey's site and its ``when`` lies between the Survey's start and end time,
+    as in ``Survey.encounters``. Of several Surveys, the one with the highest ID wins,
+    which is the one which would have claimed the Encounter last.
+    Claimed Encounters are marked to be re-rendered.
+
+    Arguments:
+    survey_ids A list of Survey IDs
+
+    Returns:
+    The number of claimed Encounters.
+    """
+    from wastd.observations.models import Area, Encounter, Survey
+
+    if not survey_ids:
+        return 0
+    qn = connection.ops.quote_name
+    sql = """
+        UPDATE {enc} AS e
+        SET survey_id = c.survey_id, render_dirty = TRUE
+        FROM (
+            SELECT DISTINCT ON (e2.id) e2.id AS encounter_id, s.id AS survey_id
+            FROM {survey} AS s
+            JOIN {area} AS a ON a.id = s.site_id
+            JOIN {enc} AS e2
+              ON e2.{where} @ a.geom
+             AND e2.{when} BETWEEN s.start_time AND s.end_time
+            WHERE s.id = ANY(%s) AND s.production
+            ORDER BY e2.id, s.id DESC
+        ) AS c
+        WHERE e.id = c.encounter_id
+    """.format(
+        enc=qn(Encounter._meta.db_table),
+        survey=qn(Survey._meta.db_table),
+        area=qn(Area._meta.db_table),
+        when=qn("when"),
+        where=qn("where"),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [list(survey_ids)])
+        claimed = cursor.rowcount
+    rendering.schedule_render()
+    logger.info("[wastd.observations.surveys.claim_encounters_bulk] "
+                "{0} Surveys claimed {1} Encounters".format(len(survey_ids), claimed))
+    return claimed
+
+
+def reconstruct_missing_surveys(buffer_mins=30):
+    """Create missing Surveys for orphaned TurtleNestEncounters and claim their Encounters.
+
+    One Survey is created per site and date of TurtleNestEncounters with a site
+    but without a survey, spanning from the earliest to the latest Encounter,
+    buffered by buffer_mins.
+
+    Arguments:
+    buffer_mins The buffer in minutes before the first and after the last Encounter, default: 30
+
+    Returns:
+    A tuple of (created Surveys, claimed Encounters).
+    """
+    from wastd.observations.models import Area, Survey
+
+    bfr = timedelta(minutes=buffer_mins)
+    groups = missing_surveys()
+    logger.info("[wastd.observations.surveys.reconstruct_missing_surveys] "
+                "Creating {0} missing surveys...".format(len(groups)))
+    if not groups:
+        return 0, 0
+
+    with transaction.atomic():
+        surveys = Survey.objects.bulk_create([
+            Survey(
+                source="reconstructed",
+                site_id=site_id,
+                start_time=min_when - bfr,
+                end_time=max_when + bfr,
+                reporter_id=reporter_id,
+                start_comments=RECONSTRUCTED_COMMENT,
+            ) for site_id, day, min_when, max_when, reporter_id in groups
+        ])
+
+        # The label needs the pk and the site name
+        sites = Area.objects.in_bulk({s.site_id for s in surveys})
+        for s in surveys:
+            s.site = sites[s.site_id]
+            s.label = s.make_label
+        Survey.objects.bulk_update(surveys, ["label"], batch_size=1000)
+        stats.refresh_later(Survey, {stats.site_day(s.site_id, s.start_time) for s in surveys})
+
+        claimed = claim_encounters_bulk([s.pk for s in surveys])
+
+    logger.info("[wastd.observations.surveys.reconstruct_missing_surveys] "
+                "Created {0} surveys, which claimed {1} Encounters.".format(len(surveys), claimed))
+    return len(surveys), claimed
+
+
+def survey_assignments(source="reconstructed"):
+    """Return a set of (encounter ID, site ID, start time, end time, reporter ID) of claimed Encounters.
+
+    Used to compare the results of different reconstructions, independent of Survey IDs.
+
+    Arguments:
+    source The Survey source, default: "reconstructed"
+    """
+    from wastd.observations.models import Encounter
+
+    return set(Encounter.objects.filter(survey__source=source).values_list(
+        "pk", "survey__site_id", "survey__start_time", "survey__end_time", "survey__reporter_id"))
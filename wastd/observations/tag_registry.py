@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""The tag registry: one summary row per tag, maintained from tag observations.
+
+``RegisteredTag`` holds, per tag type and tag name, the first and last
+sighting (and through the last, the animal name), the latest status and
+the status history.
+
+Entries are refreshed whenever a TagObservation or NestTagObservation is saved
+or deleted (see the receivers in ``wastd.observations.models``), and rebuilt
+from scratch with ``rebuild_tag_registry``. Each refresh reads only the
+observations of the affected tags.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import CharField, F, Q, Value
+from django.db.models.functions import Cast, Coalesce, Concat, Replace, Upper
+
+logger = logging.getLogger(__name__)
+
+NEST_TAG_TYPE = "nest-tag"
+
+
+def nest_tag_name():
+    """Return a query expression for ``NestTagObservation.name``."""
+
+    def part(expression):
+        return Upper(Replace(Coalesce(expression, Value("")), Value(" "), Value("")))
+
+    return Concat(
+        part(F("flipper_tag_id")), Value("_"),
+        Coalesce(Cast("date_nest_laid", CharField()), Value("")), Value("_"),
+        part(F("tag_label")),
+        output_field=CharField())
+
+
+def tag_key(observation):
+    """Return the registry key (tag_type, name) of a TagObservation or NestTagObservation."""
+    from wastd.observations.models import NestTagObservation
+
+    if isinstance(observation, NestTagObservation):
+        return (NEST_TAG_TYPE, observation.name)
+    return (observation.tag_type, observation.name)
+
+
+def saved_key(observation):
+    """Return the registry key of the saved version of a tag observation, or None if unsaved."""
+    if not observation.pk:
+        return None
+    saved = type(observation).objects.non_polymorphic().filter(pk=observation.pk).first()
+    return tag_key(saved) if saved else None
+
+
+def sightings(keys=None):
+    """Return the sightings of the given tags, or of all tags.
+
+    Arguments:
+    keys A list of (tag_type, name), default: None (all tags)
+
+    Returns:
+    A list of (tag_type, name, status, encounter_id, when, observation pk)
+    """
+    from wastd.observations.models import NestTagObservation, TagObservation
+
+    fields = ("tag_type", "name", "status", "encounter_id", "encounter__when", "pk")
+    tags = TagObservation.objects.non_polymorphic()
+    nest_tags = NestTagObservation.objects.non_polymorphic().annotate(
+        tag_type=Value(NEST_TAG_TYPE, output_field=CharField()), tag_name=nest_tag_name())
+
+    if keys is not None:
+        tag_q, nest_names = Q(), set()
+        for tag_type, name in keys:
+            if tag_type == NEST_TAG_TYPE:
+                nest_names.add(name)
+            else:
+                tag_q |= Q(tag_type=tag_type, name=name)
+        tags = tags.filter(tag_q) if tag_q else tags.none()
+        nest_tags = nest_tags.filter(tag_name__in=nest_names) if nest_names else nest_tags.none()
+
+    rows = list(tags.values_list(*fields))
+    rows.extend(nest_tags.values_list(
+        "tag_type", "tag_name", "status", "encounter_id", "encounter__when", "pk"))
+    return rows
+
+
+def build_entries(rows):
+    """Summarise sightings into unsaved RegisteredTags.
+
+    Arguments:
+    rows A list of sightings as returned by ``sightings``
+
+    Returns:
+    A dict of (tag_type, name): RegisteredTag
+    """
+    from wastd.observations.models import RegisteredTag
+
+    entries = dict()
+    for tag_type, name, status, encounter_id, when, pk in sorted(
+            rows, key=lambda r: (r[0], r[1], r[4], r[5])):
+        entry = entries.get((tag_type, name))
+        if entry is None:
+            entry = entries[(tag_type, name)] = RegisteredTag(
+                tag_type=tag_type, name=name, status_history=[],
+                first_seen_id=encounter_id, first_seen_on=when)
+        entry.status = status
+        entry.last_seen_id = encounter_id
+        entry.last_seen_on = when
+        entry.observation_count += 1
+        entry.status_history.append([when.isoformat() if when else None, status, encounter_id])
+    return entries
+
+
+def refresh_tags(keys):
+    """Rebuild the registry entries of the given tags from their observations.
+
+    Arguments:
+    keys A list of (tag_type, name)
+    """
+    from wastd.observations.models import RegisteredTag
+
+    keys = set(keys)
+    if not keys:
+        return
+    entries = build_entries(sightings(keys))
+    q = Q()
+    for tag_type, name in keys:
+        q |= Q(tag_type=tag_type, name=name)
+    with transaction.atomic():
+        RegisteredTag.objects.filter(q).delete()
+        RegisteredTag.objects.bulk_create(entries.values())
+
+
+def rebuild(batch_size=1000):
+    """Rebuild the whole tag registry, return the number of registered tags."""
+    from wastd.observations.models import RegisteredTag
+
+    rows = sightings()
+    entries = build_entries(rows)
+    with transaction.atomic():
+        RegisteredTag.objects.all().delete()
+        RegisteredTag.objects.bulk_create(entries.values(), batch_size=batch_size)
+    logger.info("[wastd.observations.tag_registry.rebuild] Registered {0} tags "
+                "from {1} observations.".format(len(entries), len(rows)))
+    return len(entries)
+
+
+def lookup(name, tag_type=None):
+    """Return the RegisteredTags with the given name, optionally of one tag type."""
+    from wastd.observations.models import RegisteredTag
+
+    tags = RegisteredTag.objects.filter(name=name).select_related("last_seen")
+    if tag_type:
+        tags = tags.filter(tag_type=tag_type)
+    return list(tags)
@@ -6,8 +6,8 @@ import os
 from background_task import background
 from django.conf import settings
 from django.utils import timezone
-from sentry_sdk import capture_message
 
+from shared.jobs import job
 from wastd.observations import utils
 
 logger = logging.getLogger(__name__)
@@ -16,43 +16,51 @@ logger = logging.getLogger(__name__)
 @background(queue="admin-tasks", schedule=timezone.now())
 def update_names():
     """Update cached names on Encounters and Loggers and reconstructs Surveys."""
-    msg = "[wastd.observations.tasks.update_names] Start updating names..."
-    logger.info(msg)
-    capture_message(msg, level="info")
-    surveys, names, loggers = utils.allocate_animal_names()
-    msg = ("[wastd.observations.tasks.update_names] {0} surveys reconstructed, "
-           "{1} animal names reconstructed, {2} logger names set. "
-           "Task successfully finished.".format(
-               len(surveys), len(names), len(loggers)))
-    logger.info(msg)
-    capture_message(msg, level="warning")
+    with job("update_names", report=True):
+        utils.allocate_animal_names()
 
 
 @background(queue="admin-tasks", schedule=timezone.now())
 def import_odka():
     """Download and import new ODKA submissions."""
-    capture_message(
-        "[wastd.observations.tasks.import_odka] Starting ODKA import.",
-        level="warning"
-    )
+    from wastd.observations.importers import odka
+
     path = os.path.join(settings.MEDIA_ROOT, "odka")
     os.makedirs(path, exist_ok=True)
+    with job("import_odka", report=True):
+        odka.save_all_odka(path=path)
+        odka.import_all_odka(path=path)
+        utils.reconstruct_missing_surveys()
+
+
+@background(queue="admin-tasks")
+def retry_media_fetch(jobs):
+    """Retry media downloads which failed during an ODKA import."""
+    from wastd.observations import media
+
+    logger.info("[wastd.observations.tasks.retry_media_fetch] Retrying {0} media downloads...".format(len(jobs)))
+    with job("retry_media_fetch", report=True) as run:
+        stats = media.run_jobs(jobs)
+        run.rows = len(jobs)
+    logger.info("[wastd.observations.tasks.retry_media_fetch] {downloaded} downloaded, "
+                "{deduplicated} deduplicated, {failed} queued again, {dropped} dropped.".format(**stats))
+
+
+@background(queue="render")
+def render_encounters():
+    """Re-render the cached popup and Latex fragments of all dirty Encounters."""
+    from wastd.observations import rendering
+
+    count = rendering.render_dirty()
+    logger.info("[wastd.observations.tasks.render_encounters] Rendered {0} Encounters.".format(count))
+
+
+@background(queue="admin-tasks", schedule=timezone.now())
+def find_duplicates():
+    """Queue groups of likely duplicate Encounters for review."""
+    from wastd.observations import duplicates
 
-    utils.save_all_odka(path=path)
-    capture_message(
-        "[wastd.observations.tasks.import_odka] ODKA submissions downloaded.",
-        level="info"
-    )
-
-    utils.import_all_odka(path=path)
-    capture_message(
-        "[wastd.observations.tasks.import_odka] ODKA submissions imported.",
-        level="info"
-    )
-
-    utils.reconstruct_missing_surveys()
-    capture_message(
-        "[wastd.observations.tasks.import_odka] "
-        "ODKA surveys reconstructed, task successfully finished.",
-        level="warning"
-    )
+    with job("find_duplicates", report=True) as run:
+        run.rows = duplicates.queue_duplicates()
+    logger.info("[wastd.observations.tasks.find_duplicates] {0} new duplicate groups queued for review.".format(
+        run.rows))
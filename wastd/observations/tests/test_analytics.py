@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point, Polygon
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from shared import db
+from wastd.observations import analytics
+from wastd.observations.models import (
+    Area,
+    LineTransectEncounter,
+    TrackTallyObservation,
+    TurtleNestEncounter,
+    TurtleNestObservation,
+)
+
+T0 = datetime(2019, 11, 4, 12, 0, tzinfo=timezone.utc)
+
+
+class NestMetricsTests(SimpleTestCase):
+    """Tests for the vectorised nest metrics."""
+
+    def test_matches_properties(self):
+        import pandas
+
+        nests = [
+            dict(no_egg_shells=80, no_live_hatchlings=2, no_dead_hatchlings=3, no_undeveloped_eggs=5,
+                 no_unhatched_eggs=4, no_unhatched_term=1, no_depredated_eggs=7),
+            dict(no_egg_shells=33, no_live_hatchlings=None, no_dead_hatchlings=1, no_undeveloped_eggs=None,
+                 no_unhatched_eggs=2, no_unhatched_term=None, no_depredated_eggs=None),
+            {c: None for c in analytics.EXCAVATION_COLUMNS},
+        ]
+        df = analytics.nest_metrics(pandas.DataFrame.from_records(nests, columns=analytics.EXCAVATION_COLUMNS))
+        for row, nest in zip(df.to_dict(orient="records"), nests):
+            obs = TurtleNestObservation(**nest)
+            self.assertEqual(row["egg_count_calculated"], obs.egg_count_calculated)
+            self.assertEqual(row["no_emerged"], obs.no_emerged)
+            self.assertAlmostEqual(row["hatching_success"], obs.hatching_success, places=2)
+            self.assertAlmostEqual(row["emergence_success"], obs.emergence_success, places=2)
+
+
+class SeasonSummaryTests(TestCase):
+    """Tests for the season summary."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        with db.run_on_commit():
+            self.site = Area.objects.create(
+                area_type=Area.AREATYPE_SITE, name="Site",
+                geom=Polygon.from_bbox((114.0, -21.5, 114.5, -21.0)))
+        for day in range(3):
+            nest = TurtleNestEncounter.objects.create(
+                where=Point(114.2, -21.2), when=T0 + timedelta(days=day), observer=self.user,
+                reporter=self.user, species="natator-depressus", nest_type="hatched-nest")
+            TurtleNestObservation.objects.create(
+                encounter=nest, no_egg_shells=40 + 10 * day, no_live_hatchlings=1, no_unhatched_eggs=10)
+        transect = LineTransectEncounter.objects.create(
+            where=Point(114.2, -21.2), when=T0, observer=self.user, reporter=self.user)
+        TrackTallyObservation.objects.create(
+            encounter=transect, species="natator-depressus", nest_type="track-not-assessed", tally=12)
+
+    def test_season_summary(self):
+        summary = analytics.season_summary()
+        self.assertEqual(len(summary), 1)
+        row = summary.iloc[0]
+        self.assertEqual(row["site_id"], self.site.pk)
+        self.assertEqual(row["season"], 2019)
+        self.assertEqual(str(row["week"]), "2019-11-04")
+        self.assertEqual(row["nests_hatched-nest"], 3)
+        self.assertEqual(row["tally_track-not-assessed"], 12)
+        self.assertEqual(row["excavations"], 3)
+        self.assertEqual(row["egg_count_calculated"], 50 + 60 + 70)
+        self.assertEqual(len(analytics.season_summary(season=2018)), 0)
+
+    def test_summary_records(self):
+        records = analytics.summary_records(analytics.cached_season_summary(site=self.site.pk))
+        self.assertEqual(records[0]["week"], "2019-11-04")
+        self.assertEqual(records[0]["season"], 2019)
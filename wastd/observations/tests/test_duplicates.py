@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from wastd.observations import duplicates
+from wastd.observations.models import DuplicateGroup, Encounter, TagObservation, TurtleNestEncounter
+
+T0 = datetime(2019, 11, 4, 12, 0, tzinfo=timezone.utc)
+
+
+class CandidatePairTests(SimpleTestCase):
+    """Tests for the grid and time bucketing of candidate pairs."""
+
+    def test_candidate_pairs(self):
+        # About 5 m apart across a cell border, 1 km away, and 5 m apart but hours later
+        records = [
+            (1, 114.0, -21.0, T0, "nest", "natator-depressus", 1),
+            (2, 114.00005, -21.0, T0 + timedelta(minutes=5), "nest", "natator-depressus", 1),
+            (3, 114.01, -21.0, T0, "nest", "natator-depressus", 1),
+            (4, 114.0, -21.00004, T0 + timedelta(hours=3), "nest", "natator-depressus", 1),
+        ]
+        self.assertEqual(duplicates.candidate_pairs(records, 10, 30), [(0, 1)])
+
+    def test_pair_score(self):
+        a = (1, 0, 0, T0, "nest", "natator-depressus", 1)
+        b = (2, 0, 0, T0, "nest", "natator-depressus", 2)
+        self.assertEqual(duplicates.pair_score(a, b, set(), set()), 0.7)
+        self.assertEqual(duplicates.pair_score(a, b, {"WA1"}, {"WA1"}), 0.8)
+        self.assertEqual(duplicates.pair_score(a, b, {"WA1"}, {"WA2"}), 0.0)
+
+
+class QueueDuplicatesTests(TestCase):
+    """Tests for the duplicate review queue."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        self.encounters = [
+            TurtleNestEncounter.objects.create(
+                where=Point(114.0 + 0.00003 * i, -21.0), when=T0 + timedelta(minutes=i),
+                observer=self.user, reporter=self.user, species="natator-depressus", nest_type="nest")
+            for i in range(3)
+        ]
+        # Different tags on the same spot show different animals
+        other = get_user_model().objects.create_user("other", "other@test.com", "pass")
+        tagged = TurtleNestEncounter.objects.create(
+            where=Point(114.0, -21.0), when=T0, observer=other, reporter=other,
+            species="natator-depressus", nest_type="nest")
+        TagObservation.objects.create(encounter=tagged, name="WA1")
+        TagObservation.objects.create(encounter=self.encounters[0], name="WA2")
+
+    def test_queue_and_flag(self):
+        self.assertEqual(duplicates.queue_duplicates(), 1)
+        self.assertEqual(duplicates.queue_duplicates(), 0)
+        group = DuplicateGroup.objects.get()
+        self.assertEqual(
+            sorted(group.encounters.values_list("pk", flat=True)), sorted(e.pk for e in self.encounters))
+
+        Encounter.objects.filter(pk=self.encounters[0].pk).update(status=Encounter.STATUS_CURATED)
+        self.assertEqual(duplicates.flag_group(group, by=self.user), 1)
+        self.assertEqual(Encounter.objects.get(pk=self.encounters[0].pk).status, Encounter.STATUS_FLAGGED)
+        self.assertEqual(DuplicateGroup.objects.get().status, DuplicateGroup.STATUS_FLAGGED)
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from wastd.observations import identity
+from wastd.observations.models import AnimalEncounter, Encounter, TagObservation
+
+T0 = datetime(2019, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class IdentityResolverTests(SimpleTestCase):
+    """Tests for the union-find animal identity resolver."""
+
+    def test_union_find(self):
+        uf = identity.UnionFind()
+        uf.union(1, 2)
+        uf.union(3, 4)
+        uf.union(2, 4)
+        uf.find(5)
+        self.assertEqual(uf.find(1), uf.find(3))
+        self.assertNotEqual(uf.find(1), uf.find(5))
+        self.assertEqual(sorted(sorted(g) for g in uf.groups().values()), [[1, 2, 3, 4], [5]])
+
+    def test_animal_names(self):
+        # (encounter_id, name, tag_type, status, tag_location, when, pk)
+        tags = [
+            (1, "WA1", "flipper-tag", "applied-new", "flipper-front-left-1", T0, 1),
+            (1, "WA2", "flipper-tag", "applied-new", "flipper-front-right-1", T0, 2),
+            (2, "WA2", "flipper-tag", "resighted", "flipper-front-right-1", T0 + timedelta(days=1), 3),
+            (2, "WA3", "flipper-tag", "applied-new", "flipper-front-left-1", T0 + timedelta(days=1), 4),
+            (3, "WA3", "flipper-tag", "resighted", "flipper-front-left-1", T0 + timedelta(days=9), 5),
+            (4, "WA9", "flipper-tag", "resighted", "flipper-front-left-1", T0, 6),
+        ]
+        self.assertEqual(
+            sorted(sorted(a) for a in identity.resolve_animals(tags)), [[1, 2, 3], [4]])
+        self.assertEqual(identity.animal_names(tags, {1, 2, 3, 4}), {1: "WA1", 2: "WA1", 3: "WA1"})
+        # Only AnimalEncounters can be new captures
+        self.assertEqual(identity.animal_names(tags, {2, 3, 4}), {})
+
+
+class AllocateNamesTests(TestCase):
+    """Tests for allocating animal names in the database."""
+
+    def test_allocate_names(self):
+        user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        first = AnimalEncounter.objects.create(
+            where=Point(114.7, -21.2), when=T0, observer=user, reporter=user)
+        second = AnimalEncounter.objects.create(
+            where=Point(114.7, -21.2), when=T0 + timedelta(days=14), observer=user, reporter=user)
+        TagObservation.objects.create(encounter=first, name="WA1", status="applied-new")
+        TagObservation.objects.create(encounter=second, name="WA1", status="resighted")
+
+        renamed = identity.allocate_names()
+        self.assertEqual(sorted(renamed), sorted([first.pk, second.pk]))
+        self.assertEqual(
+            set(Encounter.objects.filter(pk__in=renamed).values_list("name", flat=True)), {"WA1"})
+        self.assertEqual(identity.allocate_names(), [])
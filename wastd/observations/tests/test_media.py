@@ -0,0 +1,109 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from wastd.observations import media
+
+
+class FakeResponse(object):
+    """A minimal streamed requests response."""
+
+    def __init__(self, content, content_length=None):
+        self.content = content
+        self.headers = {"Content-Length": str(content_length or len(content))}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+
+class MediaDownloadTests(SimpleTestCase):
+    """Tests for the media download pipeline."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        self.content = b"not really a jpeg" * 1000
+        self.md5 = hashlib.md5(self.content).hexdigest()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root)
+
+    def session(self, response):
+        session = mock.Mock()
+        session.get.return_value = response
+        return mock.patch.object(media, "get_session", return_value=session)
+
+    def test_parse_md5(self):
+        self.assertEqual(media.parse_md5("md5:ABC123"), "abc123")
+        self.assertEqual(media.parse_md5("abc123"), "abc123")
+        self.assertIsNone(media.parse_md5(None))
+
+    def test_download_verifies_md5(self):
+        with self.session(FakeResponse(self.content)):
+            digest = media.download("http://example.com/1", "encounter/1/1.jpg", self.md5)
+        self.assertEqual(digest, self.md5)
+        path = os.path.join(self.media_root, "encounter/1/1.jpg")
+        self.assertEqual(media.file_md5(path), self.md5)
+        self.assertFalse(os.path.exists(path + media.PART_SUFFIX))
+
+    def test_download_rejects_bad_md5(self):
+        with self.session(FakeResponse(self.content)):
+            self.assertRaises(
+                media.MediaChecksumError,
+                media.download, "http://example.com/1", "encounter/1/1.jpg", "0" * 32)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "encounter/1")), [])
+
+    def test_download_rejects_partial_file(self):
+        with self.session(FakeResponse(self.content, content_length=len(self.content) + 10)):
+            self.assertRaises(
+                media.requests.RequestException,
+                media.download, "http://example.com/1", "encounter/1/1.jpg")
+
+    def test_download_rejects_empty_file(self):
+        with self.session(FakeResponse(b"", content_length=0)):
+            self.assertRaises(
+                media.requests.RequestException,
+                media.download, "http://example.com/1", "encounter/1/1.jpg")
+        self.assertEqual(os.listdir(os.path.join(self.media_root, "encounter/1")), [])
+
+    @override_settings(MEDIA_FETCH_MAX_RETRIES=2)
+    def test_failed_jobs_retried_up_to_limit(self):
+        job = dict(url="http://example.com/1", name="encounter/1/1.jpg", md5=None, attach=dict())
+        with mock.patch("wastd.observations.tasks.retry_media_fetch") as retry:
+            self.assertEqual(media.queue_retry([job]), 0)
+            queued = retry.call_args[0][0]
+            self.assertEqual(queued[0]["retries"], 1)
+            self.assertEqual(media.queue_retry(queued), 0)
+            queued = retry.call_args[0][0]
+            self.assertEqual(queued[0]["retries"], 2)
+            retry.reset_mock()
+            self.assertEqual(media.queue_retry(queued), 1)
+        retry.assert_not_called()
+
+    def test_fetcher_deduplicates_by_hash(self):
+        fetcher = media.MediaFetcher(max_workers=2, max_attempts=1)
+        fetcher.add("http://example.com/1", "encounter/1/1.jpg", dict(), md5="md5:" + self.md5)
+        fetcher.add("http://example.com/2", "encounter/2/2.jpg", dict(), md5="md5:" + self.md5)
+        with self.session(FakeResponse(self.content)), \
+                mock.patch.object(media, "attach") as attach:
+            stats = fetcher.run()
+        self.assertEqual(stats, dict(downloaded=1, deduplicated=1, failed=0, dropped=0))
+        self.assertEqual(
+            [c[0][1] for c in attach.call_args_list],
+            ["encounter/1/1.jpg", "encounter/1/1.jpg"])
@@ -0,0 +1,48 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from shared import db
+from wastd.observations import rendering
+from wastd.observations.models import Encounter
+
+
+class RenderingTests(TestCase):
+    """Tests for the deferred rendering of Encounter popups."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        self.encounter = Encounter.objects.create(
+            where=Point(114.7, -21.2), when=timezone.now(), observer=self.user, reporter=self.user)
+
+    def test_save_marks_dirty(self):
+        self.encounter.refresh_from_db()
+        self.assertTrue(self.encounter.render_dirty)
+        self.assertIsNone(self.encounter.as_html)
+
+    def test_render_dirty(self):
+        self.assertEqual(rendering.render_dirty(), 1)
+        self.encounter.refresh_from_db()
+        self.assertFalse(self.encounter.render_dirty)
+        self.assertIn(self.encounter.absolute_admin_url, self.encounter.as_html)
+        self.assertTrue(self.encounter.as_latex)
+        self.assertEqual(rendering.render_dirty(), 0)
+
+    def test_suspend_rendering_flushes(self):
+        with rendering.suspend_rendering():
+            self.assertTrue(rendering.rendering_suspended())
+            self.encounter.save()
+        self.assertFalse(rendering.rendering_suspended())
+        self.assertFalse(Encounter.objects.filter(render_dirty=True).exists())
+
+    def test_schedule_once_per_transaction(self):
+        with mock.patch.object(rendering.pending, "handler") as handler:
+            with db.run_on_commit():
+                with transaction.atomic():
+                    for _ in range(3):
+                        self.encounter.save()
+            handler.assert_called_once_with({rendering.RENDER_TASK_NAME})
@@ -0,0 +1,50 @@
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point, Polygon
+from django.test import TestCase
+from django.utils import timezone
+
+from shared import db
+from wastd.observations import spatial
+from wastd.observations.models import Area, Encounter
+
+
+class AreaIndexTests(TestCase):
+    """Tests for the in-process Site and Locality index."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        with db.run_on_commit():
+            self.locality = Area.objects.create(
+                area_type=Area.AREATYPE_LOCALITY, name="Locality",
+                geom=Polygon.from_bbox((114.0, -22.0, 116.0, -20.0)))
+            self.site = Area.objects.create(
+                area_type=Area.AREATYPE_SITE, name="Site",
+                geom=Polygon.from_bbox((114.5, -21.5, 115.0, -21.0)))
+
+    def test_lookup(self):
+        self.assertEqual(spatial.site_at(Point(114.7, -21.2)), self.site)
+        self.assertEqual(spatial.locality_at(Point(114.7, -21.2)), self.locality)
+        self.assertIsNone(spatial.site_at(Point(115.5, -21.2)))
+        self.assertIsNone(spatial.site_at(None))
+
+    def test_invalidated_on_area_save(self):
+        point = Point(115.5, -21.2)
+        self.assertIsNone(spatial.site_at(point))
+        with db.run_on_commit():
+            other = Area.objects.create(
+                area_type=Area.AREATYPE_SITE, name="Other site",
+                geom=Polygon.from_bbox((115.2, -21.5, 115.8, -21.0)))
+            # Not before the commit
+            self.assertIsNone(spatial.site_at(point))
+        self.assertEqual(spatial.site_at(point), other)
+        with db.run_on_commit():
+            other.delete()
+        self.assertIsNone(spatial.site_at(point))
+
+    def test_assign_areas(self):
+        enc = Encounter.objects.create(
+            where=Point(114.7, -21.2), when=timezone.now(), observer=self.user, reporter=self.user)
+        Encounter.objects.filter(pk=enc.pk).update(site=None)
+        self.assertEqual(spatial.assign_areas(), 1)
+        enc.refresh_from_db()
+        self.assertEqual(enc.site, self.site)
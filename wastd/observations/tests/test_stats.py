@@ -0,0 +1,122 @@
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point, Polygon
+from django.test import TestCase
+from django.utils import timezone
+
+from shared import db
+from wastd.observations import spatial, stats, surveys
+from wastd.observations.models import (
+    Area,
+    DailyEncounterCount,
+    DailySurveyEffort,
+    Survey,
+    TurtleNestEncounter,
+)
+
+T0 = datetime(2019, 11, 4, 12, 0, tzinfo=timezone.utc)
+
+
+class DailyStatsTests(TestCase):
+    """Tests for the materialised daily statistics."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        with db.run_on_commit():
+            self.site = Area.objects.create(
+                area_type=Area.AREATYPE_SITE, name="Site",
+                geom=Polygon.from_bbox((114.0, -21.5, 114.5, -21.0)))
+        with db.run_on_commit():
+            self.nests = [
+                TurtleNestEncounter.objects.create(
+                    where=Point(114.2, -21.2), when=T0 + timedelta(minutes=i), observer=self.user,
+                    reporter=self.user, species="natator-depressus", nest_type="hatched-nest")
+                for i in range(3)
+            ]
+
+    def counts(self):
+        return list(DailyEncounterCount.objects.values_list("site", "date", "nest_type", "count"))
+
+    def test_refreshed_on_save_and_delete(self):
+        self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "hatched-nest", 3)])
+        nest = self.nests[0]
+        nest.when = T0 + timedelta(days=1)
+        with db.run_on_commit():
+            nest.save()
+            # Not before the commit
+            self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "hatched-nest", 3)])
+        self.assertEqual(sorted(self.counts()), [
+            (self.site.pk, date(2019, 11, 4), "hatched-nest", 2),
+            (self.site.pk, date(2019, 11, 5), "hatched-nest", 1)])
+        with db.run_on_commit():
+            nest.delete()
+        self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "hatched-nest", 2)])
+
+    def test_refreshed_once_per_transaction(self):
+        with mock.patch.object(stats.encounter_days, "handler", wraps=stats.refresh_encounter_days) as refresh:
+            with db.run_on_commit():
+                for nest in self.nests:
+                    nest.nest_type = "successful-crawl"
+                    nest.save()
+        refresh.assert_called_once_with({(self.site.pk, date(2019, 11, 4))})
+        self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "successful-crawl", 3)])
+
+    def test_deferred_refresh(self):
+        with stats.deferred_refresh():
+            with db.run_on_commit():
+                TurtleNestEncounter.objects.create(
+                    where=Point(114.2, -21.2), when=T0, observer=self.user,
+                    reporter=self.user, species="natator-depressus", nest_type="hatched-nest")
+            self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "hatched-nest", 3)])
+        with db.run_on_commit():
+            pass
+        self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "hatched-nest", 4)])
+
+    def test_bulk_updates(self):
+        # Site assignment
+        TurtleNestEncounter.objects.filter(pk=self.nests[0].pk).update(site=None)
+        stats.refresh_encounter_days({(self.site.pk, date(2019, 11, 4)), (None, date(2019, 11, 4))})
+        with db.run_on_commit():
+            self.assertEqual(spatial.assign_areas(), 1)
+        self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "hatched-nest", 3)])
+
+        # Reconstructed Surveys
+        with db.run_on_commit():
+            surveys.reconstruct_missing_surveys()
+        self.assertEqual(list(DailySurveyEffort.objects.values_list("site", "surveys")), [(self.site.pk, 1)])
+
+    def test_assign_areas_refreshes_site_days(self):
+        TurtleNestEncounter.objects.filter(pk=self.nests[0].pk).update(site=None)
+        stats.refresh_encounter_days({(self.site.pk, date(2019, 11, 4)), (None, date(2019, 11, 4))})
+        self.assertEqual(sorted(self.counts(), key=str), [
+            (None, date(2019, 11, 4), "hatched-nest", 1),
+            (self.site.pk, date(2019, 11, 4), "hatched-nest", 2)])
+
+        with mock.patch.object(stats.encounter_days, "handler", wraps=stats.refresh_encounter_days) as refresh:
+            with db.run_on_commit():
+                self.assertEqual(spatial.assign_areas(), 1)
+        refresh.assert_called_once_with({(None, date(2019, 11, 4)), (self.site.pk, date(2019, 11, 4))})
+        self.assertEqual(self.counts(), [(self.site.pk, date(2019, 11, 4), "hatched-nest", 3)])
+
+    def test_rebuild_matches_incremental(self):
+        with db.run_on_commit():
+            Survey.objects.create(
+                site=self.site, start_time=T0, end_time=T0 + timedelta(hours=2), reporter=self.user)
+        incremental = (sorted(self.counts()), list(DailySurveyEffort.objects.values_list("site", "surveys")))
+        self.assertEqual(stats.rebuild(), (1, 1))
+        self.assertEqual((sorted(self.counts()), list(DailySurveyEffort.objects.values_list("site", "surveys"))),
+                         incremental)
+
+    def test_totals(self):
+        with db.run_on_commit():
+            Survey.objects.create(
+                site=self.site, start_time=T0, end_time=T0 + timedelta(hours=2), reporter=self.user)
+        self.assertEqual(
+            stats.encounter_totals(group_by=["site", "species"], date__year=2019),
+            [dict(site=self.site.pk, species="natator-depressus", count=3)])
+        self.assertEqual(stats.encounter_totals(group_by=[], encounter_type="stranding"), [dict(count=0)])
+        self.assertEqual(
+            stats.survey_effort_totals(),
+            [dict(site=self.site.pk, surveys=1, duration=timedelta(hours=2))])
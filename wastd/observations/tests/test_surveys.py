@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point, Polygon
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from shared import db
+from wastd.observations import surveys, utils
+from wastd.observations.models import Area, Encounter, Survey, TurtleNestEncounter
+
+
+class SurveyReconstructionTests(TestCase):
+    """Tests for the set-based Survey reconstruction."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        self.other = get_user_model().objects.create_user("other", "other@test.com", "pass")
+        with db.run_on_commit():
+            self.sites = [
+                Area.objects.create(
+                    area_type=Area.AREATYPE_SITE, name="Site {0}".format(i),
+                    geom=Polygon.from_bbox((114.0 + i, -21.5, 114.5 + i, -21.0)))
+                for i in range(2)
+            ]
+        # A fixture season: three nights at two sites, a few tracks each
+        start = datetime(2019, 11, 1, 12, 0, tzinfo=timezone.utc)
+        for night in range(3):
+            for i, site in enumerate(self.sites):
+                for n in range(4):
+                    TurtleNestEncounter.objects.create(
+                        where=Point(114.1 + i + 0.05 * n, -21.2),
+                        when=start + timedelta(days=night, hours=n),
+                        observer=self.user,
+                        reporter=self.other if n == 0 else self.user)
+        # An Encounter without a site is not claimed
+        TurtleNestEncounter.objects.create(
+            where=Point(120.0, -21.2), when=start, observer=self.user, reporter=self.user)
+
+    def test_missing_surveys(self):
+        groups = surveys.missing_surveys()
+        self.assertEqual(len(groups), 6)
+        site_id, day, min_when, max_when, reporter_id = groups[0]
+        self.assertEqual(max_when - min_when, timedelta(hours=3))
+        self.assertEqual(reporter_id, self.other.pk)
+
+    def test_reconstruct_missing_surveys(self):
+        self.assertEqual(surveys.reconstruct_missing_surveys(), (6, 24))
+        self.assertEqual(Survey.objects.filter(source="reconstructed").count(), 6)
+        self.assertFalse(TurtleNestEncounter.objects.exclude(site=None).filter(survey=None).exists())
+        survey = Survey.objects.get(site=self.sites[0], start_time__date="2019-11-01")
+        self.assertEqual(survey.reporter, self.other)
+        self.assertIn("Site 0", survey.label)
+        self.assertIn(str(survey.pk), survey.label)
+        self.assertEqual(surveys.reconstruct_missing_surveys(), (0, 0))
+
+    def test_matches_signal_path(self):
+        with transaction.atomic():
+            utils.reconstruct_missing_surveys_legacy()
+            expected = surveys.survey_assignments()
+            transaction.set_rollback(True)
+        self.assertFalse(Encounter.objects.exclude(survey=None).exists())
+
+        surveys.reconstruct_missing_surveys()
+        self.assertEqual(surveys.survey_assignments(), expected)
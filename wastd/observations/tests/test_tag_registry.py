@@ -0,0 +1,69 @@
+from datetime import date, datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from wastd.observations import tag_registry
+from wastd.observations.models import AnimalEncounter, NestTagObservation, RegisteredTag, TagObservation
+
+T0 = datetime(2019, 11, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class TagRegistryTests(TestCase):
+    """Tests for the tag registry."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        self.first, self.second = [
+            AnimalEncounter.objects.create(
+                where=Point(114.7, -21.2), when=T0 + timedelta(days=14 * i),
+                observer=self.user, reporter=self.user)
+            for i in range(2)
+        ]
+        self.new = TagObservation.objects.create(encounter=self.first, name="WA1", status="applied-new")
+
+    def test_registered_on_save(self):
+        tag = RegisteredTag.objects.get(tag_type="flipper-tag", name="WA1")
+        self.assertEqual(tag.observation_count, 1)
+        self.assertEqual(tag.first_seen_id, self.first.pk)
+        self.assertFalse(tag.is_recapture)
+
+        TagObservation.objects.create(encounter=self.second, name="WA1", status="resighted")
+        tag = RegisteredTag.objects.get(tag_type="flipper-tag", name="WA1")
+        self.assertEqual(tag.observation_count, 2)
+        self.assertEqual(tag.status, "resighted")
+        self.assertEqual(tag.first_seen_id, self.first.pk)
+        self.assertEqual(tag.last_seen_id, self.second.pk)
+        self.assertEqual([h[1] for h in tag.status_history], ["applied-new", "resighted"])
+
+    def test_renamed_and_deleted(self):
+        self.new.name = "WA2"
+        self.new.save()
+        self.assertEqual([t.name for t in tag_registry.lookup("WA1")], [])
+        self.assertEqual([t.name for t in tag_registry.lookup("WA2", "flipper-tag")], ["WA2"])
+        self.new.delete()
+        self.assertFalse(RegisteredTag.objects.exists())
+
+    def test_nest_tags(self):
+        NestTagObservation.objects.create(
+            encounter=self.first, flipper_tag_id="WA1", date_nest_laid=date(2019, 11, 1), tag_label="M1")
+        self.assertEqual(tag_registry.lookup("WA1_2019-11-01_M1")[0].tag_type, tag_registry.NEST_TAG_TYPE)
+
+    def test_rebuild_matches_incremental(self):
+        TagObservation.objects.create(encounter=self.second, name="WA1", status="resighted")
+        NestTagObservation.objects.create(encounter=self.second, flipper_tag_id="WA1")
+        fields = ("tag_type", "name", "status", "observation_count", "first_seen", "last_seen", "status_history")
+        incremental = list(RegisteredTag.objects.values_list(*fields))
+        self.assertEqual(tag_registry.rebuild(), 2)
+        self.assertEqual(list(RegisteredTag.objects.values_list(*fields)), incremental)
+
+    def test_api_lookup(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse("api:registeredtag-list"), {"name": "WA1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["results"][0]["first_seen"], self.first.pk)
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.contrib.gis.geos import Point
+from django.test import TestCase
+from django.utils import timezone
+from django_fsm_log.models import StateLog
+
+from shared import transitions
+from wastd.observations.models import AnimalEncounter, Encounter
+
+
+class BulkTransitionTests(TestCase):
+    """Tests for bulk QA transitions of Encounters."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_superuser("testuser", "testuser@test.com", "pass")
+        self.encounters = [
+            AnimalEncounter.objects.create(
+                where=Point(114.7, -21.2), when=timezone.now(), observer=self.user, reporter=self.user)
+            for i in range(3)
+        ]
+        self.rejected = self.encounters[2]
+        self.rejected.status = Encounter.STATUS_REJECTED
+        self.rejected.save()
+        Encounter.objects.update(render_dirty=False)
+
+    def test_bulk_transition(self):
+        result = transitions.bulk_transition(Encounter.objects.all(), "curate", by=self.user)
+        self.assertEqual(result, {"transitioned": 2, "skipped": 1})
+        self.assertEqual(Encounter.objects.filter(status=Encounter.STATUS_CURATED).count(), 2)
+        self.assertEqual(Encounter.objects.get(pk=self.rejected.pk).status, Encounter.STATUS_REJECTED)
+        self.assertEqual(Encounter.objects.filter(render_dirty=True).count(), 2)
+
+        log = StateLog.objects.for_(self.encounters[0]).get()
+        self.assertEqual(log.transition, "curate")
+        self.assertEqual(log.source_state, Encounter.STATUS_NEW)
+        self.assertEqual(log.state, Encounter.STATUS_CURATED)
+        self.assertEqual(log.by, self.user)
+        self.assertFalse(StateLog.objects.for_(self.rejected).exists())
+
+    def test_ineligible_records_are_skipped(self):
+        result = transitions.bulk_transition(Encounter.objects.all(), "publish")
+        self.assertEqual(result, {"transitioned": 0, "skipped": 3})
+        self.assertFalse(StateLog.objects.exists())
+
+    def test_unknown_transition(self):
+        with self.assertRaises(ValueError):
+            transitions.bulk_transition(Encounter.objects.all(), "delete")
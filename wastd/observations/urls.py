@@ -5,6 +5,7 @@ from . import views
 app_name = 'observations'
 
 urlpatterns = [
+    path('season-summary.csv', views.season_summary_csv, name='season-summary-csv'),
     path('animal-encounters/', views.AnimalEncounterList.as_view(), name='animalencounter-list'),
     path('animal-encounters/create/', views.AnimalEncounterCreate.as_view(), name='animalencounter-create'),
     path('animal-encounters/<int:pk>/', views.AnimalEncounterDetail.as_view(), name='animalencounter-detail'),
@@ -2,7 +2,8 @@
 """Views for WAStD."""
 from django.contrib import messages
 from django.db import transaction
-from django.http import HttpResponseRedirect
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, HttpResponseRedirect
 from django.shortcuts import redirect
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
@@ -17,6 +18,7 @@ from sentry_sdk import capture_message
 
 from shared.views import ListViewBreadcrumbMixin, DetailViewBreadcrumbMixin
 
+from wastd.observations import analytics
 from wastd.observations.filters import AnimalEncounterFilter, AnimalEncounterFilter2, EncounterFilter
 from wastd.observations.forms import AnimalEncounterListFormHelper, EncounterListFormHelper, AnimalEncounterForm, FlipperTagObservationFormSet
 from wastd.observations.models import AnimalEncounter, Encounter, TagObservation
@@ -44,6 +46,16 @@ def update_names_view(request):
     return HttpResponseRedirect("/")
 
 
+@staff_member_required
+def season_summary_csv(request):
+    """Download nesting season statistics as CSV, filtered by site, species and season."""
+    summary = analytics.cached_season_summary(**analytics.summary_filters(request.GET))
+    response = HttpResponse(content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="season-summary.csv"'
+    summary.to_csv(response, index=False)
+    return response
+
+
 class HomeView(ListView):
     """HomeView."""
 
@@ -4,12 +4,18 @@ from wastd.observations import api as observations_api
 from conservation import api as conservation_api
 from occurrence import api as occurrence_api
 from taxonomy import api as taxonomy_api
+from shared import api as shared_api
 
 router = DefaultRouter()
 # meta: users, area, surveys
 router.register("users", users_api.UserViewSet)
 router.register("area", observations_api.AreaViewSet)
 # router.register("surveys", observations_api.SurveyViewSet)
+router.register("tag-registry", observations_api.RegisteredTagViewSet)
+router.register("season-summary", observations_api.SeasonSummaryViewSet, basename="season_summary")
+router.register("daily-encounter-counts", observations_api.DailyEncounterCountViewSet)
+router.register("daily-survey-effort", observations_api.DailySurveyEffortViewSet)
+router.register("changes", shared_api.ChangeFeedViewSet, basename="changes")
 
 # # Encounters
 # router.register(
@@ -173,6 +179,9 @@ router.register("lookup-soilcondition", occurrence_api.SoilConditionViewSet)
 # taxonomy
 router.register("taxon", taxonomy_api.TaxonViewSet, basename="taxon_full")
 router.register("taxon-fast", taxonomy_api.FastTaxonViewSet, basename="taxon_fast")
+router.register("taxon-search", taxonomy_api.TaxonSearchViewSet, basename="taxon_search")
+router.register("taxon-resolve", taxonomy_api.TaxonResolveViewSet, basename="taxon_resolve")
+router.register("taxon-tree", taxonomy_api.TaxonTreeViewSet, basename="taxon_tree")
 router.register("vernacular", taxonomy_api.VernacularViewSet)
 router.register("crossreference", taxonomy_api.CrossreferenceViewSet)
 router.register("community", taxonomy_api.CommunityViewSet)